@@ -11,6 +11,8 @@ import fnmatch
 import os
 from setuptools import setup, find_packages, Extension
 from setuptools.command.test import test as TestCommand
+from setuptools.command.build_py import build_py
+import importlib.util
 import numpy
 from Cython.Build import cythonize
 
@@ -48,6 +50,50 @@ except ValueError:
     pass
 
 
+class BuildPy(build_py):
+    """
+    Additionally convert the datasets from the chemical component
+    dictionary into a memory-mappable store in the build directory.
+    """
+
+    def run(self):
+        super().run()
+        if importlib.util.find_spec("msgpack") is None:
+            # The datasets cannot be read
+            # -> the store is created in memory at runtime instead
+            return
+        info_dir = join("src", "biotite", "structure", "info")
+        # The module is loaded directly from its file, as importing
+        # 'biotite' requires the compiled extensions
+        ccd_spec = importlib.util.spec_from_file_location(
+            "ccd", join(info_dir, "ccd.py")
+        )
+        ccd = importlib.util.module_from_spec(ccd_spec)
+        ccd_spec.loader.exec_module(ccd)
+        if not all(
+            os.path.isfile(join(info_dir, file_name))
+            for file_name in ccd.DATASET_FILE_NAMES
+        ):
+            # Never create a store from incomplete data
+            return
+        store_path = join(
+            self.build_lib, "biotite", "structure", "info",
+            ccd.STORE_FILE_NAME
+        )
+        if not self.force and os.path.isfile(store_path):
+            # Use the same criterion as 'get_component_store()'
+            try:
+                up_to_date = ccd.ComponentStore.read(store_path) \
+                             .is_up_to_date(info_dir)
+            except ValueError:
+                # Store from an incompatible version
+                up_to_date = False
+            if up_to_date:
+                return
+        self.mkpath(dirname(store_path))
+        ccd.ComponentStore.from_msgpack(info_dir).write(store_path)
+
+
 def get_extensions():
     ext_sources = []
     for dirpath, dirnames, filenames in os.walk(normpath("src/biotite")):
@@ -96,6 +142,7 @@ setup(
     package_dir = {"" : "src"},
     
     ext_modules = get_extensions(),
+    cmdclass = {"build_py": BuildPy},
     
     # Including additional data
     package_data = {
@@ -13,7 +13,16 @@ __version__ = "0.25.0"
 __name__ = "biotite"
 __author__ = "Patrick Kunzmann"
 
-from .file import *
-from .temp import *
-from .copyable import * 
-from .visualize import * 
+from importlib.util import find_spec as _find_spec
+from .lazy import lazy_load as _lazy_load
+
+# The attributes of the modules are imported on first access
+_lazy_load(__name__, {
+    "file":      ["File", "TextFile", "InvalidFileError"],
+    "temp":      ["temp_file", "temp_dir"],
+    "copyable":  ["Copyable"],
+    "visualize": ["colors", "set_font_size_in_coord", "AdaptiveFancyArrow"],
+})
+# 'AdaptiveFancyArrow' is only available, if Matplotlib is installed
+if _find_spec("matplotlib") is None:
+    __all__.remove("AdaptiveFancyArrow")
@@ -0,0 +1,117 @@
+# This source code is part of the Biotite package and is distributed
+# under the 3-Clause BSD License. Please see 'LICENSE.rst' for further
+# information.
+
+"""
+Lazy loading of the attributes of *Biotite* packages.
+
+Each package exposes the public attributes of its modules, as if they
+were star-imported in the ``__init__.py``.
+However, a module is only imported, when one of its attributes is
+accessed for the first time
+(see `PEP 562 <https://peps.python.org/pep-0562/>`_).
+This keeps ``import biotite.structure`` and the like cheap, although
+the package comprises many modules.
+"""
+
+__author__ = "Patrick Kunzmann"
+__all__ = ["lazy_load"]
+
+import importlib
+import importlib.util
+import sys
+import types
+
+
+class _LazyPackage(types.ModuleType):
+    """
+    Module type for packages, whose attributes are imported from their
+    submodules on first access.
+    """
+
+    def __getattr__(self, name):
+        # Only called, if 'name' is not in the module dictionary yet
+        if name.startswith("__"):
+            raise AttributeError(
+                f"module '{self.__name__}' has no attribute '{name}'"
+            )
+        lazy_attributes = self.__dict__["_lazy_attributes"]
+        module_name = lazy_attributes.get(name)
+        if module_name is not None:
+            module = importlib.import_module(f"{self.__name__}.{module_name}")
+            value = getattr(module, name)
+            # Bypass '__setattr__()' to cache the attribute
+            self.__dict__[name] = value
+            return value
+        # Like in a package that imports all of its submodules,
+        # submodules and subpackages are accessible as attributes
+        submodule_name = f"{self.__name__}.{name}"
+        if importlib.util.find_spec(submodule_name) is None:
+            raise AttributeError(
+                f"module '{self.__name__}' has no attribute '{name}'"
+            )
+        return importlib.import_module(submodule_name)
+
+    def __setattr__(self, name, value):
+        # After a submodule has been imported, the import system binds
+        # it to an attribute of the parent package with the name of the
+        # submodule
+        # If the submodule contains an attribute with the same name
+        # (e.g. 'biotite.structure.sasa.sasa()'), the submodule must
+        # not shadow it
+        if (
+            isinstance(value, types.ModuleType)
+            and name in self.__dict__["_lazy_attributes"]
+            and getattr(value.__spec__, "name", None)
+                == f"{self.__name__}.{name}"
+        ):
+            return
+        super().__setattr__(name, value)
+
+    def __dir__(self):
+        # Attributes, that are unavailable due to uninstalled optional
+        # dependencies, are not part of '__all__'
+        return sorted(set(super().__dir__()) | set(self.__dict__["__all__"]))
+
+
+def lazy_load(package_name, module_attributes):
+    """
+    Make the public attributes of the submodules of a package available
+    as attributes of the package, without importing the submodules.
+
+    A submodule is imported when one of its attributes is accessed for
+    the first time.
+
+    This function is intended to be called in the ``__init__.py`` of a
+    package.
+
+    Parameters
+    ----------
+    package_name : str
+        The full name of the package.
+    module_attributes : dict of (str -> list of str)
+        Maps the name of each submodule (relative to the package) to
+        the names of the attributes, that should be exposed by the
+        package.
+        These are usually the names in ``__all__`` of the submodule.
+        If multiple submodules expose an attribute with the same name,
+        the attribute of the submodule that appears last is taken, as
+        it would be by a sequence of star-imports.
+
+    Notes
+    -----
+    The ``__all__`` attribute of the package is set to all exposed
+    attribute names, so that a star-import from the package still
+    imports all of them.
+    Attributes, that depend on an uninstalled optional dependency,
+    should be removed from ``__all__`` afterwards, to omit them from
+    star-imports and :func:`dir()`.
+    """
+    package = sys.modules[package_name]
+    lazy_attributes = {}
+    for module_name, attribute_names in module_attributes.items():
+        for attribute_name in attribute_names:
+            lazy_attributes[attribute_name] = module_name
+    package._lazy_attributes = lazy_attributes
+    package.__all__ = list(lazy_attributes.keys())
+    package.__class__ = _LazyPackage
@@ -0,0 +1,130 @@
+# This source code is part of the Biotite package and is distributed
+# under the 3-Clause BSD License. Please see 'LICENSE.rst' for further
+# information.
+
+"""
+Distribution of independent tasks over a thread or process pool.
+
+This module is used internally by functions that offer an `n_jobs`
+parameter.
+"""
+
+__author__ = "Patrick Kunzmann"
+__all__ = ["check_n_jobs", "map_tasks"]
+
+import os
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
+
+
+# The function and shared data of a worker process,
+# set by '_init_worker()'
+_worker_function = None
+_worker_shared = None
+
+
+def check_n_jobs(n_jobs, backend="thread"):
+    """
+    Check the given number of workers and the backend.
+
+    Parameters
+    ----------
+    n_jobs : int or None
+        The number of workers.
+        If ``None``, the number of available CPU cores is used.
+    backend : {'thread', 'process'}, optional
+        Whether the workers are threads or processes.
+
+    Returns
+    -------
+    n_jobs : int
+        The number of workers.
+    """
+    if backend not in ("thread", "process"):
+        raise ValueError(f"Backend '{backend}' is invalid")
+    if n_jobs is None:
+        n_jobs = os.cpu_count()
+        if n_jobs is None:
+            n_jobs = 1
+    if n_jobs < 1:
+        raise ValueError("The number of jobs must be at least 1")
+    return n_jobs
+
+
+def map_tasks(function, tasks, n_jobs, backend="thread", shared=None):
+    """
+    Apply a function to each task, either in the calling thread or in
+    a thread or process pool.
+
+    The tasks are grouped into a few chunks per worker to reduce the
+    overhead of the pool.
+
+    Parameters
+    ----------
+    function : callable
+        The function to be applied.
+        For the process backend, it must be picklable, i.e. it must
+        be importable from its module.
+    tasks : iterable object
+        The tasks.
+        If `shared` is given, each task is a tuple of indices into
+        `shared`.
+    n_jobs : int
+        The number of workers, as returned by :func:`check_n_jobs()`.
+    backend : {'thread', 'process'}, optional
+        Whether the workers are threads or processes.
+    shared : sequence, optional
+        If given, the function is called with the items of `shared`,
+        that are referenced by the indices in a task, as positional
+        arguments.
+        For the process backend, `function` and `shared` are
+        transferred to each worker process only once, instead of once
+        per task.
+
+    Returns
+    -------
+    results : list
+        The return value of the function for each task.
+    """
+    tasks = list(tasks)
+    if n_jobs == 1 or len(tasks) <= 1:
+        return _run_chunk(function, shared, tasks)
+
+    n_chunks = min(len(tasks), n_jobs * 4)
+    chunk_bounds = np.linspace(0, len(tasks), n_chunks + 1).astype(int)
+    chunks = [
+        tasks[start : stop]
+        for start, stop in zip(chunk_bounds[:-1], chunk_bounds[1:])
+    ]
+    if backend == "thread":
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            results = list(executor.map(
+                partial(_run_chunk, function, shared), chunks
+            ))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=n_jobs,
+            initializer=_init_worker, initargs=(function, shared)
+        ) as executor:
+            results = list(executor.map(_run_worker_chunk, chunks))
+    return [result for chunk_results in results for result in chunk_results]
+
+
+def _run_chunk(function, shared, tasks):
+    if shared is None:
+        return [function(task) for task in tasks]
+    else:
+        return [
+            function(*[shared[i] for i in task]) for task in tasks
+        ]
+
+
+def _init_worker(function, shared):
+    global _worker_function, _worker_shared
+    _worker_function = function
+    _worker_shared = shared
+
+
+def _run_worker_chunk(tasks):
+    return _run_chunk(_worker_function, _worker_shared, tasks)
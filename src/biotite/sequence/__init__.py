@@ -64,9 +64,17 @@ An :class:`AnnotatedSequence` combines an :class:`Annotation` and a
 __name__ = "biotite.sequence"
 __author__ = "Patrick Kunzmann"
 
-from .alphabet import *
-from .search import *
-from .seqtypes import *
-from .sequence import *
-from .codon import *
-from .annotation import *
\ No newline at end of file
+from ..lazy import lazy_load as _lazy_load
+
+# The attributes of the modules are imported on first access
+_lazy_load(__name__, {
+    "alphabet":   ["Alphabet", "LetterAlphabet", "AlphabetMapper",
+                   "AlphabetError"],
+    "search":     ["find_subsequence", "find_symbol", "find_symbol_first",
+                   "find_symbol_last"],
+    "seqtypes":   ["GeneralSequence", "NucleotideSequence",
+                   "PackedNucleotideSequence", "ProteinSequence"],
+    "sequence":   ["Sequence"],
+    "codon":      ["CodonTable"],
+    "annotation": ["Location", "Feature", "Annotation", "AnnotatedSequence"],
+})
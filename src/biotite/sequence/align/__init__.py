@@ -24,6 +24,12 @@ Optionally they also contain the similarity score.
 
 The aligning functions are usually C-accelerated, reducing the
 computation time substantially.
+:func:`align_many()` and :func:`pairwise_scores()` additionally
+distribute a large number of alignments over multiple CPU cores.
+
+A :class:`KmerTable` indexes the *k-mers* of reference sequences, to
+rapidly find exact matches of short subsequences, e.g. as seeds for
+heuristic alignment methods.
 """
 
 __name__ = "biotite.sequence.align"
@@ -31,5 +37,11 @@ __author__ = "Patrick Kunzmann"
 
 from .alignment import *
 from .pairwise import *
+from .banded import *
+from .localungapped import *
+from .localgapped import *
+from .striped import *
+from .batch import *
 from .multiple import *
-from .matrix import *
\ No newline at end of file
+from .matrix import *
+from .kmertable import *
\ No newline at end of file
@@ -0,0 +1,774 @@
+# This source code is part of the Biotite package and is distributed
+# under the 3-Clause BSD License. Please see 'LICENSE.rst' for further
+# information.
+
+__name__ = "biotite.sequence.align"
+__author__ = "Patrick Kunzmann"
+__all__ = ["align_banded"]
+
+cimport cython
+cimport numpy as np
+
+from .matrix import SubstitutionMatrix
+from ..sequence import Sequence
+from .alignment import Alignment
+import numpy as np
+
+
+ctypedef np.int32_t int32
+ctypedef np.int64_t int64
+ctypedef np.uint8_t uint8
+ctypedef np.uint16_t uint16
+ctypedef np.uint32_t uint32
+ctypedef np.uint64_t uint64
+
+ctypedef fused CodeType1:
+    uint8
+    uint16
+    uint32
+    uint64
+ctypedef fused CodeType2:
+    uint8
+    uint16
+    uint32
+    uint64
+
+
+def align_banded(seq1, seq2, matrix, band, gap_penalty=-10, local=False,
+                 max_number=1000):
+    """
+    align_banded(seq1, seq2, matrix, band, gap_penalty=-10,
+                 local=False, max_number=1000)
+
+    Perform a local or global alignment within a defined diagonal
+    band.
+
+    The function requires two diagonals that define the lower
+    and upper limit of the alignment band.
+    A diagonal is an integer defined as :math:`D = j - i`, where *i*
+    and *j* are sequence positions in the first and second sequence,
+    respectively.
+    This means that two symbols at position *i* and *j* can only be
+    aligned to each other, if :math:`D_L \\leq j - i \\leq D_U`.
+    With increasing width of the diagonal band, the probability to find
+    the optimal alignment, but also the computation time increases.
+
+    In contrast to :func:`align_optimal()`, the memory and time
+    requirements scale linearly with the sequence length for a fixed
+    band width:
+    Only the part of the alignment table that lies in the band is
+    computed and only the trace table and two rows of the score table
+    are kept in memory.
+    Hence, this function is suited to align long, similar sequences,
+    whose alignment is expected to stay close to a diagonal, e.g. a
+    diagonal obtained from a *k-mer* match of a :class:`KmerTable`.
+
+    Parameters
+    ----------
+    seq1, seq2 : Sequence
+        The sequences to be aligned.
+    matrix : SubstitutionMatrix
+        The substitution matrix used for scoring.
+    band : tuple(int, int)
+        The diagonals that represent the lower and upper limit of the
+        search space.
+        A diagonal :math:`D` is defined as :math:`D = j-i`, where
+        :math:`i` and :math:`j` are positions in `seq1` and `seq2`,
+        respectively.
+        For a global alignment, the band must contain the diagonals
+        :math:`0` and :math:`|seq2| - |seq1|`, as the alignment must
+        start and end at the corners of the alignment table.
+    gap_penalty : int or (tuple, dtype=int), optional
+        If an integer is provided, the value will be interpreted as
+        linear gap penalty.
+        If a tuple is provided, an affine gap penalty is used.
+        The first integer in the tuple is the gap opening penalty,
+        the second integer is the gap extension penalty.
+        The values need to be negative.
+    local : bool, optional
+        If false, a global alignment is performed, otherwise a local
+        alignment is performed.
+    max_number : int, optional
+        The maximum number of alignments returned.
+        When the number of branches exceeds this value in the traceback
+        step, no further branches are created.
+
+    Returns
+    -------
+    alignments : list of Alignment
+        A list of alignments.
+        Each alignment in the list has the same similarity score.
+        As the alignment is restricted to the band, this score might
+        be lower than the score of the optimal alignment.
+
+    See also
+    --------
+    align_optimal
+        Guarantees to find the optimal alignment at the cost of greater
+        computation time and memory requirements.
+
+    Notes
+    -----
+    For a global alignment terminal gaps are always penalized.
+
+    Examples
+    --------
+
+    >>> seq1 = NucleotideSequence("ATACGCTTGCT")
+    >>> seq2 = NucleotideSequence("AGGCGCAGCT")
+    >>> matrix = SubstitutionMatrix.std_nucleotide_matrix()
+    >>> alignments = align_banded(
+    ...     seq1, seq2, matrix, gap_penalty=-6, band=(-2, 2)
+    ... )
+    >>> for ali in alignments:
+    ...     print(ali, "\\n")
+    ATACGCTTGCT
+    AGGCGCA-GCT 
+    <BLANKLINE>
+    ATACGCTTGCT
+    AGGCGC-AGCT 
+    <BLANKLINE>
+
+    Determine the band from a seed of a :class:`KmerTable`:
+
+    >>> table = KmerTable.from_sequences(3, [seq1])
+    >>> query_pos, _, ref_pos = table.match(seq2)[0]
+    >>> diagonal = query_pos - ref_pos
+    >>> alignments = align_banded(
+    ...     seq1, seq2, matrix, gap_penalty=-6,
+    ...     band=(diagonal - 2, diagonal + 2), local=True
+    ... )
+    >>> print(alignments[0])
+    CGCTTGCT
+    CGCA-GCT
+    """
+    # Check matrix alphabets
+    if     not matrix.get_alphabet1().extends(seq1.get_alphabet()) \
+        or not matrix.get_alphabet2().extends(seq2.get_alphabet()):
+            raise ValueError("The sequences' alphabets do not fit the matrix")
+    # Check if gap penalty is linear or affine
+    if type(gap_penalty) == int:
+        if gap_penalty > 0:
+            raise ValueError("Gap penalty must be negative")
+        affine_penalty = False
+    elif type(gap_penalty) == tuple:
+        if gap_penalty[0] > 0 or gap_penalty[1] > 0:
+                raise ValueError("Gap penalty must be negative")
+        affine_penalty = True
+    else:
+        raise TypeError("Gap penalty must be either integer or tuple")
+    # Check if max_number is reasonable
+    if max_number < 1:
+        raise ValueError(
+            "Maximum number of returned alignments must be at least 1"
+        )
+
+    # Check band
+    lower_diag, upper_diag = min(band), max(band)
+    if lower_diag == upper_diag:
+        raise ValueError(
+            "The lower and upper diagonal of the band must be different"
+        )
+    # Restrict band to the part, that actually lies in the table
+    lower_diag = max(lower_diag, -len(seq1))
+    upper_diag = min(upper_diag, len(seq2))
+    if lower_diag > upper_diag:
+        raise ValueError(
+            "The band does not overlap with the alignment table"
+        )
+    if not local:
+        if lower_diag > 0 or upper_diag < 0 \
+           or lower_diag > len(seq2) - len(seq1) \
+           or upper_diag < len(seq2) - len(seq1):
+                raise ValueError(
+                    "Band is out of range, the band must contain the "
+                    "diagonals 0 and |seq2|-|seq1| for a global alignment"
+                )
+
+    # The trace table uses the same bit scheme as in
+    # 'align_optimal()'
+    # However, the trace table has a transformed shape:
+    # The cell (i, j) of the full table is placed at (i, j-i-lower_diag)
+    # so that each row contains only the cells inside the band
+    band_width = upper_diag - lower_diag + 1
+    trace_table = np.zeros((len(seq1)+1, band_width), dtype=np.uint8)
+    code1 = seq1.code
+    code2 = seq2.code
+    score_matrix = matrix.score_matrix()
+
+    # Table filling
+    ###############
+    # Value for negative infinity
+    # Used to prevent unallowed state transitions
+    # Subtraction of gap penalties and lowest score value
+    # to prevent integer overflow
+    if affine_penalty:
+        gap_open, gap_ext = gap_penalty
+    else:
+        gap_open, gap_ext = gap_penalty, gap_penalty
+    neg_inf = np.iinfo(np.int32).min - 2*gap_open - 2*gap_ext
+    min_score = np.min(score_matrix)
+    if min_score < 0:
+        neg_inf -= min_score
+    if affine_penalty:
+        max_score, i_list, j_list, state_list = _fill_align_table_affine(
+            code1, code2, score_matrix, trace_table, lower_diag, upper_diag,
+            gap_open, gap_ext, neg_inf, local, max_number
+        )
+    else:
+        max_score, i_list, j_list, state_list = _fill_align_table(
+            code1, code2, score_matrix, trace_table, lower_diag, upper_diag,
+            gap_penalty, neg_inf, local, max_number
+        )
+
+    # Traceback
+    ###########
+    trace_list = []
+    cdef int curr_trace_count
+    for k in range(len(i_list)):
+        i_start = i_list[k]
+        j_start = j_list[k]
+        state_start = state_list[k]
+        # Pessimistic array allocation
+        trace = np.full(( i_start+1 + j_start+1, 2 ), -1, dtype=np.int64)
+        curr_trace_count = 1
+        _follow_trace(
+            trace_table, lower_diag, i_start, j_start, 0, trace, trace_list,
+            state=state_start, curr_trace_count=&curr_trace_count,
+            max_trace_count=max_number
+        )
+    if len(trace_list) == 0:
+        # No positive score was found for a local alignment
+        return [Alignment(
+            [seq1, seq2], np.zeros((0, 2), dtype=np.int64), max_score
+        )]
+
+    # Replace gap entries in trace with -1
+    for i, trace in enumerate(trace_list):
+        trace = np.flip(trace, axis=0)
+        gap_filter = np.zeros(trace.shape, dtype=bool)
+        gap_filter[np.unique(trace[:,0], return_index=True)[1], 0] = True
+        gap_filter[np.unique(trace[:,1], return_index=True)[1], 1] = True
+        trace[~gap_filter] = -1
+        trace_list[i] = trace
+
+    return [Alignment([seq1, seq2], trace, max_score) for trace in trace_list]
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _fill_align_table(CodeType1[:] code1 not None,
+                      CodeType2[:] code2 not None,
+                      const int32[:,:] matrix not None,
+                      uint8[:,:] trace_table not None,
+                      int lower_diag,
+                      int upper_diag,
+                      int32 gap_penalty,
+                      int32 neg_inf,
+                      bint local,
+                      int max_number):
+    """
+    Fill the band of an alignment table with linear gap penalty using
+    dynamic programming.
+
+    Only two rows of the score table are kept in memory.
+    The maximum score and the cells where the traceback starts are
+    determined on the fly.
+
+    Parameters
+    ----------
+    code1, code2
+        The sequence code of each sequence to be aligned.
+    matrix
+        The score matrix obtained from the :class:`SubstitutionMatrix`
+        object.
+    trace_table
+        A band-transformed matrix containing values indicating the
+        direction for the traceback step.
+        The matrix is filled in this function
+    lower_diag, upper_diag
+        The band limits.
+    gap_penalty
+        The linear gap penalty.
+    neg_inf
+        The value used for negative infinity.
+    local
+        Indicates, whether a local alignment should be performed.
+    max_number
+        The maximum number of traceback starting points.
+
+    Returns
+    -------
+    max_score
+        The alignment score.
+    i_list, j_list, state_list
+        The starting points of the traceback.
+    """
+    cdef int i, j, b
+    cdef int j_min, j_max
+    cdef int n1 = code1.shape[0]
+    cdef int n2 = code2.shape[0]
+    cdef int band_width = upper_diag - lower_diag + 1
+    cdef int32 from_diag, from_left, from_top
+    cdef uint8 trace
+    cdef int32 score
+    cdef int32 max_score = 0
+
+    # The score rows are padded by one cell on each side,
+    # so that the neighbors of cells at the band border can be accessed
+    # -> 'b+1' is the index of band column 'b'
+    cdef int32[:] prev_row = np.full(band_width + 2, neg_inf, dtype=np.int32)
+    cdef int32[:] curr_row = np.full(band_width + 2, neg_inf, dtype=np.int32)
+    cdef int32[:] temp_row
+
+    i_list = []
+    j_list = []
+
+    for i in range(n1 + 1):
+        j_min = max(0, i + lower_diag)
+        j_max = min(n2, i + upper_diag)
+        curr_row[:] = neg_inf
+        for j in range(j_min, j_max + 1):
+            b = j - i - lower_diag
+            if i == 0 or j == 0:
+                # Initialize the first row and column
+                if local:
+                    curr_row[b+1] = 0
+                else:
+                    curr_row[b+1] = (i + j) * gap_penalty
+                    if i == 0 and j != 0:
+                        trace_table[i, b] = 2
+                    elif j == 0 and i != 0:
+                        trace_table[i, b] = 4
+                continue
+
+            # Diagonal: (i-1, j-1) -> same band column in previous row
+            from_diag = prev_row[b+1] + matrix[code1[i-1], code2[j-1]]
+            # Left: (i, j-1) -> previous band column in current row
+            from_left = curr_row[b] + gap_penalty
+            # Top: (i-1, j) -> next band column in previous row
+            from_top = prev_row[b+2] + gap_penalty
+
+            # Find maximum
+            if from_diag > from_left:
+                if from_diag > from_top:
+                    trace, score = 1, from_diag
+                elif from_diag == from_top:
+                    trace, score = 5, from_diag
+                else:
+                    trace, score = 4, from_top
+            elif from_diag == from_left:
+                if from_diag > from_top:
+                    trace, score = 3, from_diag
+                elif from_diag == from_top:
+                    trace, score = 7, from_diag
+                else:
+                    trace, score =  4, from_top
+            else:
+                if from_left > from_top:
+                    trace, score = 2, from_left
+                elif from_left == from_top:
+                    trace, score = 6, from_left
+                else:
+                    trace, score = 4, from_top
+
+            if local:
+                # If score is less than or equal to 0,
+                # then 0 is saved on the field and the trace ends here
+                if score <= 0:
+                    curr_row[b+1] = 0
+                else:
+                    curr_row[b+1] = score
+                    trace_table[i, b] = trace
+                    if score > max_score:
+                        max_score = score
+                        i_list = [i]
+                        j_list = [j]
+                    elif score == max_score and len(i_list) < max_number:
+                        i_list.append(i)
+                        j_list.append(j)
+            else:
+                curr_row[b+1] = score
+                trace_table[i, b] = trace
+
+        temp_row = prev_row
+        prev_row = curr_row
+        curr_row = temp_row
+
+    if not local:
+        # The traceback starts in the last cell of the table
+        # After the last swap, the last row is 'prev_row'
+        max_score = prev_row[n2 - n1 - lower_diag + 1]
+        i_list = [n1]
+        j_list = [n2]
+    # State is always 0 for linear gap penalty
+    # since there is only one table
+    return max_score, i_list, j_list, [0] * len(i_list)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _fill_align_table_affine(CodeType1[:] code1 not None,
+                             CodeType2[:] code2 not None,
+                             const int32[:,:] matrix not None,
+                             uint8[:,:] trace_table not None,
+                             int lower_diag,
+                             int upper_diag,
+                             int32 gap_open,
+                             int32 gap_ext,
+                             int32 neg_inf,
+                             bint local,
+                             int max_number):
+    """
+    Fill the band of an alignment table with affine gap penalty using
+    dynamic programming.
+
+    Only two rows of the three score tables are kept in memory.
+    The maximum score and the cells where the traceback starts are
+    determined on the fly.
+
+    Parameters
+    ----------
+    code1, code2
+        The sequence code of each sequence to be aligned.
+    matrix
+        The score matrix obtained from the :class:`SubstitutionMatrix`
+        object.
+    trace_table
+        A band-transformed matrix containing values indicating the
+        direction for the traceback step.
+        The matrix is filled in this function
+    lower_diag, upper_diag
+        The band limits.
+    gap_open
+        The gap opening penalty.
+    gap_ext
+        The gap extension penalty.
+    neg_inf
+        The value used for negative infinity.
+    local
+        Indicates, whether a local alignment should be performed.
+    max_number
+        The maximum number of traceback starting points.
+
+    Returns
+    -------
+    max_score
+        The alignment score.
+    i_list, j_list, state_list
+        The starting points of the traceback.
+    """
+    cdef int i, j, b, k
+    cdef int j_min, j_max
+    cdef int n1 = code1.shape[0]
+    cdef int n2 = code2.shape[0]
+    cdef int band_width = upper_diag - lower_diag + 1
+    cdef int32 mm_score, g1m_score, g2m_score
+    cdef int32 mg1_score, g1g1_score
+    cdef int32 mg2_score, g2g2_score
+    cdef uint8 trace
+    cdef int32 m_score, g1_score, g2_score
+    cdef int32 similarity
+    cdef int32 max_score = 0
+    cdef int32 state_scores[3]
+
+    # The score rows are padded by one cell on each side,
+    # so that the neighbors of cells at the band border can be accessed
+    # -> 'b+1' is the index of band column 'b'
+    cdef int32[:] m_prev  = np.full(band_width + 2, neg_inf, dtype=np.int32)
+    cdef int32[:] m_curr  = np.full(band_width + 2, neg_inf, dtype=np.int32)
+    cdef int32[:] g1_prev = np.full(band_width + 2, neg_inf, dtype=np.int32)
+    cdef int32[:] g1_curr = np.full(band_width + 2, neg_inf, dtype=np.int32)
+    cdef int32[:] g2_prev = np.full(band_width + 2, neg_inf, dtype=np.int32)
+    cdef int32[:] g2_curr = np.full(band_width + 2, neg_inf, dtype=np.int32)
+    cdef int32[:] temp_row
+
+    i_list = []
+    j_list = []
+    state_list = []
+
+    for i in range(n1 + 1):
+        j_min = max(0, i + lower_diag)
+        j_max = min(n2, i + upper_diag)
+        m_curr[:] = neg_inf
+        g1_curr[:] = neg_inf
+        g2_curr[:] = neg_inf
+        for j in range(j_min, j_max + 1):
+            b = j - i - lower_diag
+            if i == 0 or j == 0:
+                # Initialize the first row and column
+                if i == 0 and j == 0:
+                    m_curr[b+1] = 0
+                elif i == 0:
+                    g1_curr[b+1] = 0 if local else gap_open + (j-1) * gap_ext
+                    if not local:
+                        trace_table[i, b] = 16
+                else:
+                    g2_curr[b+1] = 0 if local else gap_open + (i-1) * gap_ext
+                    if not local:
+                        trace_table[i, b] = 64
+                continue
+
+            # Calculate the scores for possible transitions
+            # into the current cell
+            # Diagonal: same band column in previous row
+            similarity = matrix[code1[i-1], code2[j-1]]
+            mm_score  =  m_prev[b+1] + similarity
+            g1m_score = g1_prev[b+1] + similarity
+            g2m_score = g2_prev[b+1] + similarity
+            # Left: previous band column in current row
+            mg1_score  =  m_curr[b] + gap_open
+            g1g1_score = g1_curr[b] + gap_ext
+            # Top: next band column in previous row
+            mg2_score  =  m_prev[b+2] + gap_open
+            g2g2_score = g2_prev[b+2] + gap_ext
+
+            # Find maximum score and trace
+            # (similar to general gap method)
+            # At first for match table (m_table)
+            if mm_score > g1m_score:
+                if mm_score > g2m_score:
+                    trace, m_score = 1, mm_score
+                elif mm_score == g2m_score:
+                    trace, m_score = 5, mm_score
+                else:
+                    trace, m_score = 4, g2m_score
+            elif mm_score == g1m_score:
+                if mm_score > g2m_score:
+                    trace, m_score = 3, mm_score
+                elif mm_score == g2m_score:
+                    trace, m_score = 7, mm_score
+                else:
+                    trace, m_score =  4, g2m_score
+            else:
+                if g1m_score > g2m_score:
+                    trace, m_score = 2, g1m_score
+                elif g1m_score == g2m_score:
+                    trace, m_score = 6, g1m_score
+                else:
+                    trace, m_score = 4, g2m_score
+            # Secondly for gap tables (g1_table and g2_table)
+            if mg1_score > g1g1_score:
+                trace |= 8
+                g1_score = mg1_score
+            elif mg1_score < g1g1_score:
+                trace |= 16
+                g1_score = g1g1_score
+            else:
+                trace |= 24
+                g1_score = mg1_score
+            if mg2_score > g2g2_score:
+                trace |= 32
+                g2_score = mg2_score
+            elif mg2_score < g2g2_score:
+                trace |= 64
+                g2_score = g2g2_score
+            else:
+                trace |= 96
+                g2_score = g2g2_score
+
+            if local:
+                # If score is less than or equal to 0,
+                # then 0 is saved on the field and the trace ends here
+                if m_score <= 0:
+                    m_score = 0
+                    trace &= ~7
+                if g1_score <= 0:
+                    g1_score = 0
+                    trace &= ~24
+                if g2_score <= 0:
+                    g2_score = 0
+                    trace &= ~96
+                state_scores[0] = m_score
+                state_scores[1] = g1_score
+                state_scores[2] = g2_score
+                for k in range(3):
+                    if state_scores[k] > max_score:
+                        max_score = state_scores[k]
+                        i_list = [i]
+                        j_list = [j]
+                        state_list = [k+1]
+                    elif state_scores[k] == max_score and max_score > 0 \
+                         and len(i_list) < max_number:
+                            i_list.append(i)
+                            j_list.append(j)
+                            state_list.append(k+1)
+            m_curr[b+1] = m_score
+            g1_curr[b+1] = g1_score
+            g2_curr[b+1] = g2_score
+            trace_table[i, b] = trace
+
+        temp_row = m_prev
+        m_prev = m_curr
+        m_curr = temp_row
+        temp_row = g1_prev
+        g1_prev = g1_curr
+        g1_curr = temp_row
+        temp_row = g2_prev
+        g2_prev = g2_curr
+        g2_curr = temp_row
+
+    if not local:
+        # The traceback starts in the last cell of the table
+        # After the last swap, the last row is in the '..._prev' rows
+        b = n2 - n1 - lower_diag + 1
+        max_score = max(m_prev[b], g1_prev[b], g2_prev[b])
+        i_list = []
+        j_list = []
+        state_list = []
+        for k, state_score in enumerate((m_prev[b], g1_prev[b], g2_prev[b])):
+            if state_score == max_score:
+                i_list.append(n1)
+                j_list.append(n2)
+                state_list.append(k+1)
+    return max_score, i_list, j_list, state_list
+
+
+cdef void _follow_trace(uint8[:,:] trace_table,
+                        int lower_diag,
+                        int i, int j, int pos,
+                        int64[:,:] trace,
+                        list trace_list,
+                        int state,
+                        int* curr_trace_count,
+                        int max_trace_count):
+    """
+    Follow the traces in a band-transformed trace table and append
+    the finished traces to `trace_list`.
+
+    This function works in the same way as the corresponding function
+    in :func:`align_optimal()`, except that the positions in the trace
+    table are transformed into band coordinates.
+
+    Parameters
+    ----------
+    trace_table
+        A band-transformed matrix containing values indicating the
+        direction for the traceback.
+    lower_diag
+        The lower limit of the band.
+    i, j
+        The current position in the (untransformed) trace table.
+        For the first branch, this is the start of the traceback.
+        For additional branches this is the start of the respective
+        branch.
+    pos
+        The index in the alignment trace to be created.
+        For the first branch, this is 0.
+        For additional branches the value of the mother branch is taken.
+    trace
+        The alignment trace to be filled
+    trace_list
+        When a trace is finished, it is appened to this list
+    state
+        The current table (m, g1, g2) the traceback is in, taken from
+        mother branch. Always 0 when a linear gap penalty is used.
+    curr_trace_count
+        The current number of branches. The value is a pointer, so that
+        updating this value propagates the value to all other branches
+    max_trace_count
+        The maximum number of branches created. When the number of
+        branches reaches this value, no new branches are created.
+    """
+
+    cdef list next_indices
+    cdef list next_states
+    cdef int trace_value
+    cdef int k
+
+    if state == 0:
+        # Linear gap penalty
+        while trace_table[i, j-i-lower_diag] != 0:
+            # -1 is necessary due to the shift of the sequences
+            # to the bottom/right in the table
+            trace[pos, 0] = i-1
+            trace[pos, 1] = j-1
+            pos += 1
+            # Traces may split
+            next_indices = []
+            trace_value = trace_table[i, j-i-lower_diag]
+            if trace_value & 1:
+                next_indices.append((i-1, j-1))
+            if trace_value & 2:
+                next_indices.append((i, j-1))
+            if trace_value & 4:
+                next_indices.append((i-1, j))
+            # Trace branching
+            # -> Recursive call of _follow_trace() for indices[1:]
+            for k in range(1, len(next_indices)):
+                if curr_trace_count[0] < max_trace_count:
+                    curr_trace_count[0] += 1
+                    new_i, new_j = next_indices[k]
+                    _follow_trace(trace_table, lower_diag, new_i, new_j, pos,
+                                  np.copy(trace), trace_list, 0,
+                                  curr_trace_count, max_trace_count)
+            # Continue in this method with indices[0]
+            i, j = next_indices[0]
+    else:
+        # Affine gap penalty -> state specifies the table
+        # we are currently in
+        # The states are
+        # 1 -> m
+        # 2 -> g1
+        # 3 -> g2
+        while True:
+            # Check for loop break condition
+            # -> trace for current table (state) is 0
+            trace_value = trace_table[i, j-i-lower_diag]
+            if (   (state == 1 and trace_value & 7 == 0)
+                or (state == 2 and trace_value & 24 == 0)
+                or (state == 3 and trace_value & 96 == 0)):
+                    break
+            # If no break occurred, continue as usual
+            trace[pos, 0] = i-1
+            trace[pos, 1] = j-1
+            pos += 1
+            next_indices = []
+            next_states = []
+            # Get value of trace respective of current state
+            # = table trace is currently in
+            if state == 1:
+                trace_value &= 7
+            elif state == 2:
+                trace_value &= 24
+            else: # state == 3:
+                trace_value &= 96
+            # Determine indices and state of next trace step
+            if trace_value & 1:
+                next_indices.append((i-1, j-1))
+                next_states.append(1)
+            if trace_value & 2:
+                next_indices.append((i-1, j-1))
+                next_states.append(2)
+            if trace_value & 4:
+                next_indices.append((i-1, j-1))
+                next_states.append(3)
+            if trace_value & 8:
+                next_indices.append((i, j-1))
+                next_states.append(1)
+            if trace_value & 16:
+                next_indices.append((i, j-1))
+                next_states.append(2)
+            if trace_value & 32:
+                next_indices.append((i-1, j))
+                next_states.append(1)
+            if trace_value & 64:
+                next_indices.append((i-1, j))
+                next_states.append(3)
+            # Trace branching
+            # -> Recursive call of _follow_trace() for indices[1:]
+            for k in range(1, len(next_indices)):
+                if curr_trace_count[0] < max_trace_count:
+                    curr_trace_count[0] += 1
+                    new_i, new_j = next_indices[k]
+                    new_state = next_states[k]
+                    _follow_trace(trace_table, lower_diag, new_i, new_j, pos,
+                                  np.copy(trace), trace_list, new_state,
+                                  curr_trace_count, max_trace_count)
+            # Continue in this method with indices[0] and states[0]
+            i, j = next_indices[0]
+            state = next_states[0]
+    # Trim trace to correct size (delete all pure -1 entries)
+    # and append to trace_list
+    tr_arr = np.asarray(trace)
+    trace_list.append(tr_arr[(tr_arr[:,0] != -1) | (tr_arr[:,1] != -1)])
@@ -0,0 +1,266 @@
+# This source code is part of the Biotite package and is distributed
+# under the 3-Clause BSD License. Please see 'LICENSE.rst' for further
+# information.
+
+__name__ = "biotite.sequence.align"
+__author__ = "Patrick Kunzmann"
+__all__ = ["align_many", "pairwise_scores"]
+
+from functools import partial
+import numpy as np
+from ...parallel import check_n_jobs, map_tasks
+from .alignment import Alignment
+from .pairwise import align_optimal
+
+
+def align_many(query, targets, matrix, gap_penalty=-10,
+               terminal_penalty=True, local=False, score_only=False,
+               n_jobs=None, backend="thread"):
+    """
+    Align a query sequence to each of the given target sequences.
+
+    Each alignment is an optimal alignment obtained from
+    :func:`align_optimal()`.
+    The alignments are distributed over multiple workers.
+
+    Parameters
+    ----------
+    query : Sequence
+        The query sequence.
+    targets : iterable object of Sequence
+        The target sequences, the query is aligned to.
+    matrix : SubstitutionMatrix
+        The substitution matrix used for scoring.
+    gap_penalty : int or (tuple, dtype=int), optional
+        If an integer is provided, the value will be interpreted as
+        general gap penalty.
+        If a tuple is provided, an affine gap penalty is used.
+        The first integer in the tuple is the gap opening penalty,
+        the second integer is the gap extension penalty.
+        The values need to be negative. (Default: *-10*)
+    terminal_penalty : bool, optional
+        If true, gap penalties are applied to terminal gaps.
+        If `local` is true, this parameter has no effect.
+        (Default: True)
+    local : bool, optional
+        If false, a global alignment is performed, otherwise a local
+        alignment is performed. (Default: False)
+    score_only : bool, optional
+        If true, only the similarity scores are calculated in linear
+        memory, instead of the alignments. (Default: False)
+    n_jobs : int, optional
+        The number of workers.
+        By default, the number of available CPU cores is used.
+        If 1, the alignments are performed in the calling thread.
+    backend : {'thread', 'process'}, optional
+        Whether the workers are threads or processes.
+        The dynamic programming step does not hold the *global
+        interpreter lock* (GIL), so threads scale well for
+        `score_only` calculations.
+        The traceback step of a full alignment requires the GIL,
+        hence processes are more suitable in this case.
+        (Default: 'thread')
+
+    Returns
+    -------
+    alignments : list of Alignment or ndarray, dtype=np.int32
+        The optimal alignment of the query with each target sequence.
+        If `score_only` is true, only the similarity score for each
+        target sequence is returned.
+
+    See also
+    --------
+    pairwise_scores
+        For all-vs-all alignment of multiple sequences.
+
+    Examples
+    --------
+
+    >>> query = NucleotideSequence("ACGTAGTC")
+    >>> targets = [
+    ...     NucleotideSequence("ACGTTAGTC"),
+    ...     NucleotideSequence("CTAGTCAA"),
+    ...     NucleotideSequence("ACGTACGT"),
+    ... ]
+    >>> matrix = SubstitutionMatrix.std_nucleotide_matrix()
+    >>> print(align_many(query, targets, matrix, score_only=True))
+    [ 30 -10  15]
+    >>> for alignment in align_many(query, targets, matrix, local=True):
+    ...     print(alignment, "\\n")
+    ACG-TAGTC
+    ACGTTAGTC 
+    <BLANKLINE>
+    TAGTC
+    TAGTC 
+    <BLANKLINE>
+    ACGTA
+    ACGTA 
+    <BLANKLINE>
+    """
+    targets = list(targets)
+    n_jobs = check_n_jobs(n_jobs, backend)
+    align_func = _alignment_function(
+        matrix, gap_penalty, terminal_penalty, local, score_only
+    )
+
+    # The sequences are transferred to each worker only once,
+    # each task merely refers to the query and a target by index
+    results = map_tasks(
+        align_func, [(0, i) for i in range(1, len(targets) + 1)],
+        n_jobs, backend, shared=[query] + targets
+    )
+
+    if score_only:
+        return np.array(results, dtype=np.int32)
+    else:
+        return [alignments[0] for alignments in results]
+
+
+def pairwise_scores(sequences, matrix, gap_penalty=-10,
+                    terminal_penalty=True, local=False,
+                    return_alignments=False, n_jobs=None, backend="thread"):
+    """
+    Calculate the similarity scores of the optimal alignments between
+    all pairs of the given sequences.
+
+    The alignments are performed via :func:`align_optimal()` and are
+    distributed over multiple workers.
+
+    Parameters
+    ----------
+    sequences : iterable object of Sequence
+        The sequences to be aligned.
+    matrix : SubstitutionMatrix
+        The substitution matrix used for scoring.
+        It must be symmetric.
+    gap_penalty : int or (tuple, dtype=int), optional
+        If an integer is provided, the value will be interpreted as
+        general gap penalty.
+        If a tuple is provided, an affine gap penalty is used.
+        The first integer in the tuple is the gap opening penalty,
+        the second integer is the gap extension penalty.
+        The values need to be negative. (Default: *-10*)
+    terminal_penalty : bool, optional
+        If true, gap penalties are applied to terminal gaps.
+        If `local` is true, this parameter has no effect.
+        (Default: True)
+    local : bool, optional
+        If false, a global alignment is performed, otherwise a local
+        alignment is performed. (Default: False)
+    return_alignments : bool, optional
+        If true, the pairwise alignments are returned in addition to the
+        scores.
+        Otherwise only the similarity scores are calculated in linear
+        memory.
+        (Default: False)
+    n_jobs : int, optional
+        The number of workers.
+        By default, the number of available CPU cores is used.
+        If 1, the alignments are performed in the calling thread.
+    backend : {'thread', 'process'}, optional
+        Whether the workers are threads or processes.
+        The dynamic programming step does not hold the *global
+        interpreter lock* (GIL), so threads scale well, if only scores
+        are calculated.
+        The traceback step of a full alignment requires the GIL,
+        hence processes are more suitable, if `return_alignments` is
+        true.
+        (Default: 'thread')
+
+    Returns
+    -------
+    scores : ndarray, shape=(n,n), dtype=np.int32
+        The symmetric matrix of pairwise similarity scores.
+        ``scores[i,j]`` is the score of the alignment of
+        ``sequences[i]`` with ``sequences[j]``.
+    alignments : ndarray, shape=(n,n), dtype=object
+        The pairwise alignments.
+        ``alignments[i,j]`` is an :class:`Alignment` of
+        ``sequences[i]`` with ``sequences[j]``.
+        Only returned, if `return_alignments` is true.
+
+    See also
+    --------
+    align_many
+        For alignment of one sequence to multiple sequences.
+
+    Notes
+    -----
+    Since the score matrix is symmetric, only the alignments for
+    ``j <= i`` are performed.
+    The alignments for ``j > i`` are obtained by swapping the sequences
+    of the alignment for ``i`` and ``j``.
+
+    Examples
+    --------
+
+    >>> sequences = [
+    ...     NucleotideSequence("ACGTAGTC"),
+    ...     NucleotideSequence("ACGTTAGTC"),
+    ...     NucleotideSequence("CTAGTCAA"),
+    ... ]
+    >>> matrix = SubstitutionMatrix.std_nucleotide_matrix()
+    >>> print(pairwise_scores(sequences, matrix))
+    [[ 40  30 -10]
+     [ 30  45 -20]
+     [-10 -20  40]]
+    """
+    sequences = list(sequences)
+    if not matrix.is_symmetric():
+        raise ValueError("A symmetric substitution matrix is required")
+    n_jobs = check_n_jobs(n_jobs, backend)
+    align_func = _alignment_function(
+        matrix, gap_penalty, terminal_penalty, local, not return_alignments
+    )
+
+    # Only the lower triangle including the diagonal is aligned
+    pairs = [(i, j) for i in range(len(sequences)) for j in range(i + 1)]
+    results = map_tasks(
+        align_func, pairs, n_jobs, backend, shared=sequences
+    )
+
+    scores = np.zeros((len(sequences), len(sequences)), dtype=np.int32)
+    if return_alignments:
+        alignments = np.full(
+            (len(sequences), len(sequences)), None, dtype=object
+        )
+    for (i, j), result in zip(pairs, results):
+        if return_alignments:
+            alignment = result[0]
+            alignments[i, j] = alignment
+            # Obtain the symmetric alignment by swapping the sequences
+            alignments[j, i] = Alignment(
+                alignment.sequences[::-1],
+                alignment.trace[:, ::-1].copy(),
+                alignment.score
+            )
+            scores[i, j] = alignment.score
+            scores[j, i] = alignment.score
+        else:
+            scores[i, j] = result
+            scores[j, i] = result
+
+    if return_alignments:
+        return scores, alignments
+    else:
+        return scores
+
+
+def _alignment_function(matrix, gap_penalty, terminal_penalty, local,
+                        score_only):
+    """
+    Get a function that aligns two sequences with the given parameters.
+
+    As the public :func:`align_optimal()` is importable from its
+    module, the function can be pickled for the process backend.
+    """
+    if score_only:
+        return partial(
+            align_optimal, matrix=matrix, gap_penalty=gap_penalty,
+            terminal_penalty=terminal_penalty, local=local, score_only=True
+        )
+    else:
+        return partial(
+            align_optimal, matrix=matrix, gap_penalty=gap_penalty,
+            terminal_penalty=terminal_penalty, local=local, max_number=1
+        )
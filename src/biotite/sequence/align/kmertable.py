@@ -0,0 +1,392 @@
+# This source code is part of the Biotite package and is distributed
+# under the 3-Clause BSD License. Please see 'LICENSE.rst' for further
+# information.
+
+__name__ = "biotite.sequence.align"
+__author__ = "Patrick Kunzmann"
+__all__ = ["KmerTable"]
+
+import numpy as np
+from ..sequence import Sequence
+from ..alphabet import AlphabetError
+
+
+class KmerTable(object):
+    """
+    A :class:`KmerTable` maps *k-mers* (subsequences of length *k*)
+    to the positions where they appear in one or multiple reference
+    sequences.
+
+    The table is created once from the reference sequences via
+    :meth:`from_sequences()`.
+    Afterwards it can be used to find all matching *k-mers* in a query
+    sequence at once via :meth:`match()`, e.g. to find exact occurences
+    of short motifs or as seeding stage for a heuristic alignment.
+
+    Internally, each *k-mer* is represented by an integer, the
+    *k-mer code*:
+    The symbol codes of the *k-mer* are interpreted as digits of a
+    number in base *n*, where *n* is the length of the alphabet.
+    The table itself is array-backed:
+    The reference IDs and positions of all *k-mers* are stored in
+    contiguous :class:`ndarray` objects, sorted by *k-mer code*, and
+    an offset array points to the position list of each *k-mer*.
+    Consequently, a :class:`KmerTable` requires little memory and
+    can be pickled efficiently, e.g. to reuse a table built from a
+    reference genome in multiple processes.
+
+    Objects of this class are immutable.
+    Nevertheless, they are not hashable, as equality is defined by the
+    content of the potentially large underlying arrays.
+
+    Parameters
+    ----------
+    alphabet : Alphabet
+        The alphabet of the indexed sequences.
+    k : int
+        The length of the *k-mers*.
+
+    Attributes
+    ----------
+    alphabet : Alphabet
+        The alphabet of the indexed sequences.
+    k : int
+        The length of the *k-mers*.
+
+    Notes
+    -----
+    Creating a :class:`KmerTable` directly via its constructor gives an
+    empty table.
+    Use :meth:`from_sequences()` to fill it.
+
+    Examples
+    --------
+
+    >>> ref1 = NucleotideSequence("ACTGAATGA")
+    >>> ref2 = NucleotideSequence("TTTGAC")
+    >>> table = KmerTable.from_sequences(3, [ref1, ref2])
+    >>> print(len(table))
+    9
+    >>> # (reference ID, position) of each 'TGA' occurence
+    >>> print(table[table.kmer_code(NucleotideSequence("TGA"))])
+    [[0 2]
+     [0 6]
+     [1 2]]
+    >>> # (query position, reference ID, reference position) triples
+    >>> query = NucleotideSequence("AATGAC")
+    >>> print(table.match(query))
+    [[0 0 4]
+     [1 0 5]
+     [2 0 2]
+     [2 0 6]
+     [2 1 2]
+     [3 1 3]]
+    """
+
+    def __init__(self, alphabet, k):
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        if len(alphabet) < 1:
+            raise ValueError("The alphabet must not be empty")
+        # Check that the largest k-mer code still fits into int64
+        if len(alphabet) ** k > np.iinfo(np.int64).max:
+            raise ValueError(
+                f"k-mers of length {k} with an alphabet of {len(alphabet)} "
+                f"symbols exceed the range of 64-bit integers"
+            )
+        self._alphabet = alphabet
+        self._k = k
+        # Powers of the alphabet length, used for k-mer code calculation
+        self._radix = (
+            len(alphabet) ** np.arange(k-1, -1, -1, dtype=np.int64)
+        ).astype(np.int64)
+        # Sorted unique k-mer codes
+        self._kmers = np.zeros(0, dtype=np.int64)
+        # The position list of 'self._kmers[i]' is stored in
+        # 'self._ref_ids[self._offsets[i] : self._offsets[i+1]]' and
+        # 'self._positions[self._offsets[i] : self._offsets[i+1]]'
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._ref_ids = np.zeros(0, dtype=np.int64)
+        self._positions = np.zeros(0, dtype=np.int64)
+
+    @property
+    def alphabet(self):
+        return self._alphabet
+
+    @property
+    def k(self):
+        return self._k
+
+    @staticmethod
+    def from_sequences(k, sequences, ref_ids=None, alphabet=None):
+        """
+        Create a :class:`KmerTable` by indexing all *k-mers* of the
+        given reference sequences.
+
+        Parameters
+        ----------
+        k : int
+            The length of the *k-mers*.
+        sequences : Sequence or iterable object of Sequence
+            The reference sequences to be indexed.
+        ref_ids : iterable object of int, optional
+            The reference ID for each sequence in `sequences`.
+            The IDs must be non-negative.
+            By default, the index of each sequence in `sequences` is
+            used.
+        alphabet : Alphabet, optional
+            The alphabet of the table.
+            It must extend the alphabets of all `sequences`.
+            By default, the alphabet of the first sequence is used.
+
+        Returns
+        -------
+        table : KmerTable
+            The table containing all *k-mers* of the `sequences`.
+
+        Raises
+        ------
+        AlphabetError
+            If the alphabet of any sequence is not extended by the
+            table alphabet.
+        """
+        if isinstance(sequences, Sequence):
+            sequences = [sequences]
+        else:
+            sequences = list(sequences)
+        if ref_ids is None:
+            ref_ids = np.arange(len(sequences))
+        else:
+            ref_ids = np.asarray(ref_ids)
+            if len(ref_ids) != len(sequences):
+                raise IndexError(
+                    f"{len(ref_ids)} reference IDs were given "
+                    f"for {len(sequences)} sequences"
+                )
+            if (ref_ids < 0).any():
+                raise ValueError("Reference IDs must be non-negative")
+        if alphabet is None:
+            if len(sequences) == 0:
+                raise ValueError(
+                    "The alphabet must be given, if no sequences are given"
+                )
+            alphabet = sequences[0].get_alphabet()
+
+        table = KmerTable(alphabet, k)
+        all_kmers = []
+        all_ref_ids = []
+        all_positions = []
+        for ref_id, sequence in zip(ref_ids, sequences):
+            kmers = table.kmer_codes(sequence)
+            all_kmers.append(kmers)
+            all_ref_ids.append(np.full(len(kmers), ref_id, dtype=np.int64))
+            all_positions.append(np.arange(len(kmers), dtype=np.int64))
+        if len(all_kmers) == 0:
+            return table
+        all_kmers = np.concatenate(all_kmers)
+        all_ref_ids = np.concatenate(all_ref_ids)
+        all_positions = np.concatenate(all_positions)
+
+        # A stable sort retains the order of reference ID and position
+        # within the position list of each k-mer
+        order = np.argsort(all_kmers, kind="stable")
+        sorted_kmers = all_kmers[order]
+        table._kmers, counts = np.unique(sorted_kmers, return_counts=True)
+        table._offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=table._offsets[1:])
+        table._ref_ids = all_ref_ids[order]
+        table._positions = all_positions[order]
+        return table
+
+    def kmer_code(self, kmer):
+        """
+        Get the *k-mer code* for a single *k-mer*.
+
+        Parameters
+        ----------
+        kmer : Sequence or iterable object of symbols, length=k
+            The *k-mer*.
+
+        Returns
+        -------
+        code : int
+            The *k-mer code*.
+        """
+        if isinstance(kmer, Sequence):
+            self._check_alphabet(kmer)
+            symbol_code = kmer.code
+        else:
+            symbol_code = self._alphabet.encode_multiple(kmer)
+        if len(symbol_code) != self._k:
+            raise IndexError(
+                f"k-mer has length {len(symbol_code)}, but k is {self._k}"
+            )
+        return int(np.sum(symbol_code.astype(np.int64) * self._radix))
+
+    def kmer_codes(self, sequence):
+        """
+        Get the *k-mer codes* of all overlapping *k-mers* in a
+        sequence.
+
+        Parameters
+        ----------
+        sequence : Sequence
+            The sequence to be split into *k-mers*.
+            Its alphabet must be extended by the table alphabet.
+
+        Returns
+        -------
+        codes : ndarray, shape=(n,), dtype=np.int64
+            The *k-mer codes*, where ``codes[i]`` is the code of the
+            *k-mer* starting at ``sequence[i]``.
+            *n* is ``len(sequence) - k + 1``.
+        """
+        self._check_alphabet(sequence)
+        symbol_code = sequence.code.astype(np.int64, copy=False)
+        n_kmers = len(symbol_code) - self._k + 1
+        if n_kmers <= 0:
+            return np.zeros(0, dtype=np.int64)
+        codes = np.zeros(n_kmers, dtype=np.int64)
+        for i in range(self._k):
+            codes += symbol_code[i : i + n_kmers] * self._radix[i]
+        return codes
+
+    def get_kmers(self):
+        """
+        Get the *k-mer codes* of all *k-mers* that appear at least
+        once in the table.
+
+        Returns
+        -------
+        kmers : ndarray, dtype=np.int64
+            The sorted *k-mer codes*.
+        """
+        return self._kmers.copy()
+
+    def count(self, kmers=None):
+        """
+        Get the number of positions for the given *k-mers*.
+
+        Parameters
+        ----------
+        kmers : ndarray, dtype=int, optional
+            The *k-mer codes* to count.
+            By default, the counts for all *k-mers* returned by
+            :meth:`get_kmers()` are returned.
+
+        Returns
+        -------
+        counts : ndarray, dtype=np.int64
+            The number of positions for each *k-mer*.
+        """
+        counts = np.diff(self._offsets)
+        if kmers is None:
+            return counts
+        table_indices, found = self._lookup(np.asarray(kmers, dtype=np.int64))
+        result = np.zeros(len(table_indices), dtype=np.int64)
+        result[found] = counts[table_indices[found]]
+        return result
+
+    def match(self, sequence):
+        """
+        Find all *k-mers* of a query sequence in the table.
+
+        Parameters
+        ----------
+        sequence : Sequence
+            The query sequence.
+            Its alphabet must be extended by the table alphabet.
+
+        Returns
+        -------
+        matches : ndarray, shape=(m,3), dtype=np.int64
+            Each row describes a matching *k-mer*:
+            The first column contains the position of the *k-mer* in the
+            query sequence, the second column the reference ID and the
+            third column the position in the reference sequence.
+            The matches are sorted by query position.
+        """
+        query_kmers = self.kmer_codes(sequence)
+        table_indices, found = self._lookup(query_kmers)
+        query_positions = np.arange(len(query_kmers), dtype=np.int64)[found]
+        starts = self._offsets[table_indices[found]]
+        counts = self._offsets[table_indices[found] + 1] - starts
+
+        n_matches = np.sum(counts)
+        matches = np.zeros((n_matches, 3), dtype=np.int64)
+        if n_matches == 0:
+            return matches
+        # Index into the flat position arrays for each match:
+        # For the i-th found k-mer indices run from
+        # 'starts[i]' to 'starts[i] + counts[i] - 1'
+        match_starts = np.cumsum(counts) - counts
+        flat_indices = np.arange(n_matches, dtype=np.int64) \
+                       - np.repeat(match_starts - starts, counts)
+        matches[:, 0] = np.repeat(query_positions, counts)
+        matches[:, 1] = self._ref_ids[flat_indices]
+        matches[:, 2] = self._positions[flat_indices]
+        return matches
+
+    def _lookup(self, kmers):
+        """
+        Get the indices in `self._kmers` for the given *k-mer codes* and
+        a mask indicating which codes appear in the table at all.
+        """
+        table_indices = np.searchsorted(self._kmers, kmers)
+        # Clip to allow indexing for codes larger than every table entry
+        clipped = np.minimum(table_indices, len(self._kmers) - 1)
+        if len(self._kmers) == 0:
+            found = np.zeros(len(kmers), dtype=bool)
+        else:
+            found = self._kmers[clipped] == kmers
+        return clipped, found
+
+    def _check_alphabet(self, sequence):
+        if not self._alphabet.extends(sequence.get_alphabet()):
+            raise AlphabetError(
+                "The alphabet of the sequence is not extended by the "
+                "table alphabet"
+            )
+
+    def __getitem__(self, kmer):
+        """
+        Get the reference IDs and positions of a *k-mer*, given by its
+        *k-mer code*, as *(m x 2)* :class:`ndarray`.
+        """
+        table_indices, found = self._lookup(
+            np.array([kmer], dtype=np.int64)
+        )
+        if not found[0]:
+            return np.zeros((0, 2), dtype=np.int64)
+        start = self._offsets[table_indices[0]]
+        stop = self._offsets[table_indices[0] + 1]
+        return np.stack(
+            [self._ref_ids[start:stop], self._positions[start:stop]], axis=-1
+        )
+
+    def __contains__(self, kmer):
+        return bool(self._lookup(np.array([kmer], dtype=np.int64))[1][0])
+
+    def __len__(self):
+        """
+        The number of distinct *k-mers* in the table.
+        """
+        return len(self._kmers)
+
+    def __iter__(self):
+        return iter(self._kmers.tolist())
+
+    # Equality is based on the array content -> not hashable
+    __hash__ = None
+
+    def __eq__(self, item):
+        if not isinstance(item, KmerTable):
+            return False
+        return (
+            self._k == item._k
+            and self._alphabet == item._alphabet
+            and np.array_equal(self._kmers, item._kmers)
+            and np.array_equal(self._offsets, item._offsets)
+            and np.array_equal(self._ref_ids, item._ref_ids)
+            and np.array_equal(self._positions, item._positions)
+        )
@@ -0,0 +1,674 @@
+# This source code is part of the Biotite package and is distributed
+# under the 3-Clause BSD License. Please see 'LICENSE.rst' for further
+# information.
+
+__name__ = "biotite.sequence.align"
+__author__ = "Patrick Kunzmann"
+__all__ = ["align_local_gapped"]
+
+cimport cython
+cimport numpy as np
+
+from .matrix import SubstitutionMatrix
+from ..sequence import Sequence
+from .alignment import Alignment
+import numpy as np
+
+
+ctypedef np.int32_t int32
+ctypedef np.int64_t int64
+ctypedef np.uint8_t uint8
+ctypedef np.uint16_t uint16
+ctypedef np.uint32_t uint32
+ctypedef np.uint64_t uint64
+
+ctypedef fused CodeType1:
+    uint8
+    uint16
+    uint32
+    uint64
+ctypedef fused CodeType2:
+    uint8
+    uint16
+    uint32
+    uint64
+
+
+def align_local_gapped(seq1, seq2, matrix, seed, int32 threshold,
+                       gap_penalty=-10, str direction="both",
+                       bint score_only=False):
+    """
+    align_local_gapped(seq1, seq2, matrix, seed, threshold,
+                       gap_penalty=-10, direction="both",
+                       score_only=False)
+
+    Perform a local gapped alignment extending from a given `seed`
+    position.
+
+    The alignment extends into one or both directions (controlled by
+    `direction`) using dynamic programming.
+    A cell of the alignment table is discarded, if its score falls more
+    than `threshold` below the maximum score found so far
+    (*X-Drop* [1]_).
+    The extension terminates, when all cells of a row are discarded.
+    Hence, only the part of the alignment table that is close to the
+    optimal path is computed.
+    The returned alignment ends at the cells that yielded the maximum
+    score.
+
+    Parameters
+    ----------
+    seq1, seq2 : Sequence
+        The sequences to be aligned.
+        The sequences do not need to have the same alphabets, as long as
+        the two alphabets of `matrix` extend the alphabets of the two
+        sequences.
+    matrix : SubstitutionMatrix
+        The substitution matrix used for scoring.
+    seed : tuple(int, int)
+        The indices in `seq1` and `seq2` where the local alignment
+        starts.
+        The symbols at these positions are always aligned to each
+        other.
+        Typically, the seed is obtained from a *k-mer* match of a
+        :class:`KmerTable`.
+    threshold : int
+        If the score of a cell falls this value below the maximum score
+        found, the cell is discarded.
+    gap_penalty : int or (tuple, dtype=int), optional
+        If an integer is provided, the value will be interpreted as
+        linear gap penalty.
+        If a tuple is provided, an affine gap penalty is used.
+        The first integer in the tuple is the gap opening penalty,
+        the second integer is the gap extension penalty.
+        The values need to be negative.
+    direction : {'both', 'upstream', 'downstream'}, optional
+        Controls in which direction the alignment extends starting
+        from the seed.
+        If ``'upstream'``, the alignment starts before the `seed` and
+        ends at the `seed`.
+        If ``'downstream'``, the alignment starts at the `seed` and
+        ends behind the `seed`.
+        If ``'both'`` (default) the alignment starts before the `seed`
+        and ends behind the `seed`.
+    score_only : bool, optional
+        If set to ``True``, only the similarity score is returned
+        instead of the :class:`Alignment`.
+        In this case the trace table is not stored at all.
+
+    Returns
+    -------
+    alignment : Alignment or int
+        The resulting alignment.
+        If `score_only` is set to true, only the score is returned.
+
+    See also
+    --------
+    align_local_ungapped
+        For ungapped local alignments with the same *X-Drop* technique.
+    align_banded
+        For alignments restricted to a fixed diagonal band.
+
+    Notes
+    -----
+    In contrast to :func:`align_optimal()`, only a single alignment is
+    returned.
+    If multiple paths yield the same score, substitutions are preferred
+    over gaps in the first sequence, which are preferred over gaps in
+    the second sequence.
+
+    References
+    ----------
+
+    .. [1] Z Zhang, S Schwartz, L Wagner, W Miller,
+       "A greedy algorithm for aligning DNA sequences."
+       J Comput Biol, 7, 203-214 (2000).
+
+    Examples
+    --------
+
+    >>> seq1 = ProteinSequence("BIQTITEFQMFHEAV")
+    >>> seq2 = ProteinSequence("PYRRHQTITEQFMEHV")
+    >>> matrix = SubstitutionMatrix.std_protein_matrix()
+    >>> alignment = align_local_gapped(
+    ...     seq1, seq2, matrix, seed=(4,7), threshold=20, gap_penalty=-5
+    ... )
+    >>> print(alignment)
+    QTITE-FQMFH
+    QTITEQF-MEH
+    """
+    if     not matrix.get_alphabet1().extends(seq1.get_alphabet()) \
+        or not matrix.get_alphabet2().extends(seq2.get_alphabet()):
+            raise ValueError("The sequences' alphabets do not fit the matrix")
+    if threshold < 0:
+        raise ValueError("The threshold value must be a non-negative integer")
+    if direction not in ("both", "upstream", "downstream"):
+        raise ValueError(f"Direction '{direction}' is invalid")
+    # Check if gap penalty is linear or affine
+    if type(gap_penalty) == int:
+        if gap_penalty > 0:
+            raise ValueError("Gap penalty must be negative")
+        affine_penalty = False
+    elif type(gap_penalty) == tuple:
+        if gap_penalty[0] > 0 or gap_penalty[1] > 0:
+                raise ValueError("Gap penalty must be negative")
+        affine_penalty = True
+    else:
+        raise TypeError("Gap penalty must be either integer or tuple")
+
+    cdef int seq1_start, seq2_start
+    seq1_start, seq2_start = seed
+    if seq1_start < 0 or seq2_start < 0:
+        raise IndexError("Seed must contain positive indices")
+    if seq1_start >= len(seq1) or seq2_start >= len(seq2):
+        raise IndexError(
+            f"Seed {(seq1_start, seq2_start)} is out of bounds "
+            f"for the sequences of length {len(seq1)} and {len(seq2)}"
+        )
+
+    code1 = seq1.code
+    code2 = seq2.code
+    score_matrix = matrix.score_matrix()
+    if affine_penalty:
+        gap_open, gap_ext = gap_penalty
+    else:
+        gap_open, gap_ext = gap_penalty, gap_penalty
+    # Value for negative infinity
+    # Subtraction of gap penalties and lowest score value
+    # to prevent integer overflow
+    neg_inf = np.iinfo(np.int32).min - 2*gap_open - 2*gap_ext
+    min_score = np.min(score_matrix)
+    if min_score < 0:
+        neg_inf -= min_score
+
+    # The seed position itself is always included
+    cdef int32 total_score \
+        = score_matrix[code1[seq1_start], code2[seq2_start]]
+    upstream_trace = np.zeros((0, 2), dtype=np.int64)
+    downstream_trace = np.zeros((0, 2), dtype=np.int64)
+    if direction == "downstream" or direction == "both":
+        score, downstream_trace = _extend(
+            code1[seq1_start+1:], code2[seq2_start+1:], score_matrix,
+            gap_open, gap_ext, affine_penalty, threshold, neg_inf,
+            score_only
+        )
+        total_score += score
+    if direction == "upstream" or direction == "both":
+        # Reverse the sequence codes upstream of the seed
+        score, upstream_trace = _extend(
+            code1[:seq1_start][::-1], code2[:seq2_start][::-1], score_matrix,
+            gap_open, gap_ext, affine_penalty, threshold, neg_inf,
+            score_only
+        )
+        total_score += score
+
+    if score_only:
+        return total_score
+
+    # Transform the traces of the extensions
+    # into positions of the complete sequences
+    upstream_trace = upstream_trace[::-1]
+    upstream_trace = np.where(
+        upstream_trace == -1,
+        -1,
+        np.array([seq1_start-1, seq2_start-1]) - upstream_trace
+    )
+    downstream_trace = np.where(
+        downstream_trace == -1,
+        -1,
+        np.array([seq1_start+1, seq2_start+1]) + downstream_trace
+    )
+    trace = np.concatenate([
+        upstream_trace,
+        np.array([[seq1_start, seq2_start]]),
+        downstream_trace
+    ]).astype(np.int64)
+    return Alignment([seq1, seq2], trace, total_score)
+
+
+def _extend(code1, code2, matrix, int32 gap_open, int32 gap_ext,
+            bint affine_penalty, int32 threshold, int32 neg_inf,
+            bint score_only):
+    """
+    Perform a gapped *X-Drop* extension starting before the first
+    position of the given sequence codes.
+
+    Returns
+    -------
+    max_score
+        The maximum score encountered.
+    trace
+        The trace of the extension, ending at the cell with the maximum
+        score.
+        `None`, if `score_only` is true.
+    """
+    # Row 'i' of the trace table is stored in
+    # 'trace_buffer[row_offsets[i] : row_offsets[i+1]]' and starts at
+    # column 'row_starts[i]'
+    row_offsets = np.zeros(len(code1) + 2, dtype=np.int64)
+    row_starts = np.zeros(len(code1) + 1, dtype=np.int64)
+    if affine_penalty:
+        max_score, max_i, max_j, trace_buffer = _fill_align_table_affine(
+            code1, code2, matrix, row_offsets, row_starts,
+            gap_open, gap_ext, threshold, neg_inf, score_only
+        )
+    else:
+        max_score, max_i, max_j, trace_buffer = _fill_align_table(
+            code1, code2, matrix, row_offsets, row_starts,
+            gap_open, threshold, neg_inf, score_only
+        )
+    if score_only:
+        return max_score, None
+    trace = _follow_trace(
+        trace_buffer, row_offsets, row_starts, max_i, max_j, affine_penalty
+    )
+    return max_score, trace
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _fill_align_table(CodeType1[:] code1 not None,
+                      CodeType2[:] code2 not None,
+                      const int32[:,:] matrix not None,
+                      int64[:] row_offsets not None,
+                      int64[:] row_starts not None,
+                      int32 gap_penalty,
+                      int32 threshold,
+                      int32 neg_inf,
+                      bint score_only):
+    """
+    Fill the relevant part of an alignment table with linear gap
+    penalty using the *X-Drop* criterion.
+
+    The trace uses the same bit scheme as in :func:`align_optimal()`,
+    but only a single direction is stored for each cell.
+
+    Parameters
+    ----------
+    code1, code2
+        The sequence code of each sequence to be aligned.
+    matrix
+        The score matrix obtained from the :class:`SubstitutionMatrix`
+        object.
+    row_offsets, row_starts
+        The offset of each row in the trace buffer and the first column
+        of each row.
+        The arrays are filled in this function.
+    gap_penalty
+        The linear gap penalty.
+    threshold
+        The *X-Drop* threshold.
+    neg_inf
+        The value used for negative infinity.
+    score_only
+        If true, the trace is not stored.
+
+    Returns
+    -------
+    max_score
+        The maximum score.
+    max_i, max_j
+        The cell containing the maximum score.
+    trace_buffer
+        The flattened, row-wise trace table.
+    """
+    cdef int i, j
+    cdef int n1 = code1.shape[0]
+    cdef int n2 = code2.shape[0]
+    # The range of computed cells in the previous row
+    cdef int prev_start = 0, prev_stop = -1
+    # The range of non-discarded cells in the previous row
+    cdef int prev_lo = 0, prev_hi = -1
+    cdef int curr_lo, curr_hi
+    cdef int32 from_diag, from_left, from_top
+    cdef int32 score
+    cdef uint8 trace
+    cdef int32 max_score = 0
+    cdef int max_i = 0, max_j = 0
+    cdef int64 offset = 0
+
+    cdef int32[:] prev_row = np.full(n2 + 1, neg_inf, dtype=np.int32)
+    cdef int32[:] curr_row = np.full(n2 + 1, neg_inf, dtype=np.int32)
+    cdef int32[:] temp_row
+    trace_array = np.zeros(0 if score_only else n2 + 1, dtype=np.uint8)
+    cdef uint8[:] trace_buffer = trace_array
+
+    for i in range(n1 + 1):
+        if not score_only and offset + (n2 + 1) > trace_buffer.shape[0]:
+            # Enlarge the trace buffer, so that a complete row fits in
+            trace_array = np.concatenate(
+                [trace_array, np.zeros(trace_array.shape[0], dtype=np.uint8)]
+            )
+            trace_buffer = trace_array
+        row_starts[i] = prev_lo
+        row_offsets[i] = offset
+        curr_lo = -1
+        curr_hi = -1
+        j = prev_lo
+        while j <= n2:
+            if i == 0 and j == 0:
+                score = 0
+                trace = 0
+            else:
+                if j > 0 and j-1 >= prev_start and j-1 <= prev_stop and i > 0:
+                    from_diag = prev_row[j-1] + matrix[code1[i-1], code2[j-1]]
+                else:
+                    from_diag = neg_inf
+                if j > prev_lo:
+                    from_left = curr_row[j-1] + gap_penalty
+                else:
+                    from_left = neg_inf
+                if j <= prev_stop:
+                    from_top = prev_row[j] + gap_penalty
+                else:
+                    from_top = neg_inf
+                # Prefer the diagonal direction, then left and top
+                if from_diag >= from_left and from_diag >= from_top:
+                    trace, score = 1, from_diag
+                elif from_left >= from_top:
+                    trace, score = 2, from_left
+                else:
+                    trace, score = 4, from_top
+
+            if score < max_score - threshold:
+                # X-Drop: Discard this cell
+                curr_row[j] = neg_inf
+                trace = 0
+                if j > prev_hi:
+                    # Beyond the non-discarded cells of the previous
+                    # row, the score can only decrease
+                    break
+            else:
+                curr_row[j] = score
+                if curr_lo == -1:
+                    curr_lo = j
+                curr_hi = j
+                if score > max_score:
+                    max_score = score
+                    max_i = i
+                    max_j = j
+            if not score_only:
+                trace_buffer[offset] = trace
+            offset += 1
+            j += 1
+
+        if curr_lo == -1:
+            # All cells of this row are discarded
+            # -> the extension is finished
+            row_offsets[i+1] = offset
+            break
+        prev_start = prev_lo
+        prev_stop = j - 1
+        prev_lo = curr_lo
+        prev_hi = curr_hi
+        temp_row = prev_row
+        prev_row = curr_row
+        curr_row = temp_row
+        row_offsets[i+1] = offset
+
+    return max_score, max_i, max_j, trace_array
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _fill_align_table_affine(CodeType1[:] code1 not None,
+                             CodeType2[:] code2 not None,
+                             const int32[:,:] matrix not None,
+                             int64[:] row_offsets not None,
+                             int64[:] row_starts not None,
+                             int32 gap_open,
+                             int32 gap_ext,
+                             int32 threshold,
+                             int32 neg_inf,
+                             bint score_only):
+    """
+    Fill the relevant part of an alignment table with affine gap
+    penalty using the *X-Drop* criterion.
+
+    The trace uses the same bit scheme as in :func:`align_optimal()`,
+    but only a single direction is stored for each table in each cell.
+
+    Parameters
+    ----------
+    code1, code2
+        The sequence code of each sequence to be aligned.
+    matrix
+        The score matrix obtained from the :class:`SubstitutionMatrix`
+        object.
+    row_offsets, row_starts
+        The offset of each row in the trace buffer and the first column
+        of each row.
+        The arrays are filled in this function.
+    gap_open
+        The gap opening penalty.
+    gap_ext
+        The gap extension penalty.
+    threshold
+        The *X-Drop* threshold.
+    neg_inf
+        The value used for negative infinity.
+    score_only
+        If true, the trace is not stored.
+
+    Returns
+    -------
+    max_score
+        The maximum score.
+    max_i, max_j
+        The cell containing the maximum score.
+    trace_buffer
+        The flattened, row-wise trace table.
+    """
+    cdef int i, j
+    cdef int n1 = code1.shape[0]
+    cdef int n2 = code2.shape[0]
+    # The range of computed cells in the previous row
+    cdef int prev_start = 0, prev_stop = -1
+    # The range of non-discarded cells in the previous row
+    cdef int prev_lo = 0, prev_hi = -1
+    cdef int curr_lo, curr_hi
+    cdef int32 mm_score, g1m_score, g2m_score
+    cdef int32 mg1_score, g1g1_score
+    cdef int32 mg2_score, g2g2_score
+    cdef int32 m_score, g1_score, g2_score
+    cdef int32 similarity
+    cdef int32 drop_limit
+    cdef uint8 trace
+    cdef int32 max_score = 0
+    cdef int max_i = 0, max_j = 0
+    cdef int64 offset = 0
+
+    cdef int32[:] m_prev  = np.full(n2 + 1, neg_inf, dtype=np.int32)
+    cdef int32[:] m_curr  = np.full(n2 + 1, neg_inf, dtype=np.int32)
+    cdef int32[:] g1_prev = np.full(n2 + 1, neg_inf, dtype=np.int32)
+    cdef int32[:] g1_curr = np.full(n2 + 1, neg_inf, dtype=np.int32)
+    cdef int32[:] g2_prev = np.full(n2 + 1, neg_inf, dtype=np.int32)
+    cdef int32[:] g2_curr = np.full(n2 + 1, neg_inf, dtype=np.int32)
+    cdef int32[:] temp_row
+    trace_array = np.zeros(0 if score_only else n2 + 1, dtype=np.uint8)
+    cdef uint8[:] trace_buffer = trace_array
+
+    for i in range(n1 + 1):
+        if not score_only and offset + (n2 + 1) > trace_buffer.shape[0]:
+            # Enlarge the trace buffer, so that a complete row fits in
+            trace_array = np.concatenate(
+                [trace_array, np.zeros(trace_array.shape[0], dtype=np.uint8)]
+            )
+            trace_buffer = trace_array
+        row_starts[i] = prev_lo
+        row_offsets[i] = offset
+        curr_lo = -1
+        curr_hi = -1
+        j = prev_lo
+        while j <= n2:
+            trace = 0
+            if i == 0 and j == 0:
+                m_score = 0
+                g1_score = neg_inf
+                g2_score = neg_inf
+            else:
+                # Diagonal
+                if j > 0 and j-1 >= prev_start and j-1 <= prev_stop and i > 0:
+                    similarity = matrix[code1[i-1], code2[j-1]]
+                    mm_score  =  m_prev[j-1] + similarity
+                    g1m_score = g1_prev[j-1] + similarity
+                    g2m_score = g2_prev[j-1] + similarity
+                else:
+                    mm_score  = neg_inf
+                    g1m_score = neg_inf
+                    g2m_score = neg_inf
+                # Left
+                if j > prev_lo:
+                    mg1_score  =  m_curr[j-1] + gap_open
+                    g1g1_score = g1_curr[j-1] + gap_ext
+                else:
+                    mg1_score  = neg_inf
+                    g1g1_score = neg_inf
+                # Top
+                if j <= prev_stop:
+                    mg2_score  =  m_prev[j] + gap_open
+                    g2g2_score = g2_prev[j] + gap_ext
+                else:
+                    mg2_score  = neg_inf
+                    g2g2_score = neg_inf
+
+                if mm_score >= g1m_score and mm_score >= g2m_score:
+                    trace, m_score = 1, mm_score
+                elif g1m_score >= g2m_score:
+                    trace, m_score = 2, g1m_score
+                else:
+                    trace, m_score = 4, g2m_score
+                if mg1_score >= g1g1_score:
+                    trace |= 8
+                    g1_score = mg1_score
+                else:
+                    trace |= 16
+                    g1_score = g1g1_score
+                if mg2_score >= g2g2_score:
+                    trace |= 32
+                    g2_score = mg2_score
+                else:
+                    trace |= 64
+                    g2_score = g2g2_score
+
+            # X-Drop: Discard the states of this cell,
+            # that fall below the threshold
+            drop_limit = max_score - threshold
+            if m_score < drop_limit:
+                m_score = neg_inf
+                trace &= ~7
+            if g1_score < drop_limit:
+                g1_score = neg_inf
+                trace &= ~24
+            if g2_score < drop_limit:
+                g2_score = neg_inf
+                trace &= ~96
+            m_curr[j] = m_score
+            g1_curr[j] = g1_score
+            g2_curr[j] = g2_score
+            if m_score == neg_inf and g1_score == neg_inf \
+               and g2_score == neg_inf:
+                    if j > prev_hi:
+                        # Beyond the non-discarded cells of the
+                        # previous row, the score can only decrease
+                        break
+            else:
+                if curr_lo == -1:
+                    curr_lo = j
+                curr_hi = j
+                # An alignment cannot end with a gap
+                if m_score > max_score:
+                    max_score = m_score
+                    max_i = i
+                    max_j = j
+            if not score_only:
+                trace_buffer[offset] = trace
+            offset += 1
+            j += 1
+
+        if curr_lo == -1:
+            # All cells of this row are discarded
+            # -> the extension is finished
+            row_offsets[i+1] = offset
+            break
+        prev_start = prev_lo
+        prev_stop = j - 1
+        prev_lo = curr_lo
+        prev_hi = curr_hi
+        temp_row = m_prev
+        m_prev = m_curr
+        m_curr = temp_row
+        temp_row = g1_prev
+        g1_prev = g1_curr
+        g1_curr = temp_row
+        temp_row = g2_prev
+        g2_prev = g2_curr
+        g2_curr = temp_row
+        row_offsets[i+1] = offset
+
+    return max_score, max_i, max_j, trace_array
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _follow_trace(const uint8[:] trace_buffer not None,
+                  const int64[:] row_offsets not None,
+                  const int64[:] row_starts not None,
+                  int i, int j, bint affine_penalty):
+    """
+    Follow the trace from the given cell back to the origin of the
+    alignment table.
+
+    Returns
+    -------
+    trace
+        The alignment trace from the origin to the given cell.
+    """
+    # The trace cannot be longer than 'i + j'
+    trace = np.full((i + j, 2), -1, dtype=np.int64)
+    cdef int64[:,:] trace_v = trace
+    cdef int pos = 0
+    cdef uint8 trace_value
+    # State for affine gap penalty
+    # 1 -> m
+    # 2 -> g1
+    # 3 -> g2
+    cdef int state = 1
+
+    while i != 0 or j != 0:
+        trace_value = trace_buffer[row_offsets[i] + j - row_starts[i]]
+        if not affine_penalty:
+            if trace_value & 1:
+                trace_v[pos, 0] = i-1
+                trace_v[pos, 1] = j-1
+                i -= 1
+                j -= 1
+            elif trace_value & 2:
+                trace_v[pos, 1] = j-1
+                j -= 1
+            else:
+                trace_v[pos, 0] = i-1
+                i -= 1
+        else:
+            if state == 1:
+                trace_v[pos, 0] = i-1
+                trace_v[pos, 1] = j-1
+                if trace_value & 2:
+                    state = 2
+                elif trace_value & 4:
+                    state = 3
+                i -= 1
+                j -= 1
+            elif state == 2:
+                trace_v[pos, 1] = j-1
+                if trace_value & 8:
+                    state = 1
+                j -= 1
+            else:
+                trace_v[pos, 0] = i-1
+                if trace_value & 32:
+                    state = 1
+                i -= 1
+        pos += 1
+
+    return np.flip(trace[:pos], axis=0)
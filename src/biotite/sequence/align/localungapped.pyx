@@ -0,0 +1,209 @@
+# This source code is part of the Biotite package and is distributed
+# under the 3-Clause BSD License. Please see 'LICENSE.rst' for further
+# information.
+
+__name__ = "biotite.sequence.align"
+__author__ = "Patrick Kunzmann"
+__all__ = ["align_local_ungapped"]
+
+cimport cython
+cimport numpy as np
+
+from .matrix import SubstitutionMatrix
+from ..sequence import Sequence
+from .alignment import Alignment
+import numpy as np
+
+
+ctypedef np.int32_t int32
+ctypedef np.int64_t int64
+ctypedef np.uint8_t uint8
+ctypedef np.uint16_t uint16
+ctypedef np.uint32_t uint32
+ctypedef np.uint64_t uint64
+
+ctypedef fused CodeType1:
+    uint8
+    uint16
+    uint32
+    uint64
+ctypedef fused CodeType2:
+    uint8
+    uint16
+    uint32
+    uint64
+
+
+def align_local_ungapped(seq1, seq2, matrix, seed, int32 threshold,
+                         str direction="both", bint score_only=False):
+    """
+    align_local_ungapped(seq1, seq2, matrix, seed, threshold,
+                         direction="both", score_only=False)
+
+    Perform a local alignment extending from given `seed` position
+    without inserting gaps.
+
+    The alignment extends into one or both directions (controlled by
+    `direction`) until the total alignment score falls more than
+    `threshold` below the maximum score found (*X-Drop*).
+    The returned alignment contains the range that yielded the maximum
+    score.
+
+    Parameters
+    ----------
+    seq1, seq2 : Sequence
+        The sequences to be aligned.
+        The sequences do not need to have the same alphabets, as long as
+        the two alphabets of `matrix` extend the alphabets of the two
+        sequences.
+    matrix : SubstitutionMatrix
+        The substitution matrix used for scoring.
+    seed : tuple(int, int)
+        The indices in `seq1` and `seq2` where the local alignment
+        starts.
+        The symbols at these positions are always part of the
+        alignment.
+        Typically, the seed is obtained from a *k-mer* match of a
+        :class:`KmerTable`.
+    threshold : int
+        If the current score falls this value below the maximum score
+        found, the alignment terminates.
+    direction : {'both', 'upstream', 'downstream'}, optional
+        Controls in which direction the alignment extends starting
+        from the seed.
+        If ``'upstream'``, the alignment starts before the `seed` and
+        ends at the `seed`.
+        If ``'downstream'``, the alignment starts at the `seed` and
+        ends behind the `seed`.
+        If ``'both'`` (default) the alignment starts before the `seed`
+        and ends behind the `seed`.
+        The `seed` position itself is always included in the alignment.
+    score_only : bool, optional
+        If set to ``True``, only the similarity score is returned
+        instead of the :class:`Alignment`, decreasing the computation
+        time substantially.
+
+    Returns
+    -------
+    alignment : Alignment or int
+        The resulting alignment.
+        If `score_only` is set to true, only the score is returned.
+
+    See also
+    --------
+    align_local_gapped
+        For gapped local alignments with the same *X-Drop* technique.
+
+    Examples
+    --------
+
+    >>> seq1 = ProteinSequence("BIQTITE")
+    >>> seq2 = ProteinSequence("PYRRHQTITE")
+    >>> matrix = SubstitutionMatrix.std_protein_matrix()
+    >>> alignment = align_local_ungapped(
+    ...     seq1, seq2, matrix, seed=(4,7), threshold=10
+    ... )
+    >>> print(alignment)
+    QTITE
+    QTITE
+    >>> alignment = align_local_ungapped(
+    ...     seq1, seq2, matrix, (4,7), 10, direction="upstream"
+    ... )
+    >>> print(alignment)
+    QTI
+    QTI
+    >>> alignment = align_local_ungapped(
+    ...     seq1, seq2, matrix, (4,7), 10, direction="downstream"
+    ... )
+    >>> print(alignment)
+    ITE
+    ITE
+    >>> score = align_local_ungapped(
+    ...     seq1, seq2, matrix, (4,7), 10, score_only=True
+    ... )
+    >>> print(score)
+    24
+    """
+    if     not matrix.get_alphabet1().extends(seq1.get_alphabet()) \
+        or not matrix.get_alphabet2().extends(seq2.get_alphabet()):
+            raise ValueError("The sequences' alphabets do not fit the matrix")
+    if threshold < 0:
+        raise ValueError("The threshold value must be a non-negative integer")
+    if direction not in ("both", "upstream", "downstream"):
+        raise ValueError(f"Direction '{direction}' is invalid")
+
+    cdef int seq1_start, seq2_start
+    seq1_start, seq2_start = seed
+    if seq1_start < 0 or seq2_start < 0:
+        raise IndexError("Seed must contain positive indices")
+    if seq1_start >= len(seq1) or seq2_start >= len(seq2):
+        raise IndexError(
+            f"Seed {(seq1_start, seq2_start)} is out of bounds "
+            f"for the sequences of length {len(seq1)} and {len(seq2)}"
+        )
+
+    code1 = seq1.code
+    code2 = seq2.code
+    score_matrix = matrix.score_matrix()
+
+    # The seed position itself is always included
+    cdef int32 score
+    cdef int32 total_score \
+        = score_matrix[code1[seq1_start], code2[seq2_start]]
+    cdef int upstream_length = 0
+    cdef int downstream_length = 0
+    if direction == "downstream" or direction == "both":
+        score, downstream_length = _extend(
+            code1[seq1_start+1:], code2[seq2_start+1:],
+            score_matrix, threshold
+        )
+        total_score += score
+    if direction == "upstream" or direction == "both":
+        # Reverse the sequence codes upstream of the seed
+        score, upstream_length = _extend(
+            code1[:seq1_start][::-1], code2[:seq2_start][::-1],
+            score_matrix, threshold
+        )
+        total_score += score
+
+    if score_only:
+        return total_score
+    else:
+        start_offset = -upstream_length
+        stop_offset = downstream_length + 1
+        trace = np.stack([
+            np.arange(seq1_start + start_offset, seq1_start + stop_offset),
+            np.arange(seq2_start + start_offset, seq2_start + stop_offset)
+        ], axis=-1)
+        return Alignment([seq1, seq2], trace, total_score)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _extend(CodeType1[:] code1 not None, CodeType2[:] code2 not None,
+            const int32[:,:] matrix not None, int32 threshold):
+    """
+    Extend an ungapped alignment from the first position of the given
+    sequence codes, until the score drops more than `threshold` below
+    the maximum score.
+
+    Returns
+    -------
+    max_score
+        The maximum score encountered.
+    length
+        The length of the extension that gives the maximum score.
+    """
+    cdef int i
+    cdef int32 score = 0, max_score = 0
+    cdef int length = 0
+    cdef int n = min(code1.shape[0], code2.shape[0])
+
+    for i in range(n):
+        score += matrix[code1[i], code2[i]]
+        if score > max_score:
+            max_score = score
+            length = i + 1
+        elif max_score - score > threshold:
+            break
+    return max_score, length
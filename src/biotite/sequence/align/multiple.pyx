@@ -329,8 +329,13 @@ def _get_distance_matrix(CodeType[:] _T, sequences, matrix,
         (len(sequences), len(sequences)), None, dtype=object
     )
     for i in range(len(sequences)):
-        # Inclusive range
-        for j in range(i+1):
+        # The alignment of a sequence with itself is only required
+        # for the score
+        scores[i,i] = align_optimal(
+            sequences[i], sequences[i], matrix,
+            gap_penalty, terminal_penalty, score_only=True
+        )
+        for j in range(i):
             # For this method we only consider one alignment:
             # Score is equal for all alignments
             # Alignment length is equal for most alignments
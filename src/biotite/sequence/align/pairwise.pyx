@@ -33,7 +33,7 @@ ctypedef fused CodeType2:
     uint32
     uint64
 
-cdef inline int32 int_max(int32 a, int32 b): return a if a >= b else b
+cdef inline int32 int_max(int32 a, int32 b) nogil: return a if a >= b else b
 
 
 def align_ungapped(seq1, seq2, matrix, score_only=False):
@@ -100,10 +100,11 @@ def _add_scores(CodeType1[:] code1 not None,
 
 def align_optimal(seq1, seq2, matrix, gap_penalty=-10,
                   terminal_penalty=True, local=False,
-                  max_number=1000):
+                  max_number=1000, score_only=False, linear_memory=False):
     """
     align_optimal(seq1, seq2, matrix, gap_penalty=-10,
-                  terminal_penalty=True, local=False, max_number=1000)
+                  terminal_penalty=True, local=False, max_number=1000,
+                  score_only=False, linear_memory=False)
 
     Perform an optimal alignment of two sequences based on a
     dynamic programming algorithm.
@@ -126,6 +127,17 @@ def align_optimal(seq1, seq2, matrix, gap_penalty=-10,
     Furthermore this function supports affine gap penalties using the
     Gotoh algorithm [3]_, however, this requires approximately 4 times
     the RAM space and execution time.
+
+    For long sequences the quadratic memory requirement of the
+    alignment table can be avoided:
+    If only the similarity score is required, `score_only` computes it
+    while keeping only two rows of the table in memory.
+    If an alignment is required, `linear_memory` computes a single
+    optimal alignment with the divide-and-conquer approach from
+    Hirschberg [4]_, extended to affine gap penalties as described by
+    Myers and Miller [5]_.
+    This requires only linear memory at the cost of approximately
+    doubled execution time.
     
     Parameters
     ----------
@@ -152,12 +164,21 @@ def align_optimal(seq1, seq2, matrix, gap_penalty=-10,
         When the number of branches exceeds this value in the traceback
         step, no further branches are created.
         (Default: 1000)
+    score_only : bool, optional
+        If true, only the similarity score is returned instead of the
+        alignments.
+        The score is computed in linear memory. (Default: False)
+    linear_memory : bool, optional
+        If true, a single optimal alignment is computed in linear
+        memory.
+        In this case `max_number` has no effect. (Default: False)
     
     Returns
     -------
-    alignments : list, type=Alignment
+    alignments : list, type=Alignment or int
         A list of alignments. Each alignment in the list has
         the same maximum similarity score.
+        If `score_only` is true, only the similarity score is returned.
     
     References
     ----------
@@ -172,6 +193,13 @@ def align_optimal(seq1, seq2, matrix, gap_penalty=-10,
     .. [3] O Gotoh,
        "An improved algorithm for matching biological sequences."
        J Mol Biol, 162, 705-708 (1982).
+    .. [4] DS Hirschberg,
+       "A linear space algorithm for computing maximal common
+       subsequences."
+       Commun ACM, 18, 341-343 (1975).
+    .. [5] EW Myers, W Miller,
+       "Optimal alignments in linear space."
+       Comput Appl Biosci, 4, 11-17 (1988).
     
     Examples
     --------
@@ -188,6 +216,17 @@ def align_optimal(seq1, seq2, matrix, gap_penalty=-10,
     ATACGCTTGCT
     AGGCGC-AGCT 
     <BLANKLINE>
+    >>> score = align_optimal(
+    ...     seq1, seq2, matrix, gap_penalty=-6, score_only=True
+    ... )
+    >>> print(score)
+    17
+    >>> ali = align_optimal(
+    ...     seq1, seq2, matrix, gap_penalty=-6, linear_memory=True
+    ... )
+    >>> print(ali[0])
+    ATACGCTTGCT
+    AGGCGC-AGCT
     """
     # Check matrix alphabets
     if     not matrix.get_alphabet1().extends(seq1.get_alphabet()) \
@@ -209,6 +248,34 @@ def align_optimal(seq1, seq2, matrix, gap_penalty=-10,
         raise ValueError(
             "Maximum number of returned alignments must be at least 1"
         )
+
+    if score_only or linear_memory:
+        if affine_penalty:
+            gap_open, gap_ext = gap_penalty
+        else:
+            # A linear gap penalty is an affine penalty,
+            # whose opening and extension penalty are equal
+            gap_open, gap_ext = gap_penalty, gap_penalty
+        neg_inf = np.iinfo(np.int32).min - 2*gap_open - 2*gap_ext
+        min_score = np.min(matrix.score_matrix())
+        if min_score < 0:
+            neg_inf -= min_score
+        if score_only:
+            if affine_penalty:
+                return _score_only_affine(
+                    seq1.code, seq2.code, matrix.score_matrix(),
+                    gap_open, gap_ext, terminal_penalty, local, neg_inf
+                )
+            else:
+                return _score_only(
+                    seq1.code, seq2.code, matrix.score_matrix(),
+                    gap_penalty, terminal_penalty, local
+                )
+        else:
+            return [_align_linear_memory(
+                seq1, seq2, matrix, gap_open, gap_ext, affine_penalty,
+                terminal_penalty, local, neg_inf
+            )]
     # This implementation uses transposed tables in comparison
     # to the common implementation
     # Therefore the first sequence is one the left
@@ -422,58 +489,61 @@ def _fill_align_table(CodeType1[:] code1 not None,
     cdef int32 score
     
     # Used in case terminal gaps are not penalized
-    i_max = score_table.shape[0] -1
-    j_max = score_table.shape[1] -1
-    # Starts at 1 since the first row and column are already filled
-    for i in range(1, score_table.shape[0]):
-        for j in range(1, score_table.shape[1]):
-            # Evaluate score from diagonal direction
-            # -1 is in sequence index is necessary
-            # due to the shift of the sequences
-            # to the bottom/right in the table
-            from_diag = score_table[i-1, j-1] + matrix[code1[i-1], code2[j-1]]
-            # Evaluate score from left direction
-            if not term_penalty and i == i_max:
-                from_left = score_table[i, j-1]
-            else:
-                from_left = score_table[i, j-1] + gap_penalty
-            # Evaluate score from top direction
-            if not term_penalty and j == j_max:
-                from_top = score_table[i-1, j]
-            else:
-                from_top = score_table[i-1, j] + gap_penalty
-            
-            # Find maximum
-            if from_diag > from_left:
-                if from_diag > from_top:
-                    trace, score = 1, from_diag
-                elif from_diag == from_top:
-                    trace, score = 5, from_diag
+    cdef int i_max = score_table.shape[0] -1
+    cdef int j_max = score_table.shape[1] -1
+    
+    with nogil:
+        # Starts at 1 since the first row and column are already filled
+        for i in range(1, score_table.shape[0]):
+            for j in range(1, score_table.shape[1]):
+                # Evaluate score from diagonal direction
+                # -1 is in sequence index is necessary
+                # due to the shift of the sequences
+                # to the bottom/right in the table
+                from_diag = score_table[i-1, j-1] \
+                            + matrix[code1[i-1], code2[j-1]]
+                # Evaluate score from left direction
+                if not term_penalty and i == i_max:
+                    from_left = score_table[i, j-1]
                 else:
-                    trace, score = 4, from_top
-            elif from_diag == from_left:
-                if from_diag > from_top:
-                    trace, score = 3, from_diag
-                elif from_diag == from_top:
-                    trace, score = 7, from_diag
+                    from_left = score_table[i, j-1] + gap_penalty
+                # Evaluate score from top direction
+                if not term_penalty and j == j_max:
+                    from_top = score_table[i-1, j]
                 else:
-                    trace, score =  4, from_top
-            else:
-                if from_left > from_top:
-                    trace, score = 2, from_left
-                elif from_left == from_top:
-                    trace, score = 6, from_diag
+                    from_top = score_table[i-1, j] + gap_penalty
+            
+                # Find maximum
+                if from_diag > from_left:
+                    if from_diag > from_top:
+                        trace, score = 1, from_diag
+                    elif from_diag == from_top:
+                        trace, score = 5, from_diag
+                    else:
+                        trace, score = 4, from_top
+                elif from_diag == from_left:
+                    if from_diag > from_top:
+                        trace, score = 3, from_diag
+                    elif from_diag == from_top:
+                        trace, score = 7, from_diag
+                    else:
+                        trace, score =  4, from_top
                 else:
-                    trace, score = 4, from_top
+                    if from_left > from_top:
+                        trace, score = 2, from_left
+                    elif from_left == from_top:
+                        trace, score = 6, from_left
+                    else:
+                        trace, score = 4, from_top
             
-            # Local alignment specialty:
-            # If score is less than or equal to 0,
-            # then 0 is saved on the field and the trace ends here
-            if local == True and score <= 0:
-                score_table[i,j] = 0
-            else:
-                score_table[i,j] = score
-                trace_table[i,j] = trace
+                # Local alignment specialty:
+                # If score is less than or equal to 0,
+                # then 0 is saved on the field and the trace ends here
+                if local == True and score <= 0:
+                    score_table[i,j] = 0
+                else:
+                    score_table[i,j] = score
+                    trace_table[i,j] = trace
 
 
 @cython.boundscheck(False)
@@ -530,103 +600,105 @@ def _fill_align_table_affine(CodeType1[:] code1 not None,
     cdef int32 similarity
     
     # Used in case terminal gaps are not penalized
-    i_max = trace_table.shape[0] -1
-    j_max = trace_table.shape[1] -1
-    # Starts at 1 since the first row and column are already filled
-    for i in range(1, trace_table.shape[0]):
-        for j in range(1, trace_table.shape[1]):
-            # Calculate the scores for possible transitions
-            # into the current cell
-            similarity = matrix[code1[i-1], code2[j-1]]
-            mm_score  =  m_table[i-1,j-1] + similarity
-            g1m_score = g1_table[i-1,j-1] + similarity
-            g2m_score = g2_table[i-1,j-1] + similarity
-            # No transition from g1_table to g2_table and vice versa
-            # Since this would mean adjacent gaps in both sequences
-            # A substitution makes more sense in this case
-            if not term_penalty and i == i_max:
-                mg1_score  =  m_table[i,j-1]
-                g1g1_score = g1_table[i,j-1]
-            else:
-                mg1_score  =  m_table[i,j-1] + gap_open
-                g1g1_score = g1_table[i,j-1] + gap_ext
-            if not term_penalty and j == j_max:
-                mg2_score  = m_table[i-1,j]
-                g2g2_score = g2_table[i-1,j]
-            else:
-                mg2_score  =  m_table[i-1,j] + gap_open
-                g2g2_score = g2_table[i-1,j] + gap_ext
+    cdef int i_max = trace_table.shape[0] -1
+    cdef int j_max = trace_table.shape[1] -1
+    
+    with nogil:
+        # Starts at 1 since the first row and column are already filled
+        for i in range(1, trace_table.shape[0]):
+            for j in range(1, trace_table.shape[1]):
+                # Calculate the scores for possible transitions
+                # into the current cell
+                similarity = matrix[code1[i-1], code2[j-1]]
+                mm_score  =  m_table[i-1,j-1] + similarity
+                g1m_score = g1_table[i-1,j-1] + similarity
+                g2m_score = g2_table[i-1,j-1] + similarity
+                # No transition from g1_table to g2_table and vice versa
+                # Since this would mean adjacent gaps in both sequences
+                # A substitution makes more sense in this case
+                if not term_penalty and i == i_max:
+                    mg1_score  =  m_table[i,j-1]
+                    g1g1_score = g1_table[i,j-1]
+                else:
+                    mg1_score  =  m_table[i,j-1] + gap_open
+                    g1g1_score = g1_table[i,j-1] + gap_ext
+                if not term_penalty and j == j_max:
+                    mg2_score  = m_table[i-1,j]
+                    g2g2_score = g2_table[i-1,j]
+                else:
+                    mg2_score  =  m_table[i-1,j] + gap_open
+                    g2g2_score = g2_table[i-1,j] + gap_ext
             
-            # Find maximum score and trace
-            # (similar to general gap method)
-            # At first for match table (m_table)
-            if mm_score > g1m_score:
-                if mm_score > g2m_score:
-                    trace, m_score = 1, mm_score
-                elif mm_score == g2m_score:
-                    trace, m_score = 5, mm_score
+                # Find maximum score and trace
+                # (similar to general gap method)
+                # At first for match table (m_table)
+                if mm_score > g1m_score:
+                    if mm_score > g2m_score:
+                        trace, m_score = 1, mm_score
+                    elif mm_score == g2m_score:
+                        trace, m_score = 5, mm_score
+                    else:
+                        trace, m_score = 4, g2m_score
+                elif mm_score == g1m_score:
+                    if mm_score > g2m_score:
+                        trace, m_score = 3, mm_score
+                    elif mm_score == g2m_score:
+                        trace, m_score = 7, mm_score
+                    else:
+                        trace, m_score =  4, g2m_score
                 else:
-                    trace, m_score = 4, g2m_score
-            elif mm_score == g1m_score:
-                if mm_score > g2m_score:
-                    trace, m_score = 3, mm_score
-                elif mm_score == g2m_score:
-                    trace, m_score = 7, mm_score
+                    if g1m_score > g2m_score:
+                        trace, m_score = 2, g1m_score
+                    elif g1m_score == g2m_score:
+                        trace, m_score = 6, g1m_score
+                    else:
+                        trace, m_score = 4, g2m_score
+                #Secondly for gap tables (g1_table and g2_table)
+                if mg1_score > g1g1_score:
+                    trace |= 8
+                    g1_score = mg1_score
+                elif mg1_score < g1g1_score:
+                    trace |= 16
+                    g1_score = g1g1_score
                 else:
-                    trace, m_score =  4, g2m_score
-            else:
-                if g1m_score > g2m_score:
-                    trace, m_score = 2, g1m_score
-                elif g1m_score == g2m_score:
-                    trace, m_score = 6, g1m_score
+                    trace |= 24
+                    g1_score = mg1_score
+                if mg2_score > g2g2_score:
+                    trace |= 32
+                    g2_score = mg2_score
+                elif mg2_score < g2g2_score:
+                    trace |= 64
+                    g2_score = g2g2_score
                 else:
-                    trace, m_score = 4, g2m_score
-            #Secondly for gap tables (g1_table and g2_table)
-            if mg1_score > g1g1_score:
-                trace |= 8
-                g1_score = mg1_score
-            elif mg1_score < g1g1_score:
-                trace |= 16
-                g1_score = g1g1_score
-            else:
-                trace |= 24
-                g1_score = mg1_score
-            if mg2_score > g2g2_score:
-                trace |= 32
-                g2_score = mg2_score
-            elif mg2_score < g2g2_score:
-                trace |= 64
-                g2_score = g2g2_score
-            else:
-                trace |= 96
-                g2_score = g2g2_score
-            # Fill values into tables
-            # Local alignment specialty:
-            # If score is less than or equal to 0,
-            # then 0 is saved on the field and the trace ends here
-            if local == True:
-                if m_score <= 0:
-                    m_table[i,j] = 0
-                    # End trace in specific table
-                    # by filtering the the bits of other tables  
-                    trace &= ~7
+                    trace |= 96
+                    g2_score = g2g2_score
+                # Fill values into tables
+                # Local alignment specialty:
+                # If score is less than or equal to 0,
+                # then 0 is saved on the field and the trace ends here
+                if local == True:
+                    if m_score <= 0:
+                        m_table[i,j] = 0
+                        # End trace in specific table
+                        # by filtering the the bits of other tables  
+                        trace &= ~7
+                    else:
+                        m_table[i,j] = m_score
+                    if g1_score <= 0:
+                        g1_table[i,j] = 0
+                        trace &= ~24
+                    else:
+                        g1_table[i,j] = g1_score
+                    if g2_score <= 0:
+                        g2_table[i,j] = 0
+                        trace &= ~96
+                    else:
+                        g2_table[i,j] = g2_score
                 else:
                     m_table[i,j] = m_score
-                if g1_score <= 0:
-                    g1_table[i,j] = 0
-                    trace &= ~24
-                else:
                     g1_table[i,j] = g1_score
-                if g2_score <= 0:
-                    g2_table[i,j] = 0
-                    trace &= ~96
-                else:
                     g2_table[i,j] = g2_score
-            else:
-                m_table[i,j] = m_score
-                g1_table[i,j] = g1_score
-                g2_table[i,j] = g2_score
-            trace_table[i,j] = trace
+                trace_table[i,j] = trace
 
 
 cdef void _follow_trace(uint8[:,:] trace_table,
@@ -770,3 +842,731 @@ cdef void _follow_trace(uint8[:,:] trace_table,
     tr_arr = np.asarray(trace)
     trace_list.append(tr_arr[(tr_arr[:,0] != -1) | (tr_arr[:,1] != -1)])
 
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _score_only(CodeType1[:] code1 not None,
+                CodeType2[:] code2 not None,
+                const int32[:,:] matrix not None,
+                int gap_penalty,
+                bint term_penalty,
+                bint local):
+    """
+    Calculate the score of an optimal alignment with constant gap
+    penalty, equivalent to :func:`_fill_align_table()`.
+
+    Only two rows of the alignment table are kept in memory.
+    The GIL is released during the calculation.
+
+    Returns
+    -------
+    score
+        The similarity score of the optimal alignment.
+    """
+    cdef int i, j
+    cdef int i_max = code1.shape[0]
+    cdef int j_max = code2.shape[0]
+    # Row 'i' is stored in 'rows[i % 2]'
+    cdef int prev, curr
+    cdef int32 from_diag, from_left, from_top
+    cdef int32 score
+    cdef int32 max_score = 0
+
+    cdef int32[:,:] rows = np.zeros((2, j_max+1), dtype=np.int32)
+
+    with nogil:
+        if not local and term_penalty:
+            for j in range(j_max+1):
+                rows[0, j] = j * gap_penalty
+        for i in range(1, i_max+1):
+            prev = (i-1) % 2
+            curr = i % 2
+            if not local and term_penalty:
+                rows[curr, 0] = i * gap_penalty
+            else:
+                rows[curr, 0] = 0
+            for j in range(1, j_max+1):
+                from_diag = rows[prev, j-1] + matrix[code1[i-1], code2[j-1]]
+                if not term_penalty and i == i_max:
+                    from_left = rows[curr, j-1]
+                else:
+                    from_left = rows[curr, j-1] + gap_penalty
+                if not term_penalty and j == j_max:
+                    from_top = rows[prev, j]
+                else:
+                    from_top = rows[prev, j] + gap_penalty
+                score = int_max(from_diag, int_max(from_left, from_top))
+                if local:
+                    if score <= 0:
+                        score = 0
+                    elif score > max_score:
+                        max_score = score
+                rows[curr, j] = score
+
+    if local:
+        return max_score
+    else:
+        return rows[i_max % 2, j_max]
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _score_only_affine(CodeType1[:] code1 not None,
+                       CodeType2[:] code2 not None,
+                       const int32[:,:] matrix not None,
+                       int gap_open,
+                       int gap_ext,
+                       bint term_penalty,
+                       bint local,
+                       int32 neg_inf):
+    """
+    Calculate the score of an optimal alignment with affine gap
+    penalty, equivalent to :func:`_fill_align_table_affine()`.
+
+    Only two rows of each of the three alignment tables are kept in
+    memory.
+    The GIL is released during the calculation.
+
+    Returns
+    -------
+    score
+        The similarity score of the optimal alignment.
+    """
+    cdef int i, j
+    cdef int i_max = code1.shape[0]
+    cdef int j_max = code2.shape[0]
+    # Row 'i' is stored in 'rows[i % 2]'
+    cdef int prev, curr
+    cdef int32 similarity
+    cdef int32 m_score, g1_score, g2_score
+    cdef int32 max_score = 0
+
+    cdef int32[:,:] m_rows  = np.full((2, j_max+1), neg_inf, dtype=np.int32)
+    cdef int32[:,:] g1_rows = np.zeros((2, j_max+1), dtype=np.int32)
+    cdef int32[:,:] g2_rows = np.full((2, j_max+1), neg_inf, dtype=np.int32)
+
+    with nogil:
+        m_rows[0, 0] = 0
+        g1_rows[0, 0] = neg_inf
+        if not local and term_penalty:
+            for j in range(1, j_max+1):
+                g1_rows[0, j] = (j-1) * gap_ext + gap_open
+        for i in range(1, i_max+1):
+            prev = (i-1) % 2
+            curr = i % 2
+            m_rows[curr, 0] = neg_inf
+            g1_rows[curr, 0] = neg_inf
+            if not local and term_penalty:
+                g2_rows[curr, 0] = (i-1) * gap_ext + gap_open
+            else:
+                g2_rows[curr, 0] = 0
+            for j in range(1, j_max+1):
+                similarity = matrix[code1[i-1], code2[j-1]]
+                m_score = int_max(
+                    m_rows[prev, j-1],
+                    int_max(g1_rows[prev, j-1], g2_rows[prev, j-1])
+                ) + similarity
+                # No transition from g1 to g2 and vice versa
+                if not term_penalty and i == i_max:
+                    g1_score = int_max(m_rows[curr, j-1], g1_rows[curr, j-1])
+                else:
+                    g1_score = int_max(
+                        m_rows[curr, j-1] + gap_open,
+                        g1_rows[curr, j-1] + gap_ext
+                    )
+                if not term_penalty and j == j_max:
+                    g2_score = int_max(m_rows[prev, j], g2_rows[prev, j])
+                else:
+                    g2_score = int_max(
+                        m_rows[prev, j] + gap_open,
+                        g2_rows[prev, j] + gap_ext
+                    )
+                if local:
+                    if m_score <= 0:
+                        m_score = 0
+                    if g1_score <= 0:
+                        g1_score = 0
+                    if g2_score <= 0:
+                        g2_score = 0
+                    max_score = int_max(
+                        max_score,
+                        int_max(m_score, int_max(g1_score, g2_score))
+                    )
+                m_rows[curr, j] = m_score
+                g1_rows[curr, j] = g1_score
+                g2_rows[curr, j] = g2_score
+
+    if local:
+        return max_score
+    else:
+        curr = i_max % 2
+        return int_max(
+            m_rows[curr, j_max],
+            int_max(g1_rows[curr, j_max], g2_rows[curr, j_max])
+        )
+
+
+cdef enum:
+    # States of the linear memory alignment:
+    # The type of the step that led into an alignment table cell
+    STATE_M = 0
+    STATE_G1 = 1
+    STATE_G2 = 2
+    # Used as stop state, if the alignment may end in any state
+    STATE_ANY = 3
+    # If the alignment table of a subproblem in the Hirschberg algorithm
+    # contains at most this number of cells,
+    # the subproblem is aligned directly with the full table
+    HIRSCHBERG_MAX_CELLS = 16384
+
+
+def _align_linear_memory(seq1, seq2, matrix, int32 gap_open, int32 gap_ext,
+                         bint affine_penalty, bint terminal_penalty,
+                         bint local, int32 neg_inf):
+    """
+    Find a single optimal alignment in linear memory.
+
+    The alignment is divided into the terminal gaps (for global
+    alignments without terminal penalty) and the *core* alignment
+    in-between, which is solved by the Hirschberg algorithm.
+    The boundaries of the core alignment are found via a forward and a
+    backward pass through the alignment table, each keeping only a
+    single row in memory.
+    """
+    code1 = seq1.code
+    code2 = seq2.code
+    score_matrix = matrix.score_matrix()
+    cdef int len1 = len(code1)
+    cdef int len2 = len(code2)
+    # A linear gap penalty allows adjacent gaps in both sequences,
+    # while an affine penalty does not (see _fill_align_table_affine())
+    cdef bint allow_switch = not affine_penalty
+
+    cdef int start_i, start_j, stop_i, stop_j
+    cdef int start_state, stop_state
+    if local:
+        _, score, stop_i, stop_j, _, _, _, _ = _forward_pass(
+            code1, code2, score_matrix, gap_open, gap_ext, allow_switch,
+            STATE_M, True, False, neg_inf
+        )
+        if score <= 0:
+            # No positive scoring local alignment exists
+            return Alignment(
+                [seq1, seq2], np.zeros((0, 2), dtype=np.int64), 0
+            )
+        # A local alignment starts and ends with aligned symbols
+        _, _, start_i, start_j, _, _, _, _ = _backward_pass(
+            code1[:stop_i], code2[:stop_j], score_matrix,
+            gap_open, gap_ext, allow_switch, STATE_M, neg_inf
+        )
+        start_state = STATE_M
+        stop_state = STATE_M
+    elif terminal_penalty:
+        start_i, start_j = 0, 0
+        stop_i, stop_j = len1, len2
+        start_state = STATE_M
+        stop_state = STATE_ANY
+    else:
+        # The core alignment ends when the last row or column is reached
+        # and starts when the first row or column is left
+        _, _, _, _, score, stop_i, stop_j, stop_state = _forward_pass(
+            code1, code2, score_matrix, gap_open, gap_ext, allow_switch,
+            STATE_M, False, True, neg_inf
+        )
+        _, _, _, _, _, start_i, start_j, start_state = _backward_pass(
+            code1[:stop_i], code2[:stop_j], score_matrix,
+            gap_open, gap_ext, allow_switch, stop_state, neg_inf
+        )
+
+    trace_parts = []
+    if not local:
+        # Terminal gaps at the start
+        trace_parts.append(np.stack([
+            np.concatenate([np.arange(start_i), np.full(start_j, -1)]),
+            np.concatenate([np.full(start_i, -1), np.arange(start_j)])
+        ], axis=-1))
+    core_score = _hirschberg(
+        code1[start_i:stop_i], code2[start_j:stop_j], score_matrix,
+        gap_open, gap_ext, allow_switch, start_state, stop_state, neg_inf,
+        trace_parts, start_i, start_j
+    )
+    if not local:
+        # Terminal gaps at the end
+        trace_parts.append(np.stack([
+            np.concatenate(
+                [np.arange(stop_i, len1), np.full(len2-stop_j, -1)]
+            ),
+            np.concatenate(
+                [np.full(len1-stop_i, -1), np.arange(stop_j, len2)]
+            )
+        ], axis=-1))
+    trace = np.concatenate(trace_parts).astype(np.int64, copy=False)
+
+    if local or terminal_penalty:
+        score = core_score
+    return Alignment([seq1, seq2], trace, score)
+
+
+def _hirschberg(code1, code2, const int32[:,:] matrix,
+                int32 gap_open, int32 gap_ext, bint allow_switch,
+                int start_state, int stop_state, int32 neg_inf,
+                list trace_parts, int offset1, int offset2):
+    """
+    Find an optimal global alignment of the given sequence codes with
+    penalized terminal gaps in linear memory.
+
+    The table is split at its middle row:
+    A forward pass gives the scores for the upper half and a backward
+    pass gives the scores for the lower half.
+    The column and state, where the sum of both is maximal, is the
+    point where the optimal alignment crosses the middle row.
+    The upper and lower half are then aligned recursively.
+
+    Parameters
+    ----------
+    code1, code2
+        The sequence codes to be aligned.
+    matrix
+        The score matrix obtained from the :class:`SubstitutionMatrix`
+        object.
+    gap_open, gap_ext
+        The gap opening and extension penalty.
+    allow_switch
+        Whether a gap in one sequence may be directly followed by a gap
+        in the other sequence.
+    start_state
+        The type of step that led into the first cell of the table.
+    stop_state
+        The type of step that must lead into the last cell of the table.
+        ``STATE_ANY`` if there is no restriction.
+    neg_inf
+        Value for negative infinity.
+    trace_parts
+        The trace of the alignment, offset by `offset1` and `offset2`,
+        is appended to this list.
+    offset1, offset2
+        The position of the sequence codes in the complete sequences.
+
+    Returns
+    -------
+    score
+        The score of the optimal alignment.
+    """
+    cdef int len1 = len(code1)
+    cdef int len2 = len(code2)
+    if len1 <= 1 or (len1+1) * (len2+1) <= HIRSCHBERG_MAX_CELLS:
+        trace, score = _align_full(
+            code1, code2, matrix, gap_open, gap_ext, allow_switch,
+            start_state, stop_state, neg_inf
+        )
+        trace[trace[:,0] != -1, 0] += offset1
+        trace[trace[:,1] != -1, 1] += offset2
+        trace_parts.append(trace)
+        return score
+
+    cdef int mid = len1 // 2
+    forward_row = _forward_pass(
+        code1[:mid], code2, matrix, gap_open, gap_ext, allow_switch,
+        start_state, False, False, neg_inf
+    )[0]
+    backward_row = _backward_pass(
+        code1[mid:], code2, matrix, gap_open, gap_ext, allow_switch,
+        stop_state, neg_inf
+    )[0]
+    # The scores are summed up in a larger integer type
+    # to prevent overflow for 'neg_inf' values
+    total = forward_row.astype(np.int64) + backward_row
+    # Transpose to prefer the match state for equal scores
+    j, state = np.unravel_index(np.argmax(total.T), (len2+1, 3))
+    _hirschberg(
+        code1[:mid], code2[:j], matrix, gap_open, gap_ext, allow_switch,
+        start_state, state, neg_inf, trace_parts, offset1, offset2
+    )
+    _hirschberg(
+        code1[mid:], code2[j:], matrix, gap_open, gap_ext, allow_switch,
+        state, stop_state, neg_inf, trace_parts, offset1+mid, offset2+j
+    )
+    return int(total[state, j])
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _forward_pass(CodeType1[:] code1 not None,
+                  CodeType2[:] code2 not None,
+                  const int32[:,:] matrix not None,
+                  int32 gap_open,
+                  int32 gap_ext,
+                  bint allow_switch,
+                  int start_state,
+                  bint local,
+                  bint free_start,
+                  int32 neg_inf):
+    """
+    Fill the alignment tables for the three states from the first to
+    the last row, keeping only two rows in memory.
+
+    Each table cell contains the score of the best alignment from the
+    first cell to this cell, where the last step has the type given by
+    the state.
+
+    Parameters
+    ----------
+    start_state
+        The type of step that led into the first cell of the table.
+    local
+        If true, an alignment may start in every cell.
+    free_start
+        If true, gaps in the first row and column are not penalized.
+
+    Returns
+    -------
+    last_row : ndarray, shape=(3, n+1), dtype=np.int32
+        The scores in the last row for each state.
+    max_score, max_i, max_j
+        The maximum score in the match state table and its position.
+    stop_score, stop_i, stop_j, stop_state
+        The maximum score in the last row or column and its position and
+        state.
+        Only states, which can be followed by a gap in the last row or
+        column, respectively, are considered.
+    """
+    cdef int i, j
+    cdef int len1 = code1.shape[0]
+    cdef int len2 = code2.shape[0]
+    cdef int32 m_score, g1_score, g2_score
+
+    cdef int32 max_score = neg_inf
+    cdef int max_i = 0, max_j = 0
+    cdef int32 stop_score = neg_inf
+    cdef int stop_i = 0, stop_j = 0, stop_state = STATE_M
+
+    # Row 'i-1' (prefix 'p') and row 'i' (prefix 'c') of each table
+    cdef np.ndarray prev_rows = np.zeros((3, len2+1), dtype=np.int32)
+    cdef np.ndarray curr_rows = np.zeros((3, len2+1), dtype=np.int32)
+    cdef int32[:,:] prev_v = prev_rows
+    cdef int32[:,:] curr_v = curr_rows
+
+    for i in range(len1+1):
+        for j in range(len2+1):
+            if i == 0 and j == 0:
+                m_score  = 0 if start_state == STATE_M  or local else neg_inf
+                g1_score = 0 if start_state == STATE_G1 else neg_inf
+                g2_score = 0 if start_state == STATE_G2 else neg_inf
+            else:
+                m_score = neg_inf
+                g1_score = neg_inf
+                g2_score = neg_inf
+                if i > 0 and j > 0:
+                    m_score = int_max(
+                        prev_v[STATE_M, j-1],
+                        int_max(prev_v[STATE_G1, j-1], prev_v[STATE_G2, j-1])
+                    ) + matrix[code1[i-1], code2[j-1]]
+                if j > 0:
+                    if free_start and i == 0:
+                        g1_score = 0
+                    else:
+                        g1_score = int_max(
+                            curr_v[STATE_M, j-1] + gap_open,
+                            curr_v[STATE_G1, j-1] + gap_ext
+                        )
+                        if allow_switch:
+                            g1_score = int_max(
+                                g1_score, curr_v[STATE_G2, j-1] + gap_open
+                            )
+                if i > 0:
+                    if free_start and j == 0:
+                        g2_score = 0
+                    else:
+                        g2_score = int_max(
+                            prev_v[STATE_M, j] + gap_open,
+                            prev_v[STATE_G2, j] + gap_ext
+                        )
+                        if allow_switch:
+                            g2_score = int_max(
+                                g2_score, prev_v[STATE_G1, j] + gap_open
+                            )
+                if local and m_score < 0:
+                    # Start a new alignment
+                    m_score = 0
+                # Prevent underflow in unreachable cells
+                m_score = int_max(m_score, neg_inf)
+                g1_score = int_max(g1_score, neg_inf)
+                g2_score = int_max(g2_score, neg_inf)
+            curr_v[STATE_M, j] = m_score
+            curr_v[STATE_G1, j] = g1_score
+            curr_v[STATE_G2, j] = g2_score
+
+            if m_score > max_score:
+                max_score = m_score
+                max_i, max_j = i, j
+            if i == len1 or j == len2:
+                if m_score > stop_score:
+                    stop_score = m_score
+                    stop_i, stop_j, stop_state = i, j, STATE_M
+                # A terminal gap in the first sequence may follow
+                # in the last row
+                if (i == len1 or allow_switch) and g1_score > stop_score:
+                    stop_score = g1_score
+                    stop_i, stop_j, stop_state = i, j, STATE_G1
+                # A terminal gap in the second sequence may follow
+                # in the last column
+                if (j == len2 or allow_switch) and g2_score > stop_score:
+                    stop_score = g2_score
+                    stop_i, stop_j, stop_state = i, j, STATE_G2
+        prev_rows, curr_rows = curr_rows, prev_rows
+        prev_v = prev_rows
+        curr_v = curr_rows
+
+    return (
+        prev_rows, max_score, max_i, max_j,
+        stop_score, stop_i, stop_j, stop_state
+    )
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _backward_pass(CodeType1[:] code1 not None,
+                   CodeType2[:] code2 not None,
+                   const int32[:,:] matrix not None,
+                   int32 gap_open,
+                   int32 gap_ext,
+                   bint allow_switch,
+                   int stop_state,
+                   int32 neg_inf):
+    """
+    Fill the alignment tables for the three states from the last to
+    the first row, keeping only two rows in memory.
+
+    Each table cell contains the score of the best alignment from this
+    cell to the last cell, if the step into this cell has the type given
+    by the state.
+
+    Parameters
+    ----------
+    stop_state
+        The type of step that must lead into the last cell of the table.
+        ``STATE_ANY`` if there is no restriction.
+
+    Returns
+    -------
+    first_row : ndarray, shape=(3, n+1), dtype=np.int32
+        The scores in the first row for each state.
+    max_score, max_i, max_j
+        The maximum score in the match state table and its position.
+    start_score, start_i, start_j, start_state
+        The maximum score in the first row or column and its position
+        and state, assuming the cell was reached via a terminal gap.
+    """
+    cdef int i, j
+    cdef int len1 = code1.shape[0]
+    cdef int len2 = code2.shape[0]
+    cdef int32 diag_score, g1_score, g2_score
+    cdef int32 m_score
+    cdef int state
+
+    cdef int32 max_score = neg_inf
+    cdef int max_i = 0, max_j = 0
+    cdef int32 start_score = neg_inf
+    cdef int start_i = 0, start_j = 0, start_state = STATE_M
+
+    # Row 'i+1' (prefix 'n') and row 'i' (prefix 'c') of each table
+    cdef np.ndarray next_rows = np.zeros((3, len2+1), dtype=np.int32)
+    cdef np.ndarray curr_rows = np.zeros((3, len2+1), dtype=np.int32)
+    cdef int32[:,:] next_v = next_rows
+    cdef int32[:,:] curr_v = curr_rows
+
+    for i in range(len1, -1, -1):
+        for j in range(len2, -1, -1):
+            if i == len1 and j == len2:
+                for state in range(3):
+                    if stop_state == STATE_ANY or stop_state == state:
+                        curr_v[state, j] = 0
+                    else:
+                        curr_v[state, j] = neg_inf
+            else:
+                # The score of the remaining alignment
+                # for each type of the next step
+                diag_score = neg_inf
+                g1_score = neg_inf
+                g2_score = neg_inf
+                if i < len1 and j < len2:
+                    diag_score = next_v[STATE_M, j+1] \
+                                 + matrix[code1[i], code2[j]]
+                if j < len2:
+                    g1_score = curr_v[STATE_G1, j+1]
+                if i < len1:
+                    g2_score = next_v[STATE_G2, j]
+                curr_v[STATE_M, j] = int_max(diag_score, int_max(
+                    g1_score + gap_open, g2_score + gap_open
+                ))
+                if allow_switch:
+                    curr_v[STATE_G1, j] = int_max(diag_score, int_max(
+                        g1_score + gap_ext, g2_score + gap_open
+                    ))
+                    curr_v[STATE_G2, j] = int_max(diag_score, int_max(
+                        g1_score + gap_open, g2_score + gap_ext
+                    ))
+                else:
+                    curr_v[STATE_G1, j] = int_max(
+                        diag_score, g1_score + gap_ext
+                    )
+                    curr_v[STATE_G2, j] = int_max(
+                        diag_score, g2_score + gap_ext
+                    )
+                # Prevent underflow in cells that cannot reach the end
+                for state in range(3):
+                    curr_v[state, j] = int_max(curr_v[state, j], neg_inf)
+
+            m_score = curr_v[STATE_M, j]
+            if m_score > max_score:
+                max_score = m_score
+                max_i, max_j = i, j
+            if i == 0 and j == 0:
+                if m_score > start_score:
+                    start_score = m_score
+                    start_i, start_j, start_state = i, j, STATE_M
+            elif i == 0:
+                if curr_v[STATE_G1, j] > start_score:
+                    start_score = curr_v[STATE_G1, j]
+                    start_i, start_j, start_state = i, j, STATE_G1
+            elif j == 0:
+                if curr_v[STATE_G2, j] > start_score:
+                    start_score = curr_v[STATE_G2, j]
+                    start_i, start_j, start_state = i, j, STATE_G2
+        next_rows, curr_rows = curr_rows, next_rows
+        next_v = next_rows
+        curr_v = curr_rows
+
+    return (
+        next_rows, max_score, max_i, max_j,
+        start_score, start_i, start_j, start_state
+    )
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _align_full(CodeType1[:] code1 not None,
+                CodeType2[:] code2 not None,
+                const int32[:,:] matrix not None,
+                int32 gap_open,
+                int32 gap_ext,
+                bint allow_switch,
+                int start_state,
+                int stop_state,
+                int32 neg_inf):
+    """
+    Find an optimal global alignment of the given sequence codes with
+    penalized terminal gaps using the full alignment tables.
+
+    In contrast to :func:`_fill_align_table_affine()` no trace table is
+    filled, instead the traceback step recalculates the origin of each
+    cell.
+    This is used to solve the small subproblems of the Hirschberg
+    algorithm.
+
+    Returns
+    -------
+    trace : ndarray, shape=(n,2), dtype=np.int64
+        The alignment trace.
+    score
+        The score of the alignment.
+    """
+    cdef int i, j, k
+    cdef int len1 = code1.shape[0]
+    cdef int len2 = code2.shape[0]
+    cdef int32 m_score, g1_score, g2_score, score
+    cdef int state
+
+    cdef np.ndarray tables = np.zeros((3, len1+1, len2+1), dtype=np.int32)
+    cdef int32[:,:,:] t = tables
+
+    for i in range(len1+1):
+        for j in range(len2+1):
+            if i == 0 and j == 0:
+                m_score  = 0 if start_state == STATE_M  else neg_inf
+                g1_score = 0 if start_state == STATE_G1 else neg_inf
+                g2_score = 0 if start_state == STATE_G2 else neg_inf
+            else:
+                m_score = neg_inf
+                g1_score = neg_inf
+                g2_score = neg_inf
+                if i > 0 and j > 0:
+                    m_score = int_max(
+                        t[STATE_M, i-1, j-1],
+                        int_max(t[STATE_G1, i-1, j-1], t[STATE_G2, i-1, j-1])
+                    ) + matrix[code1[i-1], code2[j-1]]
+                if j > 0:
+                    g1_score = int_max(
+                        t[STATE_M, i, j-1] + gap_open,
+                        t[STATE_G1, i, j-1] + gap_ext
+                    )
+                    if allow_switch:
+                        g1_score = int_max(
+                            g1_score, t[STATE_G2, i, j-1] + gap_open
+                        )
+                if i > 0:
+                    g2_score = int_max(
+                        t[STATE_M, i-1, j] + gap_open,
+                        t[STATE_G2, i-1, j] + gap_ext
+                    )
+                    if allow_switch:
+                        g2_score = int_max(
+                            g2_score, t[STATE_G1, i-1, j] + gap_open
+                        )
+                m_score = int_max(m_score, neg_inf)
+                g1_score = int_max(g1_score, neg_inf)
+                g2_score = int_max(g2_score, neg_inf)
+            t[STATE_M, i, j] = m_score
+            t[STATE_G1, i, j] = g1_score
+            t[STATE_G2, i, j] = g2_score
+
+    # Traceback
+    i = len1
+    j = len2
+    if stop_state == STATE_ANY:
+        state = STATE_M
+        for k in (STATE_G1, STATE_G2):
+            if t[k, i, j] > t[state, i, j]:
+                state = k
+    else:
+        state = stop_state
+    cdef int32 total_score = t[state, i, j]
+    trace = np.full((len1 + len2, 2), -1, dtype=np.int64)
+    cdef int64[:,:] trace_v = trace
+    cdef int pos = 0
+    while i > 0 or j > 0:
+        score = t[state, i, j]
+        if state == STATE_M:
+            trace_v[pos, 0] = i-1
+            trace_v[pos, 1] = j-1
+            score -= matrix[code1[i-1], code2[j-1]]
+            i -= 1
+            j -= 1
+            if t[STATE_M, i, j] == score:
+                state = STATE_M
+            elif t[STATE_G1, i, j] == score:
+                state = STATE_G1
+            else:
+                state = STATE_G2
+        elif state == STATE_G1:
+            trace_v[pos, 1] = j-1
+            j -= 1
+            if t[STATE_M, i, j] + gap_open == score:
+                state = STATE_M
+            elif t[STATE_G1, i, j] + gap_ext == score:
+                state = STATE_G1
+            else:
+                state = STATE_G2
+        else:
+            trace_v[pos, 0] = i-1
+            i -= 1
+            if t[STATE_M, i, j] + gap_open == score:
+                state = STATE_M
+            elif t[STATE_G2, i, j] + gap_ext == score:
+                state = STATE_G2
+            else:
+                state = STATE_G1
+        pos += 1
+
+    return np.flip(trace[:pos], axis=0), total_score
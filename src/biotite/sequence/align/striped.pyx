@@ -0,0 +1,432 @@
+# This source code is part of the Biotite package and is distributed
+# under the 3-Clause BSD License. Please see 'LICENSE.rst' for further
+# information.
+
+__name__ = "biotite.sequence.align"
+__author__ = "Patrick Kunzmann"
+__all__ = ["scan_local"]
+
+cimport cython
+cimport numpy as np
+
+from .matrix import SubstitutionMatrix
+from ..sequence import Sequence
+from .alignment import Alignment
+from .pairwise import align_optimal
+import numpy as np
+
+
+ctypedef np.int8_t int8
+ctypedef np.int16_t int16
+ctypedef np.int32_t int32
+ctypedef np.int64_t int64
+ctypedef np.uint8_t uint8
+ctypedef np.uint16_t uint16
+ctypedef np.uint32_t uint32
+ctypedef np.uint64_t uint64
+
+ctypedef fused CodeType:
+    uint8
+    uint16
+    uint32
+    uint64
+
+
+cdef enum:
+    # The number of query positions processed in parallel,
+    # i.e. the vector width of the striped alignment table column
+    LANES = 16
+
+
+def scan_local(query, targets, matrix, gap_penalty=-10, int n_alignments=0):
+    """
+    scan_local(query, targets, matrix, gap_penalty=-10, n_alignments=0)
+
+    Find the optimal local alignment score of a query sequence with each
+    of the given target sequences, e.g. the entries of a sequence
+    database.
+
+    The scores are calculated using the *striped* Smith-Waterman
+    algorithm [1]_:
+    The query positions are distributed over multiple *lanes* in a
+    way that the lanes can be processed in parallel using vector
+    instructions.
+    The alignment table is filled using 32 bit integer scores.
+
+    Only the scores and the end positions of the optimal local
+    alignments are calculated.
+    The alignments themselves can be obtained for the best scoring
+    targets in a second step.
+
+    Parameters
+    ----------
+    query : Sequence
+        The query sequence.
+    targets : iterable object of Sequence
+        The target sequences, the query is aligned to.
+    matrix : SubstitutionMatrix
+        The substitution matrix used for scoring.
+        The query corresponds to the first alphabet, the targets to the
+        second alphabet of the matrix.
+    gap_penalty : int or (tuple, dtype=int), optional
+        If an integer is provided, the value will be interpreted as
+        general gap penalty.
+        If a tuple is provided, an affine gap penalty is used.
+        The first integer in the tuple is the gap opening penalty,
+        the second integer is the gap extension penalty.
+        The values need to be negative. (Default: *-10*)
+    n_alignments : int, optional
+        The number of best scoring targets, for which the local
+        alignment is created.
+        Targets without positive score are omitted.
+        By default, no alignments are created.
+
+    Returns
+    -------
+    scores : ndarray, shape=(n,), dtype=np.int32
+        The optimal local alignment score for each target sequence.
+    ends : ndarray, shape=(n,2), dtype=np.int64
+        The position of the last aligned symbol in the query (first
+        column) and in the target (second column) for each target
+        sequence.
+        -1, if the score is 0.
+    alignments : list of (Alignment or None), length=n
+        The optimal local alignment for each of the `n_alignments` best
+        scoring target sequences.
+        ``None`` for all other target sequences.
+        Only returned, if `n_alignments` is greater than 0.
+
+    See also
+    --------
+    align_optimal
+        Equivalent local alignment of a single pair of sequences.
+
+    Notes
+    -----
+    For each alignment that is created, the start position of the local
+    alignment is found by aligning the reversed sequences up to the end
+    positions.
+    The alignment is then obtained from :func:`align_optimal()` for the
+    sequence ranges between start and end.
+
+    In contrast to :func:`align_optimal()`, with an affine gap penalty a
+    gap in one sequence may directly follow a gap in the other sequence.
+    Hence, the scores may differ from :func:`align_optimal()` in rare
+    cases, where the sum of gap opening and extension penalty is larger
+    than the smallest value in the substitution matrix.
+
+    References
+    ----------
+
+    .. [1] M Farrar,
+       "Striped Smith–Waterman speeds database searches six times over
+       other SIMD implementations."
+       Bioinformatics, 23, 156-161 (2007).
+
+    Examples
+    --------
+
+    >>> query = ProteinSequence("QTITE")
+    >>> targets = [
+    ...     ProteinSequence("BIQTITE"),
+    ...     ProteinSequence("PYRRHQTIE"),
+    ...     ProteinSequence("NRNCDGK"),
+    ... ]
+    >>> matrix = SubstitutionMatrix.std_protein_matrix()
+    >>> scores, ends, alignments = scan_local(
+    ...     query, targets, matrix, n_alignments=2
+    ... )
+    >>> print(scores)
+    [24 14  2]
+    >>> print(ends)
+    [[4 6]
+     [2 7]
+     [4 4]]
+    >>> for alignment in alignments:
+    ...     if alignment is not None:
+    ...         print(alignment, "\\n")
+    QTITE
+    QTITE 
+    <BLANKLINE>
+    QTI
+    QTI 
+    <BLANKLINE>
+    """
+    if isinstance(targets, Sequence):
+        targets = [targets]
+    else:
+        targets = list(targets)
+    if not matrix.get_alphabet1().extends(query.get_alphabet()):
+        raise ValueError("The query alphabet does not fit the matrix")
+    for target in targets:
+        if not matrix.get_alphabet2().extends(target.get_alphabet()):
+            raise ValueError("The target alphabet does not fit the matrix")
+    if type(gap_penalty) == int:
+        if gap_penalty > 0:
+            raise ValueError("Gap penalty must be negative")
+        gap_open, gap_ext = gap_penalty, gap_penalty
+    elif type(gap_penalty) == tuple:
+        if gap_penalty[0] > 0 or gap_penalty[1] > 0:
+            raise ValueError("Gap penalty must be negative")
+        gap_open, gap_ext = gap_penalty
+    else:
+        raise TypeError("Gap penalty must be either integer or tuple")
+    if n_alignments < 0:
+        raise ValueError("The number of alignments must not be negative")
+
+    score_matrix = matrix.score_matrix()
+    scanner = _StripedScanner(query.code, score_matrix, gap_open, gap_ext)
+    scores = np.zeros(len(targets), dtype=np.int32)
+    ends = np.full((len(targets), 2), -1, dtype=np.int64)
+    for i, target in enumerate(targets):
+        score, query_end, target_end = scanner.align(target.code)
+        scores[i] = score
+        if score > 0:
+            ends[i] = query_end, target_end
+
+    if n_alignments == 0:
+        return scores, ends
+
+    alignments = [None] * len(targets)
+    # Stable sorting ensures a deterministic choice for equal scores
+    top_indices = np.argsort(-scores, kind="stable")[:n_alignments]
+    for i in top_indices:
+        if scores[i] <= 0:
+            break
+        alignments[i] = _align_hit(
+            query, targets[i], matrix, gap_penalty, ends[i],
+            score_matrix, gap_open, gap_ext
+        )
+    return scores, ends, alignments
+
+
+def _align_hit(query, target, matrix, gap_penalty, end,
+               score_matrix, gap_open, gap_ext):
+    """
+    Create the local alignment ending at the given end positions.
+    """
+    query_end, target_end = end
+    # Align the reversed sequences up to the end positions
+    # to find the start positions
+    scanner = _StripedScanner(
+        query.code[query_end::-1], score_matrix, gap_open, gap_ext
+    )
+    _, rev_query_end, rev_target_end = scanner.align(
+        target.code[target_end::-1]
+    )
+    query_start = query_end - rev_query_end
+    target_start = target_end - rev_target_end
+    alignment = align_optimal(
+        query[query_start : query_end+1], target[target_start : target_end+1],
+        matrix, gap_penalty, local=True, max_number=1
+    )[0]
+    trace = alignment.trace.copy()
+    trace[trace[:,0] != -1, 0] += query_start
+    trace[trace[:,1] != -1, 1] += target_start
+    return Alignment([query, target], trace, alignment.score)
+
+
+class _StripedScanner:
+    """
+    Aligns a query sequence to target sequences via striped
+    Smith-Waterman.
+
+    The *query profile* and the working memory for the alignment table
+    column are created once and are reused for all target sequences.
+    """
+
+    def __init__(self, query_code, score_matrix, int gap_open, int gap_ext):
+        self._query_code = query_code
+        self._score_matrix = score_matrix
+        # Gap penalties as positive costs
+        self._gap_open = -gap_open
+        self._gap_ext = -gap_ext
+        self._seg_len = max(1, -(-len(query_code) // LANES))
+        self._profile = self._create_profile()
+        self._h_buffer = np.zeros((2, self._seg_len, LANES), dtype=np.int32)
+        self._e_buffer = np.zeros((self._seg_len, LANES), dtype=np.int32)
+        self._h_max_buffer = np.zeros((self._seg_len, LANES), dtype=np.int32)
+
+    def align(self, target_code):
+        """
+        Get the score, query end position and target end position of
+        the optimal local alignment with the given target sequence.
+        """
+        if len(self._query_code) == 0 or len(target_code) == 0:
+            return 0, -1, -1
+        return _fill_striped(
+            self._profile, target_code,
+            self._h_buffer, self._e_buffer, self._h_max_buffer,
+            len(self._query_code), self._gap_open, self._gap_ext
+        )
+
+    def _create_profile(self):
+        """
+        Create the query profile:
+        ``profile[c, s, k]`` is the similarity score of the query symbol
+        at position ``k * seg_len + s`` with the target symbol code
+        ``c``.
+        """
+        seg_len = self._seg_len
+        query_length = len(self._query_code)
+        scores = np.full(
+            (seg_len * LANES, self._score_matrix.shape[1]),
+            # Padding positions behind the end of the query
+            # must not be part of a positive scoring alignment
+            -np.iinfo(np.int32).max, dtype=np.int64
+        )
+        scores[:query_length] = self._score_matrix[self._query_code]
+        profile = scores.reshape(LANES, seg_len, -1).transpose(2, 1, 0)
+        return np.ascontiguousarray(profile, dtype=np.int32)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def _fill_striped(int32[:,:,::1] profile not None,
+                  CodeType[:] target_code not None,
+                  int32[:,:,::1] h_buffer not None,
+                  int32[:,::1] e_buffer not None,
+                  int32[:,::1] h_max_buffer not None,
+                  int query_length,
+                  int gap_open,
+                  int gap_ext):
+    """
+    Fill the local alignment table column by column, where each column
+    is stored in striped layout:
+    The query position ``k * seg_len + s`` is stored at ``[s, k]``.
+
+    Parameters
+    ----------
+    profile
+        The query profile.
+    target_code
+        The sequence code of the target sequence.
+    h_buffer
+        Working memory for the current and previous column of the
+        alignment table.
+    e_buffer
+        Working memory for the scores of the alignments ending with a
+        gap in the query.
+    h_max_buffer
+        Working memory for the column containing the maximum score.
+    query_length
+        The length of the query sequence.
+    gap_open, gap_ext
+        The gap penalties as positive costs.
+
+    Returns
+    -------
+    max_score
+        The optimal local alignment score.
+    query_end, target_end
+        The end position of the optimal local alignment.
+    """
+    cdef int seg_len = profile.shape[1]
+    cdef int size = seg_len * LANES
+    cdef int i, s, k, it
+    cdef int h, e, h_gap, col_max
+    cdef bint any_greater
+    # Vectors of all lanes
+    cdef int f[LANES]
+    cdef int v_h[LANES]
+    cdef int v_max[LANES]
+    cdef int max_score = 0
+    cdef int target_end = -1
+    cdef int query_end = -1
+    cdef int query_pos
+    # Pointers to the first element of the respective column
+    cdef int32* prof_col
+    cdef int32* h_curr
+    cdef int32* h_prev
+    cdef int32* h_both = &h_buffer[0, 0, 0]
+    cdef int32* e_col = &e_buffer[0, 0]
+    cdef int32* h_max_col = &h_max_buffer[0, 0]
+
+    with nogil:
+        for k in range(2 * size):
+            h_both[k] = 0
+        for k in range(size):
+            e_col[k] = 0
+            h_max_col[k] = 0
+
+        for i in range(target_code.shape[0]):
+            prof_col = &profile[<uint64> target_code[i], 0, 0]
+            h_curr = h_both + (i % 2) * size
+            h_prev = h_both + (1 - i % 2) * size
+            # The diagonal predecessor of the first segment in each lane
+            # is the last segment of the previous lane
+            v_h[0] = 0
+            for k in range(1, LANES):
+                v_h[k] = h_prev[(seg_len-1) * LANES + k-1]
+            for k in range(LANES):
+                f[k] = 0
+                v_max[k] = 0
+
+            for s in range(seg_len):
+                for k in range(LANES):
+                    h = v_h[k] + prof_col[s * LANES + k]
+                    e = e_col[s * LANES + k]
+                    h = h if h > e else e
+                    h = h if h > f[k] else f[k]
+                    h = h if h > 0 else 0
+                    v_max[k] = v_max[k] if v_max[k] > h else h
+                    h_curr[s * LANES + k] = h
+                    h_gap = h - gap_open
+                    e = e - gap_ext
+                    e = e if e > h_gap else h_gap
+                    e_col[s * LANES + k] = e if e > 0 else 0
+                    f[k] = f[k] - gap_ext
+                    f[k] = f[k] if f[k] > h_gap else h_gap
+                    f[k] = f[k] if f[k] > 0 else 0
+                    v_h[k] = h_prev[s * LANES + k]
+
+            # 'Lazy F' loop:
+            # The gaps in the target spanning multiple lanes are not
+            # considered yet
+            # -> Propagate them, until they cannot improve any score
+            for it in range(LANES):
+                for k in range(LANES-1, 0, -1):
+                    f[k] = f[k-1]
+                f[0] = 0
+                for s in range(seg_len):
+                    any_greater = False
+                    for k in range(LANES):
+                        h = h_curr[s * LANES + k]
+                        # The gap opened from the score before the
+                        # update has already been propagated
+                        h_gap = h - gap_open
+                        if f[k] > h:
+                            h_curr[s * LANES + k] = f[k]
+                            v_max[k] = v_max[k] if v_max[k] > f[k] else f[k]
+                            if f[k] - gap_open > e_col[s * LANES + k]:
+                                e_col[s * LANES + k] = f[k] - gap_open
+                        f[k] -= gap_ext
+                        if f[k] > h_gap and f[k] > 0:
+                            any_greater = True
+                    if not any_greater:
+                        break
+                if not any_greater:
+                    break
+
+            col_max = 0
+            for k in range(LANES):
+                col_max = col_max if col_max > v_max[k] else v_max[k]
+            if col_max > max_score:
+                max_score = col_max
+                target_end = i
+                for k in range(size):
+                    h_max_col[k] = h_curr[k]
+
+        if max_score > 0:
+            # Find the first query position with the maximum score
+            # in the column containing the maximum score
+            query_end = query_length
+            for s in range(seg_len):
+                for k in range(LANES):
+                    query_pos = k * seg_len + s
+                    if h_max_col[s * LANES + k] == max_score \
+                        and query_pos < query_end:
+                            query_end = query_pos
+
+    return max_score, query_end, target_end
@@ -13,10 +13,15 @@ values.
 
 Furthermore, the package contains convenience functions for
 getting/setting directly :class:`Sequence` objects, rather than strings.
+
+For random access to regions of large (optionally *bgzip* compressed)
+files, the :class:`IndexedFastaFile` can be used, which is based on a
+*faidx* index created by :func:`create_fasta_index()`.
 """
 
 __name__ = "biotite.sequence.io.fasta"
 __author__ = "Patrick Kunzmann"
 
 from .file import *
-from .convert import *
\ No newline at end of file
+from .convert import *
+from .indexed import *
\ No newline at end of file
@@ -0,0 +1,467 @@
+# This source code is part of the Biotite package and is distributed
+# under the 3-Clause BSD License. Please see 'LICENSE.rst' for further
+# information.
+
+__name__ = "biotite.sequence.io.fasta"
+__author__ = "Patrick Kunzmann"
+__all__ = ["IndexedFastaFile", "create_fasta_index"]
+
+import os.path
+import mmap
+import zlib
+import gzip
+from collections import OrderedDict
+from collections.abc import Mapping
+import numpy as np
+from ....file import InvalidFileError
+from ...seqtypes import NucleotideSequence
+
+
+class IndexedFastaFile(Mapping):
+    """
+    This class provides random access to the sequences of a FASTA file,
+    based on a *faidx* index (``.fai`` file).
+
+    In contrast to :class:`FastaFile`, the file is not parsed as a
+    whole.
+    Instead the file is memory-mapped and only the bytes of the
+    requested region are read.
+    Hence, this class is suitable for accessing small regions of large
+    genomes.
+
+    The file may also be compressed with *bgzip*.
+    In this case an additional ``.gzi`` index is required, to find the
+    compressed block that contains a requested region.
+
+    This class is used in a dictionary like manner, implementing the
+    :class:`Mapping` interface:
+    Sequence names are used as keys, and the corresponding
+    :class:`NucleotideSequence` objects are the values.
+    Consistent with *samtools faidx*, the name of a sequence is the
+    header up to the first whitespace character.
+
+    Parameters
+    ----------
+    file_path : str
+        The path of the FASTA file.
+    index_path : str, optional
+        The path of the ``.fai`` index file.
+        By default, the ``.fai`` file is expected next to the FASTA
+        file, i.e. at ``file_path + '.fai'``.
+        If the index file does not exist, the index is built in memory.
+    gzi_path : str, optional
+        The path of the ``.gzi`` index file.
+        Only used, if the FASTA file is compressed with *bgzip*.
+        By default, the ``.gzi`` file is expected at
+        ``file_path + '.gzi'``.
+        If the index file does not exist, the index is built in memory.
+
+    See also
+    --------
+    create_fasta_index
+
+    Notes
+    -----
+    The file is kept open, until :meth:`close()` is called.
+    Alternatively, the object can be used as context manager.
+
+    Examples
+    --------
+
+    >>> import os.path
+    >>> file = FastaFile(chars_per_line=4)
+    >>> file["chr1 first chromosome"] = "ACGTACGTAAAA"
+    >>> file["chr2 second chromosome"] = "TTTTGG"
+    >>> path = os.path.join(path_to_directory, "indexed.fasta")
+    >>> file.write(path)
+    >>> create_fasta_index(path)
+    >>> with IndexedFastaFile(path) as indexed_file:
+    ...     print(list(indexed_file.keys()))
+    ...     print(indexed_file.get_length("chr1"))
+    ...     print(indexed_file.get_sequence("chr1", 2, 9))
+    ...     print(indexed_file["chr2"])
+    ['chr1', 'chr2']
+    12
+    GTACGTA
+    TTTTGG
+    """
+
+    def __init__(self, file_path, index_path=None, gzi_path=None):
+        self._file = open(file_path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._is_bgzip = _is_bgzip(self._mmap)
+        if self._is_bgzip:
+            if gzi_path is None:
+                gzi_path = file_path + ".gzi"
+            if os.path.isfile(gzi_path):
+                self._block_offsets = _read_gzi(gzi_path)
+            else:
+                self._block_offsets = _find_bgzip_blocks(self._mmap)
+        elif self._mmap[:2] == b"\x1f\x8b":
+            self.close()
+            raise InvalidFileError(
+                "Random access requires the file to be compressed with "
+                "'bgzip' instead of 'gzip'"
+            )
+
+        if index_path is None:
+            index_path = file_path + ".fai"
+        if os.path.isfile(index_path):
+            self._entries = _read_fai(index_path)
+        else:
+            self._entries = _build_fai(self._iter_lines())
+
+    def get_length(self, name):
+        """
+        Get the length of a sequence in the file.
+
+        Parameters
+        ----------
+        name : str
+            The name of the sequence.
+
+        Returns
+        -------
+        length : int
+            The length of the sequence.
+        """
+        return self._entries[name][0]
+
+    def get_seq_string(self, name, start=None, stop=None):
+        """
+        Get a region of a sequence in the file as string.
+
+        Parameters
+        ----------
+        name : str
+            The name of the sequence.
+        start, stop : int, optional
+            The region of the sequence, that is returned.
+            The positions are 0-based and `stop` is exclusive, as in
+            Python slices.
+            By default, the region starts at the beginning and stops at
+            the end of the sequence, respectively.
+
+        Returns
+        -------
+        seq_str : str
+            The sequence region.
+            The letter case is the same as in the file.
+        """
+        length, offset, line_bases, line_width = self._entries[name]
+        start, stop, _ = slice(start, stop).indices(length)
+        if stop <= start:
+            return ""
+        byte_start = _byte_position(start, offset, line_bases, line_width)
+        # The last base of the region is still included
+        byte_stop = _byte_position(stop-1, offset, line_bases, line_width) + 1
+        data = self._read_range(byte_start, byte_stop)
+        # Remove line breaks
+        return data.translate(None, b"\r\n").decode("ascii")
+
+    def get_sequence(self, name, start=None, stop=None):
+        """
+        Get a region of a sequence in the file as
+        :class:`NucleotideSequence`.
+
+        Parameters
+        ----------
+        name : str
+            The name of the sequence.
+        start, stop : int, optional
+            The region of the sequence, that is returned.
+            The positions are 0-based and `stop` is exclusive, as in
+            Python slices.
+            By default, the region starts at the beginning and stops at
+            the end of the sequence, respectively.
+
+        Returns
+        -------
+        sequence : NucleotideSequence
+            The sequence region.
+        """
+        return NucleotideSequence(self.get_seq_string(name, start, stop))
+
+    def close(self):
+        """
+        Close the underlying file.
+        """
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __getitem__(self, name):
+        return self.get_sequence(name)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return self._entries.__iter__()
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def _read_range(self, start, stop):
+        """
+        Get the bytes in the given range of the uncompressed file.
+        """
+        if not self._is_bgzip:
+            return self._mmap[start : stop]
+
+        compressed_offsets, uncompressed_offsets = self._block_offsets
+        # Find the block that contains the start of the range
+        block_i = np.searchsorted(
+            uncompressed_offsets, start, side="right"
+        ) - 1
+        block_start = int(compressed_offsets[block_i])
+        uncompressed_start = int(uncompressed_offsets[block_i])
+        blocks = []
+        uncompressed_stop = uncompressed_start
+        while uncompressed_stop < stop and block_start < len(self._mmap):
+            block_size = _bgzip_block_size(self._mmap, block_start)
+            block = zlib.decompress(
+                self._mmap[block_start : block_start + block_size],
+                wbits=31
+            )
+            blocks.append(block)
+            uncompressed_stop += len(block)
+            block_start += block_size
+        data = b"".join(blocks)
+        return data[start - uncompressed_start : stop - uncompressed_start]
+
+    def _iter_lines(self):
+        """
+        Iterate over the lines of the uncompressed file.
+        """
+        if self._is_bgzip:
+            with gzip.open(self._file.name, "rb") as file:
+                yield from file
+        else:
+            self._mmap.seek(0)
+            yield from iter(self._mmap.readline, b"")
+
+
+def create_fasta_index(file_path, index_path=None, gzi_path=None):
+    """
+    Create a *faidx* index (``.fai`` file) for a FASTA file.
+
+    The index file is compatible with *samtools faidx*.
+    If the file is compressed with *bgzip*, additionally a ``.gzi``
+    index is created, that maps compressed to uncompressed positions.
+
+    Parameters
+    ----------
+    file_path : str
+        The path of the FASTA file.
+        The file may be compressed with *bgzip*.
+    index_path : str, optional
+        The path of the ``.fai`` file to be written.
+        By default, the index is written to ``file_path + '.fai'``.
+    gzi_path : str, optional
+        The path of the ``.gzi`` file to be written.
+        Only used, if the FASTA file is compressed with *bgzip*.
+        By default, the index is written to ``file_path + '.gzi'``.
+
+    Raises
+    ------
+    InvalidFileError
+        If the lines of a sequence have different lengths, except for
+        the last line of each sequence, or if the file is compressed
+        with *gzip*, but not with *bgzip*.
+
+    See also
+    --------
+    IndexedFastaFile
+    """
+    if index_path is None:
+        index_path = file_path + ".fai"
+    if gzi_path is None:
+        gzi_path = file_path + ".gzi"
+
+    with open(file_path, "rb") as file:
+        magic = file.read(2)
+    if magic == b"\x1f\x8b":
+        with open(file_path, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if not _is_bgzip(mm):
+                    raise InvalidFileError(
+                        "Random access requires the file to be compressed "
+                        "with 'bgzip' instead of 'gzip'"
+                    )
+                compressed_offsets, uncompressed_offsets \
+                    = _find_bgzip_blocks(mm)
+        _write_gzi(gzi_path, compressed_offsets, uncompressed_offsets)
+        with gzip.open(file_path, "rb") as file:
+            entries = _build_fai(file)
+    else:
+        with open(file_path, "rb") as file:
+            entries = _build_fai(file)
+
+    with open(index_path, "w") as file:
+        for name, (length, offset, line_bases, line_width) in entries.items():
+            file.write(
+                f"{name}\t{length}\t{offset}\t{line_bases}\t{line_width}\n"
+            )
+
+
+def _byte_position(seq_pos, offset, line_bases, line_width):
+    """
+    Convert a position in a sequence into a byte position in the file.
+    """
+    return offset + (seq_pos // line_bases) * line_width \
+           + seq_pos % line_bases
+
+
+def _build_fai(lines):
+    """
+    Create the *faidx* entries from the lines of a FASTA file, given
+    as bytes.
+
+    Returns a dictionary that maps each sequence name to a tuple
+    (length, offset, bases per line, bytes per line).
+    """
+    entries = OrderedDict()
+    name = None
+    position = 0
+    for line in lines:
+        position += len(line)
+        stripped = line.rstrip(b"\r\n")
+        if stripped[:1] == b">":
+            if name is not None:
+                entries[name] = (length, offset, line_bases, line_width)
+            header = stripped[1:].decode("utf-8").split()
+            name = header[0] if len(header) > 0 else ""
+            if name in entries:
+                raise InvalidFileError(f"Duplicate sequence name '{name}'")
+            length = 0
+            # The sequence starts directly after the header line
+            offset = position
+            line_bases = 0
+            line_width = 0
+            # Only the last line of a sequence may be shorter
+            is_last_line = False
+        elif name is None:
+            # Skip content before the first header
+            continue
+        elif len(stripped) == 0:
+            # Empty lines are only allowed at the end of an entry
+            is_last_line = True
+        else:
+            if line_bases == 0:
+                line_bases = len(stripped)
+                line_width = len(line)
+            elif is_last_line or len(stripped) > line_bases:
+                raise InvalidFileError(
+                    f"Sequence '{name}' has lines of different length"
+                )
+            elif len(stripped) < line_bases:
+                is_last_line = True
+            length += len(stripped)
+    if name is None:
+        raise InvalidFileError("File does not contain any sequences")
+    entries[name] = (length, offset, line_bases, line_width)
+    return entries
+
+
+def _read_fai(index_path):
+    entries = OrderedDict()
+    with open(index_path, "r") as file:
+        for line in file:
+            fields = line.rstrip("\r\n").split("\t")
+            if len(fields) == 1 and len(fields[0]) == 0:
+                continue
+            if len(fields) < 5:
+                raise InvalidFileError(
+                    f"Index file has {len(fields)} columns, expected 5"
+                )
+            entries[fields[0]] = tuple(int(field) for field in fields[1:5])
+    return entries
+
+
+def _is_bgzip(data):
+    """
+    Check whether the given data starts with a *bgzip* block.
+    """
+    # gzip magic number, deflate method and extra field flag
+    if data[:4] != b"\x1f\x8b\x08\x04":
+        return False
+    # Search for the 'BC' subfield
+    extra_length = int.from_bytes(data[10:12], "little")
+    return data[12:12 + extra_length].find(b"BC\x02\x00") != -1
+
+
+def _bgzip_block_size(data, block_start):
+    """
+    Get the total size of the *bgzip* block starting at the given
+    position.
+    """
+    extra_length = int.from_bytes(
+        data[block_start + 10 : block_start + 12], "little"
+    )
+    extra = data[block_start + 12 : block_start + 12 + extra_length]
+    # Iterate over subfields to find the 'BC' subfield
+    i = 0
+    while i < len(extra):
+        subfield_length = int.from_bytes(extra[i+2 : i+4], "little")
+        if extra[i : i+2] == b"BC":
+            # The subfield contains the block size minus one
+            return int.from_bytes(extra[i+4 : i+6], "little") + 1
+        i += 4 + subfield_length
+    raise InvalidFileError(
+        f"Block at position {block_start} is not a valid 'bgzip' block"
+    )
+
+
+def _find_bgzip_blocks(data):
+    """
+    Find the compressed and uncompressed start positions of all
+    *bgzip* blocks, by reading only the block headers and footers.
+    """
+    compressed_offsets = []
+    uncompressed_offsets = []
+    compressed_pos = 0
+    uncompressed_pos = 0
+    while compressed_pos < len(data):
+        block_size = _bgzip_block_size(data, compressed_pos)
+        compressed_offsets.append(compressed_pos)
+        uncompressed_offsets.append(uncompressed_pos)
+        # The last 4 bytes of a block contain the uncompressed size
+        block_stop = compressed_pos + block_size
+        uncompressed_pos += int.from_bytes(
+            data[block_stop - 4 : block_stop], "little"
+        )
+        compressed_pos = block_stop
+    return (
+        np.array(compressed_offsets, dtype=np.int64),
+        np.array(uncompressed_offsets, dtype=np.int64)
+    )
+
+
+def _read_gzi(gzi_path):
+    with open(gzi_path, "rb") as file:
+        content = file.read()
+    n_entries = int.from_bytes(content[:8], "little")
+    offsets = np.frombuffer(
+        content, dtype="<u8", count=2 * n_entries, offset=8
+    ).reshape(-1, 2).astype(np.int64)
+    # The first block at position 0 is implicit in a '.gzi' file
+    compressed_offsets = np.concatenate(([0], offsets[:, 0]))
+    uncompressed_offsets = np.concatenate(([0], offsets[:, 1]))
+    return compressed_offsets, uncompressed_offsets
+
+
+def _write_gzi(gzi_path, compressed_offsets, uncompressed_offsets):
+    # The first block at position 0 is implicit in a '.gzi' file
+    offsets = np.stack(
+        (compressed_offsets[1:], uncompressed_offsets[1:]), axis=-1
+    ).astype("<u8")
+    with open(gzi_path, "wb") as file:
+        file.write(len(offsets).to_bytes(8, "little"))
+        file.write(offsets.tobytes())
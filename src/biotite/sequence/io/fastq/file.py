@@ -6,16 +6,21 @@ __name__ = "biotite.sequence.io.fastq"
 __author__ = "Patrick Kunzmann"
 
 import warnings
+import gzip
 from numbers import Integral
 from collections import OrderedDict
 from collections.abc import MutableMapping
 import numpy as np
-from ....file import TextFile, InvalidFileError, wrap_string
+from ....file import TextFile, InvalidFileError, wrap_string, is_text
 from ...seqtypes import NucleotideSequence
+from ...codec import encode_chars
 
 __all__ = ["FastqFile"]
 
 
+# The size of the blocks (in bytes) read by 'FastqFile.read_batches()'
+_BLOCK_SIZE = 2**22
+
 _OFFSETS = {
     "Sanger"       : 33,
     "Solexa"       : 64,
@@ -441,6 +446,168 @@ class FastqFile(TextFile, MutableMapping):
             else:
                 raise InvalidFileError(f"FASTQ file is invalid")
 
+    @staticmethod
+    def read_batches(file, offset, batch_size=10000, alphabet=None):
+        """
+        Create an iterator over batches of sequences (and corresponding
+        scores) of the given FASTQ file.
+
+        In contrast to :meth:`read_iter()`, the file is parsed in large
+        binary blocks and each batch is returned as contiguous arrays.
+        This allows fast processing of large files, e.g. quality
+        filtering or trimming can be performed on all sequences of a
+        batch at once.
+
+        Parameters
+        ----------
+        file : file-like object or str
+            The file to be read.
+            Alternatively a file path can be supplied.
+            If a file path is given, the file may be *gzip* compressed.
+            A file-like object may be opened in text or binary mode,
+            e.g. by :func:`gzip.open()`.
+        offset : int or {'Sanger', 'Solexa', 'Illumina-1.3', 'Illumina-1.5', 'Illumina-1.8'}
+            This value that is added to the quality score to obtain the
+            ASCII code.
+            Can either be directly the value, or a string that indicates
+            the score format.
+        batch_size : int, optional
+            The maximum number of sequences in each batch.
+            Only the last batch may contain less sequences.
+        alphabet : LetterAlphabet, optional
+            The alphabet, the sequences are encoded with.
+            By default, the ambiguous nucleotide alphabet
+            (``NucleotideSequence.alphabet_amb``) is used.
+
+        Yields
+        ------
+        identifiers : list of str
+            The identifiers of the sequences in the current batch.
+        codes : ndarray, dtype=np.uint8
+            The symbol codes of all sequences in the current batch,
+            concatenated into a single array.
+        scores : ndarray, dtype=np.int8
+            The quality scores of all sequences in the current batch,
+            concatenated into a single array.
+        offsets : ndarray, shape=(n+1,), dtype=np.int64
+            The sequence ``i`` of the current batch is
+            ``codes[offsets[i] : offsets[i+1]]`` and the corresponding
+            scores are ``scores[offsets[i] : offsets[i+1]]``.
+
+        Notes
+        -----
+        Files where each entry consists of exactly four lines are parsed
+        fastest.
+        Sequences and scores that span multiple lines are supported, but
+        the entry boundaries in such files must be determined line by
+        line.
+
+        Examples
+        --------
+
+        >>> import os.path
+        >>> file = FastqFile(offset="Sanger")
+        >>> file["seq1"] = "ATACT", [0,3,10,7,12]
+        >>> file["seq2"] = "TTGTAGG", [15,13,24,21,28,38,35]
+        >>> file["seq3"] = "GCNA", [30,30,0,25]
+        >>> path = os.path.join(path_to_directory, "test.fastq")
+        >>> file.write(path)
+        >>> for identifiers, codes, scores, offsets in FastqFile.read_batches(
+        ...     path, offset="Sanger", batch_size=2
+        ... ):
+        ...     print(identifiers)
+        ...     print(codes)
+        ...     print(scores)
+        ...     print(offsets)
+        ['seq1', 'seq2']
+        [0 3 0 1 3 3 3 2 3 0 2 2]
+        [ 0  3 10  7 12 15 13 24 21 28 38 35]
+        [ 0  5 12]
+        ['seq3']
+        [ 2  1 14  0]
+        [30 30  0 25]
+        [0 4]
+        """
+        if batch_size < 1:
+            raise ValueError("The batch size must be at least 1")
+        offset = _convert_offset(offset)
+        if alphabet is None:
+            alphabet = NucleotideSequence.alphabet_amb
+        # The symbols as ASCII values, as required by 'encode_chars()'
+        symbols = np.frombuffer(
+            np.array(alphabet.get_symbols(), dtype="|S1"), dtype=np.ubyte
+        )
+
+        blocks = _read_binary_blocks(file)
+        data = b""
+        eof = False
+        # The number of lines that is expected to contain a full batch
+        required_lines = 4 * batch_size
+        while True:
+            # Read blocks until the batch is expected to be complete
+            pending = [data]
+            n_lines = data.count(b"\n")
+            while not eof and n_lines < required_lines:
+                block = next(blocks, None)
+                if block is None:
+                    eof = True
+                else:
+                    pending.append(block)
+                    n_lines += block.count(b"\n")
+            data = b"".join(pending)
+
+            chars = np.frombuffer(data, dtype=np.ubyte)
+            line_starts, line_stops = _find_lines(chars, eof)
+            header_lines, seq_starts, seq_stops, score_starts, score_stops \
+                = _find_entries_in_lines(
+                    chars, line_starts, line_stops, batch_size
+                )
+            n_entries = len(header_lines)
+            if n_entries < batch_size and not eof:
+                # Entries span more lines than expected
+                # -> Adjust the estimation and read more data
+                if n_entries == 0:
+                    required_lines = 2 * required_lines
+                else:
+                    lines_per_entry = score_stops[-1] / n_entries
+                    required_lines = int(lines_per_entry * batch_size) + 1
+                required_lines = max(required_lines, n_lines + 1)
+                continue
+            if n_entries == 0:
+                if len(line_starts) > 0:
+                    raise InvalidFileError(
+                        "The last entry in the file is incomplete"
+                    )
+                return
+
+            identifiers = [
+                data[start + 1 : stop].decode("utf-8")
+                for start, stop in zip(
+                    line_starts[header_lines].tolist(),
+                    line_stops[header_lines].tolist()
+                )
+            ]
+            seq_chars, offsets = _gather_lines(
+                data, line_starts, line_stops, seq_starts, seq_stops
+            )
+            score_chars, _ = _gather_lines(
+                data, line_starts, line_stops, score_starts, score_stops
+            )
+            codes = encode_chars(alphabet=symbols, symbols=seq_chars)
+            scores = score_chars.view(np.int8)
+            scores -= offset
+            yield identifiers, codes, scores, offsets
+
+            # The remaining data starts with the line after the batch
+            last_line = score_stops[-1]
+            if last_line < len(line_starts):
+                data = data[line_starts[last_line]:]
+            elif eof:
+                data = b""
+            else:
+                # Keep the incomplete last line
+                data = data[data.rfind(b"\n") + 1:]
+
 
 def _score_str_to_scores(score_str, offset):
     """
@@ -455,6 +622,167 @@ def _score_str_to_scores(score_str, offset):
     scores -= offset
     return scores
 
+def _read_binary_blocks(file):
+    """
+    Iterate over the content of a file in blocks of bytes.
+    Files given by path are decompressed, if they are *gzip* compressed.
+    """
+    # File name
+    if isinstance(file, str):
+        with open(file, "rb") as f:
+            is_gzip = (f.read(2) == b"\x1f\x8b")
+        if is_gzip:
+            f = gzip.open(file, "rb")
+        else:
+            f = open(file, "rb")
+        with f:
+            while True:
+                block = f.read(_BLOCK_SIZE)
+                if not block:
+                    break
+                yield block
+    # File object
+    else:
+        text_mode = is_text(file)
+        while True:
+            block = file.read(_BLOCK_SIZE)
+            if not block:
+                break
+            if text_mode:
+                block = block.encode("utf-8")
+            yield block
+
+
+def _find_lines(chars, eof):
+    """
+    Find the start and stop positions of all non-empty lines in the
+    given ASCII characters.
+    If the end of the file is not reached, the incomplete last line is
+    omitted.
+    """
+    if len(chars) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    newlines = np.flatnonzero(chars == ord("\n"))
+    line_starts = np.concatenate(([0], newlines + 1))
+    line_stops = np.append(newlines, len(chars))
+    if not eof:
+        line_starts = line_starts[:-1]
+        line_stops = line_stops[:-1]
+    # Remove carriage returns of Windows line endings
+    has_cr = (line_stops > line_starts) \
+        & (chars[line_stops - 1] == ord("\r"))
+    line_stops = line_stops - has_cr
+    # Filter out empty lines
+    non_empty = line_stops > line_starts
+    return line_starts[non_empty], line_stops[non_empty]
+
+
+def _find_entries_in_lines(chars, line_starts, line_stops, max_entries):
+    """
+    Find the line index ranges of the identifier, sequence and score
+    part of each complete entry.
+    Entries consisting of exactly four lines are identified in a
+    vectorized manner, otherwise the lines are processed one by one.
+    """
+    line_lengths = line_stops - line_starts
+
+    # Fast path: Each entry spans exactly four lines
+    n_entries = min(len(line_starts) // 4, max_entries)
+    header_lines = np.arange(0, 4 * n_entries, 4)
+    if (chars[line_starts[header_lines]] == ord("@")).all() \
+        and (chars[line_starts[header_lines + 2]] == ord("+")).all() \
+        and (line_lengths[header_lines + 1]
+             == line_lengths[header_lines + 3]).all():
+            entries = (
+                header_lines,
+                header_lines + 1, header_lines + 2,
+                header_lines + 3, header_lines + 4
+            )
+            if n_entries < max_entries:
+                # The remaining lines might contain a complete entry
+                # that does not consist of four lines
+                remaining = _find_entries_in_lines_iterative(
+                    chars, line_starts[4 * n_entries:],
+                    line_lengths[4 * n_entries:], max_entries - n_entries
+                )
+                entries = tuple(
+                    np.concatenate((lines, remaining_lines + 4 * n_entries))
+                    for lines, remaining_lines in zip(entries, remaining)
+                )
+            return entries
+    return _find_entries_in_lines_iterative(
+        chars, line_starts, line_lengths, max_entries
+    )
+
+
+def _find_entries_in_lines_iterative(chars, line_starts, line_lengths,
+                                     max_entries):
+    first_chars = chars[line_starts].tolist()
+    line_lengths = line_lengths.tolist()
+    n_lines = len(first_chars)
+    entries = []
+    i = 0
+    while i < n_lines and len(entries) < max_entries:
+        if first_chars[i] != ord("@"):
+            raise InvalidFileError("FASTQ file is invalid")
+        # Sequence lines are terminated by the '+' line
+        seq_len = 0
+        j = i + 1
+        while j < n_lines and first_chars[j] != ord("+"):
+            seq_len += line_lengths[j]
+            j += 1
+        if j == n_lines:
+            # Incomplete entry
+            break
+        # Score lines are terminated when the sequence length is reached
+        score_len = 0
+        k = j + 1
+        while k < n_lines and score_len < seq_len:
+            score_len += line_lengths[k]
+            k += 1
+        if score_len < seq_len:
+            # Incomplete entry
+            break
+        if score_len > seq_len:
+            raise InvalidFileError(
+                f"The amount of scores is not equal to the sequence "
+                f"length"
+            )
+        entries.append((i, i + 1, j, j + 1, k))
+        i = k
+    entries = np.array(entries, dtype=np.int64).reshape(-1, 5)
+    return tuple(entries.T)
+
+
+def _gather_lines(data, line_starts, line_stops, first_lines, stop_lines):
+    """
+    Concatenate the characters in the given line ranges.
+
+    Returns the concatenated characters and the offsets of each line
+    range in the concatenated array.
+    """
+    line_lengths = line_stops - line_starts
+    cum_lengths = np.concatenate(([0], np.cumsum(line_lengths)))
+    range_lengths = cum_lengths[stop_lines] - cum_lengths[first_lines]
+    offsets = np.concatenate(([0], np.cumsum(range_lengths)))
+
+    if (stop_lines - first_lines == 1).all():
+        # Each range consists of a single line
+        lines = first_lines
+    else:
+        lines = np.concatenate([
+            np.arange(first, stop) for first, stop
+            in zip(first_lines.tolist(), stop_lines.tolist())
+        ])
+    # Joining memory views of the lines is faster than fancy indexing
+    view = memoryview(data)
+    selected_chars = bytearray().join([
+        view[start : stop] for start, stop
+        in zip(line_starts[lines].tolist(), line_stops[lines].tolist())
+    ])
+    return np.frombuffer(selected_chars, dtype=np.ubyte), offsets
+
+
 def _convert_offset(offset_val_or_string):
     """
     If the given offset is a string return the corresponding numerical
@@ -44,13 +44,25 @@ def find_subsequence(sequence, query):
     """
     if not sequence.get_alphabet().extends(query.get_alphabet()):
         raise ValueError("The sequences alphabets are not equal")
-    match_indices = []
     frame_size = len(query)
-    for i in range(len(sequence) - frame_size + 1):
-        sub_seq_code = sequence.code[i : i + frame_size]
-        if np.array_equal(query.code, sub_seq_code):
-            match_indices.append(i)
-    return np.array(match_indices)
+    if frame_size == 0:
+        # An empty query matches at every position
+        return np.arange(len(sequence) + 1)
+    if frame_size > len(sequence):
+        return np.zeros(0, dtype=np.int64)
+    seq_code = sequence.code
+    query_code = query.code
+    # Start with all positions that match the first query symbol
+    # and successively remove the positions, where the following
+    # symbols do not match
+    match_indices = np.where(
+        seq_code[:len(sequence) - frame_size + 1] == query_code[0]
+    )[0]
+    for i in range(1, frame_size):
+        match_indices = match_indices[
+            seq_code[match_indices + i] == query_code[i]
+        ]
+    return match_indices
 
 def find_symbol(sequence, symbol):
     """
@@ -4,8 +4,10 @@
 
 __name__ = "biotite.sequence"
 __author__ = "Patrick Kunzmann", "Thomas Nevolianis"
-__all__ = ["GeneralSequence", "NucleotideSequence", "ProteinSequence"]
+__all__ = ["GeneralSequence", "NucleotideSequence",
+           "PackedNucleotideSequence", "ProteinSequence"]
 
+import numbers
 from .sequence import Sequence
 from .alphabet import LetterAlphabet, AlphabetError
 import numpy as np
@@ -122,8 +124,12 @@ class NucleotideSequence(Sequence):
         _key_code = alphabet_amb.encode(_key)
         _val_code = alphabet_amb.encode(_value)
         _compl_dict[_key_code] = _val_code
-    # Vectorized function that returns a complement code
-    _complement_func = np.vectorize(_compl_dict.__getitem__)
+    # Lookup table that maps a code to its complement code
+    # This works for both alphabets,
+    # as the unambiguous alphabet is a prefix of the ambiguous one
+    _complement_code = np.zeros(len(alphabet_amb), dtype=np.uint8)
+    for _key_code, _val_code in _compl_dict.items():
+        _complement_code[_key_code] = _val_code
     
     def __init__(self, sequence=[], ambiguous=None):
         if isinstance(sequence, str):
@@ -175,9 +181,59 @@ class NucleotideSequence(Sequence):
         AAGCGT
         
         """
-        compl_code = NucleotideSequence._complement_func(self.code)
+        compl_code = NucleotideSequence._complement_code[self.code]
         return self.copy(compl_code)
     
+    def reverse_complement(self):
+        """
+        Get the reverse complement nucleotide sequence.
+
+        This is equivalent to ``reverse().complement()``.
+        
+        Returns
+        -------
+        reverse_complement : NucleotideSequence
+            The reverse complement sequence.
+        
+        Examples
+        --------
+        
+        >>> dna_seq = NucleotideSequence("ACGCTT")
+        >>> print(dna_seq.reverse_complement())
+        AAGCGT
+        """
+        compl_code = NucleotideSequence._complement_code[self.code[::-1]]
+        return self.copy(compl_code)
+    
+    def pack(self):
+        """
+        Convert this sequence into a :class:`PackedNucleotideSequence`,
+        which stores four nucleotides per byte.
+
+        Returns
+        -------
+        packed : PackedNucleotideSequence
+            The packed sequence.
+
+        Raises
+        ------
+        AlphabetError
+            If the sequence contains ambiguous symbols.
+        
+        Examples
+        --------
+        
+        >>> dna_seq = NucleotideSequence("ACGCTT")
+        >>> packed_seq = dna_seq.pack()
+        >>> print(packed_seq)
+        ACGCTT
+        >>> print(packed_seq.packed_code)
+        [ 25 240]
+        """
+        packed_seq = PackedNucleotideSequence()
+        packed_seq.code = self.code
+        return packed_seq
+    
     def translate(self, complete=False, codon_table=None, met_start=False):
         """
         Translate the nucleotide sequence into a protein sequence.
@@ -309,6 +365,282 @@ class NucleotideSequence(Sequence):
         return NucleotideSequence.alphabet_amb
 
 
+class PackedNucleotideSequence(NucleotideSequence):
+    """
+    Representation of an unambiguous nucleotide sequence, that stores
+    four nucleotides per byte.
+
+    This class uses the :attr:`unambiguous_alphabet()` of
+    :class:`NucleotideSequence`, so each symbol code fits into two
+    bits.
+    This reduces the memory requirement to a quarter compared to a
+    :class:`NucleotideSequence`, which is useful for genome-scale
+    sequences.
+
+    The first nucleotide of each byte is stored in the most significant
+    bits.
+    The packed representation is available via :attr:`packed_code`.
+    The :attr:`code` is unpacked on each access, so that this class can
+    be used in place of a :class:`NucleotideSequence`.
+    As modifying the unpacked :attr:`code` would not modify the
+    sequence, the returned array is read-only.
+    Use indexing or assign a new :attr:`code` instead.
+
+    :func:`reverse()`, :func:`complement()`,
+    :func:`reverse_complement()`, :func:`kmer_codes()` and indexing
+    with a slice work directly on the packed representation.
+    
+    Parameters
+    ----------
+    sequence : iterable object, optional
+        The initial DNA sequence. This may either be a list or a string.
+        May take upper or lower case letters.
+        By default the sequence is empty.
+
+    Attributes
+    ----------
+    packed_code : ndarray, dtype=np.uint8
+        The packed sequence code.
+        The unused bits of the last byte are always zero.
+    
+    Examples
+    --------
+
+    >>> dna_seq = PackedNucleotideSequence("ACGTACGTA")
+    >>> print(dna_seq)
+    ACGTACGTA
+    >>> print(dna_seq.packed_code)
+    [27 27  0]
+    >>> print(dna_seq.code)
+    [0 1 2 3 0 1 2 3 0]
+    >>> print(dna_seq[2:7])
+    GTACG
+    >>> print(dna_seq.reverse_complement())
+    TACGTACGT
+    >>> print(dna_seq.kmer_codes(3))
+    [ 6 27 44 49  6 27 44]
+    """
+
+    # The code of each of the four symbols in a byte
+    _UNPACK_TABLE = np.stack(
+        [(np.arange(256) >> shift) & 0b11 for shift in (6, 4, 2, 0)],
+        axis=-1
+    ).astype(np.uint8)
+    # Maps each byte to the byte with the reverse order of symbols
+    _REVERSE_TABLE = (
+        (_UNPACK_TABLE[:, 0] << 0) | (_UNPACK_TABLE[:, 1] << 2) |
+        (_UNPACK_TABLE[:, 2] << 4) | (_UNPACK_TABLE[:, 3] << 6)
+    ).astype(np.uint8)
+
+    def __init__(self, sequence=()):
+        if isinstance(sequence, str):
+            sequence = sequence.upper()
+        else:
+            sequence = [symbol.upper() for symbol in sequence]
+        self._alphabet = NucleotideSequence.alphabet_unamb
+        Sequence.__init__(self, sequence)
+    
+    def __copy_create__(self):
+        return PackedNucleotideSequence()
+
+    def copy(self, new_seq_code=None):
+        if new_seq_code is not None:
+            return super().copy(new_seq_code)
+        # Copy the packed code directly
+        return self._from_packed(self._packed_code.copy(), self._length)
+    
+    @property
+    def packed_code(self):
+        return self._packed_code
+
+    @property
+    def _seq_code(self):
+        # The methods of 'Sequence' access the sequence code
+        # via '_seq_code' -> unpack on access
+        code = self._unpack_code()
+        # Writing into the unpacked code would be silently lost
+        code.flags.writeable = False
+        return code
+    
+    @_seq_code.setter
+    def _seq_code(self, value):
+        value = np.asarray(value)
+        if len(value) > 0 and np.max(value) >= 4:
+            raise AlphabetError(
+                "A packed nucleotide sequence cannot contain "
+                "ambiguous symbols"
+            )
+        self._length = len(value)
+        # Pad the code to a multiple of four symbols
+        padded = np.zeros(-(-len(value) // 4) * 4, dtype=np.uint8)
+        padded[:len(value)] = value
+        padded = padded.reshape(-1, 4)
+        self._packed_code = (
+            (padded[:, 0] << 6) | (padded[:, 1] << 4) |
+            (padded[:, 2] << 2) | (padded[:, 3])
+        ).astype(np.uint8)
+    
+    def pack(self):
+        return self.copy()
+    
+    def unpack(self):
+        """
+        Convert this sequence into a :class:`NucleotideSequence`,
+        which stores one nucleotide per byte.
+
+        Returns
+        -------
+        unpacked : NucleotideSequence
+            The unpacked sequence.
+        """
+        unpacked_seq = NucleotideSequence(ambiguous=False)
+        unpacked_seq.code = self._unpack_code()
+        return unpacked_seq
+
+    def _unpack_code(self):
+        return PackedNucleotideSequence._UNPACK_TABLE[self._packed_code] \
+               .reshape(-1)[:self._length]
+    
+    def reverse(self):
+        reversed_code = PackedNucleotideSequence._REVERSE_TABLE[
+            self._packed_code[::-1]
+        ]
+        # The unused positions of the last byte are now at the start
+        return self._from_packed(
+            _shift_packed(reversed_code, -self._length % 4), self._length
+        )
+    
+    def complement(self):
+        # The complement of the code 'c' of an unambiguous nucleotide
+        # is '3 - c', i.e. the inverted bits
+        return self._from_packed(~self._packed_code, self._length)
+    
+    def reverse_complement(self):
+        return self.complement().reverse()
+
+    def kmer_codes(self, k):
+        """
+        Get the *k-mer codes* of all overlapping *k-mers* in this
+        sequence, without unpacking it.
+
+        The codes are equal to the ones from
+        :meth:`KmerTable.kmer_codes()`
+        for :attr:`unambiguous_alphabet()`.
+
+        Parameters
+        ----------
+        k : int
+            The length of the *k-mers*.
+            Must be in the range 1 to 31.
+
+        Returns
+        -------
+        codes : ndarray, shape=(n,), dtype=np.int64
+            The *k-mer codes*, where ``codes[i]`` is the code of the
+            *k-mer* starting at ``sequence[i]``.
+            *n* is ``len(sequence) - k + 1``.
+        
+        Examples
+        --------
+
+        >>> dna_seq = PackedNucleotideSequence("ACGTT")
+        >>> print(dna_seq.kmer_codes(2))
+        [ 1  6 11 15]
+        """
+        if k < 1 or k > 31:
+            raise ValueError("k must be in the range 1 to 31")
+        n_kmers = self._length - k + 1
+        if n_kmers <= 0:
+            return np.zeros(0, dtype=np.int64)
+        # The 64-bit word that begins with each byte
+        # and the following byte contain all symbols of the k-mers
+        # starting within this byte
+        padded = np.zeros(len(self._packed_code) + 8, dtype=np.uint64)
+        padded[:len(self._packed_code)] = self._packed_code
+        n_bytes = len(self._packed_code)
+        words = np.zeros(n_bytes, dtype=np.uint64)
+        for i in range(8):
+            words |= padded[i : i + n_bytes] << np.uint64(56 - 8*i)
+        next_bytes = padded[8 : 8 + n_bytes]
+        
+        codes = np.zeros(n_bytes * 4, dtype=np.uint64)
+        for pos_in_byte in range(4):
+            shift = 2 * pos_in_byte
+            codes[pos_in_byte::4] = (
+                (words << np.uint64(shift)) |
+                (next_bytes >> np.uint64(8 - shift))
+            ) >> np.uint64(64 - 2*k)
+        return codes[:n_kmers].astype(np.int64)
+    
+    def __getitem__(self, index):
+        if isinstance(index, numbers.Integral):
+            if index < 0:
+                index += self._length
+            if index < 0 or index >= self._length:
+                raise IndexError(
+                    f"Index {index} is out of bounds for a sequence of "
+                    f"length {self._length}"
+                )
+            code = (self._packed_code[index // 4] >> (6 - 2 * (index % 4))) \
+                   & 0b11
+            return self._alphabet.decode(code)
+        if isinstance(index, slice) and index.step in (None, 1):
+            # Only the bytes containing the subsequence are processed
+            start, stop, _ = index.indices(self._length)
+            stop = max(start, stop)
+            sub_code = self._packed_code[start // 4 : -(-stop // 4)]
+            return self._from_packed(
+                _shift_packed(sub_code, start % 4), stop - start
+            )
+        return super().__getitem__(index)
+    
+    def __setitem__(self, index, item):
+        # Modify the unpacked sequence and pack it again
+        unpacked_seq = self.unpack()
+        unpacked_seq[index] = item
+        self._seq_code = unpacked_seq.code
+    
+    def __len__(self):
+        return self._length
+    
+    def __iter__(self):
+        return iter(self.unpack())
+
+    def __eq__(self, item):
+        if isinstance(item, PackedNucleotideSequence):
+            return self._length == item._length \
+                   and np.array_equal(self._packed_code, item._packed_code)
+        # Equal to an unpacked sequence with the same symbols
+        return self.unpack() == item
+
+    def _from_packed(self, packed_code, length):
+        """
+        Create a new sequence from a packed code, whose unused
+        positions are set to zero.
+        """
+        packed_seq = self.__copy_create__()
+        packed_code = packed_code[:-(-length // 4)].copy()
+        if length % 4 != 0:
+            packed_code[-1] &= np.uint8(0xFF << (8 - 2 * (length % 4)))
+        packed_seq._packed_code = packed_code
+        packed_seq._length = length
+        self.__copy_fill__(packed_seq)
+        return packed_seq
+
+
+def _shift_packed(packed_code, n_symbols):
+    """
+    Shift a packed sequence code by the given number of symbols
+    (0 to 3) to the start.
+    """
+    if n_symbols == 0:
+        return packed_code
+    shift = 2 * n_symbols
+    shifted = packed_code << np.uint8(shift)
+    shifted[:-1] |= packed_code[1:] >> np.uint8(8 - shift)
+    return shifted
+
+
 class ProteinSequence(Sequence):
     """
     Representation of a protein sequence.
@@ -97,28 +97,63 @@ The universal length unit in this package is Å.
 __name__ = "biotite.structure"
 __author__ = "Patrick Kunzmann"
 
-from .atoms import *
-from .bonds import *
-from .box import *
-from .celllist import *
-from .charges import *
-from .compare import *
-from .density import *
-from .dotbracket import *
-from .error import *
-from .filter import *
-from .geometry import *
-from .hbond import *
-from .integrity import *
-from .mechanics import *
-from .molecules import *
-from .pseudoknots import *
-from .rdf import *
-from .residues import *
-from .chains import *
-from .sasa import *
-from .sse import *
-from .superimpose import *
-from .transform import *
-from .basepairs import *
+from ..lazy import lazy_load as _lazy_load
+
+# The attributes of the modules are imported on first access
+_lazy_load(__name__, {
+    "atoms":       ["Atom", "AtomArray", "AtomArrayStack", "array", "stack",
+                    "repeat", "from_template", "coord"],
+    "bonds":       ["BondList", "BondType", "connect_via_distances",
+                    "connect_via_residue_names", "find_connected"],
+    "box":         ["vectors_from_unitcell", "unitcell_from_vectors",
+                    "box_volume", "repeat_box", "repeat_box_coord",
+                    "move_inside_box", "remove_pbc", "remove_pbc_from_coord",
+                    "coord_to_fraction", "fraction_to_coord",
+                    "is_orthogonal"],
+    "celllist":    ["CellList"],
+    "charges":     ["partial_charges"],
+    "compare":     ["rmsd", "rmsf", "average", "pairwise_rmsd"],
+    "density":     ["density"],
+    "dotbracket":  ["dot_bracket_from_structure", "dot_bracket",
+                    "base_pairs_from_dot_bracket"],
+    "error":       ["BadStructureError", "IncompleteStructureWarning",
+                    "UnexpectedStructureWarning"],
+    "filter":      ["filter_solvent", "filter_monoatomic_ions",
+                    "filter_nucleotides", "filter_amino_acids",
+                    "filter_backbone", "filter_intersection",
+                    "filter_first_altloc", "filter_highest_occupancy_altloc"],
+    "geometry":    ["displacement", "index_displacement", "distance",
+                    "index_distance", "angle", "index_angle", "dihedral",
+                    "index_dihedral", "dihedral_backbone", "centroid"],
+    "hbond":       ["hbond", "hbond_frequency"],
+    "integrity":   ["check_id_continuity", "check_atom_id_continuity",
+                    "check_res_id_continuity", "check_bond_continuity",
+                    "check_duplicate_atoms", "renumber_atom_ids",
+                    "renumber_res_ids"],
+    "mechanics":   ["mass_center", "gyration_radius"],
+    "molecules":   ["get_molecule_indices", "get_molecule_masks",
+                    "molecule_iter"],
+    "pseudoknots": ["pseudoknots"],
+    "rdf":         ["rdf"],
+    "residues":    ["get_residue_starts", "apply_residue_wise",
+                    "spread_residue_wise", "get_residue_masks",
+                    "get_residue_starts_for", "get_residue_positions",
+                    "get_residues", "get_residue_count", "residue_iter"],
+    "chains":      ["get_chain_starts", "apply_chain_wise",
+                    "spread_chain_wise", "get_chains", "get_chain_count",
+                    "chain_iter"],
+    "sasa":        ["sasa"],
+    "segments":    ["apply_segment_wise", "spread_segment_wise"],
+    "sse":         ["annotate_sse"],
+    "stream":      ["StreamAnalysis", "AverageAnalysis", "RMSDAnalysis",
+                    "RMSFAnalysis", "RDFAnalysis", "DensityAnalysis",
+                    "HBondAnalysis", "analyze_stream"],
+    "superimpose": ["superimpose", "superimpose_apply"],
+    "transform":   ["translate", "rotate", "rotate_centered",
+                    "rotate_about_axis", "align_vectors"],
+    "basepairs":   ["base_pairs", "map_nucleotide", "base_stacking",
+                    "base_pairs_edge", "Edge", "base_pairs_glycosidic_bond",
+                    "GlycosidicBond"],
+})
+
 # util is used internally
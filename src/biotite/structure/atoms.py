@@ -36,6 +36,10 @@ class _AtomArrayBase(Copyable, metaclass=abc.ABCMeta):
         self._coord = None
         self._bonds = None
         self._box = None
+        # Values derived from the annotation arrays or bonds
+        self._cache = {}
+        # Incremented, whenever the annotation arrays or bonds change
+        self._version = 0
         self.add_annotation("chain_id", dtype="U4")
         self.add_annotation("res_id", dtype=int)
         self.add_annotation("ins_code", dtype="U1")
@@ -107,6 +111,7 @@ class _AtomArrayBase(Copyable, metaclass=abc.ABCMeta):
         """
         if category in self._annot:
             del self._annot[str(category)]
+            self._invalidate_cache()
             
     def get_annotation(self, category):
         """
@@ -132,6 +137,11 @@ class _AtomArrayBase(Copyable, metaclass=abc.ABCMeta):
         """
         Set an annotation array. If the annotation category does not
         exist yet, the category is created.
+
+        Values derived from the annotation arrays, e.g. the residue
+        starts, are cached in this object.
+        Hence, if an annotation array is modified in place, it must be
+        set again via this method afterwards, to update these values.
         
         Parameters
         ----------
@@ -147,6 +157,7 @@ class _AtomArrayBase(Copyable, metaclass=abc.ABCMeta):
                 f"but got {len(array)}"
             )
         self._annot[category] = np.asarray(array)
+        self._invalidate_cache()
         
     def get_annotation_categories(self):
         """
@@ -158,6 +169,55 @@ class _AtomArrayBase(Copyable, metaclass=abc.ABCMeta):
             The list containing the names of each annotation array.
         """
         return list(self._annot.keys())
+    
+    def _get_cached(self, key, function):
+        """
+        Get a value derived from the annotation arrays or the bonds
+        from the cache of this object.
+
+        The value is only computed via `function`, if it is not cached
+        yet or this object has been modified since then.
+        Modifications are tracked via a version counter, that is
+        incremented by :func:`set_annotation()`,
+        :func:`del_annotation()`, the assignment of annotations or bonds
+        as attributes and by ``__setitem__()`` and ``__delitem__()``.
+        Hence, in-place modifications of the annotation arrays
+        (e.g. ``array.res_id[0] = 2``) are not detected, unless the
+        array is set again via :func:`set_annotation()`.
+        As all methods of :class:`BondList`, that change the bonded
+        atoms, replace its internal bond array, the bond array is
+        additionally checked for identity.
+
+        Parameters
+        ----------
+        key : str
+            The name of the cached value.
+        function : function
+            The function that computes the value from this object, if
+            necessary.
+        
+        Returns
+        -------
+        value : object
+            The cached value.
+            As the value is shared between calls, it must not be
+            modified.
+        """
+        bond_array = None if self._bonds is None else self._bonds._bonds
+        entry = self._cache.get(key)
+        if entry is not None:
+            version, cached_bond_array, value = entry
+            if version == self._version and cached_bond_array is bond_array:
+                return value
+        value = function(self)
+        self._cache[key] = (self._version, bond_array, value)
+        return value
+    
+    def _invalidate_cache(self):
+        """
+        Mark all cached values as outdated.
+        """
+        self._version += 1
             
     def _subarray(self, index):
         # Index is one dimensional (boolean mask, index array)
@@ -184,6 +244,7 @@ class _AtomArrayBase(Copyable, metaclass=abc.ABCMeta):
                 for name in self._annot:
                     self._annot[name][index] = atom._annot[name]
                 self._coord[..., index, :] = atom.coord
+                self._invalidate_cache()
             else:
                 raise TypeError(
                     f"Index must be integer, not '{type(index).__name__}'"
@@ -201,6 +262,7 @@ class _AtomArrayBase(Copyable, metaclass=abc.ABCMeta):
                 mask = np.ones(self._bonds.get_atom_count(), dtype=bool)
                 mask[index] = False
                 self._bonds = self._bonds[mask]
+            self._invalidate_cache()
         else:
             raise TypeError(
                     f"Index must be integer, not '{type(index).__name__}'"
@@ -310,6 +372,7 @@ class _AtomArrayBase(Copyable, metaclass=abc.ABCMeta):
                 self._bonds = None
             else:
                 raise TypeError("Value must be 'BondList'")
+            self._invalidate_cache()
         
         elif attr == "box":
             if value is None:
@@ -1397,56 +1397,140 @@ def connect_via_residue_names(atoms):
     for exotic molecules, e.g. specialized inhibitors.
     """
     from .residues import get_residue_starts
-    from .info.bonds import bond_dataset
 
-    cdef list bonds = []
-    cdef int i
-    cdef int curr_start_i, next_start_i
-    cdef np.ndarray atom_names = atoms.atom_name
-    cdef np.ndarray atom_names_in_res
-    cdef np.ndarray res_names = atoms.res_name
-    cdef str atom_name1, atom_name2
-    cdef np.ndarray atom_indices1, atom_indices2
-    cdef int atom_index1, atom_index2
-    cdef int bond_order
-    # Obtain dictionary containing bonds for all residues in RCSB
-    cdef dict bond_dict = bond_dataset()
-    cdef dict bond_dict_for_res
+    if atoms.array_length() == 0:
+        return BondList(0)
 
     residue_starts = get_residue_starts(atoms, add_exclusive_stop=True)
-    # Omit exclsive stop in 'residue_starts'
-    for i in range(len(residue_starts)-1):
-        curr_start_i = residue_starts[i]
-        next_start_i = residue_starts[i+1]
+    atom_table = _AtomNameTable(atoms.atom_name, residue_starts)
+    res_names = atoms.res_name[residue_starts[:-1]]
+    unique_res_names, res_name_codes = np.unique(
+        res_names, return_inverse=True
+    )
 
-        bond_dict_for_res = bond_dict.get(res_names[curr_start_i])
-        if bond_dict_for_res is None:
+    bonds = []
+    # Match the bonds of all residues with the same name at once
+    for i, res_name in enumerate(unique_res_names):
+        template = _get_bond_template(res_name)
+        if template is None:
             # Residue is not in dataset -> skip this residue
             continue
-        atom_names_in_res = atom_names[curr_start_i : next_start_i]
-        for (atom_name1, atom_name2), bond_order in bond_dict_for_res.items():
-            atom_indices1 = np.where(atom_names_in_res == atom_name1)[0]
-            atom_indices2 = np.where(atom_names_in_res == atom_name2)[0]
-            if len(atom_indices1) == 0 or len(atom_indices2) == 0:
-                # The pair of atoms in this bond from the dataset is not
-                # in the residue of the atom array
-                # -> skip this bond
-                continue
-            bonds.append((
-                curr_start_i + atom_indices1[0],
-                curr_start_i + atom_indices2[0],
-                bond_order
-            ))
-             
-    bond_list = BondList(atoms.array_length(), np.array(bonds))
+        atom_names1, atom_names2, bond_orders = template
+        residue_pos = np.where(res_name_codes == i)[0]
+        # Each residue has the bonds of the template
+        bond_residue_pos = np.repeat(residue_pos, len(bond_orders))
+        atom_indices1 = atom_table.find(
+            bond_residue_pos,
+            np.tile(atom_table.get_name_codes(atom_names1), len(residue_pos))
+        )
+        atom_indices2 = atom_table.find(
+            bond_residue_pos,
+            np.tile(atom_table.get_name_codes(atom_names2), len(residue_pos))
+        )
+        # If the pair of atoms in a bond from the dataset is not
+        # in the residue of the atom array, the bond is skipped
+        found_mask = (atom_indices1 != -1) & (atom_indices2 != -1)
+        bonds.append(np.stack([
+            atom_indices1[found_mask],
+            atom_indices2[found_mask],
+            np.tile(bond_orders, len(residue_pos))[found_mask]
+        ], axis=-1))
+
+    if len(bonds) > 0:
+        bond_array = np.concatenate(bonds).astype(np.uint32)
+    else:
+        bond_array = np.zeros((0, 3), dtype=np.uint32)
+    bond_list = BondList(atoms.array_length(), bond_array)
+
+    return bond_list.merge(
+        _connect_inter_residue(atoms, residue_starts, atom_table)
+    )
+
+
+# Maps residue names to the bonds in the respective residue, given as
+# the names of both bonded atoms and the bond order
+_bond_templates = {}
+
+def _get_bond_template(res_name):
+    """
+    Get the intra-residue bonds for the given residue name from the
+    chemical compound dictionary.
+
+    Parameters
+    ----------
+    res_name : str
+        The residue name.
     
-    return bond_list.merge(_connect_inter_residue(atoms, residue_starts))
+    Returns
+    -------
+    template : tuple(ndarray, ndarray, ndarray) or None
+        The names of the first and second atom and the order of each
+        bond.
+        ``None``, if the residue is not in the dataset.
+    """
+    from .info.ccd import get_component_store
+
+    # 'None' is also a valid cached value for unknown residues
+    if res_name not in _bond_templates:
+        store = get_component_store()
+        _bond_templates[res_name] = store.bonds(store.index(res_name))
+    return _bond_templates[res_name]
+
+
+class _AtomNameTable:
+    """
+    Lookup table for the index of the first atom with a given name in
+    each residue.
+
+    Parameters
+    ----------
+    atom_names : ndarray, dtype=str
+        The atom names of the structure.
+    residue_starts : ndarray, dtype=int
+        Return value of
+        ``get_residue_starts(atoms, add_exclusive_stop=True)``.
+    """
+
+    def __init__(self, atom_names, residue_starts):
+        self._names, name_codes = np.unique(atom_names, return_inverse=True)
+        residue_pos = np.repeat(
+            np.arange(len(residue_starts) - 1), np.diff(residue_starts)
+        )
+        # A key identifies a combination of residue and atom name;
+        # 'np.unique()' returns the index of the first occurrence
+        self._keys, self._indices = np.unique(
+            residue_pos * len(self._names) + name_codes, return_index=True
+        )
+
+    def get_name_codes(self, atom_names):
+        """
+        Convert atom names into integer codes, that are used by
+        :meth:`find()`.
+        Atom names that do not appear in the structure get the code -1.
+        """
+        atom_names = np.asarray(atom_names)
+        codes = np.searchsorted(self._names, atom_names)
+        codes[codes == len(self._names)] = 0
+        codes[self._names[codes] != atom_names] = -1
+        return codes
+
+    def find(self, residue_pos, name_codes):
+        """
+        Get the index of the first atom with the given atom name code in
+        the residue at the given position.
+        The index is -1, if no such atom exists.
+        """
+        keys = residue_pos * len(self._names) + name_codes
+        key_pos = np.searchsorted(self._keys, keys)
+        key_pos[key_pos == len(self._keys)] = 0
+        found_mask = (self._keys[key_pos] == keys) & (name_codes != -1)
+        return np.where(found_mask, self._indices[key_pos], -1)
 
 
 _PEPTIDE_LINKS = ["PEPTIDE LINKING", "L-PEPTIDE LINKING", "D-PEPTIDE LINKING"]
 _NUCLEIC_LINKS = ["RNA LINKING", "DNA LINKING"]
 
-def _connect_inter_residue(atoms, residue_starts):
+def _connect_inter_residue(atoms, residue_starts, atom_table=None):
     """
     Create a :class:`BondList` containing the bonds between two adjacent
     amino acid or nucleotide residues.
@@ -1458,6 +1542,9 @@ def _connect_inter_residue(atoms, residue_starts):
     residue_starts : ndarray, dtype=int
         Return value of
         ``get_residue_starts(atoms, add_exclusive_stop=True)``.
+    atom_table : _AtomNameTable, optional
+        The lookup table for atom indices in the residues of `atoms`.
+        It is created, if not given.
     
     Returns
     -------
@@ -1465,72 +1552,62 @@ def _connect_inter_residue(atoms, residue_starts):
         A bond list containing all inter residue bonds.
     """
     from .info.misc import link_type
-    
-    cdef list bonds = []
-    cdef int i
-    cdef np.ndarray atom_names = atoms.atom_name
-    cdef np.ndarray res_names = atoms.res_name
-    cdef np.ndarray res_ids = atoms.res_id
-    cdef np.ndarray chain_ids = atoms.chain_id
-    cdef int curr_start_i, next_start_i, after_next_start_i
-    cdef str curr_connect_atom_name, next_connect_atom_name
-    cdef np.ndarray curr_connect_indices, next_connect_indices
-    
-    # Iterate over all starts excluding:
-    #   - the last residue and
-    #   - exclusive end index of 'atoms'
-    for i in range(len(residue_starts)-2):
-        curr_start_i = residue_starts[i]
-        next_start_i = residue_starts[i+1]
-        after_next_start_i = residue_starts[i+2]
 
-        # Check if the current and next residue is in the same chain
-        if chain_ids[next_start_i] != chain_ids[curr_start_i]:
-            continue
-        # Check if the current and next residue
-        # have consecutive residue IDs
-        if res_ids[next_start_i] != res_ids[curr_start_i] + 1:
-            continue
-        
-        # Get link type for this residue from RCSB components.cif
-        curr_link = link_type(res_names[curr_start_i])
-        next_link = link_type(res_names[curr_start_i+1])
-        
-        if curr_link in _PEPTIDE_LINKS and next_link in _PEPTIDE_LINKS:
-            curr_connect_atom_name = "C"
-            next_connect_atom_name = "N"
-        elif curr_link in _NUCLEIC_LINKS and next_link in _NUCLEIC_LINKS:
-            curr_connect_atom_name = "O3'"
-            next_connect_atom_name = "P"
-        else:
-            # Create no bond if the connection types of consecutive
-            # residues are not compatible
-            continue
-        
-        # Index in atom array for atom name in current residue
-        # Addition of 'curr_start_i' is necessary, as only a slice of
-        # 'atom_names' is taken, beginning at 'curr_start_i'
-        curr_connect_indices = curr_start_i + np.where(
-            atom_names[curr_start_i : next_start_i]
-            == curr_connect_atom_name
-        )[0]
-        # Index in atom array for atom name in next residue 
-        next_connect_indices = next_start_i + np.where(
-            atom_names[next_start_i : after_next_start_i]
-            == next_connect_atom_name
-        )[0]
-        if len(curr_connect_indices) == 0 or len(next_connect_indices) == 0:
-            # The connector atoms are not found in the adjacent residues
-            # -> skip this bond
-            continue
+    if atoms.array_length() == 0:
+        return BondList(0)
+    if atom_table is None:
+        atom_table = _AtomNameTable(atoms.atom_name, residue_starts)
+
+    # Omit the exclusive stop
+    starts = residue_starts[:-1]
+    # Only consecutive residues in the same chain are connected
+    curr_starts = starts[:-1]
+    next_starts = starts[1:]
+    adjacent_mask = (
+        (atoms.chain_id[next_starts] == atoms.chain_id[curr_starts]) &
+        (atoms.res_id[next_starts] == atoms.res_id[curr_starts] + 1)
+    )
 
-        bonds.append((
-            curr_connect_indices[0],
-            next_connect_indices[0],
-            BondType.SINGLE
-        ))
+    # Get link type for each residue from RCSB components.cif
+    unique_res_names, res_name_codes = np.unique(
+        atoms.res_name[starts], return_inverse=True
+    )
+    link_types = [link_type(res_name) for res_name in unique_res_names]
+    is_peptide = np.isin(link_types, _PEPTIDE_LINKS)[res_name_codes]
+    is_nucleic = np.isin(link_types, _NUCLEIC_LINKS)[res_name_codes]
+
+    bonds = []
+    for link_mask, curr_connect_atom_name, next_connect_atom_name in (
+        (is_peptide, "C", "N"),
+        (is_nucleic, "O3'", "P")
+    ):
+        # Create no bond if the connection types of consecutive
+        # residues are not compatible
+        curr_residue_pos = np.where(
+            adjacent_mask & link_mask[:-1] & link_mask[1:]
+        )[0]
+        curr_connect_code, next_connect_code = atom_table.get_name_codes(
+            [curr_connect_atom_name, next_connect_atom_name]
+        )
+        curr_connect_indices = atom_table.find(
+            curr_residue_pos, np.full(len(curr_residue_pos), curr_connect_code)
+        )
+        next_connect_indices = atom_table.find(
+            curr_residue_pos + 1,
+            np.full(len(curr_residue_pos), next_connect_code)
+        )
+        # The connector atoms are not found in the adjacent residues
+        # -> skip this bond
+        found_mask = (curr_connect_indices != -1) & (next_connect_indices != -1)
+        bonds.append(np.stack([
+            curr_connect_indices[found_mask],
+            next_connect_indices[found_mask],
+            np.full(np.count_nonzero(found_mask), BondType.SINGLE)
+        ], axis=-1))
         
-    return BondList(atoms.array_length(), np.array(bonds, dtype=np.uint32))
+    return BondList(
+        atoms.array_length(), np.concatenate(bonds).astype(np.uint32)
+    )
 
 
 
@@ -13,14 +13,13 @@ __all__ = ["CellList"]
 
 cimport cython
 cimport numpy as np
-from libc.stdlib cimport realloc, malloc, free
 
 import numpy as np
 from .atoms import coord as to_coord
-from .atoms import AtomArrayStack
+from .atoms import AtomArray, AtomArrayStack
 from .box import repeat_box_coord, move_inside_box
 
-ctypedef np.uint64_t ptr
+ctypedef np.int64_t int64
 ctypedef np.float32_t float32
 ctypedef np.uint8_t uint8
 
@@ -77,17 +76,24 @@ cdef class CellList:
     # A boolean mask that covers the selected atoms
     cdef uint8[:] _selection
     cdef bint _has_selection
-    # The cells to store the coordinates in; an ndarray of pointers
-    cdef ptr[:,:,:] _cells
-    # The amount elements in each C-array in '_cells'
+    # The cells to store the coordinates in:
+    # The atom indices of all cells are stored contiguously in
+    # '_cell_indices', sorted by cell.
+    # The indices of a cell begin at the respective '_cell_start'
+    cdef int64[:,:,:] _cell_start
+    cdef int[:] _cell_indices
+    # The amount of atoms in each cell
     cdef int[:,:,:] _cell_length
+    # The flattened cell index of each atom,
+    # required for the second pass of the counting sort
+    cdef int64[:] _atom_cell
     # The maximum value of '_cell_length' over all cells,
     # required for worst case assumption on size of output arrays
     cdef int _max_cell_length
     # The length of the cell in each direction (x,y,z)
     cdef float _cellsize
     # The minimum and maximum coordinates for all atoms
-    # Used as origin ('_min_coord' is at _cells[0,0,0])
+    # Used as origin ('_min_coord' is at _cell_start[0,0,0])
     # and for bound checks
     cdef float32[:] _min_coord
     cdef float32[:] _max_coord
@@ -97,21 +103,10 @@ cdef class CellList:
     # The length of the array before appending periodic copies
     # if 'periodic' is true
     cdef int _orig_length
-    cdef float32[:] _orig_min_coord
-    cdef float32[:] _orig_max_coord
     
     
-    @cython.initializedcheck(False)
-    @cython.boundscheck(False)
-    @cython.wraparound(False)
     def __cinit__(self, atom_array not None, float cell_size,
                   bint periodic=False, box=None, np.ndarray selection=None):
-        cdef float32 x, y, z
-        cdef int i, j, k
-        cdef int atom_array_i
-        cdef int* cell_ptr = NULL
-        cdef int length
-
         if isinstance(atom_array, AtomArrayStack):
             raise TypeError("Expected 'AtomArray' but got 'AtomArrayStack'")
         coord = to_coord(atom_array)
@@ -119,14 +114,9 @@ cdef class CellList:
         # if 'periodic' is true
         self._orig_length = coord.shape[0]
         self._box = None
-        if coord.ndim != 2:
-            raise ValueError("Coordinates must have shape (n,3)")
+        _check_coord_shape(coord)
         if coord.shape[0] == 0:
             raise ValueError("Coordinates must not be empty")
-        if coord.shape[1] != 3:
-            raise ValueError("Coordinates must have form (x,y,z)")
-        if np.isnan(coord).any():
-            raise ValueError("Coordinates contain NaN values")
 
         if periodic:
             if box is not None:
@@ -143,34 +133,14 @@ cdef class CellList:
                 )
             if np.isnan(self._box).any():
                 raise ValueError("Box contains NaN values")
-            coord = move_inside_box(coord, self._box)
-            coord, indices = repeat_box_coord(coord, self._box)
         
         if self._has_initialized_cells():
             raise Exception("Duplicate call of constructor")
-        self._cells = None
+        self._cell_start = None
         if cell_size <= 0:
             raise ValueError("Cell size must be greater than 0")
         self._periodic = periodic
-        self._coord = coord.astype(np.float32, copy=False)
         self._cellsize = cell_size
-        # calculate how many cells are required for each dimension
-        min_coord = np.min(coord, axis=0).astype(np.float32)
-        max_coord = np.max(coord, axis=0).astype(np.float32)
-        self._min_coord = min_coord
-        self._max_coord = max_coord
-        cell_count = (((max_coord - min_coord) / cell_size) +1).astype(int)
-        if self._periodic:
-            self._orig_min_coord = np.min(coord[:self._orig_length], axis=0) \
-                                   .astype(np.float32)
-            self._orig_max_coord = np.max(coord[:self._orig_length], axis=0) \
-                                   .astype(np.float32)
-        
-        # ndarray of pointers to C-arrays
-        # containing indices to atom array
-        self._cells = np.zeros(cell_count, dtype=np.uint64)
-        # Stores the length of the C-arrays
-        self._cell_length = np.zeros(cell_count, dtype=np.int32)
         
         # Prepare selection
         if selection is not None:
@@ -184,35 +154,170 @@ cdef class CellList:
         else:
             self._has_selection = False
         
-        # Fill cells
-        for atom_array_i in range(self._coord.shape[0]):
+        self._set_coord(coord)
+        self._create_grid()
+        self._fill_cells()
+
+
+    def update(self, coord, box=None):
+        """
+        update(coord, box=None)
+
+        Replace the atom coordinates of this cell list, e.g. with the
+        coordinates of the next frame in a trajectory.
+
+        The atoms are sorted into the existing cells again, so that
+        no new memory needs to be allocated.
+        Only if an atom moved outside the range of the existing cells,
+        the cells are enlarged.
+        Hence, updating a :class:`CellList` is more efficient than
+        creating a new one for each frame.
+
+        Parameters
+        ----------
+        coord : AtomArray or ndarray, dtype=float, shape=(n,3)
+            The new coordinates.
+            The number of atoms must be equal to the number of atoms
+            the :class:`CellList` was created with.
+            The `selection` given to the constructor is retained.
+        box : ndarray, dtype=float, shape=(3,3), optional
+            The new box for a periodic :class:`CellList`.
+            By default, the box of `coord` is used, if `coord` is an
+            :class:`AtomArray` with a box, otherwise the previous box is
+            kept.
+            Only has an effect, if the :class:`CellList` is periodic.
+
+        Examples
+        --------
+
+        >>> cell_list = CellList(atom_array_stack[0], cell_size=5)
+        >>> for model in atom_array_stack:
+        ...     cell_list.update(model.coord)
+        ...     n_contacts = len(cell_list.get_atom_pairs(5))
+        """
+        if isinstance(coord, AtomArrayStack):
+            raise TypeError("Expected 'AtomArray' but got 'AtomArrayStack'")
+        if box is None and isinstance(coord, AtomArray):
+            box = coord.box
+        coord = to_coord(coord)
+        _check_coord_shape(coord)
+        if coord.shape[0] != self._orig_length:
+            raise IndexError(
+                f"The cell list was created for {self._orig_length} atoms, "
+                f"but {coord.shape[0]} coordinates were given"
+            )
+        if self._periodic and box is not None:
+            if box.shape != (3,3):
+                raise ValueError("Box has invalid shape")
+            if np.isnan(box).any():
+                raise ValueError("Box contains NaN values")
+            self._box = box
+
+        self._set_coord(coord)
+        if not self._fill_cells():
+            # At least one atom is outside of the existing cells
+            self._create_grid()
+            self._fill_cells()
+
+
+    def _set_coord(self, np.ndarray coord):
+        """
+        Set the coordinates including periodic copies, if required.
+        """
+        if np.isnan(coord).any():
+            raise ValueError("Coordinates contain NaN values")
+        if self._periodic:
+            coord = move_inside_box(coord, self._box)
+            coord, _ = repeat_box_coord(coord, self._box)
+        self._coord = coord.astype(np.float32, copy=False)
+
+
+    def _create_grid(self):
+        """
+        Create the cells based on the range of the current coordinates.
+        """
+        coord = np.asarray(self._coord)
+        # calculate how many cells are required for each dimension
+        min_coord = np.min(coord, axis=0).astype(np.float32)
+        max_coord = np.max(coord, axis=0).astype(np.float32)
+        self._min_coord = min_coord
+        self._max_coord = max_coord
+        cell_count = (((max_coord - min_coord) / self._cellsize) +1) \
+                     .astype(int)
+        self._cell_start = np.zeros(cell_count, dtype=np.int64)
+        self._cell_length = np.zeros(cell_count, dtype=np.int32)
+        self._cell_indices = np.zeros(len(coord), dtype=np.int32)
+        self._atom_cell = np.zeros(len(coord), dtype=np.int64)
+
+
+    @cython.initializedcheck(False)
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef bint _fill_cells(self):
+        """
+        Sort the atom indices into the cells via a counting sort.
+
+        Returns false, if an atom is outside of the cells.
+        In this case the cells are left in an invalid state.
+        """
+        cdef int64 atom_i
+        cdef int i, j, k
+        cdef int64 cell_i
+        cdef int64 position
+        cdef int length
+        cdef int max_cell_length = 0
+        cdef float32[:,:] coord = self._coord
+        cdef int[:,:,:] cell_length = self._cell_length
+        cdef int64[:] atom_cell = self._atom_cell
+        cdef int n_x = cell_length.shape[0]
+        cdef int n_y = cell_length.shape[1]
+        cdef int n_z = cell_length.shape[2]
+        cdef int64[:] cell_start = np.asarray(self._cell_start).reshape(-1)
+        cdef int[:] flat_length = np.asarray(self._cell_length).reshape(-1)
+        cdef int[:] cell_indices = self._cell_indices
+
+        # First pass: Count the atoms in each cell
+        flat_length[:] = 0
+        for atom_i in range(coord.shape[0]):
             # Only put selected atoms into cell list
-            if not self._has_selection \
-               or self._selection[atom_array_i % self._orig_length]:
-                    x = self._coord[atom_array_i, 0]
-                    y = self._coord[atom_array_i, 1]
-                    z = self._coord[atom_array_i, 2]
-                    # Get cell indices for coordinates
-                    self._get_cell_index(x, y, z, &i, &j, &k)
-                    # Increment cell length and reallocate
-                    length = self._cell_length[i,j,k] + 1
-                    cell_ptr = <int*>self._cells[i,j,k]
-                    cell_ptr = <int*>realloc(cell_ptr, length * sizeof(int))
-                    if not cell_ptr:
-                        raise MemoryError()
-                    # Potentially increase max cell length
-                    if length > self._max_cell_length:
-                        self._max_cell_length = length
-                    # Store atom array index in respective cell
-                    cell_ptr[length-1] = atom_array_i
-                    # Store new cell pointer and length
-                    self._cell_length[i,j,k] = length
-                    self._cells[i,j,k] = <ptr> cell_ptr
-            
-    
-    def __dealloc__(self):
-        if self._has_initialized_cells():
-            deallocate_ptrs(self._cells)
+            if self._has_selection \
+               and not self._selection[atom_i % self._orig_length]:
+                    atom_cell[atom_i] = -1
+                    continue
+            if coord[atom_i, 0] < self._min_coord[0] \
+               or coord[atom_i, 1] < self._min_coord[1] \
+               or coord[atom_i, 2] < self._min_coord[2]:
+                    return False
+            self._get_cell_index(
+                coord[atom_i, 0], coord[atom_i, 1], coord[atom_i, 2],
+                &i, &j, &k
+            )
+            if i >= n_x or j >= n_y or k >= n_z:
+                return False
+            cell_i = (<int64> i * n_y + j) * n_z + k
+            atom_cell[atom_i] = cell_i
+            flat_length[cell_i] += 1
+
+        # Each cell begins, where the previous cell ends
+        position = 0
+        for cell_i in range(flat_length.shape[0]):
+            cell_start[cell_i] = position
+            length = flat_length[cell_i]
+            position += length
+            if length > max_cell_length:
+                max_cell_length = length
+        self._max_cell_length = max_cell_length
+
+        # Second pass: Put the atom indices into the cells,
+        # '_cell_length' is used as fill level and is restored afterwards
+        flat_length[:] = 0
+        for atom_i in range(coord.shape[0]):
+            cell_i = atom_cell[atom_i]
+            if cell_i == -1:
+                continue
+            cell_indices[cell_start[cell_i] + flat_length[cell_i]] = atom_i
+            flat_length[cell_i] += 1
+        return True
     
     
     @cython.initializedcheck(False)
@@ -288,13 +393,117 @@ cdef class CellList:
         else:
             return self.get_atoms(coord, threshold_distance, as_mask=True)
         
+
+    def get_atom_pairs(self, float32 threshold_distance,
+                       bint return_distances=False):
+        """
+        get_atom_pairs(threshold_distance, return_distances=False)
+
+        Find all pairs of atoms in this cell list that have a distance
+        lower than a given threshold distance.
+
+        In contrast to :meth:`create_adjacency_matrix()`, the memory
+        requirement scales linearly with the number of found pairs
+        instead of quadratically with the number of atoms.
+
+        Parameters
+        ----------
+        threshold_distance : float
+            The threshold distance.
+        return_distances : bool, optional
+            If true, the distance of each pair is returned additionally.
+
+        Returns
+        -------
+        pairs : ndarray, dtype=int32, shape=(p,2)
+            The atom indices of each pair.
+            Each pair appears only once with the lower index in the
+            first column.
+            The pairs are sorted by the first and second index.
+            If a `selection` was given to the constructor of the
+            :class:`CellList`, only pairs of selected atoms are
+            returned.
+        distances : ndarray, dtype=float32, shape=(p,)
+            The distance of each pair.
+            In case of a periodic :class:`CellList` this is the distance
+            to the nearest periodic copy.
+            Only returned with `return_distances` set to true.
+
+        See Also
+        --------
+        create_adjacency_matrix
+
+        Examples
+        --------
+
+        Find all pairs of atoms that are within bond distance:
+
+        >>> cell_list = CellList(atom_array, cell_size=3)
+        >>> pairs = cell_list.get_atom_pairs(1.5)
+        >>> print(pairs[:3])
+        [[0 1]
+         [0 8]
+         [0 9]]
+        """
+        if threshold_distance < 0:
+            raise ValueError("Threshold must be a positive value")
+
+        coord = np.asarray(self._coord[:self._orig_length])
+        if self._has_selection:
+            first = np.where(np.asarray(self._selection, dtype=bool))[0] \
+                    .astype(np.int32)
+        else:
+            first = np.arange(self._orig_length, dtype=np.int32)
+        cell_radii = np.full(
+            len(first), int(threshold_distance / self._cellsize) + 1,
+            dtype=np.int32
+        )
+        sq_radii = np.full(
+            len(first), threshold_distance * threshold_distance,
+            dtype=np.float32
+        )
+        offsets, second, sq_distances = self._find_adjacent_atoms_sparse(
+            coord[first], cell_radii, sq_radii, True
+        )
+        second = self._map_periodic_indices(second)
+        first = np.repeat(first, np.diff(offsets))
+
+        # Each pair is found twice ('i-j' and 'j-i'),
+        # and each atom is found for itself
+        # -> Only keep pairs with 'i < j'
+        is_upper = first < second
+        first = first[is_upper]
+        second = second[is_upper]
+        sq_distances = sq_distances[is_upper]
+        # Sort by indices, the squared distance acts as tie breaker, so
+        # that for duplicate pairs due to multiple periodic copies the
+        # shortest distance comes first
+        order = np.lexsort((sq_distances, second, first))
+        first = first[order]
+        second = second[order]
+        sq_distances = sq_distances[order]
+        if self._periodic:
+            is_unique = np.ones(len(first), dtype=bool)
+            is_unique[1:] = (first[1:] != first[:-1]) \
+                          | (second[1:] != second[:-1])
+            first = first[is_unique]
+            second = second[is_unique]
+            sq_distances = sq_distances[is_unique]
+
+        pairs = np.stack((first, second), axis=-1)
+        if return_distances:
+            return pairs, np.sqrt(sq_distances)
+        else:
+            return pairs
+
     
     @cython.initializedcheck(False)
     @cython.boundscheck(False)
     @cython.wraparound(False)
-    def get_atoms(self, np.ndarray coord, radius, bint as_mask=False):
+    def get_atoms(self, np.ndarray coord, radius, bint as_mask=False,
+                  bint as_sparse=False, bint return_distances=False):
         """
-        get_atoms(coord, radius, as_mask=False)
+        get_atoms(coord, radius, as_mask=False, as_sparse=False, return_distances=False)
         
         Find atoms with a maximum distance from given coordinates.
         
@@ -321,6 +530,17 @@ cdef class CellList:
         as_mask : bool, optional
             If true, the result is returned as boolean mask, instead
             of an index array.
+        as_sparse : bool, optional
+            If true, the result is returned in compressed sparse row
+            format, i.e. as `offsets` and `indices`, instead of a padded
+            index array.
+            The memory requirement of this format scales linearly with
+            the actual number of found atoms.
+            Mutually exclusive with `as_mask`.
+        return_distances : bool, optional
+            If true, the distances of the found atoms to the respective
+            position are returned additionally.
+            Only valid, if `as_sparse` is true.
         
         Returns
         -------
@@ -330,15 +550,27 @@ cdef class CellList:
             If `coord` contains multiple positions, this return value is
             two-dimensional with trailing `-1` values for empty values.
             Only returned with `as_mask` set to false.
+            If `as_sparse` is true, this is a flat array instead,
+            containing the indices for all positions consecutively.
         mask : ndarray, dtype=bool, shape=(m,p) or shape=(p,)
             Same as `indices`, but as boolean mask.
             The values are true for atoms in the atom array,
             that are in the defined vicinity.
             Only returned with `as_mask` set to true.
+        offsets : ndarray, dtype=int64, shape=(m+1,)
+            The atoms found for the position ``i`` are
+            ``indices[offsets[i] : offsets[i+1]]``.
+            For a single position `m` is 1.
+            Only returned with `as_sparse` set to true.
+        distances : ndarray, dtype=float32, shape=(n,)
+            The distance of each atom in `indices` to the corresponding
+            position.
+            Only returned with `return_distances` set to true.
             
         See Also
         --------
         get_atoms_in_cells
+        get_atom_pairs
 
         Notes
         -----
@@ -393,6 +625,14 @@ cdef class CellList:
         [ 99 102 104 112 114  45  55 290 101 105 271 273 268]
         [104 114  45  46  55  44  54 105 271 273 265 268 269 272 275]
         [ 46  55 273 268 269 272 274 275]
+
+        The same result in compressed sparse row format:
+
+        >>> offsets, indices = cell_list.get_atoms(pos, radius=3.0, as_sparse=True)
+        >>> print(offsets)
+        [ 0 13 28 36]
+        >>> print(indices[offsets[2] : offsets[3]])
+        [ 46  55 273 268 269 272 274 275]
         """
         cdef int i=0, j=0
         cdef int array_i = 0
@@ -408,6 +648,7 @@ cdef class CellList:
         cdef int[:,:] indices
         cdef float32[:,:] coord_v
         
+        _check_output_format(as_mask, as_sparse, return_distances)
         # Handle periodicity for the input coordinates
         if self._periodic:
             coord = move_inside_box(coord, self._box)
@@ -428,6 +669,19 @@ cdef class CellList:
                 len(coord), int(radius[0]/self._cellsize)+1, dtype=np.int32
             )
 
+        if as_sparse:
+            # Filter by distance directly while finding adjacent atoms,
+            # so that no padded intermediate array is required
+            offsets, sparse_indices, sq_distances \
+                = self._find_adjacent_atoms_sparse(
+                    coord, cell_radii, sq_radii, True
+                )
+            sparse_indices = self._map_periodic_indices(sparse_indices)
+            if return_distances:
+                return offsets, sparse_indices, np.sqrt(sq_distances)
+            else:
+                return offsets, sparse_indices
+
         # Get indices for adjacent atoms, based on a cell radius
         all_indices = self._get_atoms_in_cells(
             coord, cell_radii, is_multi_radius
@@ -471,9 +725,10 @@ cdef class CellList:
     @cython.boundscheck(False)
     @cython.wraparound(False)
     def get_atoms_in_cells(self, np.ndarray coord,
-                           cell_radius=1, bint as_mask=False):
+                           cell_radius=1, bint as_mask=False,
+                           bint as_sparse=False):
         """
-        get_atoms_in_cells(coord, cell_radius=1, as_mask=False)
+        get_atoms_in_cells(coord, cell_radius=1, as_mask=False, as_sparse=False)
         
         Find atoms with a maximum cell distance from given
         coordinates.
@@ -512,6 +767,14 @@ cdef class CellList:
             :class:`ndarray`.
             By default atoms are searched in the cell of `coord`
             and directly adjacent cells (cell_radius = 1).
+        as_mask : bool, optional
+            If true, the result is returned as boolean mask, instead
+            of an index array.
+        as_sparse : bool, optional
+            If true, the result is returned in compressed sparse row
+            format, i.e. as `offsets` and `indices`, instead of a padded
+            index array.
+            Mutually exclusive with `as_mask`.
         
         Returns
         -------
@@ -521,11 +784,18 @@ cdef class CellList:
             If `coord` contains multiple positions, this return value is
             two-dimensional with trailing `-1` values for empty values.
             Only returned with `as_mask` set to false.
+            If `as_sparse` is true, this is a flat array instead,
+            containing the indices for all positions consecutively.
         mask : ndarray, dtype=bool, shape=(m,p) or shape=(p,)
             Same as `indices`, but as boolean mask.
             The values are true for atoms in the atom array,
             that are in the defined vicinity.
             Only returned with `as_mask` set to true.
+        offsets : ndarray, dtype=int64, shape=(m+1,)
+            The atoms found for the position ``i`` are
+            ``indices[offsets[i] : offsets[i+1]]``.
+            For a single position `m` is 1.
+            Only returned with `as_sparse` set to true.
 
         See Also
         --------
@@ -543,12 +813,18 @@ cdef class CellList:
         # with the same name, with addition of handling periodicty
         # and the ability to return a mask instead of indices
 
+        _check_output_format(as_mask, as_sparse, False)
         # Handle periodicity for the input coordinates
         if self._periodic:
             coord = move_inside_box(coord, self._box)
         # Convert input parameters into a uniform format
         coord, cell_radius, is_multi_coord, is_multi_radius \
             = _prepare_vectorization(coord, cell_radius, np.int32)
+        if as_sparse:
+            offsets, indices, _ = self._find_adjacent_atoms_sparse(
+                coord, cell_radius, None, False
+            )
+            return offsets, self._map_periodic_indices(indices)
         # Get adjacent atom indices
         array_indices = self._get_atoms_in_cells(
             coord, cell_radius, is_multi_radius
@@ -616,7 +892,7 @@ cdef class CellList:
         in this 'array of arrays'.
         """
         cdef int length
-        cdef int* list_ptr
+        cdef int64 start
         cdef float32 x, y,z
         cdef int i=0, j=0, k=0
         cdef int adj_i, adj_j, adj_k
@@ -624,8 +900,9 @@ cdef class CellList:
         cdef int max_array_length = 0
         cdef int cell_r
         
-        cdef ptr[:,:,:] cells = self._cells
+        cdef int64[:,:,:] cell_start = self._cell_start
         cdef int[:,:,:] cell_length = self._cell_length
+        cdef int[:] cell_indices = self._cell_indices
 
         for pos_i in range(coord.shape[0]):
             array_i = 0
@@ -638,22 +915,123 @@ cdef class CellList:
             # in all 3 dimensions
 
             for adj_i in range(i-cell_r, i+cell_r+1):
-                if (adj_i >= 0 and adj_i < cells.shape[0]):
+                if (adj_i >= 0 and adj_i < cell_length.shape[0]):
                     for adj_j in range(j-cell_r, j+cell_r+1):
-                        if (adj_j >= 0 and adj_j < cells.shape[1]):
+                        if (adj_j >= 0 and adj_j < cell_length.shape[1]):
                             for adj_k in range(k-cell_r, k+cell_r+1):
-                                if (adj_k >= 0 and adj_k < cells.shape[2]):
+                                if (adj_k >= 0 and adj_k < cell_length.shape[2]):
                                     # Fill index array
                                     # with indices in cell
-                                    list_ptr = <int*>cells[adj_i, adj_j, adj_k]
+                                    start = cell_start[adj_i, adj_j, adj_k]
                                     length = cell_length[adj_i, adj_j, adj_k]
                                     for cell_i in range(length):
                                         indices[pos_i, array_i] = \
-                                            list_ptr[cell_i]
+                                            cell_indices[start + cell_i]
                                         array_i += 1
             if array_i > max_array_length:
                 max_array_length = array_i
         return max_array_length
+
+
+    @cython.initializedcheck(False)
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef tuple _find_adjacent_atoms_sparse(self,
+                                           float32[:,:] coord,
+                                           int[:] cell_radius,
+                                           float32[:] sq_radii,
+                                           bint filter_distance):
+        """
+        Find the indices of adjacent atoms and store them in compressed
+        sparse row format.
+
+        The output arrays grow dynamically, so that memory is only
+        allocated for the actually found atoms.
+        If `filter_distance` is true, only atoms within the respective
+        `sq_radii` are kept and their squared distances are returned
+        as well.
+        """
+        cdef int length
+        cdef int64 start
+        cdef float32 x, y, z
+        cdef int i=0, j=0, k=0
+        cdef int adj_i, adj_j, adj_k
+        cdef int pos_i, cell_i
+        cdef int atom_i
+        cdef int cell_r
+        cdef float32 sq_dist
+        cdef int64 n_found = 0
+        cdef int64 capacity = max(16 * coord.shape[0], 1024)
+
+        cdef int64[:,:,:] cell_start = self._cell_start
+        cdef int[:,:,:] cell_length = self._cell_length
+        cdef int[:] cell_indices = self._cell_indices
+
+        offsets = np.zeros(coord.shape[0] + 1, dtype=np.int64)
+        indices = np.zeros(capacity, dtype=np.int32)
+        sq_distances = np.zeros(
+            capacity if filter_distance else 0, dtype=np.float32
+        )
+        cdef int64[:] offsets_v = offsets
+        cdef int[:] indices_v = indices
+        cdef float32[:] sq_distances_v = sq_distances
+
+        for pos_i in range(coord.shape[0]):
+            cell_r = cell_radius[pos_i]
+            x = coord[pos_i, 0]
+            y = coord[pos_i, 1]
+            z = coord[pos_i, 2]
+            self._get_cell_index(x, y, z, &i, &j, &k)
+            for adj_i in range(i-cell_r, i+cell_r+1):
+                if (adj_i < 0 or adj_i >= cell_length.shape[0]):
+                    continue
+                for adj_j in range(j-cell_r, j+cell_r+1):
+                    if (adj_j < 0 or adj_j >= cell_length.shape[1]):
+                        continue
+                    for adj_k in range(k-cell_r, k+cell_r+1):
+                        if (adj_k < 0 or adj_k >= cell_length.shape[2]):
+                            continue
+                        start = cell_start[adj_i, adj_j, adj_k]
+                        length = cell_length[adj_i, adj_j, adj_k]
+                        # Ensure that all atoms of this cell would fit
+                        if n_found + length > capacity:
+                            capacity = max(2 * capacity, n_found + length)
+                            indices = np.resize(indices, capacity)
+                            indices_v = indices
+                            if filter_distance:
+                                sq_distances = np.resize(
+                                    sq_distances, capacity
+                                )
+                                sq_distances_v = sq_distances
+                        for cell_i in range(length):
+                            atom_i = cell_indices[start + cell_i]
+                            if filter_distance:
+                                sq_dist = squared_distance(
+                                    x, y, z,
+                                    self._coord[atom_i, 0],
+                                    self._coord[atom_i, 1],
+                                    self._coord[atom_i, 2]
+                                )
+                                if sq_dist > sq_radii[pos_i]:
+                                    continue
+                                sq_distances_v[n_found] = sq_dist
+                            indices_v[n_found] = atom_i
+                            n_found += 1
+            offsets_v[pos_i+1] = n_found
+
+        if filter_distance:
+            sq_distances = sq_distances[:n_found]
+        return offsets, indices[:n_found], sq_distances
+
+
+    def _map_periodic_indices(self, np.ndarray indices):
+        """
+        Map indices of periodic copies to the indices of the original
+        atoms in the central box.
+        """
+        if self._periodic:
+            indices %= self._orig_length
+        return indices
     
 
     @cython.boundscheck(False)
@@ -731,10 +1109,10 @@ cdef class CellList:
     
     cdef inline bint _has_initialized_cells(self):
         # Memoryviews are not initialized on class creation
-        # This method checks if a the _cells memoryview was initialized
+        # This method checks if a the _cell_start memoryview was initialized
         # and is not None
         try:
-            if self._cells is not None:
+            if self._cell_start is not None:
                 return True
             else:
                 return False
@@ -742,6 +1120,13 @@ cdef class CellList:
             return False
 
 
+def _check_coord_shape(np.ndarray coord):
+    if coord.ndim != 2:
+        raise ValueError("Coordinates must have shape (n,3)")
+    if coord.shape[1] != 3:
+        raise ValueError("Coordinates must have form (x,y,z)")
+
+
 def _prepare_vectorization(np.ndarray coord, radius, radius_dtype):
     """
     Since `get_atoms()` and `get_atoms_in_cells()`, may take different
@@ -810,15 +1195,16 @@ def _prepare_vectorization(np.ndarray coord, radius, radius_dtype):
     return coord, radius, is_multi_coord, is_multi_radius
 
 
-cdef inline void deallocate_ptrs(ptr[:,:,:] ptrs):
-    cdef int i, j, k
-    cdef int* cell_ptr
-    # Free cell pointers
-    for i in range(ptrs.shape[0]):
-        for j in range(ptrs.shape[1]):
-            for k in range(ptrs.shape[2]):
-                cell_ptr = <int*>ptrs[i,j,k]
-                free(cell_ptr)
+def _check_output_format(bint as_mask, bint as_sparse,
+                         bint return_distances):
+    if as_mask and as_sparse:
+        raise ValueError(
+            "'as_mask' and 'as_sparse' are mutually exclusive"
+        )
+    if return_distances and not as_sparse:
+        raise ValueError(
+            "Distances can only be returned in combination with 'as_sparse'"
+        )
 
 
 cdef inline float32 squared_distance(float32 x1, float32 y1, float32 z1,
@@ -9,9 +9,12 @@ atom level.
 
 __name__ = "biotite.structure"
 __author__ = "Patrick Kunzmann"
-__all__ = ["get_chain_starts", "get_chains", "get_chain_count", "chain_iter"]
+__all__ = ["get_chain_starts", "apply_chain_wise", "spread_chain_wise",
+           "get_chains", "get_chain_count", "chain_iter"]
 
 import numpy as np
+from .atoms import AtomArray, AtomArrayStack
+from .segments import apply_segment_wise, spread_segment_wise
 
 
 def get_chain_starts(array, add_exclusive_stop=False):
@@ -41,6 +44,32 @@ def get_chain_starts(array, add_exclusive_stop=False):
     See also
     --------
     get_residue_starts
+
+    Notes
+    -----
+    The chain starts are cached in the atom array (stack), until its
+    annotation arrays are changed.
+    If the chain IDs are modified in place, they must be set again
+    via :meth:`AtomArray.set_annotation()`, to update the cached chain
+    starts.
+    """
+    if isinstance(array, (AtomArray, AtomArrayStack)):
+        chain_starts = array._get_cached(
+            "chain_starts", _compute_chain_starts
+        )
+    else:
+        chain_starts = _compute_chain_starts(array)
+    
+    # The cached array must not be exposed to modifications
+    if add_exclusive_stop:
+        return chain_starts.copy()
+    else:
+        return chain_starts[:-1].copy()
+
+
+def _compute_chain_starts(array):
+    """
+    Compute the chain starts including the exclusive stop.
     """
     # This mask is 'true' at indices where the value changes
     chain_id_changes = (array.chain_id[1:] != array.chain_id[:-1])
@@ -51,10 +80,86 @@ def get_chain_starts(array, add_exclusive_stop=False):
     chain_starts = np.where(chain_id_changes)[0] +1
     
     # The first chain is not included yet -> Insert '[0]'
-    if add_exclusive_stop:
-        return np.concatenate(([0], chain_starts, [array.array_length()]))
-    else:
-        return np.concatenate(([0], chain_starts))
+    return np.concatenate(([0], chain_starts, [array.array_length()]))
+
+
+def apply_chain_wise(array, data, function, axis=None):
+    """
+    Apply a function to intervals of data, where each interval
+    corresponds to one chain.
+    
+    The function takes an atom array (stack) and an data array
+    (`ndarray`) of the same length.
+    The data is partitioned into the chains of the atom array (stack)
+    and each interval is put as parameter into `function`.
+    Each return value is stored as element in the resulting
+    :class:`ndarray`, therefore each element corresponds to one chain.
+    
+    Parameters
+    ----------
+    array : AtomArray or AtomArrayStack
+        The atom array (stack) to determine the chains from.
+    data : ndarray
+        The data, whose intervals are the parameter for `function`. Must
+        have same length as `array`.
+    function : function
+        The `function` must have either the form *f(data)* or
+        *f(data, axis)* in case `axis` is given. Every `function` call
+        must return a value with the same shape and data type.
+    axis : int, optional
+        This value is given to the `axis` parameter of `function`.
+        
+    Returns
+    -------
+    processed_data : ndarray
+        Chain-wise evaluation of `data` by `function`. The size of the
+        first dimension of this array is equal to the amount of
+        chains.
+    
+    See also
+    --------
+    spread_chain_wise, apply_residue_wise, apply_segment_wise
+
+    Examples
+    --------
+
+    Calculate the centroid of each chain:
+
+    >>> centroids = apply_chain_wise(atom_array, atom_array.coord, centroid)
+    >>> print(centroids)
+    [[ 0.102  0.019 -0.004]]
+    """
+    starts = get_chain_starts(array, add_exclusive_stop=True)
+    return apply_segment_wise(starts, data, function, axis)
+
+
+def spread_chain_wise(array, input_data):
+    """
+    Expand chain-wise data to atom-wise data.
+
+    Each value in the chain-wise input is assigned to all atoms of
+    this chain.
+    
+    Parameters
+    ----------
+    array : AtomArray or AtomArrayStack
+        The atom array (stack) to determine the chains from.
+    input_data : ndarray
+        The data to be spread. The length of axis=0 must be equal to
+        the amount of chains in `array`.
+        
+    Returns
+    -------
+    output_data : ndarray
+        Chain-wise spread `input_data`. Length is the same as
+        `array_length()` of `array`.
+    
+    See also
+    --------
+    apply_chain_wise, spread_residue_wise, spread_segment_wise
+    """
+    starts = get_chain_starts(array, add_exclusive_stop=True)
+    return spread_segment_wise(starts, input_data)
 
 
 def get_chains(array):
@@ -9,9 +9,10 @@ comparing multiple structures with each other.
 
 __name__ = "biotite.structure"
 __author__ = "Patrick Kunzmann"
-__all__ = ["rmsd", "rmsf", "average"]
+__all__ = ["rmsd", "rmsf", "average", "pairwise_rmsd"]
 
 import numpy as np
+from ..parallel import check_n_jobs, map_tasks
 from .atoms import Atom, AtomArray, AtomArrayStack, coord
 from .util import vector_dot
 
@@ -47,7 +48,7 @@ def rmsd(reference, subject):
     
     See Also
     --------
-    rmsf
+    rmsf, pairwise_rmsd
 
     Notes
     -----
@@ -176,6 +177,152 @@ def average(atoms):
         return mean_coords
 
 
+# Number of models per tile in 'pairwise_rmsd()'
+_TILE_SIZE = 256
+
+
+def pairwise_rmsd(atoms, superimpose=True, condensed=False, n_jobs=None):
+    """
+    Calculate the RMSD between each pair of models.
+
+    The resulting distance matrix can be used for clustering models,
+    e.g. the frames of a trajectory.
+
+    Parameters
+    ----------
+    atoms : AtomArrayStack or ndarray, dtype=float, shape=(m,n,3)
+        The models to be compared with each other.
+        Alternatively, coordinates can be provided directly as
+        :class:`ndarray`.
+    superimpose : bool, optional
+        If true, the RMSD of each pair is calculated after optimal
+        superimposition of the two models, i.e. the result is equal to
+        :func:`superimpose()` followed by :func:`rmsd()`.
+        Otherwise, the models are compared in their given position.
+    condensed : bool, optional
+        If true, only the upper triangle of the distance matrix is
+        returned as one-dimensional array, saving half of the memory.
+        The order of the pairs is
+        ``(0,1), (0,2), ..., (0,m-1), (1,2), ..., (m-2,m-1)``.
+    n_jobs : int, optional
+        The number of threads used for the calculation.
+        By default, as many threads as CPUs are used.
+
+    Returns
+    -------
+    rmsd : ndarray, dtype=np.float32, shape=(m,m) or shape=(m*(m-1)/2,)
+        The RMSD between each pair of models.
+        By default, this is a symmetric matrix, that can be directly
+        used as distance matrix e.g. in
+        :func:`biotite.sequence.phylo.upgma()`.
+
+    See Also
+    --------
+    rmsd
+
+    Notes
+    -----
+    The pairs of models are processed in tiles.
+    For each tile, the covariance matrices of all pairs are computed by
+    a single matrix multiplication.
+    The minimum RMSD is directly obtained from the singular values of
+    the covariance matrices [1]_, so that the superimposed coordinates
+    are never computed.
+
+    References
+    ----------
+
+    .. [1] W Kabsch,
+       "A discussion of the solution for the best rotation to relate
+       two sets of vectors."
+       Acta Cryst, 34, 827-828 (1978).
+
+    Examples
+    --------
+
+    >>> distances = pairwise_rmsd(atom_array_stack)
+    >>> print(np.around(distances[:4, :4], decimals=3))
+    [[0.000 1.928 2.103 2.209]
+     [1.928 0.000 1.539 1.775]
+     [2.103 1.539 0.000 2.024]
+     [2.209 1.775 2.024 0.000]]
+    """
+    models = coord(atoms)
+    if models.ndim != 3:
+        raise TypeError(
+            "Expected an AtomArrayStack or an ndarray with shape (m,n,3)"
+        )
+    n_models, n_atoms = models.shape[:2]
+    # Double precision prevents cancellation errors
+    # in the expanded squared distances
+    models = models.astype(np.float64)
+    if superimpose:
+        models -= np.mean(models, axis=-2, keepdims=True)
+    sq_norms = np.sum(models * models, axis=(-2, -1))
+
+    if condensed:
+        distances = np.zeros(n_models * (n_models - 1) // 2, dtype=np.float32)
+    else:
+        distances = np.zeros((n_models, n_models), dtype=np.float32)
+    tile_starts = range(0, n_models, _TILE_SIZE)
+    tiles = [(i, j) for i in tile_starts for j in tile_starts if i <= j]
+
+    def compute_tile(tile):
+        i, j = tile
+        return _pairwise_msd(
+            models[i : i+_TILE_SIZE], models[j : j+_TILE_SIZE],
+            sq_norms[i : i+_TILE_SIZE], sq_norms[j : j+_TILE_SIZE],
+            superimpose
+        )
+
+    tile_msd = map_tasks(compute_tile, tiles, check_n_jobs(n_jobs))
+    for (i, j), msd in zip(tiles, tile_msd):
+        tile_rmsd = np.sqrt(msd / n_atoms) if n_atoms > 0 else msd
+        rows = np.arange(i, i + tile_rmsd.shape[0])[:, np.newaxis]
+        cols = np.arange(j, j + tile_rmsd.shape[1])[np.newaxis, :]
+        # Only pairs in the upper triangle are written,
+        # which omits also the diagonal of zeros
+        rows, cols = np.broadcast_arrays(rows, cols)
+        upper = rows < cols
+        rows = rows[upper]
+        cols = cols[upper]
+        tile_rmsd = tile_rmsd[upper]
+        if condensed:
+            distances[
+                rows * n_models - rows * (rows + 1) // 2 + cols - rows - 1
+            ] = tile_rmsd
+        else:
+            distances[rows, cols] = tile_rmsd
+            distances[cols, rows] = tile_rmsd
+    return distances
+
+
+def _pairwise_msd(rows, cols, row_sq_norms, col_sq_norms, superimpose):
+    """
+    Calculate the sum of squared deviations for each pair of models
+    from `rows` and `cols`.
+    """
+    n_atoms = rows.shape[1]
+    if superimpose:
+        # Covariance matrix of each pair: rows[i].T @ cols[j]
+        cov = np.matmul(
+            rows.transpose(0, 2, 1).reshape(-1, n_atoms),
+            cols.transpose(1, 0, 2).reshape(n_atoms, -1)
+        ).reshape(len(rows), 3, len(cols), 3).transpose(0, 2, 1, 3)
+        singular_values = np.linalg.svd(cov, compute_uv=False)
+        # If the optimal rotation would be a reflection,
+        # the smallest singular value is subtracted instead
+        singular_values[..., -1] *= np.sign(np.linalg.det(cov))
+        inner = np.sum(singular_values, axis=-1)
+    else:
+        inner = np.matmul(
+            rows.reshape(len(rows), -1), cols.reshape(len(cols), -1).T
+        )
+    msd = row_sq_norms[:, np.newaxis] + col_sq_norms[np.newaxis, :] \
+          - 2 * inner
+    return np.maximum(msd, 0)
+
+
 def _sq_euclidian(reference, subject):
     """
     Calculate squared euclidian distance between atoms in two
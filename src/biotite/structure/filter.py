@@ -230,18 +230,23 @@ def filter_first_altloc(atoms, altloc_ids):
     """
     # Filter all atoms without altloc code
     altloc_filter = np.in1d(altloc_ids, [".", "?", " ", ""])
+    if altloc_filter.all():
+        # No altloc IDs -> Nothing to do
+        return altloc_filter
 
     # And filter all atoms for each residue with the first altloc ID
-    residue_starts = get_residue_starts(atoms, add_exclusive_stop=True)
-    for start, stop in zip(residue_starts[:-1], residue_starts[1:]):
-        letter_altloc_ids = [l for l in altloc_ids[start:stop] if l.isalpha()]
-        if len(letter_altloc_ids) > 0:
-            first_id = letter_altloc_ids[0]
-            altloc_filter[start:stop] |= (altloc_ids[start:stop] == first_id)
-        else:
-            # No altloc ID in this residue -> Nothing to do
-            pass
-
+    letter_i, residue_pos, altloc_codes = _group_altlocs(
+        atoms, altloc_ids, altloc_filter
+    )
+    # The atoms are sorted by residue
+    # -> the first atom of each residue has the first altloc ID
+    is_first = np.ones(len(residue_pos), dtype=bool)
+    is_first[1:] = residue_pos[1:] != residue_pos[:-1]
+    # The number of atoms is an upper bound for the number of residues
+    selected_codes = np.full(atoms.array_length(), -1)
+    selected_codes[residue_pos[is_first]] = altloc_codes[is_first]
+
+    altloc_filter[letter_i] |= (altloc_codes == selected_codes[residue_pos])
     return altloc_filter
 
 
@@ -279,6 +284,8 @@ def filter_highest_occupancy_altloc(atoms, altloc_ids, occupancies):
             - The atom has the altloc ID (e.g. ``'A'``, ``'B'``, etc.),
               of which the corresponding occupancy values are highest
               for the **entire** residue.
+              If multiple altloc IDs have the same occupancy, the one
+              appearing first in the residue is chosen.
 
     Notes
     -----
@@ -307,29 +314,55 @@ def filter_highest_occupancy_altloc(atoms, altloc_ids, occupancies):
     """
     # Filter all atoms without altloc code
     altloc_filter = np.in1d(altloc_ids, [".", "?", " ", ""])
+    if altloc_filter.all():
+        # No altloc IDs -> Nothing to do
+        return altloc_filter
 
     # And filter all atoms for each residue with the highest sum of
     # occupancies
-    residue_starts = get_residue_starts(atoms, add_exclusive_stop=True)
-    for start, stop in zip(residue_starts[:-1], residue_starts[1:]):
-        occupancies_in_res = occupancies[start:stop]
-        altloc_ids_in_res = altloc_ids[start:stop]
-
-        letter_altloc_ids = [l for l in altloc_ids_in_res if l.isalpha()]
-
-        if len(letter_altloc_ids) > 0:
-            highest = -1.0
-            highest_id = None
-            for id in set(letter_altloc_ids):
-                occupancy_sum = np.sum(
-                    occupancies_in_res[altloc_ids_in_res == id]
-                )
-                if occupancy_sum > highest:
-                    highest = occupancy_sum
-                    highest_id = id
-            altloc_filter[start:stop] |= (altloc_ids[start:stop] == highest_id)
-        else:
-            # No altloc ID in this residue -> Nothing to do
-            pass
-
+    letter_i, residue_pos, altloc_codes = _group_altlocs(
+        atoms, altloc_ids, altloc_filter
+    )
+    if len(letter_i) == 0:
+        return altloc_filter
+    # Each group is a combination of residue and altloc ID
+    n_codes = np.max(altloc_codes) + 1
+    groups, first_indices, group_indices = np.unique(
+        residue_pos * n_codes + altloc_codes,
+        return_index=True, return_inverse=True
+    )
+    group_residue_pos = groups // n_codes
+    group_codes = groups % n_codes
+    occupancy_sums = np.bincount(
+        group_indices, weights=np.asarray(occupancies)[letter_i]
+    )
+    # Sort the groups by residue and by descending occupancy sum,
+    # in case of equal sums the altloc ID appearing first is chosen
+    order = np.lexsort((first_indices, -occupancy_sums, group_residue_pos))
+    group_residue_pos = group_residue_pos[order]
+    group_codes = group_codes[order]
+    is_highest = np.ones(len(groups), dtype=bool)
+    is_highest[1:] = group_residue_pos[1:] != group_residue_pos[:-1]
+    # The number of atoms is an upper bound for the number of residues
+    selected_codes = np.full(atoms.array_length(), -1)
+    selected_codes[group_residue_pos[is_highest]] = group_codes[is_highest]
+
+    altloc_filter[letter_i] |= (altloc_codes == selected_codes[residue_pos])
     return altloc_filter
+
+
+def _group_altlocs(atoms, altloc_ids, no_altloc_mask):
+    """
+    Get the atoms with a letter altloc ID, together with the position
+    of their residue and an integer code for their altloc ID.
+    """
+    altloc_ids = np.asarray(altloc_ids)
+    candidate_i = np.where(~no_altloc_mask)[0]
+    # Only altloc IDs consisting of letters are considered
+    letter_i = candidate_i[
+        np.char.isalpha(altloc_ids[candidate_i].astype(str))
+    ]
+    residue_starts = get_residue_starts(atoms)
+    residue_pos = np.searchsorted(residue_starts, letter_i, side="right") - 1
+    _, altloc_codes = np.unique(altloc_ids[letter_i], return_inverse=True)
+    return letter_i, residue_pos, altloc_codes
@@ -17,6 +17,10 @@ from .atoms import AtomArrayStack, stack
 from .celllist import CellList
 
 
+# The maximum number of triplets times models evaluated at once
+_MAX_CHUNK_SIZE = 2**22
+
+
 def hbond(atoms, selection1=None, selection2=None, selection1_type='both',
           cutoff_dist=2.5, cutoff_angle=120,
           donor_elements=('O', 'N', 'S'), acceptor_elements=('O', 'N', 'S'),
@@ -128,23 +132,50 @@ def hbond(atoms, selection1=None, selection2=None, selection1_type='both',
        "Hydrogen bonding in globular proteins"
        Prog Biophys Mol Biol, 44, 97-179 (1984).
     """
-    if not (atoms.element == "H").any():
-        warnings.warn(
-            "Input structure does not contain hydrogen atoms, "
-            "hence no hydrogen bonds can be identified"
-        )
-
     # Create AtomArrayStack from AtomArray
     if not isinstance(atoms, AtomArrayStack):
         atoms = stack([atoms])
         single_model = True
     else:
         single_model = False
-    
+
+    triplets, mask = _find_hbonds(
+        atoms, atoms[0], selection1, selection2, selection1_type,
+        cutoff_dist, cutoff_angle, donor_elements, acceptor_elements,
+        periodic
+    )
+
+    if single_model:
+        # For a atom array (not stack),
+        # hbond_mask contains only 'True' values,
+        # since all interaction are in the one model
+        # -> Simply return triplets without hbond_mask
+        return triplets
+    else:
+        return triplets, mask
+
+
+def _find_hbonds(atoms, reference, selection1=None, selection2=None,
+                 selection1_type='both', cutoff_dist=2.5, cutoff_angle=120,
+                 donor_elements=('O', 'N', 'S'),
+                 acceptor_elements=('O', 'N', 'S'), periodic=False):
+    """
+    Find the hydrogen bonds in an :class:`AtomArrayStack`, where the
+    hydrogen atoms are assigned to their donors based on the
+    `reference` :class:`AtomArray`.
+    """
+    if not (atoms.element == "H").any():
+        warnings.warn(
+            "Input structure does not contain hydrogen atoms, "
+            "hence no hydrogen bonds can be identified"
+        )
+
     if periodic:
         box = atoms.box
+        reference_box = reference.box
     else:
         box = None
+        reference_box = None
     
     # Mask for donor/acceptor elements
     donor_element_mask = np.isin(atoms.element, donor_elements)
@@ -191,11 +222,11 @@ def hbond(atoms, selection1=None, selection2=None, selection1_type='both',
                 np.count_nonzero(acceptor_mask) != 0:
                     # Calculate triplets and mask
                     triplets, mask = _hbond(
-                        atoms, donor_mask, acceptor_mask,
+                        atoms, reference, donor_mask, acceptor_mask,
                         donor_element_mask, acceptor_element_mask,
                         cutoff_dist, cutoff_angle,
                         donor_elements, acceptor_elements,
-                        box
+                        box, reference_box
                     )
                     all_comb_triplets.append(triplets)
                     all_comb_mask.append(mask)
@@ -205,78 +236,41 @@ def hbond(atoms, selection1=None, selection2=None, selection1_type='both',
 
     elif selection1_type == 'donor':
         triplets, mask = _hbond(
-            atoms, selection1, selection2,
+            atoms, reference, selection1, selection2,
             donor_element_mask, acceptor_element_mask,
             cutoff_dist, cutoff_angle,
             donor_elements, acceptor_elements,
-            box
+            box, reference_box
         )
     
     elif selection1_type == 'acceptor':
         triplets, mask = _hbond(
-            atoms, selection2, selection1,
+            atoms, reference, selection2, selection1,
             donor_element_mask, acceptor_element_mask,
             cutoff_dist, cutoff_angle,
             donor_elements, acceptor_elements,
-            box
+            box, reference_box
         )
     
     else:
         raise ValueError(f"Unkown selection type '{selection1_type}'")
 
-    if single_model:
-        # For a atom array (not stack),
-        # hbond_mask contains only 'True' values,
-        # since all interaction are in the one model
-        # -> Simply return triplets without hbond_mask
-        return triplets
-    else:
-        return triplets, mask
+    return triplets, mask
 
 
-def _hbond(atoms, donor_mask, acceptor_mask,
+def _hbond(atoms, reference, donor_mask, acceptor_mask,
            donor_element_mask, acceptor_element_mask,
            cutoff_dist, cutoff_angle, donor_elements, acceptor_elements,
-           box):
+           box, reference_box):
     
     # Filter donor/acceptor elements
     donor_mask    &= donor_element_mask
     acceptor_mask &= acceptor_element_mask
-    
-    def _get_bonded_hydrogens(array, donor_mask, box, cutoff=1.5):
-        """
-        Helper function to find indices of associated hydrogens in atoms
-        for all donors in atoms[donor_mask].
-        The criterium is that the hydrogen must be in the same residue
-        and the distance must be smaller than the cutoff.
-
-        """
-        coord = array.coord
-        res_id = array.res_id
-        hydrogen_mask = (array.element == "H")
-        
-        donor_hydrogen_mask = np.zeros(len(array), dtype=bool)
-        associated_donor_indices = np.full(len(array), -1, dtype=int)
-
-        donor_indices = np.where(donor_mask)[0]
-        for donor_i in donor_indices:
-            candidate_mask = hydrogen_mask & (res_id == res_id[donor_i])
-            distances = distance(
-                coord[donor_i], coord[candidate_mask], box=box
-            )
-            donor_h_indices = np.where(candidate_mask)[0][distances <= cutoff]
-            for i in donor_h_indices:
-                associated_donor_indices[i] = donor_i
-                donor_hydrogen_mask[i] = True
-        
-        return donor_hydrogen_mask, associated_donor_indices
-            
 
-    # TODO use BondList if available
     first_model_box = box[0] if box is not None else None
-    donor_h_mask, associated_donor_indices \
-        = _get_bonded_hydrogens(atoms[0], donor_mask, first_model_box)
-    donor_h_i = np.where(donor_h_mask)[0]
+    donor_h_i, associated_donor_i = _get_bonded_hydrogens(
+        reference, donor_mask, reference_box
+    )
     acceptor_i = np.where(acceptor_mask)[0]
     if len(donor_h_i) == 0 or len(acceptor_i) == 0:
         # Return empty triplets and mask
@@ -287,50 +281,53 @@ def _hbond(atoms, donor_mask, acceptor_mask,
     
     # Narrow the amount of possible acceptor to donor-H connections
     # down via the distance cutoff parameter using a cell list
-    # Save in acceptor-to-hydrogen matrix
-    # (true when distance smaller than cutoff)
+    # Only the pairs within the cutoff in any model are stored,
+    # as indices into 'acceptor_i' and 'donor_h_i'
     coord = atoms.coord
-    possible_bonds = np.zeros(
-        (len(acceptor_i), len(donor_h_i)),
-        dtype=bool
-    )
     periodic = False if box is None else True
+    cell_list = CellList(
+        coord[0, donor_h_i], cell_size=cutoff_dist,
+        periodic=periodic, box=first_model_box
+    )
+    possible_bonds = []
     for model_i in range(atoms.stack_depth()):
-        donor_h_coord = coord[model_i, donor_h_mask]
-        acceptor_coord = coord[model_i, acceptor_mask]
-        box_for_model = box[model_i] if box is not None else None
-        cell_list = CellList(
-            donor_h_coord, cell_size=cutoff_dist,
-            periodic=periodic, box=box_for_model
+        if model_i > 0:
+            cell_list.update(
+                coord[model_i, donor_h_i],
+                box[model_i] if box is not None else None
+            )
+        offsets, h_i = cell_list.get_atoms(
+            coord[model_i, acceptor_i], cutoff_dist, as_sparse=True
         )
-        possible_bonds |= cell_list.get_atoms_in_cells(
-            acceptor_coord, as_mask=True
+        a_i = np.repeat(np.arange(len(acceptor_i)), np.diff(offsets))
+        # Encode each pair as single integer for efficient deduplication
+        possible_bonds.append(
+            np.unique(a_i.astype(np.int64) * len(donor_h_i) + h_i)
         )
-    possible_bonds_i = np.where(possible_bonds)
+    possible_bonds = np.unique(np.concatenate(possible_bonds))
     # Narrow down
-    acceptor_i = acceptor_i[possible_bonds_i[0]]
-    donor_h_i = donor_h_i[possible_bonds_i[1]]
+    acceptor_i = acceptor_i[possible_bonds // len(donor_h_i)]
+    donor_i = associated_donor_i[possible_bonds % len(donor_h_i)]
+    donor_h_i = donor_h_i[possible_bonds % len(donor_h_i)]
     
     # Build D-H..A triplets
-    donor_i = associated_donor_indices[donor_h_i]
     triplets = np.stack((donor_i, donor_h_i, acceptor_i), axis=1)
     # Remove entries where donor and acceptor are the same
     triplets = triplets[donor_i != acceptor_i]
 
-     # Filter triplets that meet distance and angle condition
-    def _is_hbond(donor, donor_h, acceptor, box,
-                  cutoff_dist=2.5, cutoff_angle=120):
-        cutoff_angle_rad = np.deg2rad(cutoff_angle)
-        theta = angle(donor, donor_h, acceptor, box=box)
-        dist = distance(donor_h, acceptor, box=box)
-        return (theta > cutoff_angle_rad) & (dist <= cutoff_dist)
-    
-    hbond_mask = _is_hbond(
-        coord[:, triplets[:,0]],  # donors
-        coord[:, triplets[:,1]],  # donor hydrogens
-        coord[:, triplets[:,2]],  # acceptors
-        box, cutoff_dist=cutoff_dist, cutoff_angle=cutoff_angle
-    )
+    # Filter triplets that meet distance and angle condition,
+    # evaluate the models in chunks to limit the memory consumption
+    models_per_chunk = max(1, _MAX_CHUNK_SIZE // max(1, len(triplets)))
+    hbond_mask = np.zeros((atoms.stack_depth(), len(triplets)), dtype=bool)
+    for start in range(0, atoms.stack_depth(), models_per_chunk):
+        stop = min(start + models_per_chunk, atoms.stack_depth())
+        hbond_mask[start : stop] = _is_hbond(
+            coord[start : stop, triplets[:,0]],  # donors
+            coord[start : stop, triplets[:,1]],  # donor hydrogens
+            coord[start : stop, triplets[:,2]],  # acceptors
+            box[start : stop] if box is not None else None,
+            cutoff_dist=cutoff_dist, cutoff_angle=cutoff_angle
+        )
 
     # Reduce output to contain only triplets counted at least once
     is_counted = hbond_mask.any(axis=0)
@@ -340,6 +337,84 @@ def _hbond(atoms, donor_mask, acceptor_mask,
     return triplets, hbond_mask
 
 
+def _get_bonded_hydrogens(array, donor_mask, box, cutoff=1.5):
+    """
+    Find indices of associated hydrogens in atoms for all donors in
+    atoms[donor_mask].
+
+    If the structure has an associated :class:`BondList`, the bonds are
+    used.
+    Otherwise, or for hydrogen atoms without any bond, the criterium is
+    that the hydrogen must be in the same residue and the distance must
+    be smaller than the cutoff.
+
+    Returns the indices of the donor hydrogens and the indices of their
+    associated donors.
+    """
+    hydrogen_mask = (array.element == "H")
+    if array.bonds is not None:
+        bonds = array.bonds.as_array()
+        # Each bond may be stored in either direction
+        first = np.concatenate([bonds[:, 0], bonds[:, 1]]).astype(int)
+        second = np.concatenate([bonds[:, 1], bonds[:, 0]]).astype(int)
+        is_donor_h = donor_mask[first] & hydrogen_mask[second]
+        bonded_h_i = second[is_donor_h]
+        bonded_donor_i = first[is_donor_h]
+        # Only hydrogen atoms without any bond remain for the
+        # distance criterium
+        hydrogen_mask = hydrogen_mask.copy()
+        hydrogen_mask[bonds[:, :2].flatten()] = False
+    else:
+        bonded_h_i = np.zeros(0, dtype=int)
+        bonded_donor_i = np.zeros(0, dtype=int)
+
+    hydrogen_i = np.where(hydrogen_mask)[0]
+    donor_i = np.where(donor_mask)[0]
+    if len(hydrogen_i) > 0 and len(donor_i) > 0:
+        cell_list = CellList(
+            array.coord[hydrogen_i], cell_size=cutoff,
+            periodic=box is not None, box=box
+        )
+        offsets, h_i = cell_list.get_atoms(
+            array.coord[donor_i], cutoff, as_sparse=True
+        )
+        donor_i = np.repeat(donor_i, np.diff(offsets))
+        h_i = hydrogen_i[h_i]
+        same_residue = array.res_id[donor_i] == array.res_id[h_i]
+        h_i = h_i[same_residue]
+        donor_i = donor_i[same_residue]
+    else:
+        h_i = np.zeros(0, dtype=int)
+        donor_i = np.zeros(0, dtype=int)
+
+    return _unique_hydrogens(
+        np.concatenate([bonded_h_i, h_i]),
+        np.concatenate([bonded_donor_i, donor_i])
+    )
+
+
+def _unique_hydrogens(h_i, donor_i):
+    """
+    Assign each hydrogen to only one donor.
+    If a hydrogen is associated with multiple donors, the donor with
+    the highest index is chosen.
+    """
+    order = np.lexsort((donor_i, h_i))
+    h_i = h_i[order]
+    donor_i = donor_i[order]
+    is_last = np.ones(len(h_i), dtype=bool)
+    is_last[:-1] = h_i[:-1] != h_i[1:]
+    return h_i[is_last], donor_i[is_last]
+
+
+def _is_hbond(donor, donor_h, acceptor, box, cutoff_dist=2.5,
+              cutoff_angle=120):
+    cutoff_angle_rad = np.deg2rad(cutoff_angle)
+    theta = angle(donor, donor_h, acceptor, box=box)
+    dist = distance(donor_h, acceptor, box=box)
+    return (theta > cutoff_angle_rad) & (dist <= cutoff_dist)
+
+
 def hbond_frequency(mask):
     """
     Get the relative frequency of each hydrogen bond in a multi-model
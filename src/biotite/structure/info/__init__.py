@@ -17,10 +17,15 @@ repository.
 __name__ = "biotite.structure.info"
 __author__ = "Patrick Kunzmann"
 
-from .atoms import *
-from .bonds import *
-from .masses import *
-from .misc import *
-from .radii import *
-from .standardize import *
-from .nucleotides import *
+from ...lazy import lazy_load as _lazy_load
+
+# The attributes of the modules are imported on first access
+_lazy_load(__name__, {
+    "atoms":       ["residue"],
+    "bonds":       ["bond_dataset", "bond_order", "bonds_in_residue"],
+    "masses":      ["mass"],
+    "misc":        ["full_name", "link_type"],
+    "radii":       ["vdw_radius_protor", "vdw_radius_single"],
+    "standardize": ["standardize_order"],
+    "nucleotides": ["nucleotide_names"],
+})
@@ -6,36 +6,10 @@ __name__ = "biotite.structure.info"
 __author__ = "Patrick Kunzmann"
 __all__ = ["residue"]
 
-from os.path import join, dirname, realpath
-import msgpack
 import numpy as np
 from ..atoms import AtomArray
 from ..bonds import BondList
-
-
-_residues = None
-
-
-def _init_dataset():
-    """
-    Load the residue dataset from MessagePack file.
-
-    Since loading the database is computationally expensive,
-    this is only done, when the residue database is actually required.
-    """
-    global _residues
-    if _residues is not None:
-        # Database is already initialized
-        return
-
-    # Residue data is taken from
-    # ftp://ftp.wwpdb.org/pub/pdb/data/monomers/components.cif
-    # (2019/01/27)
-    _info_dir = dirname(realpath(__file__))
-    with open(join(_info_dir, "residues.msgpack"), "rb") as file:
-        _residues = msgpack.unpack(
-            file, use_list=False, raw=False
-        )
+from .ccd import get_component_store
 
 
 def residue(res_name):
@@ -90,30 +64,23 @@ def residue(res_name):
      ['CB' 'HB3']
      ['OXT' 'HXT']]
     """
-    _init_dataset()
-    array_dict = _residues[res_name]
+    store = get_component_store()
+    structure = store.structure(store.index(res_name))
+    if structure is None:
+        raise KeyError(res_name)
 
-    array = AtomArray(len(array_dict["res_name"]))
+    array = AtomArray(len(structure["atom_name"]))
 
     array.add_annotation("charge", int)
 
-    array.res_name = array_dict["res_name"]
-    array.atom_name = array_dict["atom_name"]
-    array.element = array_dict["element"]
-    array.charge = array_dict["charge"]
-    array.hetero = array_dict["hetero"]
+    array.res_name = np.full(array.array_length(), res_name)
+    array.atom_name = structure["atom_name"]
+    array.element = structure["element"]
+    array.charge = structure["charge"]
+    array.hetero = structure["hetero"]
 
-    array.coord[:,0] = array_dict["coord_x"]
-    array.coord[:,1] = array_dict["coord_y"]
-    array.coord[:,2] = array_dict["coord_z"]
+    array.coord = structure["coord"]
 
-    array.bonds = BondList(
-        array.array_length(),
-        bonds = np.stack([
-            array_dict["bond_i"],
-            array_dict["bond_j"],
-            array_dict["bond_type"]
-        ]).T
-    )
+    array.bonds = BondList(array.array_length(), structure["bonds"])
 
-    return array
\ No newline at end of file
+    return array
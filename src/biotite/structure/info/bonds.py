@@ -6,41 +6,7 @@ __name__ = "biotite.structure.info"
 __author__ = "Patrick Kunzmann"
 __all__ = ["bond_dataset", "bond_order", "bonds_in_residue"]
 
-import msgpack
-import copy
-from os.path import join, dirname, realpath
-
-
-_intra_bonds = None
-
-
-def _init_dataset():
-    """
-    Load the bond dataset from MessagePack file.
-
-    Since loading the database is computationally expensive,
-    this is only done, when the bond database is actually required.
-    """
-    global _intra_bonds
-    if _intra_bonds is not None:
-        # Database is already initialized
-        return
-
-    # Bonds are taken from
-    # ftp://ftp.wwpdb.org/pub/pdb/data/monomers/components.cif
-    # (2019/01/27)
-    _info_dir = dirname(realpath(__file__))
-    with open(join(_info_dir, "intra_bonds.msgpack"), "rb") as file:
-        _intra_bonds_raw = msgpack.unpack(
-            file, use_list=False, raw=False, strict_map_key=False
-        )
-        _intra_bonds = {}
-        for group, group_bonds_raw in _intra_bonds_raw.items():
-            group_bonds = {
-                frozenset(bond_raw) : count
-                for bond_raw, count in group_bonds_raw.items()
-            }
-            _intra_bonds[group] = group_bonds
+from .ccd import get_component_store
 
 
 def bond_dataset():
@@ -60,9 +26,20 @@ def bond_dataset():
         given residue.
         Specifically, it uses a set of two atom names, that are bonded,
         as keys and the respective bond order as values.
+
+    Notes
+    -----
+    As the complete dataset is converted into dictionaries, this
+    function is computationally expensive.
+    For single residues :func:`bonds_in_residue()` is preferable.
     """
-    _init_dataset()
-    return copy.copy(_intra_bonds)
+    store = get_component_store()
+    dataset = {}
+    for i, res_name in enumerate(store.res_names()):
+        bonds = store.bonds(i)
+        if bonds is not None:
+            dataset[res_name] = _to_bond_dict(bonds)
+    return dataset
 
 
 def bond_order(res_name, atom_name1, atom_name2):
@@ -98,12 +75,18 @@ def bond_order(res_name, atom_name1, atom_name2):
     >>> print(bond_order("ALA", "FOO", "BAR"))
     None
     """
-    _init_dataset()
-    group_bonds = _intra_bonds.get(res_name.upper())
-    if group_bonds is None:
+    store = get_component_store()
+    bonds = store.bonds(store.index(res_name.upper()))
+    if bonds is None:
+        return None
+    atom_names1, atom_names2, bond_orders = bonds
+    bond_mask = (
+        ((atom_names1 == atom_name1) & (atom_names2 == atom_name2)) |
+        ((atom_names1 == atom_name2) & (atom_names2 == atom_name1))
+    )
+    if not bond_mask.any():
         return None
-    else:
-        return group_bonds.get(frozenset((atom_name1, atom_name2)))
+    return int(bond_orders[bond_mask][0])
 
 
 def bonds_in_residue(res_name):
@@ -154,5 +137,17 @@ def bonds_in_residue(res_name):
     HO4 + O4  -> 1
     HO6 + O6  -> 1
     """
-    _init_dataset()
-    return copy.copy(_intra_bonds.get(res_name.upper()))
\ No newline at end of file
+    store = get_component_store()
+    bonds = store.bonds(store.index(res_name.upper()))
+    if bonds is None:
+        return None
+    return _to_bond_dict(bonds)
+
+
+def _to_bond_dict(bonds):
+    atom_names1, atom_names2, bond_orders = bonds
+    return {
+        frozenset((atom_name1, atom_name2)): bond_order
+        for atom_name1, atom_name2, bond_order
+        in zip(atom_names1.tolist(), atom_names2.tolist(), bond_orders.tolist())
+    }
\ No newline at end of file
@@ -0,0 +1,572 @@
+# This source code is part of the Biotite package and is distributed
+# under the 3-Clause BSD License. Please see 'LICENSE.rst' for further
+# information.
+
+"""
+A compact store for the data from the chemical component dictionary,
+that is used internally by the other modules in this subpackage.
+
+The store is a single binary file containing a sorted index of the
+residue names and packed arrays for the atoms, bonds and further
+properties of all residues.
+As this file is memory-mapped, only the accessed pages are actually
+read and multiple processes share the same pages via the page cache of
+the operating system.
+
+The store file is created from the *MessagePack* datasets in this
+directory, when the package is built.
+If it is not present or outdated, e.g. in a source checkout, the same
+arrays are created in memory from these datasets instead.
+
+This module must only depend on *NumPy* and *msgpack*, as it is also
+loaded by ``setup.py``.
+"""
+
+__name__ = "biotite.structure.info"
+__author__ = "Patrick Kunzmann"
+
+import json
+import os
+from os.path import join, dirname, realpath, isfile
+import numpy as np
+
+
+STORE_FILE_NAME = "components.bcs"
+# The datasets the store is created from
+DATASET_FILE_NAMES = [
+    "residues.msgpack",
+    "intra_bonds.msgpack",
+    "residue_masses.msgpack",
+    "link_types.msgpack",
+    "residue_names.msgpack",
+]
+_MAGIC = b"BIOTITE_CCD\x00"
+_VERSION = 2
+_ALIGNMENT = 64
+
+_INFO_DIR = dirname(realpath(__file__))
+_store = None
+
+
+def get_component_store():
+    """
+    Get the store for the chemical component dictionary.
+
+    The store is loaded only, when it is required for the first time.
+
+    Returns
+    -------
+    store : ComponentStore
+        The store.
+    """
+    global _store
+    if _store is None:
+        store_file = join(_INFO_DIR, STORE_FILE_NAME)
+        if isfile(store_file):
+            try:
+                store = ComponentStore.read(store_file)
+            except ValueError:
+                # Store from an incompatible version
+                store = None
+            if store is not None and store.is_up_to_date(_INFO_DIR):
+                _store = store
+        if _store is None:
+            _store = ComponentStore.from_msgpack(_INFO_DIR)
+    return _store
+
+
+class ComponentStore:
+    """
+    Packed arrays for the data of all residues in the chemical component
+    dictionary.
+
+    For each residue the atoms and bonds are stored contiguously in the
+    respective arrays, the start of each residue is given by a
+    separate start index array.
+    The atoms of a residue comprise the atoms of the residue structure,
+    followed by atoms, that only appear in the bond dataset.
+
+    Parameters
+    ----------
+    arrays : dict of (str -> ndarray)
+        The packed arrays.
+    link_types : list of str
+        The link types, that are referred to by the ``link_type`` array.
+    dataset_sizes : dict of (str -> int)
+        The file size of each dataset the store was created from.
+        Used to detect outdated store files.
+    missing_datasets : iterable object of str, optional
+        The file names of the datasets, that were not available when
+        the store was created.
+        Accessing the data from these datasets raises a
+        :class:`FileNotFoundError`.
+    """
+
+    def __init__(self, arrays, link_types, dataset_sizes,
+                 missing_datasets=()):
+        self._arrays = arrays
+        self._link_types = link_types
+        self._dataset_sizes = dataset_sizes
+        self._missing_datasets = frozenset(missing_datasets)
+        # Only the names of the requested residues are decoded
+        self._res_names = arrays["res_name"]
+
+    @staticmethod
+    def read(file_name):
+        """
+        Memory-map a store file.
+
+        Parameters
+        ----------
+        file_name : str
+            The path of the store file.
+
+        Returns
+        -------
+        store : ComponentStore
+            The store, whose arrays refer to the memory-mapped file.
+        """
+        buffer = np.memmap(file_name, dtype=np.uint8, mode="r")
+        if bytes(buffer[:len(_MAGIC)]) != _MAGIC:
+            raise ValueError(f"'{file_name}' is not a component store")
+        version, header_length = np.frombuffer(
+            buffer, dtype="<u4", count=2, offset=len(_MAGIC)
+        )
+        if version != _VERSION:
+            raise ValueError(
+                f"Component store has version {version}, "
+                f"but version {_VERSION} is required"
+            )
+        header_start = len(_MAGIC) + 8
+        header = json.loads(
+            bytes(buffer[header_start : header_start + header_length])
+            .decode("utf-8")
+        )
+        arrays = {
+            name: np.ndarray(
+                tuple(shape), dtype=np.dtype(dtype),
+                buffer=buffer, offset=offset
+            )
+            for name, (dtype, shape, offset) in header["arrays"].items()
+        }
+        return ComponentStore(
+            arrays, header["link_types"], header["dataset_sizes"]
+        )
+
+    def write(self, file_name):
+        """
+        Write this store into a file.
+
+        The file is replaced atomically, so that processes reading the
+        store at the same time are not affected.
+
+        Parameters
+        ----------
+        file_name : str
+            The path of the store file.
+
+        Raises
+        ------
+        FileNotFoundError
+            If any dataset was missing, when this store was created.
+            A store file is never written from incomplete data.
+        """
+        if len(self._missing_datasets) > 0:
+            raise FileNotFoundError(
+                "Cannot write the component store, as the datasets "
+                + ", ".join(f"'{name}'" for name in
+                            sorted(self._missing_datasets))
+                + " are missing"
+            )
+        # Determine the position of each array in the file
+        array_entries = {}
+        header_length = 4096
+        while True:
+            offset = len(_MAGIC) + 8 + header_length
+            for name, array in self._arrays.items():
+                offset = _align(offset)
+                array_entries[name] = (
+                    array.dtype.str, list(array.shape), offset
+                )
+                offset += array.nbytes
+            header = json.dumps({
+                "arrays": array_entries,
+                "link_types": self._link_types,
+                "dataset_sizes": self._dataset_sizes,
+            }).encode("utf-8")
+            if len(header) <= header_length:
+                break
+            # The header does not fit into the reserved space
+            header_length *= 2
+
+        temp_file_name = f"{file_name}.{os.getpid()}.tmp"
+        with open(temp_file_name, "wb") as file:
+            file.write(_MAGIC)
+            file.write(np.array([_VERSION, header_length], "<u4").tobytes())
+            file.write(header.ljust(header_length))
+            for name, array in self._arrays.items():
+                _, _, offset = array_entries[name]
+                file.write(b"\x00" * (offset - file.tell()))
+                file.write(np.ascontiguousarray(array).tobytes())
+        os.replace(temp_file_name, file_name)
+
+    @staticmethod
+    def from_msgpack(info_dir):
+        """
+        Create the store from the *MessagePack* datasets.
+
+        Missing datasets are recorded, so that accessing their data
+        raises a :class:`FileNotFoundError`, while the data from the
+        other datasets is still accessible.
+
+        Parameters
+        ----------
+        info_dir : str
+            The directory containing the datasets.
+
+        Returns
+        -------
+        store : ComponentStore
+            The store, whose arrays are kept in memory.
+        """
+        # Data is taken from
+        # ftp://ftp.wwpdb.org/pub/pdb/data/monomers/components.cif
+        # (2019/01/27)
+        datasets = {
+            file_name: _load_msgpack(info_dir, file_name)
+            for file_name in DATASET_FILE_NAMES
+        }
+        missing_datasets = [
+            file_name for file_name, dataset in datasets.items()
+            if dataset is None
+        ]
+        residues, intra_bonds, masses, link_types, full_names = [
+            {} if dataset is None else dataset
+            for dataset in datasets.values()
+        ]
+
+        res_names = sorted(
+            set(residues) | set(intra_bonds) | set(masses)
+            | set(link_types) | set(full_names)
+        )
+        link_type_names = sorted(set(link_types.values()))
+        link_type_codes = {name: i for i, name in enumerate(link_type_names)}
+
+        atom_starts = [0]
+        structure_atom_counts = []
+        atom_names = []
+        elements = []
+        charges = []
+        hetero = []
+        coord = []
+        structure_bond_starts = [0]
+        structure_bond_atoms = []
+        structure_bond_types = []
+        bond_starts = [0]
+        bond_atoms = []
+        bond_orders = []
+        name_starts = [0]
+        name_data = []
+        for res_name in res_names:
+            res_atom_names = []
+            residue = residues.get(res_name)
+            if residue is None:
+                structure_atom_counts.append(-1)
+            else:
+                res_atom_names += list(residue["atom_name"])
+                structure_atom_counts.append(len(res_atom_names))
+                elements += residue["element"]
+                charges += residue["charge"]
+                hetero += residue["hetero"]
+                coord += zip(
+                    residue["coord_x"], residue["coord_y"], residue["coord_z"]
+                )
+                structure_bond_atoms += zip(
+                    residue["bond_i"], residue["bond_j"]
+                )
+                structure_bond_types += residue["bond_type"]
+            structure_bond_starts.append(len(structure_bond_types))
+
+            atom_indices = {name: i for i, name in enumerate(res_atom_names)}
+            for bond, order in intra_bonds.get(res_name, {}).items():
+                indices = []
+                for atom_name in bond:
+                    if atom_name not in atom_indices:
+                        # Atom is not part of the residue structure
+                        atom_indices[atom_name] = len(res_atom_names)
+                        res_atom_names.append(atom_name)
+                    indices.append(atom_indices[atom_name])
+                bond_atoms.append(indices)
+                bond_orders.append(order)
+            bond_starts.append(len(bond_orders))
+            n_bond_only_atoms = len(res_atom_names) - max(
+                structure_atom_counts[-1], 0
+            )
+            elements += [""] * n_bond_only_atoms
+            charges += [0] * n_bond_only_atoms
+            hetero += [False] * n_bond_only_atoms
+            coord += [(np.nan, np.nan, np.nan)] * n_bond_only_atoms
+
+            atom_names += res_atom_names
+            atom_starts.append(len(atom_names))
+            name_data.append(full_names.get(res_name, "").encode("utf-8"))
+            name_starts.append(name_starts[-1] + len(name_data[-1]))
+
+        arrays = {
+            "res_name": _encode(res_names),
+            "has_structure": np.array([
+                res_name in residues for res_name in res_names
+            ], dtype=bool),
+            "has_bonds": np.array([
+                res_name in intra_bonds for res_name in res_names
+            ], dtype=bool),
+            "has_full_name": np.array([
+                res_name in full_names for res_name in res_names
+            ], dtype=bool),
+            "mass": np.array([
+                masses.get(res_name, np.nan) for res_name in res_names
+            ], dtype=np.float64),
+            "link_type": np.array([
+                link_type_codes.get(link_types.get(res_name), -1)
+                for res_name in res_names
+            ], dtype=np.int16),
+            "atom_start": np.array(atom_starts, dtype=np.int64),
+            "structure_atom_count": np.array(
+                structure_atom_counts, dtype=np.int32
+            ),
+            "atom_name": _encode(atom_names),
+            "element": _encode(elements),
+            "charge": np.array(charges, dtype=np.int8),
+            "hetero": np.array(hetero, dtype=bool),
+            "coord": np.array(coord, dtype=np.float32).reshape(-1, 3),
+            "structure_bond_start": np.array(
+                structure_bond_starts, dtype=np.int64
+            ),
+            "structure_bond_atoms": np.array(
+                structure_bond_atoms, dtype=np.uint16
+            ).reshape(-1, 2),
+            "structure_bond_type": np.array(
+                structure_bond_types, dtype=np.uint8
+            ),
+            "bond_start": np.array(bond_starts, dtype=np.int64),
+            "bond_atoms": np.array(bond_atoms, dtype=np.uint16).reshape(-1, 2),
+            "bond_order": np.array(bond_orders, dtype=np.uint8),
+            "full_name_start": np.array(name_starts, dtype=np.int64),
+            "full_name": np.frombuffer(b"".join(name_data), dtype=np.uint8),
+        }
+        return ComponentStore(
+            arrays, link_type_names,
+            _get_dataset_sizes(info_dir), missing_datasets
+        )
+
+    def is_up_to_date(self, info_dir):
+        """
+        Check whether this store was created from the current datasets.
+
+        As installers do not preserve modification times, the datasets
+        are compared by their file size.
+
+        Parameters
+        ----------
+        info_dir : str
+            The directory containing the datasets.
+
+        Returns
+        -------
+        up_to_date : bool
+            True, if the size of each dataset is equal to the size
+            recorded in the store.
+        """
+        return _get_dataset_sizes(info_dir) == self._dataset_sizes
+
+    def index(self, res_name):
+        """
+        Get the position of a residue in the store.
+
+        Parameters
+        ----------
+        res_name : str
+            The residue name.
+
+        Returns
+        -------
+        index : int
+            The position of the residue, -1 if the residue is not in
+            the store.
+        """
+        try:
+            key = res_name.encode("ascii")
+        except UnicodeEncodeError:
+            return -1
+        if len(key) > self._res_names.itemsize:
+            return -1
+        index = np.searchsorted(self._res_names, key)
+        if index < len(self._res_names) and self._res_names[index] == key:
+            return int(index)
+        return -1
+
+    def res_names(self):
+        """
+        Get the names of all residues in the store.
+
+        Returns
+        -------
+        res_names : list of str
+            The residue names.
+        """
+        return _decode(self._res_names).tolist()
+
+    def structure(self, index):
+        """
+        Get the atoms and bonds of a residue.
+
+        Parameters
+        ----------
+        index : int
+            The position of the residue.
+
+        Returns
+        -------
+        structure : dict of (str -> ndarray) or None
+            The ``atom_name``, ``element``, ``charge``, ``hetero`` and
+            ``coord`` of the atoms and the ``bonds`` as atom indices and
+            bond type.
+            None, if the residue has no structure.
+        """
+        self._require("residues.msgpack")
+        if index < 0 or not self._arrays["has_structure"][index]:
+            return None
+        start = self._arrays["atom_start"][index]
+        stop = start + self._arrays["structure_atom_count"][index]
+        bond_start, bond_stop = \
+            self._arrays["structure_bond_start"][index : index+2]
+        return {
+            "atom_name": _decode(self._arrays["atom_name"][start:stop]),
+            "element": _decode(self._arrays["element"][start:stop]),
+            "charge": self._arrays["charge"][start:stop].astype(int),
+            "hetero": self._arrays["hetero"][start:stop].copy(),
+            "coord": self._arrays["coord"][start:stop].copy(),
+            "bonds": np.concatenate([
+                self._arrays["structure_bond_atoms"][bond_start:bond_stop],
+                self._arrays["structure_bond_type"][bond_start:bond_stop]
+                [:, np.newaxis]
+            ], axis=-1).astype(int),
+        }
+
+    def bonds(self, index):
+        """
+        Get the bonds of a residue from the bond dataset.
+
+        Parameters
+        ----------
+        index : int
+            The position of the residue.
+
+        Returns
+        -------
+        atom_names1, atom_names2 : ndarray, dtype=str
+            The names of the first and second atom of each bond.
+        bond_orders : ndarray, dtype=int
+            The order of each bond.
+            None is returned instead of the three arrays, if the
+            residue is not in the bond dataset.
+        """
+        self._require("intra_bonds.msgpack")
+        if index < 0 or not self._arrays["has_bonds"][index]:
+            return None
+        atom_start = self._arrays["atom_start"][index]
+        start, stop = self._arrays["bond_start"][index : index+2]
+        bond_atom_names = _decode(
+            self._arrays["atom_name"][
+                atom_start + self._arrays["bond_atoms"][start:stop]
+            ]
+        )
+        return (
+            bond_atom_names[:, 0],
+            bond_atom_names[:, 1],
+            self._arrays["bond_order"][start:stop].astype(int)
+        )
+
+    def mass(self, index):
+        """
+        Get the mass of a residue, None if it is unknown.
+        """
+        self._require("residue_masses.msgpack")
+        if index < 0:
+            return None
+        mass = self._arrays["mass"][index]
+        return None if np.isnan(mass) else float(mass)
+
+    def link_type(self, index):
+        """
+        Get the link type of a residue, None if it is unknown.
+        """
+        self._require("link_types.msgpack")
+        if index < 0:
+            return None
+        code = self._arrays["link_type"][index]
+        return None if code == -1 else self._link_types[code]
+
+    def full_name(self, index):
+        """
+        Get the full name of a residue, None if it is unknown.
+        """
+        self._require("residue_names.msgpack")
+        if index < 0 or not self._arrays["has_full_name"][index]:
+            return None
+        start, stop = self._arrays["full_name_start"][index : index+2]
+        return bytes(self._arrays["full_name"][start:stop]).decode("utf-8")
+
+    def _require(self, file_name):
+        if file_name in self._missing_datasets:
+            raise FileNotFoundError(
+                f"The dataset '{file_name}' was not found, when the "
+                f"component store was created"
+            )
+
+
+def _load_msgpack(info_dir, file_name):
+    import msgpack
+
+    path = join(info_dir, file_name)
+    if not isfile(path):
+        return None
+    with open(path, "rb") as file:
+        return msgpack.unpack(
+            file, use_list=False, raw=False, strict_map_key=False
+        )
+
+
+def _get_dataset_sizes(info_dir):
+    """
+    Get the file size of each dataset, -1 for missing datasets.
+    """
+    sizes = {}
+    for file_name in DATASET_FILE_NAMES:
+        path = join(info_dir, file_name)
+        sizes[file_name] = os.path.getsize(path) if isfile(path) else -1
+    return sizes
+
+
+def _encode(strings):
+    """
+    Convert strings into a fixed-width byte string array.
+    """
+    encoded = [string.encode("utf-8") for string in strings]
+    width = max([len(string) for string in encoded], default=1)
+    return np.array(encoded, dtype=f"S{max(width, 1)}")
+
+
+def _decode(byte_strings):
+    """
+    Convert a byte string array into a string array with the minimum
+    required width.
+    """
+    return np.array(
+        [string.decode("utf-8") for string in byte_strings.reshape(-1)],
+        dtype=str
+    ).reshape(byte_strings.shape)
+
+
+def _align(offset):
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
@@ -8,19 +8,14 @@ __all__ = ["mass"]
 
 import json
 from os.path import join, dirname, realpath
-import msgpack
 from ..atoms import Atom, AtomArray, AtomArrayStack
+from .ccd import get_component_store
 
 
 _info_dir = dirname(realpath(__file__))
 # Masses are taken from http://www.sbcs.qmul.ac.uk/iupac/AtWt/ (2018/03/01)
 with open(join(_info_dir, "atom_masses.json"), "r") as file:
     _atom_masses = json.load(file)
-# Masses are taken from
-# ftp://ftp.wwpdb.org/pub/pdb/data/monomers/components.cif
-# (2019/01/27)
-with open(join(_info_dir, "residue_masses.msgpack"), "rb") as file:
-    _res_masses = msgpack.load(file, raw=False)
 
 
 def mass(item, is_residue=None):
@@ -102,11 +97,11 @@ def mass(item, is_residue=None):
         if is_residue is None:
             result_mass = _atom_masses.get(item.upper())
             if result_mass is None:
-                result_mass = _res_masses.get(item.upper())
+                result_mass = _residue_mass(item.upper())
         elif not is_residue:
             result_mass = _atom_masses.get(item.upper())
         else:
-            result_mass = _res_masses.get(item.upper())
+            result_mass = _residue_mass(item.upper())
     
     elif isinstance(item, Atom):
         result_mass = mass(item.element, is_residue=False)
@@ -122,4 +117,9 @@ def mass(item, is_residue=None):
     
     if result_mass is None:
         raise KeyError(f"{item} is not known")
-    return result_mass
\ No newline at end of file
+    return result_mass
+
+
+def _residue_mass(res_name):
+    store = get_component_store()
+    return store.mass(store.index(res_name))
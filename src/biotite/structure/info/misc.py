@@ -6,18 +6,7 @@ __name__ = "biotite.structure.info"
 __author__ = "Patrick Kunzmann"
 __all__ = ["full_name", "link_type"]
 
-from os.path import join, dirname, realpath
-import msgpack
-
-
-_info_dir = dirname(realpath(__file__))
-# Data is taken from
-# ftp://ftp.wwpdb.org/pub/pdb/data/monomers/components.cif
-# (2019/01/27)
-with open(join(_info_dir, "residue_names.msgpack"), "rb") as file:
-    _res_names = msgpack.load(file, raw=False)
-with open(join(_info_dir, "link_types.msgpack"), "rb") as file:
-    _link_types = msgpack.load(file, raw=False)
+from .ccd import get_component_store
 
 
 def full_name(res_name):
@@ -41,7 +30,8 @@ def full_name(res_name):
     >>> print(full_name("MAN"))
     ALPHA-D-MANNOSE
     """
-    return _res_names.get(res_name.upper())
+    store = get_component_store()
+    return store.full_name(store.index(res_name.upper()))
 
 
 def link_type(res_name):
@@ -69,4 +59,5 @@ def link_type(res_name):
     >>> print(link_type("HOH"))
     NON-POLYMER
     """
-    return _link_types.get(res_name.upper())
\ No newline at end of file
+    store = get_component_store()
+    return store.link_type(store.index(res_name.upper()))
\ No newline at end of file
@@ -20,6 +20,10 @@ as :class:`BondList` instances.
 
 Besides the mentioned structure formats, Gromacs trajectory files can be
 loaded, if `mdtraj` is installed.
+
+Parsed structures can be cached in a memory-mappable binary format
+via the `cache_dir` parameter of :func:`load_structure()`, so that
+repeated loading of the same file does not require parsing.
 """
 
 __name__ = "biotite.structure.io"
@@ -0,0 +1,23 @@
+# This source code is part of the Biotite package and is distributed
+# under the 3-Clause BSD License. Please see 'LICENSE.rst' for further
+# information.
+
+"""
+This subpackage is used for caching an :class:`AtomArray` or
+:class:`AtomArrayStack` in a binary columnar file.
+In contrast to the NPZ format, each annotation array, the coordinates,
+the box and the bonds are stored uncompressed at aligned positions in
+the file.
+Hence, the file can be memory-mapped, so that the arrays are available
+without parsing and only the parts of the file that are actually
+accessed (e.g. the coordinates of a single model) are read from disk.
+
+This format is used by :func:`load_structure()` for caching parsed
+structure files, but it can also be used directly via the
+:class:`CacheFile` class.
+"""
+
+__name__ = "biotite.structure.io.cache"
+__author__ = "Patrick Kunzmann"
+
+from .file import *
@@ -0,0 +1,310 @@
+# This source code is part of the Biotite package and is distributed
+# under the 3-Clause BSD License. Please see 'LICENSE.rst' for further
+# information.
+
+__name__ = "biotite.structure.io.cache"
+__author__ = "Patrick Kunzmann"
+__all__ = ["CacheFile"]
+
+import json
+import numpy as np
+from ...atoms import AtomArray, AtomArrayStack
+from ...bonds import BondList
+from ....file import File, InvalidFileError, is_binary
+
+
+_MAGIC = b"BTCACHE\x00"
+_VERSION = 1
+# Each array in the file starts at a multiple of this value
+_ALIGNMENT = 64
+# Columns that are not annotation arrays
+_COORD = "coord"
+_BOX = "box"
+_BONDS = "bonds"
+
+
+class CacheFile(File):
+    r"""
+    This class represents a binary columnar file for caching an
+    :class:`AtomArray` or :class:`AtomArrayStack`.
+
+    The file consists of a small JSON header, followed by the
+    uncompressed coordinates, box, bonds and annotation arrays.
+    When a file is read, the file is only memory-mapped and the arrays
+    are read-only views into the mapped file.
+    Hence, reading a file does not require any parsing and data is
+    only loaded from disk when it is accessed.
+    For example, :meth:`get_coord()` with a given model only reads the
+    coordinates of this model.
+
+    Additionally, arbitrary JSON-serializable metadata can be stored in
+    the file, e.g. to validate a cached structure against its source.
+
+    Examples
+    --------
+
+    >>> import os.path
+    >>> file = CacheFile()
+    >>> file.set_structure(atom_array_stack)
+    >>> file.set_metadata({"source": "1l2y.pdb"})
+    >>> file.write(os.path.join(path_to_directory, "1l2y.cache"))
+    >>> file = CacheFile.read(os.path.join(path_to_directory, "1l2y.cache"))
+    >>> print(file.get_metadata())
+    {'source': '1l2y.pdb'}
+    >>> print(file.get_coord(model=1).shape)
+    (304, 3)
+    >>> print(file.get_structure() == atom_array_stack)
+    True
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._columns = None
+        self._metadata = {}
+
+    def __copy_fill__(self, clone):
+        super().__copy_fill__(clone)
+        if self._columns is not None:
+            clone._columns = {
+                key: np.copy(value) for key, value in self._columns.items()
+            }
+        clone._metadata = json.loads(json.dumps(self._metadata))
+
+    @classmethod
+    def read(cls, file):
+        """
+        Read a cache file by memory-mapping it.
+
+        Parameters
+        ----------
+        file : str
+            The path of the file to be read.
+            Since the file is memory-mapped, file-like objects are not
+            supported.
+
+        Returns
+        -------
+        file_object : CacheFile
+            The file, whose arrays point into the memory-mapped file.
+        """
+        if not isinstance(file, str):
+            raise TypeError("Only file paths are supported")
+        with open(file, "rb") as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                raise InvalidFileError("File is not a cache file")
+            header_length = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(header_length).decode("utf-8"))
+        if header["version"] != _VERSION:
+            raise InvalidFileError(
+                f"Unsupported cache file version {header['version']}"
+            )
+
+        data_start = _align(len(_MAGIC) + 8 + header_length)
+        buffer = np.memmap(file, dtype=np.uint8, mode="r")
+        columns = {}
+        for name, info in header["columns"].items():
+            dtype = np.dtype(info["dtype"])
+            shape = tuple(info["shape"])
+            start = data_start + info["offset"]
+            stop = start + int(np.prod(shape)) * dtype.itemsize
+            if stop > len(buffer):
+                raise InvalidFileError("File is truncated")
+            columns[name] = buffer[start : stop].view(dtype).reshape(shape)
+
+        cache_file = CacheFile()
+        cache_file._columns = columns
+        cache_file._metadata = header["metadata"]
+        return cache_file
+
+    def write(self, file):
+        """
+        Write the cache file.
+
+        Parameters
+        ----------
+        file : file-like object or str
+            The file to be written to.
+            Alternatively, a file path can be supplied.
+        """
+        if self._columns is None:
+            raise ValueError("The structure of this file has not been set")
+        column_info = {}
+        offset = 0
+        for name, array in self._columns.items():
+            column_info[name] = {
+                "dtype": array.dtype.str,
+                "shape": list(array.shape),
+                "offset": offset
+            }
+            offset = _align(offset + array.nbytes)
+        header = json.dumps({
+            "version": _VERSION,
+            "metadata": self._metadata,
+            "columns": column_info
+        }).encode("utf-8")
+
+        if isinstance(file, str):
+            with open(file, "wb") as f:
+                _write_content(f, header, self._columns, column_info)
+        else:
+            if not is_binary(file):
+                raise TypeError("A file opened in 'binary' mode is required")
+            _write_content(file, header, self._columns, column_info)
+
+    def get_metadata(self):
+        """
+        Get the metadata stored in the file.
+
+        Returns
+        -------
+        metadata : dict
+            The metadata.
+        """
+        return self._metadata
+
+    def set_metadata(self, metadata):
+        """
+        Set the metadata stored in the file.
+
+        Parameters
+        ----------
+        metadata : dict
+            The metadata.
+            Must be serializable to JSON.
+        """
+        # Check early, whether the metadata can be serialized
+        json.dumps(metadata)
+        self._metadata = metadata
+
+    def get_coord(self, model=None):
+        """
+        Get only the coordinates from the file.
+
+        Parameters
+        ----------
+        model : int, optional
+            If this parameter is given, only the coordinates of the
+            given model number (starting at 1) are returned.
+            Negative values are used to index models starting from the
+            last model instead of the first model.
+            Only valid, if the file contains an :class:`AtomArrayStack`.
+
+        Returns
+        -------
+        coord : ndarray, shape=(m,n,3) or shape=(n,3), dtype=np.float32
+            The read-only coordinates.
+        """
+        coord = self._get_column(_COORD)
+        if model is None:
+            return coord
+        return coord[self._model_index(model)]
+
+    def get_structure(self, model=None):
+        """
+        Get an :class:`AtomArray` or :class:`AtomArrayStack` from the
+        file.
+
+        The coordinates, box and annotation arrays of the returned
+        structure are read-only views into the memory-mapped file.
+
+        Parameters
+        ----------
+        model : int, optional
+            If this parameter is given, an :class:`AtomArray` containing
+            only the given model number (starting at 1) is returned.
+            Negative values are used to index models starting from the
+            last model instead of the first model.
+            Only valid, if the file contains an :class:`AtomArrayStack`.
+
+        Returns
+        -------
+        array : AtomArray or AtomArrayStack
+            The array or stack contained in this file.
+        """
+        coord = self.get_coord(model)
+        box = self._columns.get(_BOX)
+        if model is not None and box is not None:
+            box = box[self._model_index(model)]
+        if coord.ndim == 3:
+            array = AtomArrayStack(coord.shape[0], coord.shape[1])
+        else:
+            array = AtomArray(coord.shape[0])
+
+        array.coord = coord
+        if box is not None:
+            array.box = box
+        if _BONDS in self._columns:
+            array.bonds = BondList(
+                array.array_length(), np.asarray(self._columns[_BONDS])
+            )
+        for name, column in self._columns.items():
+            if name not in (_COORD, _BOX, _BONDS):
+                array.set_annotation(name, column)
+        return array
+
+    def set_structure(self, array):
+        """
+        Set the :class:`AtomArray` or :class:`AtomArrayStack` for the
+        file.
+
+        Parameters
+        ----------
+        array : AtomArray or AtomArrayStack
+            The array or stack to be saved into this file.
+        """
+        columns = {}
+        columns[_COORD] = np.ascontiguousarray(array.coord)
+        if array.box is not None:
+            columns[_BOX] = np.ascontiguousarray(array.box)
+        if array.bonds is not None:
+            columns[_BONDS] = np.ascontiguousarray(array.bonds.as_array())
+        for category in array.get_annotation_categories():
+            annotation = np.ascontiguousarray(array.get_annotation(category))
+            if annotation.dtype.hasobject:
+                raise TypeError(
+                    f"Annotation category '{category}' has an object "
+                    f"dtype, which cannot be cached"
+                )
+            columns[category] = annotation
+        self._columns = columns
+
+    def _get_column(self, name):
+        if self._columns is None:
+            raise ValueError(
+                "The structure of this file has not been loaded or set yet"
+            )
+        return self._columns[name]
+
+    def _model_index(self, model):
+        coord = self._get_column(_COORD)
+        if coord.ndim != 3:
+            raise TypeError(
+                "The file contains an AtomArray, a model cannot be selected"
+            )
+        n_models = coord.shape[0]
+        if model == 0:
+            raise ValueError("The model index must not be 0")
+        index = model - 1 if model > 0 else n_models + model
+        if index < 0 or index >= n_models:
+            raise ValueError(
+                f"The file has {n_models} models, "
+                f"the given model {model} does not exist"
+            )
+        return index
+
+
+def _align(position):
+    return -(-position // _ALIGNMENT) * _ALIGNMENT
+
+
+def _write_content(file, header, columns, column_info):
+    file.write(_MAGIC)
+    file.write(len(header).to_bytes(8, "little"))
+    file.write(header)
+    position = len(_MAGIC) + 8 + len(header)
+    data_start = _align(position)
+    for name, array in columns.items():
+        start = data_start + column_info[name]["offset"]
+        file.write(b"\x00" * (start - position))
+        file.write(array.tobytes())
+        position = start + array.nbytes
@@ -6,9 +6,17 @@ __name__ = "biotite.structure.io.dcd"
 __author__ = "Patrick Kunzmann"
 __all__ = ["DCDFile"]
 
+import struct
 import numpy as np
-from ..trajfile import TrajectoryFile
+from ..trajfile import TrajectoryFile, FrameReader
 from ...box import vectors_from_unitcell, unitcell_from_vectors
+from ....file import InvalidFileError
+
+
+# Size of the first record containing 'CORD' and the control integers
+_HEADER_RECORD_SIZE = 84
+# Record marker size
+_MARKER_SIZE = 4
 
 
 class DCDFile(TrajectoryFile):
@@ -21,6 +29,10 @@ class DCDFile(TrajectoryFile):
         import mdtraj.formats as traj
         return traj.DCDTrajectoryFile
     
+    @classmethod
+    def reader_type(cls):
+        return _DCDReader
+
     @classmethod
     def process_read_values(cls, read_values):
         # .netcdf files use Angstrom
@@ -62,4 +74,108 @@ class DCDFile(TrajectoryFile):
         if time is not None:
             raise NotImplementedError(
                 "This trajectory file does not support writing simulation time"
-            )
\ No newline at end of file
+            )
+
+
+
+class _DCDReader(FrameReader):
+    """
+    Native reader for *CHARMM* and *X-PLOR* DCD files.
+
+    As each frame has the same size, the position of each frame is
+    directly computed from the header.
+    The separate *x*, *y* and *z* records of a frame are mapped into
+    a single coordinate array via the array strides.
+    """
+
+    def _index(self):
+        buffer = self._buffer
+        if len(buffer) < _MARKER_SIZE + _HEADER_RECORD_SIZE:
+            raise InvalidFileError("The DCD file is truncated")
+        # The first record marker determines the byte order
+        if struct.unpack_from("<i", buffer, 0)[0] == _HEADER_RECORD_SIZE:
+            self._endian = "<"
+        elif struct.unpack_from(">i", buffer, 0)[0] == _HEADER_RECORD_SIZE:
+            self._endian = ">"
+        else:
+            raise InvalidFileError("Invalid DCD header record")
+        if bytes(buffer[4:8]) != b"CORD":
+            raise InvalidFileError("The file is not a DCD coordinate file")
+        control = struct.unpack_from(f"{self._endian}20i", buffer, 8)
+        n_fixed_atoms = control[8]
+        # A non-zero version indicates a CHARMM file,
+        # which may contain unit cells and a fourth dimension
+        is_charmm = control[19] != 0
+        self._has_cell = is_charmm and control[10] != 0
+        has_4d = is_charmm and control[11] != 0
+        if n_fixed_atoms != 0:
+            raise InvalidFileError(
+                "DCD files with fixed atoms are not supported"
+            )
+
+        # Skip the title record
+        position = _MARKER_SIZE + _HEADER_RECORD_SIZE + _MARKER_SIZE
+        title_size = self._read_marker(position)
+        position += _MARKER_SIZE + title_size + _MARKER_SIZE
+        # Atom count record
+        self._read_marker(position)
+        self._n_atoms, = struct.unpack_from(
+            f"{self._endian}i", buffer, position + _MARKER_SIZE
+        )
+        position += _MARKER_SIZE + 4 + _MARKER_SIZE
+
+        # Each frame consists of an optional unit cell record
+        # and a record for each dimension
+        coord_record_size = _MARKER_SIZE + 4*self._n_atoms + _MARKER_SIZE
+        self._cell_offset = _MARKER_SIZE
+        self._coord_offset = _MARKER_SIZE
+        if self._has_cell:
+            self._coord_offset += _MARKER_SIZE + 6*8 + _MARKER_SIZE
+        self._dim_stride = coord_record_size
+        frame_size = self._coord_offset - _MARKER_SIZE \
+                     + (4 if has_4d else 3) * coord_record_size
+        n_frames, remainder = divmod(len(buffer) - position, frame_size)
+        if remainder != 0:
+            raise InvalidFileError("The DCD file is truncated")
+        return position + np.arange(n_frames, dtype=np.int64) * frame_size
+
+    def read(self, frames, atom_i=None):
+        positions = self._offsets[frames]
+        coord = self._view(
+            positions + self._coord_offset,
+            f"{self._endian}f4",
+            (self._n_atoms, 3),
+            strides=(4, self._dim_stride)
+        )
+        if atom_i is not None:
+            coord = coord[:, atom_i]
+        # If the byte order is already native, this is still a view
+        coord = coord.astype(np.float32, copy=False)
+
+        if self._has_cell:
+            # Order of unit cell values is
+            # (a, gamma, b, beta, alpha, c)
+            cell = self._view(
+                positions + self._cell_offset, f"{self._endian}f8", (6,)
+            )
+            lengths = cell[:, [0, 2, 5]].astype(np.float32)
+            angles = cell[:, [4, 3, 1]]
+            if ((angles >= -1) & (angles <= 1)).all():
+                # Newer files contain the cosine of the angles
+                angles = 90 - np.rad2deg(np.arcsin(angles))
+            angles = np.deg2rad(angles.astype(np.float32))
+            box = np.stack(
+                [vectors_from_unitcell(a, b, c, alpha, beta, gamma)
+                for (a, b, c), (alpha, beta, gamma) in zip(lengths, angles)],
+                axis=0
+            ) if len(positions) > 0 else np.zeros((0, 3, 3), np.float32)
+        else:
+            box = None
+        return coord, box, None
+
+    def _read_marker(self, position):
+        if position + _MARKER_SIZE > len(self._buffer):
+            raise InvalidFileError("The DCD file is truncated")
+        return struct.unpack_from(
+            f"{self._endian}i", self._buffer, position
+        )[0]
@@ -11,12 +11,19 @@ __name__ = "biotite.structure.io"
 __author__ = "Patrick Kunzmann"
 __all__ = ["load_structure", "save_structure"]
 
+import os
 import os.path
 import io
+import hashlib
+import json
+import tempfile
 from ..atoms import AtomArray, AtomArrayStack
 
 
-def load_structure(file_path, template=None, **kwargs):
+_TRAJECTORY_SUFFIXES = [".trr", ".xtc", ".tng", ".dcd", ".netcdf"]
+
+
+def load_structure(file_path, template=None, cache_dir=None, **kwargs):
     """
     Load an :class:`AtomArray` or class`AtomArrayStack` from a structure
     file without the need to manually instantiate a :class:`File`
@@ -33,6 +40,20 @@ def load_structure(file_path, template=None, **kwargs):
         The path to structure file.
     template : AtomArray or AtomArrayStack or file-like object or str, optional
         Only required when reading a trajectory file.
+    cache_dir : str, optional
+        If given, the loaded structure is cached in this directory as
+        :class:`CacheFile`.
+        The cache entry is specific for the absolute path and
+        modification time of the file and the given `kwargs`.
+        Subsequent calls with the same parameters memory-map the cached
+        structure instead of parsing the file again.
+        The returned structure is always memory-mapped from the cache,
+        hence its coordinates and annotation arrays are read-only.
+        Cache entries are never removed:
+        Each modification of the file and each new combination of
+        `kwargs` adds a new entry, so the directory needs to be cleaned
+        up manually.
+        Not supported for trajectory files.
     kwargs
         Additional parameters will be passed to either the
         :func:`get_structure()` or :func:`read()` method of the file
@@ -53,6 +74,9 @@ def load_structure(file_path, template=None, **kwargs):
         If a trajectory file is loaded without specifying the
         `template` parameter.
     """
+    if cache_dir is not None:
+        return _load_cached_structure(file_path, cache_dir, **kwargs)
+
     # Optionally load template from file
     if isinstance(template, (io.IOBase, str)):
         template = load_structure(template)
@@ -104,7 +128,7 @@ def load_structure(file_path, template=None, **kwargs):
             return array[0]
         else:
             return array
-    elif suffix in [".trr", ".xtc", ".tng", ".dcd", ".netcdf"]:
+    elif suffix in _TRAJECTORY_SUFFIXES:
         if template is None:
             raise TypeError("Template must be specified for trajectory files")
         from .trr import TRRFile
@@ -128,6 +152,52 @@ def load_structure(file_path, template=None, **kwargs):
         raise ValueError(f"Unknown file format '{suffix}'")
 
 
+def _load_cached_structure(file_path, cache_dir, **kwargs):
+    """
+    Load a structure from the cache directory, or load it from the
+    structure file and put it into the cache, if no valid cache entry
+    exists.
+    """
+    from .cache import CacheFile
+
+    _, suffix = os.path.splitext(file_path)
+    if suffix in _TRAJECTORY_SUFFIXES:
+        raise ValueError("Caching is not supported for trajectory files")
+    # The key identifies the source file and the parser options
+    status = os.stat(file_path)
+    key = {
+        "path": os.path.abspath(file_path),
+        "mtime": status.st_mtime_ns,
+        "size": status.st_size,
+        "options": {name: repr(value) for name, value in kwargs.items()}
+    }
+    key_hash = hashlib.sha256(
+        json.dumps(key, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+    cache_path = os.path.join(cache_dir, key_hash + ".cache")
+
+    if os.path.isfile(cache_path):
+        cache_file = CacheFile.read(cache_path)
+        # Protect against hash collisions
+        if cache_file.get_metadata() == key:
+            return cache_file.get_structure()
+
+    array = load_structure(file_path, **kwargs)
+    cache_file = CacheFile()
+    cache_file.set_structure(array)
+    cache_file.set_metadata(key)
+    # Write into a temporary file first,
+    # so that concurrent readers never see an incomplete file
+    os.makedirs(cache_dir, exist_ok=True)
+    temp_file, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    with os.fdopen(temp_file, "wb") as file:
+        cache_file.write(file)
+    os.replace(temp_path, cache_path)
+    # Return the memory-mapped structure from the cache,
+    # to behave the same as in case of an existing cache entry
+    return CacheFile.read(cache_path).get_structure()
+
+
 def save_structure(file_path, array, **kwargs):
     """
     Save an :class:`AtomArray` or class`AtomArrayStack` to a structure
@@ -179,7 +249,7 @@ def save_structure(file_path, array, **kwargs):
         file = NpzFile()
         file.set_structure(array, **kwargs)
         file.write(file_path)
-    elif suffix in [".trr", ".xtc", ".tng", ".dcd", ".netcdf"]:
+    elif suffix in _TRAJECTORY_SUFFIXES:
         from .trr import TRRFile
         from .xtc import XTCFile
         from .tng import TNGFile
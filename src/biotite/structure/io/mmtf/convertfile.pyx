@@ -104,129 +104,51 @@ def get_structure(file, model=None, altloc="first",
     >>> print(stack.stack_depth(), stack.array_length())
     38 304
     """
-    cdef int i, j, m
-    
-
-    # Obtain (and potentially decode) required arrays/values from file
-    cdef int atom_count = file["numAtoms"]
-    cdef int model_count = file["numModels"]
-    cdef np.ndarray chain_names = file["chainNameList"]
-    cdef int32[:] chains_per_model = np.array(file["chainsPerModel"], np.int32)
-    cdef int32[:] res_per_chain = np.array(file["groupsPerChain"], np.int32)
-    cdef int32[:] res_type_i = file["groupTypeList"]
-    cdef np.ndarray index_list = file["groupIdList"]
-    cdef int32[:] res_ids = index_list
-    cdef np.ndarray x_coord = file["xCoordList"]
-    cdef np.ndarray y_coord = file["yCoordList"]
-    cdef np.ndarray z_coord = file["zCoordList"]
-    cdef np.ndarray occupancy = file.get("occupancyList")
-    cdef np.ndarray b_factor
-    if "b_factor" in extra_fields:
-        b_factor = file["bFactorList"]
-    cdef np.ndarray atom_ids
-    if "atom_id" in extra_fields:
-        atom_ids = file["atomIdList"]
-    cdef np.ndarray all_altloc_ids
-    cdef np.ndarray inscode
-    all_altloc_ids = file.get("altLocList")
-    inscode = file.get("insCodeList")
-    
+    # Obtain (and potentially decode) the residue level arrays,
+    # which are required to locate the atoms of each model
+    chain_names = file["chainNameList"]
+    chains_per_model = np.array(file["chainsPerModel"], np.int32)
+    res_per_chain = np.array(file["groupsPerChain"], np.int32)
+    res_type_i = file["groupTypeList"]
+    res_ids = file["groupIdList"]
+    res_inscodes = file.get("insCodeList")
+    # The residue types are decoded only once
+    # and shared by all residues of the same type
+    templates = _GroupTemplates(file["groupList"], include_bonds)
 
-    # Create arrays from 'groupList' list of dictionaries
-    cdef list group_list = file["groupList"]
-    cdef list non_hetero_list = ["L-PEPTIDE LINKING", "PEPTIDE LINKING",
-                                 "DNA LINKING", "RNA LINKING"]
-    # Determine per-residue-count and maximum count
-    # of atoms in each residue
-    cdef np.ndarray atoms_per_res = np.zeros(len(group_list), dtype=np.int32)
-    for i in range(len(group_list)):
-        atoms_per_res[i] = len(group_list[i]["atomNameList"])
-    cdef int32 max_atoms_per_res = np.max(atoms_per_res)
-    #Create the arrays
-    cdef np.ndarray res_names = np.zeros(len(group_list), dtype="U3")
-    cdef np.ndarray hetero_res = np.zeros(len(group_list), dtype=np.bool)
-    cdef np.ndarray atom_names = np.zeros((len(group_list), max_atoms_per_res),
-                                          dtype="U6")
-    cdef np.ndarray elements = np.zeros((len(group_list), max_atoms_per_res),
-                                        dtype="U2")
-    cdef np.ndarray charges = np.zeros((len(group_list), max_atoms_per_res),
-                                          dtype=np.int32)
-    # Fill the arrays
-    for i in range(len(group_list)):
-        residue = group_list[i]
-        res_names[i] = residue["groupName"]
-        hetero_res[i] = (residue["chemCompType"] not in non_hetero_list)
-        atom_names[i, :atoms_per_res[i]] = residue["atomNameList"]
-        elements[i, :atoms_per_res[i]] = residue["elementList"]
-        charges[i, :atoms_per_res[i]] = residue["formalChargeList"]
-    
+    # The start index of the residues in each chain and
+    # the start index of the chains in each model
+    chain_res_starts = _to_starts(res_per_chain)
+    model_chain_starts = _to_starts(chains_per_model)
+    model_res_starts = chain_res_starts[model_chain_starts]
+    res_atom_starts = _to_starts(templates.atom_counts[res_type_i])
+    model_atom_starts = res_atom_starts[model_res_starts]
+    lengths = np.diff(model_atom_starts)
+    # The chain index of each residue
+    res_chain_i = np.repeat(
+        np.arange(len(res_per_chain), dtype=np.int32), res_per_chain
+    )
 
-    # Create the atom array (stack)
-    cdef int depth, length
-    cdef int start_i, stop_i
-    cdef bint extra_charge
-    cdef np.ndarray altloc_ids
-    cdef np.ndarray inscode_array
-    
-    
-    if model == None:
-        lengths = _get_model_lengths(res_type_i, chains_per_model,
-                                     res_per_chain, atoms_per_res)
+    if model is None:
         # Check if each model has the same amount of atoms
         # If not, raise exception
         if (lengths != lengths[0]).any():
             raise InvalidFileError("The models in the file have unequal "
                                    "amount of atoms, give an explicit "
                                    "model instead")
+        depth = len(lengths)
         length = lengths[0]
-
-        depth = model_count
-        
-        
+        # Annotations are taken from the first model
+        model_i = 0
         array = AtomArrayStack(depth, length)
+        # Coordinates are required for all models
         array.coord = np.stack(
-            [x_coord,
-             y_coord,
-             z_coord],
+            [file["xCoordList"],
+             file["yCoordList"],
+             file["zCoordList"]],
              axis=1
         ).reshape(depth, length, 3)
-        
-        # Create altloc array for the final filtering
-        if all_altloc_ids is not None:
-            altloc_ids = all_altloc_ids[:length]
-        else:
-            altloc_ids = None
-        
-        extra_charge = False
-        if "ins_code" in extra_fields:
-            extra_inscode = True
-            array.add_annotation("ins_code", "U1")
-        if "charge" in extra_fields:
-            extra_charge = True
-            array.add_annotation("charge", int)
-        if "atom_id" in extra_fields:
-            array.set_annotation("atom_id", atom_ids[:length])
-        if "b_factor" in extra_fields:
-            array.set_annotation("b_factor", b_factor[:length])
-        if "occupancy" in extra_fields:
-            array.set_annotation("occupancy", occupancy[:length])
-        
-        _fill_annotations(1, array, extra_charge,
-                          chain_names, chains_per_model, res_per_chain,
-                          res_type_i, res_ids, inscode, atoms_per_res,
-                          res_names, hetero_res, atom_names, elements, charges)
-        
-        if include_bonds:
-            array.bonds = _create_bond_list(
-                1, file["bondAtomList"], file["bondOrderList"],
-                0, length, file["numAtoms"], group_list, res_type_i,
-                atoms_per_res, res_per_chain, chains_per_model
-            )
-    
-
     else:
-        lengths = _get_model_lengths(res_type_i, chains_per_model,
-                                     res_per_chain, atoms_per_res)
         if model == 0:
             raise ValueError("The model index must not be 0")
         # Negative models mean model index starting from last model
@@ -236,47 +158,59 @@ def get_structure(file, model=None, altloc="first",
                 f"The file has {len(lengths)} models, "
                 f"the given model {model} does not exist"
             )
-
-        length = lengths[model-1]
-        # Indices to filter coords and some annotations
-        # for the specified model
-        start_i = np.sum(lengths[:model-1])
-        stop_i = start_i + length
-        
+        model_i = model - 1
+        length = lengths[model_i]
         array = AtomArray(length)
-        array.coord[:,0] = x_coord[start_i : stop_i]
-        array.coord[:,1] = y_coord[start_i : stop_i]
-        array.coord[:,2] = z_coord[start_i : stop_i]
-        
-        # Create altloc array for the final filtering
-        if all_altloc_ids is not None:
-            altloc_ids = np.array(all_altloc_ids[start_i : stop_i], dtype="U1")
-        else:
-            altloc_ids = None
-        
-        extra_charge = False
-        if "charge" in extra_fields:
-            extra_charge = True
-            array.add_annotation("charge", int)
-        if "atom_id" in extra_fields:
-            array.set_annotation("atom_id", atom_ids[start_i : stop_i])
-        if "b_factor" in extra_fields:
-            array.set_annotation("b_factor", b_factor[start_i : stop_i])
-        if "occupancy" in extra_fields:
-            array.set_annotation("occupancy", occupancy[start_i : stop_i])
-        
-        _fill_annotations(model, array, extra_charge,
-                          chain_names, chains_per_model, res_per_chain,
-                          res_type_i, res_ids, inscode, atoms_per_res,
-                          res_names, hetero_res, atom_names, elements, charges)
-        
-        if include_bonds:
-            array.bonds = _create_bond_list(
-                model, file["bondAtomList"], file["bondOrderList"],
-                start_i, stop_i, file["numAtoms"], group_list, res_type_i,
-                atoms_per_res, res_per_chain, chains_per_model
-            )
-    
+    # Indices to filter coords and some annotations
+    # for the specified model
+    start_i = model_atom_starts[model_i]
+    stop_i = start_i + length
+    res_start_i = model_res_starts[model_i]
+    res_stop_i = model_res_starts[model_i + 1]
+
+    if model is not None:
+        # Only the coordinates of the given model are decoded
+        array.coord[:,0] = file.get_array("xCoordList", start_i, stop_i)
+        array.coord[:,1] = file.get_array("yCoordList", start_i, stop_i)
+        array.coord[:,2] = file.get_array("zCoordList", start_i, stop_i)
+
+    _fill_annotations(
+        array, templates, chain_names, res_chain_i[res_start_i:res_stop_i],
+        res_type_i[res_start_i:res_stop_i], res_ids[res_start_i:res_stop_i],
+        None if res_inscodes is None
+        else res_inscodes[res_start_i:res_stop_i],
+        "charge" in extra_fields
+    )
+
+    # Atom level annotations are only decoded for the given model
+    occupancy = None
+    if "occupancyList" in file \
+        and ("occupancy" in extra_fields or altloc == "occupancy"):
+            occupancy = file.get_array("occupancyList", start_i, stop_i)
+    if "atom_id" in extra_fields:
+        array.set_annotation(
+            "atom_id", file.get_array("atomIdList", start_i, stop_i)
+        )
+    if "b_factor" in extra_fields:
+        array.set_annotation(
+            "b_factor", file.get_array("bFactorList", start_i, stop_i)
+        )
+    if "occupancy" in extra_fields:
+        array.set_annotation("occupancy", occupancy)
+    # Create altloc array for the final filtering
+    if "altLocList" in file:
+        altloc_ids = np.array(
+            file.get_array("altLocList", start_i, stop_i), dtype="U1"
+        )
+    else:
+        altloc_ids = None
+
+    if include_bonds:
+        array.bonds = _create_bond_list(
+            file["bondAtomList"], file["bondOrderList"], templates,
+            res_type_i[res_start_i:res_stop_i], start_i, stop_i
+        )
+
     # Get box
     if "unitCell" in file:
         a_len, b_len, c_len, alpha, beta, gamma = file["unitCell"]
@@ -313,189 +247,146 @@ def get_structure(file, model=None, altloc="first",
         raise ValueError(f"'{altloc}' is not a valid 'altloc' option")
 
 
-def _get_model_lengths(int32[:] res_type_i,
-                       int32[:] chains_per_model,
-                       int32[:] res_per_chain,
-                       int32[:] atoms_per_res):
-    cdef int[:] model_lengths = np.zeros(len(chains_per_model), np.int32)
-    cdef int atom_count = 0
-    cdef int model_i = 0
-    cdef int chain_i = 0
-    cdef int res_i
-    cdef int res_count_in_chain = 0
-    cdef int chain_count_in_model = 0
-    # The length of 'res_type_i'
-    # is equal to the total number of residues
-    for res_i in range(res_type_i.shape[0]):
-        atom_count += atoms_per_res[res_type_i[res_i]]
-        res_count_in_chain += 1
-        if res_count_in_chain == res_per_chain[chain_i]:
-            # Chain is full -> Bump chain index and reset residue count
-            res_count_in_chain = 0
-            chain_i += 1
-            chain_count_in_model += 1
-        if chain_count_in_model == chains_per_model[model_i]:
-            # Model is full -> Bump model index and reset chain count
-            chain_count_in_model = 0
-            model_lengths[model_i] = atom_count
-            # Restart counting for the next model
-            atom_count = 0
-            model_i += 1
-    return np.asarray(model_lengths)
+class _GroupTemplates:
+    """
+    The atoms (and optionally the bonds) of each residue type from the
+    ``groupList``, concatenated into flat arrays.
+
+    The atoms of the residue type ``i`` are at the positions
+    ``atom_starts[i] : atom_starts[i+1]``, the bonds accordingly at
+    ``bond_starts[i] : bond_starts[i+1]``.
+    """
+
+    _NON_HETERO_TYPES = [
+        "L-PEPTIDE LINKING", "PEPTIDE LINKING", "DNA LINKING", "RNA LINKING"
+    ]
+
+    def __init__(self, list group_list, bint include_bonds):
+        self.res_names = np.array(
+            [group["groupName"] for group in group_list], dtype=str
+        )
+        self.hetero = np.array(
+            [group["chemCompType"] not in _GroupTemplates._NON_HETERO_TYPES
+             for group in group_list], dtype=bool
+        )
+        self.atom_counts = np.array(
+            [len(group["atomNameList"]) for group in group_list],
+            dtype=np.int32
+        )
+        self.atom_starts = _to_starts(self.atom_counts)
+        self.atom_names = np.array(
+            [name for group in group_list for name in group["atomNameList"]],
+            dtype=str
+        )
+        self.elements = np.char.upper(np.array(
+            [element for group in group_list
+             for element in group["elementList"]],
+            dtype=str
+        ))
+        self.charges = np.array(
+            [charge for group in group_list
+             for charge in group["formalChargeList"]],
+            dtype=np.int32
+        )
+
+        if include_bonds:
+            self.bond_counts = np.array(
+                [len(group["bondOrderList"]) for group in group_list],
+                dtype=np.int32
+            )
+            self.bond_starts = _to_starts(self.bond_counts)
+            self.bonds = np.zeros((self.bond_starts[-1], 3), dtype=np.uint32)
+            self.bonds[:, :2] = np.array(
+                [index for group in group_list
+                 for index in group["bondAtomList"]],
+                dtype=np.uint32
+            ).reshape(-1, 2)
+            self.bonds[:, 2] = [
+                order for group in group_list
+                for order in group["bondOrderList"]
+            ]
+
+
+def _to_starts(counts):
+    """
+    Convert segment lengths into segment start indices, including the
+    exclusive stop of the last segment.
+    """
+    starts = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=starts[1:])
+    return starts
+
+
+def _expand_templates(type_i, starts, counts):
+    """
+    Get the indices into the flat template arrays for a sequence of
+    residues with the given types.
+
+    Returns the template indices and the number of template elements
+    for each residue.
+    """
+    res_counts = counts[type_i]
+    # The index of each element within its residue
+    index_in_res = np.arange(np.sum(res_counts), dtype=np.int64) \
+        - np.repeat(_to_starts(res_counts)[:-1], res_counts)
+    return np.repeat(starts[type_i], res_counts) + index_in_res, res_counts
 
     
-def _fill_annotations(int model, array,
-                      bint extra_charge,
-                      np.ndarray chain_names,
-                      int32[:] chains_per_model,
-                      int32[:] res_per_chain,
-                      int32[:] res_type_i,
-                      int32[:] res_ids,
-                      np.ndarray res_inscodes,
-                      np.ndarray atoms_per_res,
-                      np.ndarray res_names,
-                      np.ndarray hetero_res,
-                      np.ndarray atom_names,
-                      np.ndarray elements,
-                      np.ndarray charges):
-    # Get annotation arrays from atom array (stack)
-    cdef np.ndarray chain_id  = array.chain_id
-    cdef np.ndarray res_id    = array.res_id
-    cdef np.ndarray ins_code  = array.ins_code
-    cdef np.ndarray res_name  = array.res_name
-    cdef np.ndarray hetero    = array.hetero
-    cdef np.ndarray atom_name = array.atom_name
-    cdef np.ndarray element   = array.element
+def _fill_annotations(array, templates, chain_names, res_chain_i,
+                      res_type_i, res_ids, res_inscodes, bint extra_charge):
+    """
+    Fill the annotation arrays of the given atom array (stack) from the
+    residue level arrays of a single model.
+    """
+    template_i, atoms_per_res = _expand_templates(
+        res_type_i, templates.atom_starts, templates.atom_counts
+    )
+    array.chain_id[:] = np.repeat(chain_names[res_chain_i], atoms_per_res)
+    array.res_id[:] = np.repeat(res_ids, atoms_per_res)
+    if res_inscodes is not None:
+        array.ins_code[:] = np.repeat(res_inscodes, atoms_per_res)
+    array.res_name[:] = np.repeat(templates.res_names[res_type_i],
+                                  atoms_per_res)
+    array.hetero[:] = np.repeat(templates.hetero[res_type_i], atoms_per_res)
+    array.atom_name[:] = templates.atom_names[template_i]
+    array.element[:] = templates.elements[template_i]
     if extra_charge:
-        charge = array.charge
-
-    cdef int model_i = 0
-    cdef int chain_i = 0
-    cdef int res_i
-    cdef int atom_i = 0
-    cdef int res_count_in_chain = 0
-    cdef int chain_count_in_model = 0
-    cdef int atom_index_in_res
-
-    cdef chain_id_for_chain
-    cdef res_name_for_res
-    cdef inscode_for_res
-    cdef bint hetero_for_res
-    cdef int res_id_for_res
-    cdef int type_i
-
-    # The length of 'res_type_i'
-    # is equal to the total number of residues
-    for res_i in range(res_type_i.shape[0]):
-        # Wait for the data of the given model
-        if model_i == model-1: 
-            chain_id_for_chain = chain_names[chain_i]
-            res_id_for_res = res_ids[res_i]
-            if res_inscodes is not None:
-                inscode_for_res = res_inscodes[res_i]
-            type_i = res_type_i[res_i]
-            res_name_for_res = res_names[type_i]
-            hetero_for_res = hetero_res[type_i]
-
-            for atom_index_in_res in range(atoms_per_res[type_i]):
-                chain_id[atom_i]  = chain_id_for_chain
-                res_id[atom_i]    = res_id_for_res
-                ins_code[atom_i]  = inscode_for_res
-                hetero[atom_i]    = hetero_for_res
-                res_name[atom_i]  = res_name_for_res
-                atom_name[atom_i] = atom_names[type_i][atom_index_in_res]
-                element[atom_i]   = elements[type_i][atom_index_in_res].upper()
-                if extra_charge:
-                    charge[atom_i] = charges[type_i][atom_index_in_res]
-                atom_i += 1
-        
-        elif model_i > model-1:
-            # The given model has already been parsed
-            # -> parsing is finished
-            break
-        
-        res_count_in_chain += 1
-        if res_count_in_chain == res_per_chain[chain_i]:
-            # Chain is full -> Bump chain index and reset residue count
-            res_count_in_chain = 0
-            chain_i += 1
-            chain_count_in_model += 1
-        if chain_count_in_model == chains_per_model[model_i]:
-            # Model is full -> Bump model index and reset chain count
-            chain_count_in_model = 0
-            model_i += 1
-
-
-def _create_bond_list(int model, np.ndarray bonds, np.ndarray bond_types,
-                      int model_start, int model_stop, int atom_count,
-                      list group_list, int32[:] res_type_i,
-                      int32[:] atoms_per_res,
-                      int32[:] res_per_chain, int32[:] chains_per_model):
-    cdef int i=0, j=0
-
-    # Determine per-residue-count and maximum count
-    # of bonds in each residue
-    cdef int32[:] bonds_per_res = np.zeros(len(group_list), dtype=np.int32)
-    for i in range(len(group_list)):
-        bonds_per_res[i] = len(group_list[i]["bondOrderList"])
-    cdef int32 max_bonds_per_res = np.max(bonds_per_res)
-
-    # Create arrays for intra-residue bonds and bond types
-    cdef np.ndarray intra_bonds = np.zeros(
-        (len(group_list), max_bonds_per_res, 3), dtype=np.uint32
+        array.add_annotation("charge", int)
+        array.charge[:] = templates.charges[template_i]
+
+
+def _create_bond_list(np.ndarray bonds, np.ndarray bond_types, templates,
+                      res_type_i, int model_start, int model_stop):
+    """
+    Create the :class:`BondList` for a single model from the
+    intra-residue bonds in the residue templates and the inter-residue
+    bonds in the ``bondAtomList``.
+    """
+    # Intra-residue bonds
+    template_i, bonds_per_res = _expand_templates(
+        res_type_i, templates.bond_starts, templates.bond_counts
+    )
+    intra_bonds = templates.bonds[template_i]
+    # The template bonds refer to the atom indices within the residue
+    res_atom_starts = _to_starts(templates.atom_counts[res_type_i])[:-1]
+    intra_bonds[:, :2] += np.repeat(
+        res_atom_starts, bonds_per_res
+    ).astype(np.uint32)[:, np.newaxis]
+
+    # Inter-residue bonds within the given model
+    inter_bonds = np.zeros((len(bond_types), 3), dtype=np.int64)
+    inter_bonds[:, :2] = bonds.reshape((len(bond_types), 2))
+    inter_bonds[:, 2] = bond_types
+    in_model = (
+        (inter_bonds[:, :2] >= model_start) &
+        (inter_bonds[:, :2] < model_stop)
+    ).all(axis=1)
+    inter_bonds = inter_bonds[in_model]
+    inter_bonds[:, :2] -= model_start
+
+    return BondList(
+        model_stop - model_start,
+        np.concatenate(
+            [inter_bonds.astype(np.uint32), intra_bonds], axis=0
+        )
     )
-    # Dictionary for groupList entry
-    cdef dict residue
-    # Fill the array
-    for i in range(len(group_list)):
-        residue = group_list[i]
-        bonds_in_residue = np.array(residue["bondAtomList"], dtype=np.uint32)
-        intra_bonds[i, :bonds_per_res[i], :2] = \
-            np.array(residue["bondAtomList"], dtype=np.uint32).reshape((-1, 2))
-        intra_bonds[i, :bonds_per_res[i], 2] = residue["bondOrderList"]
-
-    # Unify intra-residue bonds to one BondList
-    cdef int model_i = 0
-    cdef int chain_i = 0
-    cdef int res_i
-    cdef int res_count_in_chain = 0
-    cdef int chain_count_in_model = 0
-    cdef int type_i
-    intra_bond_list = BondList(0)
-    # The length of 'res_type_i'
-    # is equal to the total number of residues
-    for res_i in range(res_type_i.shape[0]):
-        # Wait for the data of the given model
-        if model_i == model-1: 
-            type_i = res_type_i[res_i]
-            bond_list_per_res = BondList(
-                atoms_per_res[type_i],
-                intra_bonds[type_i, :bonds_per_res[type_i]]
-            )
-            intra_bond_list += bond_list_per_res
-        
-        elif model_i > model-1:
-            # The given model has already been parsed
-            # -> parsing is finished
-            break
-
-        res_count_in_chain += 1
-        if res_count_in_chain == res_per_chain[chain_i]:
-            # Chain is full -> Bump chain index and reset residue count
-            res_count_in_chain = 0
-            chain_i += 1
-            chain_count_in_model += 1
-        if chain_count_in_model == chains_per_model[model_i]:
-            # Model is full -> Bump model index and reset chain count
-            chain_count_in_model = 0
-            model_i += 1
-    
-    # Add inter-residue bonds to BondList
-    cdef np.ndarray inter_bonds = np.zeros((len(bond_types), 3),
-                                           dtype=np.uint32)
-    inter_bonds[:,:2] = bonds.reshape((len(bond_types), 2))
-    inter_bonds[:,2] = bond_types
-    inter_bond_list = BondList(atom_count, inter_bonds)
-    inter_bond_list = inter_bond_list[model_start : model_stop]
-    global_bond_list = inter_bond_list.merge(intra_bond_list)
-    return global_bond_list
\ No newline at end of file
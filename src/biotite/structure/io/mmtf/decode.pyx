@@ -21,96 +21,144 @@ ctypedef np.uint64_t uint64
 ctypedef np.float32_t float32
 
 
-def decode_array(int codec, bytes raw_bytes, int param):
+def decode_array(int codec, raw_bytes, int param, start=None, stop=None):
+    """
+    decode_array(codec, raw_bytes, param, start=None, stop=None)
+
+    Decode a MMTF binary encoded array.
+
+    Parameters
+    ----------
+    codec : int
+        The codec ID.
+    raw_bytes : bytes-like object
+        The encoded array without the 12-byte header.
+    param : int
+        The codec parameter.
+    start, stop : int, optional
+        If given, only the elements in this range of the decoded array
+        are returned.
+        Both values must be non-negative and `stop` must not exceed the
+        length of the decoded array.
+        Decoding stops as soon as the element at `stop` is reached and
+        pass-through encoded elements before `start` are skipped.
+
+    Returns
+    -------
+    array : ndarray
+        The decoded array.
+    """
     cdef np.ndarray array
+    cdef int first = 0 if start is None else start
+    cdef int last = -1 if stop is None else stop
     # Pass-through: 32-bit floating-point number array
     if   codec == 1:
-        array = np.frombuffer(raw_bytes, dtype=">f4").astype(np.float32)
-        return array
+        array = _frombuffer(raw_bytes, np.dtype(">f4"), first, last)
+        return array.astype(np.float32)
     # Pass-through: 8-bit signed integer array
     elif codec == 2:
-        array = np.frombuffer(raw_bytes, dtype=">i1").astype(np.int8)
-        return array
+        array = _frombuffer(raw_bytes, np.dtype(">i1"), first, last)
+        return array.astype(np.int8)
     # Pass-through: 16-bit signed integer array
     elif codec == 3:
-        array = np.frombuffer(raw_bytes, dtype=">i2").astype(np.int16)
-        return array
+        array = _frombuffer(raw_bytes, np.dtype(">i2"), first, last)
+        return array.astype(np.int16)
     # Pass-through: 32-bit signed integer array
     elif codec == 4:
-        array = np.frombuffer(raw_bytes, dtype=">i4").astype(np.int32)
-        return array
+        array = _frombuffer(raw_bytes, np.dtype(">i4"), first, last)
+        return array.astype(np.int32)
     # UTF8/ASCII fixed-length string array
     elif codec == 5:
-        array = np.frombuffer(raw_bytes, np.dtype("S" + str(param)))
+        array = _frombuffer(
+            raw_bytes, np.dtype("S" + str(param)), first, last
+        )
         return array.astype(np.dtype("U" + str(param)))
     # Run-length encoded character array
     elif codec == 6:
         array = np.frombuffer(raw_bytes, dtype=">i4").astype(np.int32)
-        return np.frombuffer(_decode_run_length(array), dtype="U1")
+        return np.frombuffer(
+            _decode_run_length(array, last)[first:], dtype="U1"
+        )
     # Run-length encoded 32-bit signed integer array
     elif codec == 7:
         array = np.frombuffer(raw_bytes, dtype=">i4").astype(np.int32)
-        return _decode_run_length(array)
+        return _decode_run_length(array, last)[first:]
     # Delta & run-length encoded 32-bit signed integer array
     elif codec == 8:
         array = np.frombuffer(raw_bytes, dtype=">i4").astype(np.int32)
         return _decode_delta(
-               _decode_run_length(array))
+               _decode_run_length(array, last))[first:]
     # Integer & run-length encoded 32-bit floating-point number array
     elif codec == 9:
         array = np.frombuffer(raw_bytes, dtype=">i4").astype(np.int32)
-        return _decode_integer(param, 
-               _decode_run_length(array))
+        return _decode_integer(param,
+               _decode_run_length(array, last)[first:])
     # Integer & delta encoded
     # & two-byte-packed 32-bit floating-point number array
     elif codec == 10:
         array = np.frombuffer(raw_bytes, dtype=">i2").astype(np.int16)
-        return _decode_integer(param, 
+        return _decode_integer(param,
                _decode_delta(
-               _decode_packed(array)))
+               _decode_packed(array, last))[first:])
     # Integer encoded 32-bit floating-point number array
     elif codec == 11:
-        array = np.frombuffer(raw_bytes, dtype=">i2").astype(np.int16)
-        return _decode_integer(param, array)
+        array = _frombuffer(raw_bytes, np.dtype(">i2"), first, last)
+        return _decode_integer(param, array.astype(np.int16))
     # Integer & two-byte-packed 32-bit floating-point number array
     elif codec == 12:
         array = np.frombuffer(raw_bytes, dtype=">i2").astype(np.int16)
-        return _decode_integer(param, 
-               _decode_packed(array))
+        return _decode_integer(param,
+               _decode_packed(array, last)[first:])
     # Integer & one-byte-packed 32-bit floating-point number array
     elif codec == 13:
         array = np.frombuffer(raw_bytes, dtype=">i1").astype(np.int8)
-        return _decode_integer(param, 
-               _decode_packed(array))
+        return _decode_integer(param,
+               _decode_packed(array, last)[first:])
     # Two-byte-packed 32-bit signed integer array
     elif codec == 14:
         array = np.frombuffer(raw_bytes, dtype=">i2").astype(np.int16)
-        return _decode_packed(array)
+        return _decode_packed(array, last)[first:]
     # One-byte-packed 32-bit signed integer array
     elif codec == 15:
         array = np.frombuffer(raw_bytes, dtype=">i1").astype(np.int8)
-        return _decode_packed(array)
+        return _decode_packed(array, last)[first:]
     else:
-        raise ValueError("Unknown codec with ID {codec}")
+        raise ValueError(f"Unknown codec with ID {codec}")
+
+
+def _frombuffer(raw_bytes, dtype, int start, int stop):
+    """
+    Read only the elements in the given range from the buffer.
+    A negative `stop` means the end of the buffer.
+    """
+    cdef int count = -1 if stop < 0 else stop - start
+    return np.frombuffer(
+        raw_bytes, dtype=dtype, count=count, offset=start * dtype.itemsize
+    )
 
 
 def _decode_delta(np.ndarray array):
     return np.cumsum(array, dtype=np.int32)
 
 
-def _decode_run_length(int32[:] array):
+def _decode_run_length(int32[:] array, int stop=-1):
     cdef int length = 0
     cdef int i, j
     cdef int value, repeat
     # Determine length of output array by summing the run lengths
     for i in range(1, array.shape[0], 2):
         length += array[i]
+    # A non-negative 'stop' truncates the output array
+    if stop >= 0 and stop < length:
+        length = stop
     cdef int32[:] output = np.zeros(length, dtype=np.int32)
     # Fill output array
     j = 0
     for i in range(0, array.shape[0], 2):
+        if j >= length:
+            break
         value = array[i]
-        repeat = array[i+1]
+        repeat = min(array[i+1], length - j)
         output[j : j+repeat] = value
         j += repeat
     return np.asarray(output)
@@ -119,7 +167,7 @@ def _decode_run_length(int32[:] array):
 ctypedef fused PackedType:
     int8
     int16
-def _decode_packed(PackedType[:] array):
+def _decode_packed(PackedType[:] array, int stop=-1):
     cdef int min_val, max_val
     if PackedType is int8:
         min_val = np.iinfo(np.int8).min
@@ -132,10 +180,16 @@ def _decode_packed(PackedType[:] array):
     # Pessimistic size assumption:
     # The maximum output array length is the input array length
     # in case all values are within the type limits
-    cdef int32[:] output = np.zeros(array.shape[0], dtype=np.int32)
+    cdef int length = array.shape[0]
+    # A non-negative 'stop' truncates the output array
+    if stop >= 0 and stop < length:
+        length = stop
+    cdef int32[:] output = np.zeros(length, dtype=np.int32)
     j = 0
     unpacked_val = 0
     for i in range(array.shape[0]):
+        if j >= length:
+            break
         packed_val = array[i]
         if packed_val == max_val or packed_val == min_val:
             unpacked_val += packed_val
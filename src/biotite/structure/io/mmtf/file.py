@@ -29,6 +29,9 @@ class MMTFFile(File, MutableMapping):
     If the dictionary value is an encoded array, the value automatically
     decoded.
     Decoded arrays are always returned as :class:`ndarray` instances.
+    Encoded arrays are kept in their binary form and are only decoded
+    when accessed.
+    :func:`get_array()` decodes only a range of an encoded array.
     
     Examples
     --------
@@ -171,6 +174,49 @@ class MMTFFile(File, MutableMapping):
         else:
             return None
     
+    def get_array(self, key, start=None, stop=None):
+        """
+        Obtain a range of elements from an MMTF encoded array.
+
+        In contrast to indexing the file object, only the part of the
+        encoded array up to `stop` is decoded.
+        Hence, obtaining for example the coordinates of a single model
+        is much cheaper than decoding the coordinates of all models.
+
+        Parameters
+        ----------
+        key : str
+            The key for the array.
+        start, stop : int, optional
+            The decoded array is sliced with these indices.
+            Negative values count from the end of the array.
+            By default, the entire array is returned.
+
+        Returns
+        -------
+        array : ndarray
+            The decoded array slice.
+            If the value is not encoded, the value is converted into an
+            :class:`ndarray` and sliced.
+
+        Examples
+        --------
+
+        >>> import os.path
+        >>> mmtf_file = MMTFFile.read(os.path.join(path_to_structures, "1l2y.mmtf"))
+        >>> print(mmtf_file.get_array("xCoordList", 0, 3))
+        [-8.901 -8.608 -7.117]
+        """
+        data = self._content[key]
+        if isinstance(data, bytes) and data[0] == 0:
+            codec, length, param = struct.unpack(">iii", data[0:12])
+            start, stop, _ = slice(start, stop).indices(length)
+            return decode_array(
+                codec, memoryview(data)[12:], param, start, max(start, stop)
+            )
+        else:
+            return np.asarray(data)[start:stop]
+    
     def set_array(self, key, array, codec, param=0):
         length = len(array)
         raw_bytes = encode_array(array, codec, param)
@@ -187,7 +233,8 @@ class MMTFFile(File, MutableMapping):
             codec     = struct.unpack(">i", data[0:4 ])[0]
             length    = struct.unpack(">i", data[4:8 ])[0]
             param     = struct.unpack(">i", data[8:12])[0]
-            raw_bytes = data[12:]
+            # Avoid copying the encoded data
+            raw_bytes = memoryview(data)[12:]
             return decode_array(codec, raw_bytes, param)
         else:
             return data
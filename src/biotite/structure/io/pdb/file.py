@@ -33,6 +33,8 @@ _atom_records = {"hetero"    : (0,  6),
                  "temp_f"    : (60, 66),
                  "element"   : (76, 78),
                  "charge"    : (78, 80),}
+# The maximum length of a record line
+_RECORD_LENGTH = 80
 
 
 class PDBFile(TextFile):
@@ -152,18 +154,7 @@ class PDBFile(TextFile):
         >>> print(new_stack == atom_array_stack)
         True
         """
-        # Line indices where a new model starts
-        model_start_i = np.array([i for i in range(len(self.lines))
-                                  if self.lines[i].startswith("MODEL")],
-                                 dtype=int)
-        # Line indices with ATOM or HETATM records
-        atom_line_i = np.array([i for i in range(len(self.lines)) if
-                                self.lines[i].startswith(("ATOM", "HETATM"))],
-                                dtype=int)
-        # Structures containing only one model may omit MODEL record
-        # In these cases model starting index is set to 0
-        if len(model_start_i) == 0:
-            model_start_i = np.array([0])
+        model_start_i, atom_line_i, _ = self._index_records()
         
         if model is None:
             depth = len(model_start_i)
@@ -171,48 +162,13 @@ class PDBFile(TextFile):
             coord_i = atom_line_i
         
         else:
-            last_model = len(model_start_i)
-            if model == 0:
-                raise ValueError("The model index must not be 0")
-            # Negative models mean index starting from last model
-            model = last_model + model + 1 if model < 0 else model
-
-            if model < last_model:
-                line_filter = ( ( atom_line_i >= model_start_i[model-1] ) &
-                                ( atom_line_i <  model_start_i[model  ] ) )
-            elif model == last_model:
-                line_filter = (atom_line_i >= model_start_i[model-1])
-            else:
-                raise ValueError(
-                    f"The file has {last_model} models, "
-                    f"the given model {model} does not exist"
-                )
-            coord_i = atom_line_i[line_filter]
-            length = len(coord_i)
+            coord_i = self._get_model_lines(model, model_start_i, atom_line_i)
         
-        # Fill in coordinates
+        records = self._get_atom_records(coord_i)
+        coord = _parse_coord(records)
         if model is None:
-            coord = np.zeros((depth, length, 3), dtype=np.float32)
-            m = 0
-            i = 0
-            for line_i in atom_line_i:
-                if m < len(model_start_i)-1 and line_i > model_start_i[m+1]:
-                    m += 1
-                    i = 0
-                line = self.lines[line_i]
-                coord[m,i,0] = float(line[30:38])
-                coord[m,i,1] = float(line[38:46])
-                coord[m,i,2] = float(line[46:54])
-                i += 1
-            return coord
-        
+            return coord.reshape(depth, length, 3)
         else:
-            coord = np.zeros((length, 3), dtype=np.float32)
-            for i, line_i in enumerate(coord_i):
-                line = self.lines[line_i]
-                coord[i,0] = float(line[30:38])
-                coord[i,1] = float(line[38:46])
-                coord[i,2] = float(line[46:54])
             return coord
 
 
@@ -256,18 +212,7 @@ class PDBFile(TextFile):
         array : AtomArray or AtomArrayStack
             The return type depends on the `model` parameter.
         """
-        # Line indices where a new model starts
-        model_start_i = np.array([i for i in range(len(self.lines))
-                                  if self.lines[i].startswith(("MODEL"))],
-                                 dtype=int)
-        # Line indices with ATOM or HETATM records
-        atom_line_i = np.array([i for i in range(len(self.lines)) if
-                                self.lines[i].startswith(("ATOM", "HETATM"))],
-                               dtype=int)
-        # Structures containing only one model may omit MODEL record
-        # In these cases model starting index is set to 0
-        if len(model_start_i) == 0:
-            model_start_i = np.array([0])
+        model_start_i, atom_line_i, box_line_i = self._index_records()
         
         if model is None:
             depth = len(model_start_i)
@@ -284,83 +229,41 @@ class PDBFile(TextFile):
             coord_i = atom_line_i
         
         else:
-            last_model = len(model_start_i)
-            if model == 0:
-                raise ValueError("The model index must not be 0")
-            # Negative models mean index starting from last model
-            model = last_model + model + 1 if model < 0 else model
-
-            if model < last_model:
-                line_filter = ( ( atom_line_i >= model_start_i[model-1] ) &
-                                ( atom_line_i <  model_start_i[model  ] ) )
-            elif model == last_model:
-                line_filter = (atom_line_i >= model_start_i[model-1])
-            else:
-                raise ValueError(
-                    f"The file has {last_model} models, "
-                    f"the given model {model} does not exist"
-                )
-            annot_i = coord_i = atom_line_i[line_filter]
+            annot_i = coord_i = self._get_model_lines(
+                model, model_start_i, atom_line_i
+            )
             array = AtomArray(len(coord_i))
         
-        # Create mandatory and optional annotation arrays
-        chain_id  = np.zeros(array.array_length(), array.chain_id.dtype)
-        res_id    = np.zeros(array.array_length(), array.res_id.dtype)
-        ins_code  = np.zeros(array.array_length(), array.ins_code.dtype)
-        res_name  = np.zeros(array.array_length(), array.res_name.dtype)
-        hetero    = np.zeros(array.array_length(), array.hetero.dtype)
-        atom_name = np.zeros(array.array_length(), array.atom_name.dtype)
-        element   = np.zeros(array.array_length(), array.element.dtype)
-
-        atom_id_raw = np.zeros(array.array_length(), "U5")
-        charge_raw  = np.zeros(array.array_length(), "U2")
-        occupancy = np.zeros(array.array_length(), float)
-        b_factor  = np.zeros(array.array_length(), float)
-
-        altloc_id = np.zeros(array.array_length(), dtype="U1")
-
-        # Fill annotation array
-        # i is index in array, line_i is line index
-        for i, line_i in enumerate(annot_i):
-            line = self.lines[line_i]
-            
-            chain_id[i] = line[21].upper().strip()
-            res_id[i] = decode_hybrid36(line[22:26])
-            ins_code[i] = line[26].strip()
-            res_name[i] = line[17:20].strip()
-            hetero[i] = (False if line[0:4] == "ATOM" else True)
-            atom_name[i] = line[12:16].strip()
-            element[i] = line[76:78].strip()
-
-            altloc_id[i] = line[16]
-
-            atom_id_raw[i] = line[6:11]
-            charge_raw[i] = line[78:80]
-            occupancy[i] = float(line[54:60].strip())
-            b_factor[i] = float(line[60:66].strip())
+        # Extract all annotation columns at once from a fixed-width
+        # character array of the ATOM/HETATM records
+        records = self._get_atom_records(annot_i)
+        chain_id  = np.char.upper(_parse_string(records, "chain_id"))
+        res_id    = _parse_int(records, "res_id")
+        ins_code  = _parse_string(records, "ins_code")
+        res_name  = _parse_string(records, "res_name")
+        hetero    = _parse_string(records, "hetero") != "ATOM"
+        atom_name = _parse_string(records, "atom_name")
+        element   = _parse_string(records, "element")
+
+        altloc_id = _parse_string(records, "alt_loc", strip=False)
+        
+        occupancy = _parse_float(records, "occupancy")
+        b_factor  = _parse_float(records, "temp_f")
         
         # Add annotation arrays to atom array (stack)
-        array.chain_id = chain_id
-        array.res_id = res_id
-        array.ins_code = ins_code
-        array.res_name = res_name
-        array.hetero = hetero
-        array.atom_name = atom_name
-        array.element = element
+        array.chain_id = chain_id.astype(array.chain_id.dtype)
+        array.res_id = res_id.astype(array.res_id.dtype)
+        array.ins_code = ins_code.astype(array.ins_code.dtype)
+        array.res_name = res_name.astype(array.res_name.dtype)
+        array.hetero = hetero.astype(array.hetero.dtype)
+        array.atom_name = atom_name.astype(array.atom_name.dtype)
+        array.element = element.astype(array.element.dtype)
 
         for field in (extra_fields if extra_fields is not None else []):
             if field == "atom_id":
-                array.set_annotation("atom_id", np.array(
-                    [decode_hybrid36(raw_id.item()) for raw_id in atom_id_raw],
-                    dtype=int
-                ))
+                array.set_annotation("atom_id", _parse_int(records, "atom_id"))
             elif field == "charge":
-                array.set_annotation("charge", np.array(
-                    [0 if raw_number == " " else
-                     (-float(raw_number) if sign == "-" else float(raw_number))
-                     for raw_number, sign in charge_raw],
-                    dtype=int
-                ))
+                array.set_annotation("charge", _parse_charge(records))
             elif field == "occupancy":
                 array.set_annotation("occupancy", occupancy)
             elif field == "b_factor":
@@ -381,47 +284,33 @@ class PDBFile(TextFile):
         
         # Fill in coordinates
         if isinstance(array, AtomArray):
-            for i, line_i in enumerate(coord_i):
-                line = self.lines[line_i]
-                array.coord[i,0] = float(line[30:38])
-                array.coord[i,1] = float(line[38:46])
-                array.coord[i,2] = float(line[46:54])
-                
+            array.coord = _parse_coord(records)
         elif isinstance(array, AtomArrayStack):
-            m = 0
-            i = 0
-            for line_i in atom_line_i:
-                if m < len(model_start_i)-1 and line_i > model_start_i[m+1]:
-                    m += 1
-                    i = 0
-                line = self.lines[line_i]
-                array.coord[m,i,0] = float(line[30:38])
-                array.coord[m,i,1] = float(line[38:46])
-                array.coord[m,i,2] = float(line[46:54])
-                i += 1
+            array.coord = _parse_coord(
+                self._get_atom_records(coord_i)
+            ).reshape(depth, length, 3)
 
         # Fill in box vectors
         # PDB does not support changing box dimensions. CRYST1 is a one-time
         # record so we can extract it directly
-        for line in self.lines:
-            if line.startswith("CRYST1"):
-                len_a = float(line[6:15])
-                len_b = float(line[15:24])
-                len_c = float(line[24:33])
-                alpha = np.deg2rad(float(line[33:40]))
-                beta = np.deg2rad(float(line[40:47]))
-                gamma = np.deg2rad(float(line[47:54]))
-                box = vectors_from_unitcell(
-                    len_a, len_b, len_c, alpha, beta, gamma
-                )
+        if box_line_i is not None:
+            line = self.lines[box_line_i]
+            len_a = float(line[6:15])
+            len_b = float(line[15:24])
+            len_c = float(line[24:33])
+            alpha = np.deg2rad(float(line[33:40]))
+            beta = np.deg2rad(float(line[40:47]))
+            gamma = np.deg2rad(float(line[47:54]))
+            box = vectors_from_unitcell(
+                len_a, len_b, len_c, alpha, beta, gamma
+            )
 
-                if isinstance(array, AtomArray):
-                    array.box = box
-                else:
-                    array.box = np.repeat(
-                        box[np.newaxis, ...], array.stack_depth(), axis=0
-                    )
-                break
+            if isinstance(array, AtomArray):
+                array.box = box
+            else:
+                array.box = np.repeat(
+                    box[np.newaxis, ...], array.stack_depth(), axis=0
+                )
 
         # Filter altloc IDs and return
         if altloc_id is None:
@@ -607,6 +496,71 @@ class PDBFile(TextFile):
                               "{:>7.2f}".format(np.rad2deg(unitcell[5])) +
                               " P 1           1")
 
+    def _index_records(self):
+        """
+        Find the line indices of all *MODEL* and *ATOM*/*HETATM* records
+        and the first *CRYST1* record in a single pass over the lines.
+        """
+        model_start_i = []
+        atom_line_i = []
+        box_line_i = None
+        for i, line in enumerate(self.lines):
+            if line.startswith(("ATOM", "HETATM")):
+                atom_line_i.append(i)
+            elif line.startswith("MODEL"):
+                model_start_i.append(i)
+            elif box_line_i is None and line.startswith("CRYST1"):
+                box_line_i = i
+        # Structures containing only one model may omit MODEL record
+        # In these cases model starting index is set to 0
+        if len(model_start_i) == 0:
+            model_start_i = [0]
+        return (
+            np.array(model_start_i, dtype=int),
+            np.array(atom_line_i, dtype=int),
+            box_line_i
+        )
+    
+    def _get_model_lines(self, model, model_start_i, atom_line_i):
+        """
+        Get the line indices of the *ATOM*/*HETATM* records that belong
+        to the given model number.
+        """
+        last_model = len(model_start_i)
+        if model == 0:
+            raise ValueError("The model index must not be 0")
+        # Negative models mean index starting from last model
+        model = last_model + model + 1 if model < 0 else model
+
+        if model < last_model:
+            line_filter = ( ( atom_line_i >= model_start_i[model-1] ) &
+                            ( atom_line_i <  model_start_i[model  ] ) )
+        elif model == last_model:
+            line_filter = (atom_line_i >= model_start_i[model-1])
+        else:
+            raise ValueError(
+                f"The file has {last_model} models, "
+                f"the given model {model} does not exist"
+            )
+        return atom_line_i[line_filter]
+    
+    def _get_atom_records(self, line_indices):
+        """
+        Get the lines at the given indices as fixed-width character
+        array, with one row per line and one column per character.
+        """
+        if len(line_indices) == 0:
+            return np.zeros((0, _RECORD_LENGTH), dtype=np.ubyte)
+        # Lines exceeding the record length are truncated,
+        # shorter lines are padded with null characters
+        records = np.array(
+            [self.lines[i] for i in line_indices],
+            dtype=f"S{_RECORD_LENGTH}"
+        ).view(np.ubyte).reshape(-1, _RECORD_LENGTH)
+        # Treat missing characters like whitespace
+        records[records == 0] = ord(" ")
+        return records
+
     def _get_model_length(self, model_start_i, atom_line_i):
         """
         Determine length of models and check that all models
@@ -628,4 +582,64 @@ class PDBFile(TextFile):
                     f"Model {model_i+1} has {model_length} atoms, "
                     f"but model 1 has {length} atoms, must be equal"
                 )
-        return length
\ No newline at end of file
+        return length
+
+
+def _get_columns(records, field):
+    """
+    Get the characters of a field in the given fixed-width record array
+    as byte strings.
+    """
+    columns = _atom_records[field]
+    start = columns[0]
+    stop = columns[1] if len(columns) > 1 else start + 1
+    return np.ascontiguousarray(records[:, start:stop]) \
+        .view(f"S{stop - start}")[:, 0]
+
+
+def _parse_string(records, field, strip=True):
+    strings = _get_columns(records, field).astype(str)
+    if strip:
+        return np.char.strip(strings)
+    else:
+        return strings
+
+
+def _parse_float(records, field):
+    return _get_columns(records, field).astype(float)
+
+
+def _parse_int(records, field):
+    """
+    Parse a field containing base-10 or hybrid-36 integers.
+    """
+    raw_values = _get_columns(records, field)
+    try:
+        return raw_values.astype(int)
+    except ValueError:
+        # Hybrid-36 encoded values cannot be parsed by NumPy
+        return np.array(
+            [decode_hybrid36(value.decode("ascii")) for value in raw_values],
+            dtype=int
+        )
+
+
+def _parse_charge(records):
+    # The charge is given as single digit followed by the sign
+    digit = _atom_records["charge"][0]
+    sign = digit + 1
+    digit_chars = records[:, digit].astype(int)
+    charge = np.where(
+        digit_chars == ord(" "), 0, digit_chars - ord("0")
+    )
+    charge[records[:, sign] == ord("-")] *= -1
+    return charge
+
+
+def _parse_coord(records):
+    coord = np.stack([
+        _parse_float(records, "coord_x"),
+        _parse_float(records, "coord_y"),
+        _parse_float(records, "coord_z"),
+    ], axis=-1)
+    return coord.astype(np.float32)
@@ -81,7 +81,7 @@ def get_model_count(file, data_block=None):
     model_count : int
         The number of models.
     """
-    atom_site_dict = file.get_category("atom_site", data_block)
+    atom_site_dict = file._get_category("atom_site", data_block)
     return len(_get_model_starts(atom_site_dict["pdbx_PDB_model_num"]))
 
 
@@ -157,7 +157,7 @@ def get_structure(pdbx_file, model=None, data_block=None, altloc="first",
     altloc = [] if altloc is None else altloc
     extra_fields = [] if extra_fields is None else extra_fields
     
-    atom_site_dict = pdbx_file.get_category("atom_site", data_block)
+    atom_site_dict = pdbx_file._get_category("atom_site", data_block)
     models = atom_site_dict["pdbx_PDB_model_num"]
     model_starts = _get_model_starts(models)
     model_count = len(model_starts)
@@ -6,11 +6,12 @@ __name__ = "biotite.structure.io.pdbx"
 __author__ = "Patrick Kunzmann"
 __all__ = ["PDBxFile"]
 
-import shlex
 import copy
 from collections.abc import MutableMapping
 import numpy as np
-from ....file import TextFile
+from ....file import TextFile, InvalidFileError
+from .tokenizer import index_categories, tokenize, gather_tokens, \
+                       TOKEN_BARE, TOKEN_TEXT_FIELD
 
 
 class PDBxFile(TextFile, MutableMapping):
@@ -23,7 +24,7 @@ class PDBxFile(TextFile, MutableMapping):
     The dictionary contains the entry
     (e.g. *label_entity_id* in *atom_site*) as key.
     The corresponding values are either strings in *non-looped*
-    categories, or 1-D numpy arrays of string objects in case of
+    categories, or 1-D numpy arrays of strings in case of
     *looped* categories.
     
     A category can be changed or added using :meth:`set_category()`:
@@ -47,6 +48,10 @@ class PDBxFile(TextFile, MutableMapping):
     the file only the line positions of all categories are checked. The
     time consuming task of dictionary creation is done when
     :meth:`get_category()` is called.
+    The values of a *looped* category are split into tokens in a single
+    pass and each column is directly copied into a fixed-width string
+    array, without creating an intermediate string object for each
+    value.
     
     Examples
     --------
@@ -108,54 +113,9 @@ class PDBxFile(TextFile, MutableMapping):
         if file.lines[-1] == "":
             del file.lines[-1]
         
-        current_data_block = ""
-        current_category = None
-        start = -1
-        stop = -1
-        is_loop = False
-        has_multiline_values = False
-        for i, line in enumerate(file.lines):
-            # Ignore empty and comment lines
-            if not _is_empty(line):
-                data_block_name = _data_block_name(line)
-                if data_block_name is not None:
-                    data_block = data_block_name
-                    # If new data block begins, reset category data
-                    current_category = None
-                    start = -1
-                    stop = -1
-                    is_loop = False
-                    has_multiline_values = False
-                
-                is_loop_in_line = _is_loop_start(line)
-                category_in_line = _get_category_name(line)
-                if is_loop_in_line or (category_in_line != current_category
-                                       and category_in_line is not None):
-                    # Start of a new category
-                    # Add an entry into the dictionary with the old category
-                    stop = i
-                    file._add_category(data_block, current_category, start,
-                                       stop, is_loop, has_multiline_values)
-                    # Track the new category
-                    if is_loop_in_line:
-                        # In case of lines with "loop_" the category is in the
-                        # next line
-                        category_in_line = _get_category_name(file.lines[i+1])
-                    is_loop = is_loop_in_line
-                    current_category = category_in_line
-                    start = i
-                    has_multiline_values = False
-                
-                multiline = _is_multi(line, is_loop)
-                if multiline:
-                    has_multiline_values = True
-        # Add the entry for the final category
-        # Since at the end of the file the end of the category
-        # is not determined by the start of a new one,
-        # this needs to be handled separately
-        stop = len(file.lines)
-        file._add_category(data_block, current_category, start,
-                           stop, is_loop, has_multiline_values)
+        for data_block, category, start, stop, is_loop \
+            in index_categories(file.lines):
+                file._add_category(data_block, category, start, stop, is_loop)
         return file
     
     
@@ -194,13 +154,29 @@ class PDBxFile(TextFile, MutableMapping):
             
         Returns
         -------
-        category_dict : dict of (str or ndarray, dtype=str) or None
+        category_dict : dict of (str or ndarray, dtype=object) or None
             A entry keyed dictionary. The corresponding values are
             strings or array of strings for *non-looped* and
             *looped* categories, respectively.
             Returns None, if the data block does not contain the given
             category.
         """
+        category_dict = self._get_category(category, block, expect_looped)
+        if category_dict is None:
+            return None
+        # Object arrays do not truncate longer strings, that are
+        # assigned to the returned arrays
+        return {
+            key: val.astype(object) if isinstance(val, np.ndarray) else val
+            for key, val in category_dict.items()
+        }
+    
+    
+    def _get_category(self, category, block=None, expect_looped=False):
+        """
+        Same as :meth:`get_category()`, but the arrays are fixed-width
+        string arrays, which are faster to process.
+        """
         if block is None:
             block = self.get_block_names()[0]
         category_info = self._categories.get((block, category))
@@ -209,58 +185,15 @@ class PDBxFile(TextFile, MutableMapping):
         start = category_info["start"]
         stop = category_info["stop"]
         is_loop = category_info["loop"]
-        is_multilined = category_info["multiline"]
-        
-        if is_multilined:
-            # Convert multiline values into singleline values
-            prelines = [line.strip() for line in self.lines[start:stop]
-                         if not _is_empty(line) and not _is_loop_start(line)]
-            lines = (len(prelines)) * [None]
-            # lines index
-            k = 0
-            # prelines index
-            i = 0
-            while i < len(prelines):
-                if prelines[i][0] == ";":
-                    # multiline values
-                    multi_line_str = prelines[i][1:]
-                    j = i+1
-                    while prelines[j] != ";":
-                        multi_line_str += prelines[j]
-                        j += 1
-                    lines[k-1] += " " + shlex.quote(multi_line_str)
-                    i = j+1
-                elif not is_loop and prelines[i][0] in ["'",'"']:
-                    # Singleline values where value is in the line
-                    # after the corresponding key
-                    lines[k-1] += " " + prelines[i]
-                    i += 1
-                else:    
-                    # Normal singleline value in the same row as the key
-                    lines[k] = prelines[i]
-                    i += 1
-                    k += 1
-            lines = [line for line in lines if line is not None]
-            
-        else:
-            lines = [line.strip() for line in self.lines[start:stop]
-                     if not _is_empty(line) and not _is_loop_start(line)]
-        
+
+        text = "\n".join(self.lines[start:stop]).encode("utf-8")
         if is_loop:
-            # Special optimization for "atom_site":
-            # Even if the values are quote protected,
-            # no whitespace is expected in escaped values
-            # Therefore slow shlex.split() call is not necessary
-            if category == "atom_site":
-                whitespace_values = False
-            else:
-                whitespace_values = True
-            category_dict = _process_looped(lines, whitespace_values)
+            category_dict = _process_looped(text)
         else:
-            category_dict = _process_singlevalued(lines)
+            category_dict = _process_singlevalued(text)
         
         if expect_looped and not is_loop:
-            category_dict = {key: np.array([val], dtype=object)
+            category_dict = {key: np.array([val])
                              for key, val in category_dict.items()}
 
         return category_dict
@@ -397,8 +330,6 @@ class PDBxFile(TextFile, MutableMapping):
             # Update category info
             category_info["start"] = category_start
             category_info["stop"] = category_start + len(newlines)
-            # When writing a category no multiline values are used
-            category_info["multiline"] = False
             category_info["loop"] = is_looped
         elif block in self.get_block_names():
             # Data block exists but not the category
@@ -414,7 +345,7 @@ class PDBxFile(TextFile, MutableMapping):
             len_diff = len(newlines)
             self.lines[category_start:category_start] = newlines
             self._add_category(block, category, category_start, category_stop,
-                               is_looped, is_multilined=False)
+                               is_looped)
         else:
             # The data block does not exist
             # Put the begin of data block in front of newlines
@@ -431,7 +362,7 @@ class PDBxFile(TextFile, MutableMapping):
             len_diff = len(newlines)-2
             self.lines[last_stop:last_stop] = newlines
             self._add_category(block, category, category_start, category_stop,
-                               is_looped, is_multilined=False)
+                               is_looped)
         # Update start and stop of all categories appearing after the
         # changed/added category
         for category_info in self._categories.values():
@@ -499,110 +430,76 @@ class PDBxFile(TextFile, MutableMapping):
             )
 
 
-    def _add_category(self, block, category_name,
-                      start, stop, is_loop, is_multilined):
-        # Before the first category starts,
-        # the current_category is None
-        # This is checked before adding an entry
-        if category_name is not None:
-            self._categories[
-                (block, category_name)] = {"start"     : start,
-                                           "stop"      : stop,
-                                           "loop"      : is_loop,
-                                           "multiline" : is_multilined}
-    
-    
-def _process_singlevalued(lines):
+    def _add_category(self, block, category_name, start, stop, is_loop):
+        self._categories[(block, category_name)] = {"start" : start,
+                                                    "stop"  : stop,
+                                                    "loop"  : is_loop}
+    
+    
+def _process_singlevalued(text):
+    starts, stops, kinds = tokenize(text)
+    keys = _find_keys(text, starts, kinds)
+    # Each key is followed by its value
+    value_i = np.flatnonzero(keys) + 1
+    if len(value_i) > 0 and value_i[-1] >= len(starts):
+        raise InvalidFileError("The last key in the category has no value")
     category_dict = {}
-    i = 0
-    while i < len(lines):
-        parts = shlex.split(lines[i])
-        key = parts[0].split(".")[1]
-        if len(parts) > 1:
-            value = parts[1]
-        else:
-            # The value is not in the same line,
-            # but in the following one
-            i += 1
-            value = shlex.split(lines[i])[0]
+    for key_i, i in zip(value_i - 1, value_i):
+        key = _get_key(text, starts[key_i], stops[key_i])
+        value = text[starts[i] : stops[i]].decode("utf-8")
+        if kinds[i] == TOKEN_TEXT_FIELD:
+            value = _join_text_field(value)
         category_dict[key] = value
-        i += 1
     return category_dict
 
 
-def _process_looped(lines, whitepace_values):
+def _process_looped(text):
+    starts, stops, kinds = tokenize(text)
+    keys = _find_keys(text, starts, kinds)
+    # The first token is 'loop_', followed by the keys
+    non_keys = np.flatnonzero(~keys[1:])
+    n_keys = non_keys[0] if len(non_keys) > 0 else len(keys) - 1
+    keys = [
+        _get_key(text, starts[i], stops[i]) for i in range(1, n_keys + 1)
+    ]
+    starts = starts[n_keys + 1:]
+    stops = stops[n_keys + 1:]
+    kinds = kinds[n_keys + 1:]
+    # Ignore values of an incomplete last row
+    n_rows = len(starts) // n_keys
+    starts = starts[:n_rows * n_keys].reshape(n_rows, n_keys)
+    stops = stops[:n_rows * n_keys].reshape(n_rows, n_keys)
+    kinds = kinds[:n_rows * n_keys].reshape(n_rows, n_keys)
+
     category_dict = {}
-    keys = []
-    # Array index
-    i = 0
-    # Dictionary key index
-    j = 0
-    for line in lines:
-        if line[0] == "_":
-            # Key line
-            key = line.split(".")[1]
-            keys.append(key)
-            # Pessimistic array allocation
-            # numpy array filled with strings
-            category_dict[key] = np.zeros(len(lines), dtype=object)
-            keys_length = len(keys)
-        else:
-            # If whitespace is expected in quote protected values,
-            # use standard shlex split
-            # Otherwise use much more faster whitespace split
-            # and quote removal if applicable,
-            # bypassing the slow shlex module 
-            if whitepace_values:
-                values = shlex.split(line)
-            else:
-                values = line.split()
-                for k in range(len(values)):
-                    # Remove quotes
-                    if ((values[k][0] == '"' and values[k][-1] == '"') or
-                        (values[k][0] == "'" and values[k][-1] == "'")):
-                            values[k] = values[k][1:-1]
-            for value in values:
-                category_dict[keys[j]][i] = value
-                j += 1
-                if j == keys_length:
-                    # If all keys have been filled with a value,
-                    # restart with first key with incremented index
-                    j = 0
-                    i += 1
-    for key in category_dict.keys():
-        # Trim to correct size
-        category_dict[key] = category_dict[key][:i]
+    for j, key in enumerate(keys):
+        column = gather_tokens(text, starts[:, j], stops[:, j])
+        for i in np.flatnonzero(kinds[:, j] == TOKEN_TEXT_FIELD):
+            column[i] = _join_text_field(column[i])
+        category_dict[key] = column
     return category_dict
-    
-
-def _is_empty(line):
-    return len(line) == 0 or line[0] == "#"
-
-
-def _data_block_name(line):
-    if line.startswith("data_"):
-        return line[5:]
-    else:
-        return None
-
 
-def _is_loop_start(line):
-    return line.startswith("loop_")
 
+def _find_keys(text, starts, kinds):
+    """
+    Get a boolean mask indicating which tokens are keys,
+    i.e. unquoted tokens starting with an underscore.
+    """
+    first_chars = np.frombuffer(text, dtype=np.uint8)[starts]
+    return (kinds == TOKEN_BARE) & (first_chars == ord("_"))
 
-def _is_multi(line, is_loop):
-    if is_loop:
-        return line[0] == ";"
-    else:
-        return line[0] in [";","'",'"']
 
+def _get_key(text, start, stop):
+    # Omit the category name
+    return text[start : stop].decode("utf-8").split(".")[1]
 
-def _get_category_name(line):
-    if line[0] != "_":
-        return None
-    else:
-        return line[1:line.find(".")]
 
+def _join_text_field(value):
+    """
+    Convert a multi-line text field value into a single-line value.
+    """
+    return "".join([line.strip() for line in value.split("\n")])
+    
 
 def _quote(value):
     if "'" in value:
@@ -0,0 +1,297 @@
+# This source code is part of the Biotite package and is distributed
+# under the 3-Clause BSD License. Please see 'LICENSE.rst' for further
+# information.
+
+"""
+Low-level parsing functions for the PDBx/mmCIF format.
+"""
+
+__name__ = "biotite.structure.io.pdbx"
+__author__ = "Patrick Kunzmann"
+__all__ = ["index_categories", "tokenize", "gather_tokens",
+           "TOKEN_BARE", "TOKEN_QUOTED", "TOKEN_TEXT_FIELD"]
+
+cimport cython
+cimport numpy as np
+
+import numpy as np
+
+ctypedef np.int64_t int64
+ctypedef np.uint8_t uint8
+
+
+# Token kinds
+TOKEN_BARE = 0
+TOKEN_QUOTED = 1
+TOKEN_TEXT_FIELD = 2
+
+cdef unsigned char _NEWLINE = ord("\n")
+cdef unsigned char _CR = ord("\r")
+cdef unsigned char _SPACE = ord(" ")
+cdef unsigned char _TAB = ord("\t")
+cdef unsigned char _SEMICOLON = ord(";")
+cdef unsigned char _HASH = ord("#")
+cdef unsigned char _SINGLE_QUOTE = ord("'")
+cdef unsigned char _DOUBLE_QUOTE = ord('"')
+
+
+cdef inline bint _is_whitespace(unsigned char c):
+    return c == _SPACE or c == _TAB or c == _NEWLINE or c == _CR
+
+
+def index_categories(list lines):
+    """
+    Find the data blocks and categories in the lines of a PDBx/mmCIF
+    file in a single pass.
+
+    Lines within multi-line text fields are skipped, so that their
+    content is not mistaken for a category.
+
+    Parameters
+    ----------
+    lines : list of str
+        The lines of the file.
+
+    Returns
+    -------
+    categories : list of tuple(str, str, int, int, bool)
+        For each category the data block, the category name, the start
+        and exclusive stop line and whether the category is looped.
+    """
+    cdef int i
+    cdef int n_lines = len(lines)
+    cdef str line
+    cdef bint in_text_field = False
+    cdef bint is_loop = False
+    cdef bint is_loop_in_line
+    cdef int start = -1
+
+    categories = []
+    data_block = ""
+    current_category = None
+    for i in range(n_lines):
+        line = lines[i]
+        if len(line) == 0:
+            continue
+        if line[0] == ";":
+            # Start or end of a multi-line text field
+            in_text_field = not in_text_field
+            continue
+        if in_text_field or line[0] == "#":
+            continue
+
+        if line.startswith("data_"):
+            # If new data block begins, finish previous category
+            if current_category is not None:
+                categories.append(
+                    (data_block, current_category, start, i, is_loop)
+                )
+            data_block = line[5:]
+            current_category = None
+            is_loop = False
+            continue
+
+        is_loop_in_line = line.startswith("loop_")
+        if is_loop_in_line:
+            # In case of lines with "loop_" the category is in the
+            # next line
+            if i + 1 < n_lines:
+                category_in_line = _get_category_name(lines[i+1])
+            else:
+                category_in_line = None
+        else:
+            category_in_line = _get_category_name(line)
+        if is_loop_in_line or (
+            category_in_line is not None
+            and category_in_line != current_category
+        ):
+            # Start of a new category
+            if current_category is not None:
+                categories.append(
+                    (data_block, current_category, start, i, is_loop)
+                )
+            is_loop = is_loop_in_line
+            current_category = category_in_line
+            start = i
+    # Since at the end of the file the end of the category
+    # is not determined by the start of a new one,
+    # this needs to be handled separately
+    if current_category is not None:
+        categories.append(
+            (data_block, current_category, start, n_lines, is_loop)
+        )
+    return categories
+
+
+cdef _get_category_name(str line):
+    if len(line) == 0 or line[0] != "_":
+        return None
+    else:
+        return line[1 : line.find(".")]
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def tokenize(const unsigned char[:] text):
+    """
+    Split the content of a PDBx/mmCIF category into tokens.
+
+    Tokens are separated by whitespace.
+    A token may be enclosed in single or double quotes, in which case
+    it ends at the first matching quote that is followed by whitespace.
+    A line starting with ``;`` begins a multi-line text field, that
+    ends at the next line starting with ``;``.
+    Comments are ignored.
+
+    Parameters
+    ----------
+    text : ndarray, dtype=np.uint8
+        The UTF-8 encoded text.
+
+    Returns
+    -------
+    starts, stops : ndarray, dtype=np.int64
+        The start and exclusive stop position of each token in `text`.
+        Enclosing quotes and ``;`` characters are excluded.
+    kinds : ndarray, dtype=np.uint8
+        The kind of each token, i.e. ``TOKEN_BARE``, ``TOKEN_QUOTED``
+        or ``TOKEN_TEXT_FIELD``.
+    """
+    cdef int64 n = text.shape[0]
+    cdef int64 capacity = 1024
+    cdef int64 n_tokens = 0
+    cdef int64 i = 0
+    cdef int64 j
+    cdef unsigned char c
+    cdef uint8 kind
+    cdef int64 token_start, token_stop
+    cdef bint at_line_start = True
+
+    starts = np.zeros(capacity, dtype=np.int64)
+    stops = np.zeros(capacity, dtype=np.int64)
+    kinds = np.zeros(capacity, dtype=np.uint8)
+    cdef int64[:] starts_v = starts
+    cdef int64[:] stops_v = stops
+    cdef uint8[:] kinds_v = kinds
+
+    while i < n:
+        c = text[i]
+        if c == _NEWLINE:
+            at_line_start = True
+            i += 1
+            continue
+        if _is_whitespace(c):
+            at_line_start = False
+            i += 1
+            continue
+
+        if at_line_start and c == _SEMICOLON:
+            # Multi-line text field,
+            # terminated by a semicolon at the start of a line
+            kind = TOKEN_TEXT_FIELD
+            token_start = i + 1
+            j = token_start
+            while j < n and not (
+                text[j] == _SEMICOLON and text[j-1] == _NEWLINE
+            ):
+                j += 1
+            token_stop = j
+            # Skip the terminating semicolon
+            i = j + 1
+        elif c == _HASH:
+            # Comment -> skip remaining line
+            while i < n and text[i] != _NEWLINE:
+                i += 1
+            continue
+        elif c == _SINGLE_QUOTE or c == _DOUBLE_QUOTE:
+            # The closing quote must be followed by whitespace,
+            # otherwise it is part of the value
+            kind = TOKEN_QUOTED
+            token_start = i + 1
+            j = token_start
+            while j < n and not (
+                text[j] == c and (j + 1 == n or _is_whitespace(text[j+1]))
+            ):
+                j += 1
+            token_stop = j
+            i = j + 1
+        else:
+            kind = TOKEN_BARE
+            token_start = i
+            j = i
+            while j < n and not _is_whitespace(text[j]):
+                j += 1
+            token_stop = j
+            i = j
+        at_line_start = False
+
+        if n_tokens == capacity:
+            capacity *= 2
+            starts = np.resize(starts, capacity)
+            stops = np.resize(stops, capacity)
+            kinds = np.resize(kinds, capacity)
+            starts_v = starts
+            stops_v = stops
+            kinds_v = kinds
+        starts_v[n_tokens] = token_start
+        stops_v[n_tokens] = token_stop
+        kinds_v[n_tokens] = kind
+        n_tokens += 1
+
+    return starts[:n_tokens], stops[:n_tokens], kinds[:n_tokens]
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def gather_tokens(const unsigned char[:] text,
+                  const int64[:] starts, const int64[:] stops):
+    """
+    Copy the given tokens into a fixed-width string array.
+
+    Parameters
+    ----------
+    text : ndarray, dtype=np.uint8
+        The UTF-8 encoded text.
+    starts, stops : ndarray, dtype=np.int64
+        The start and exclusive stop position of each token in `text`.
+
+    Returns
+    -------
+    tokens : ndarray, dtype=str
+        The tokens.
+        The width of the array is the length of the longest token.
+    """
+    cdef int64 i, j
+    cdef int64 n_tokens = starts.shape[0]
+    cdef int64 width = 1
+    cdef int64 length
+    cdef unsigned char c
+
+    for i in range(n_tokens):
+        length = stops[i] - starts[i]
+        if length > width:
+            width = length
+
+    # For ASCII characters the Unicode code point is equal to the byte
+    # value, hence the characters can be copied directly
+    tokens = np.zeros((n_tokens, width), dtype=np.uint32)
+    cdef np.uint32_t[:,:] tokens_v = tokens
+    for i in range(n_tokens):
+        for j in range(stops[i] - starts[i]):
+            c = text[starts[i] + j]
+            if c >= 128:
+                return _gather_non_ascii_tokens(text, starts, stops, width)
+            tokens_v[i, j] = c
+    return tokens.view(f"U{width}")[:, 0]
+
+
+def _gather_non_ascii_tokens(const unsigned char[:] text,
+                             const int64[:] starts, const int64[:] stops,
+                             int64 width):
+    cdef int64 i, j
+    tokens = np.zeros((starts.shape[0], width), dtype=np.uint8)
+    cdef uint8[:,:] tokens_v = tokens
+    for i in range(starts.shape[0]):
+        for j in range(stops[i] - starts[i]):
+            tokens_v[i, j] = text[starts[i] + j]
+    return np.char.decode(tokens.view(f"S{width}")[:, 0], "utf-8")
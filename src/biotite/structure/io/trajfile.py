@@ -4,12 +4,13 @@
 
 __name__ = "biotite.structure.io"
 __author__ = "Patrick Kunzmann"
-__all__ = ["TrajectoryFile"]
+__all__ = ["TrajectoryFile", "FrameReader"]
 
 import abc
+import os
 import numpy as np
 from ..atoms import AtomArray, AtomArrayStack, stack, from_template
-from ...file import File
+from ...file import File, InvalidFileError
 
 
 class TrajectoryFile(File, metaclass=abc.ABCMeta):
@@ -21,9 +22,19 @@ class TrajectoryFile(File, metaclass=abc.ABCMeta):
     frames. The file formats are usually binary and involve sometimes
     heavy compression, so that a large number of frames can be stored
     in relatively small space.
-    Since all :class:`TrajectoryFile` subclasses interface *MDtraj*
-    trajectory file classes, `MDtraj` must be installed to use any of
-    them.
+    Writing trajectory files is performed by the *MDtraj* trajectory
+    file classes, so `MDtraj` must be installed for this purpose.
+    Subclasses may provide a native reader via :func:`reader_type()`
+    (*XTC*, *TRR* and *DCD*), otherwise `MDtraj` is also required for
+    reading.
+
+    A native reader indexes the position of each frame in the file
+    first, so that a frame can be accessed without parsing the
+    preceding frames.
+    Hence, the `start`, `stop` and `step` parameters of the reading
+    methods do not require to read the skipped frames.
+    Where the file layout allows it, the coordinates are directly
+    memory-mapped from the file instead of being copied.
 
     Notes
     -----
@@ -84,6 +95,9 @@ class TrajectoryFile(File, metaclass=abc.ABCMeta):
             Although lower values can decrease the memory consumption of
             reading trajectories, they also increase the computation
             time.
+            This parameter has no effect for formats with a native
+            reader, as these read the frames directly into the
+            output arrays.
         
         Returns
         -------
@@ -102,6 +116,34 @@ class TrajectoryFile(File, metaclass=abc.ABCMeta):
             if step is not None and chunk_size % step != 0:
                 chunk_size = ((chunk_size // step) + 1) * step
 
+        reader_type = cls.reader_type()
+        if reader_type is not None:
+            reader = reader_type(file_name)
+            coord, box, time = reader.read(
+                reader.select_frames(start, stop, step), atom_i
+            )
+        else:
+            result = cls._read_mdtraj(
+                file_name, start, stop, step, atom_i, chunk_size
+            )
+            # nm to Angstrom
+            coord, box, time = cls.process_read_values(result)
+        file.set_coord(coord)
+        file.set_box(box)
+        file.set_time(time)
+
+        return file
+    
+
+    @classmethod
+    def _read_mdtraj(cls, file_name, start, stop, step, atom_i, chunk_size):
+        """
+        Read the selected frames using the respective `MDtraj` file
+        class.
+
+        Returns the return value of the :func:`read()` method of the
+        `MDtraj` file class.
+        """
         traj_type = cls.traj_type()
         with traj_type(file_name, "r") as f:
             
@@ -137,14 +179,7 @@ class TrajectoryFile(File, metaclass=abc.ABCMeta):
                 result = TrajectoryFile._read_chunk_wise(
                     f, n_frames, step, atom_i, chunk_size, discard=False
                 )
-        
-        # nm to Angstrom
-        coord, box, time = cls.process_read_values(result)
-        file.set_coord(coord)
-        file.set_box(box)
-        file.set_time(time)
-
-        return file
+        return result
     
 
     @classmethod
@@ -186,11 +221,22 @@ class TrajectoryFile(File, metaclass=abc.ABCMeta):
         See also
         --------
         read_iter_structure
-        
-        Notes
-        -----
-        The `step` parameter does currently not work for *DCD* files.
         """
+        reader_type = cls.reader_type()
+        if reader_type is not None:
+            reader = reader_type(file_name)
+            frames = reader.select_frames(start, stop, step)
+            for i in range(len(frames)):
+                coord, box, time = reader.read(frames[i : i+1], atom_i)
+                # Only one frame
+                # -> only one element in first dimension
+                # -> remove first dimension
+                coord = coord[0]
+                box = box[0] if box is not None else None
+                time = float(time[0]) if time is not None else None
+                yield coord, box, time
+            return
+
         traj_type = cls.traj_type()
         with traj_type(file_name, "r") as f:
             
@@ -290,8 +336,6 @@ class TrajectoryFile(File, metaclass=abc.ABCMeta):
         frame.
         If a higher efficiency is required, please use the
         :func:`read_iter()` function.
-
-        The `step` parameter does currently not work for *DCD* files.
         """
         if isinstance(template, AtomArrayStack):
             template = template[0]
@@ -485,6 +529,24 @@ class TrajectoryFile(File, metaclass=abc.ABCMeta):
         pass
     
 
+    @classmethod
+    def reader_type(cls):
+        """
+        The native reader class to be used for reading the file.
+
+        PROTECTED: Override when inheriting, if the format can be read
+        without `MDtraj`.
+
+        Returns
+        -------
+        class or None
+            A subclass of :class:`FrameReader`.
+            By default, ``None`` is returned, meaning that the file is
+            read via :func:`traj_type()`.
+        """
+        return None
+    
+
     @classmethod
     @abc.abstractmethod
     def process_read_values(cls, read_values):
@@ -616,4 +678,145 @@ class TrajectoryFile(File, metaclass=abc.ABCMeta):
                     result[i] = None
             return tuple(result)
         else:
-            return None
\ No newline at end of file
+            return None
+
+
+
+class FrameReader(metaclass=abc.ABCMeta):
+    """
+    Base class for native trajectory readers, that do not require
+    `MDtraj`.
+
+    On construction, the file is memory-mapped and the byte offset of
+    each frame is indexed.
+    Afterwards, any frame can be accessed directly without parsing the
+    preceding frames.
+
+    The mapping is copy-on-write:
+    Arrays returned by :func:`read()` may be views into the mapped
+    file, but modifying them does not alter the file.
+
+    PROTECTED: Inherit and override :func:`_index()` and
+    :func:`read()`.
+
+    Parameters
+    ----------
+    file_name : str
+        The path of the file to be read.
+    """
+
+    def __init__(self, file_name):
+        if os.path.getsize(file_name) == 0:
+            raise InvalidFileError("The trajectory file is empty")
+        self._buffer = np.memmap(file_name, dtype=np.uint8, mode="c")
+        self._offsets = self._index()
+
+    @property
+    def n_frames(self):
+        return len(self._offsets)
+
+    def select_frames(self, start=None, stop=None, step=None):
+        """
+        Get the indices of the frames in the given range.
+
+        Parameters
+        ----------
+        start, stop, step : int, optional
+            The slice parameters.
+
+        Returns
+        -------
+        frames : ndarray, dtype=int
+            The selected frame indices.
+        """
+        return np.arange(self.n_frames)[start : stop : step]
+
+    @abc.abstractmethod
+    def _index(self):
+        """
+        Find the byte offset of each frame in the buffer.
+
+        Returns
+        -------
+        offsets : ndarray, dtype=np.int64
+            The start position of each frame.
+        """
+        pass
+
+    @abc.abstractmethod
+    def read(self, frames, atom_i=None):
+        """
+        Read the given frames.
+
+        Parameters
+        ----------
+        frames : ndarray, dtype=int
+            The indices of the frames to be read.
+        atom_i : ndarray, dtype=int, optional
+            If this parameter is set, only the atoms at the given
+            indices are read from each frame.
+
+        Returns
+        -------
+        coord : ndarray, dtype=float32, shape=(m,n,3)
+            The atom coordinates in Å for each frame.
+        box : ndarray, dtype=float32, shape=(m,3,3) or None
+            The box vectors in Å for each frame.
+        time : ndarray, dtype=float32, shape=(m,) or None
+            The simulation time in ps for each frame.
+        """
+        pass
+
+    def _view(self, positions, dtype, shape, strides=None):
+        """
+        Create an array from data at the given byte positions, one for
+        each frame.
+
+        If the positions are equidistant, the returned array is a view
+        into the mapped file, otherwise the data is copied.
+
+        Parameters
+        ----------
+        positions : ndarray, dtype=np.int64, shape=(m,)
+            The byte position of the data in each frame.
+        dtype : dtype
+            The data type of the data in the file.
+        shape : tuple of int
+            The shape of the data in each frame.
+        strides : tuple of int, optional
+            The strides of the data in each frame.
+            By default, the data is C-contiguous.
+
+        Returns
+        -------
+        array : ndarray, dtype=dtype, shape=(m, ...)
+            The data for each frame.
+        """
+        dtype = np.dtype(dtype)
+        if strides is None:
+            strides = np.empty(shape, dtype=dtype).strides
+        if len(positions) == 0:
+            return np.zeros((0,) + tuple(shape), dtype=dtype)
+        for position in (positions[0], positions[-1]):
+            end = position + np.sum((np.array(shape) - 1) * strides) \
+                  + dtype.itemsize
+            if position < 0 or end > len(self._buffer):
+                raise InvalidFileError("The trajectory file is truncated")
+
+        distances = np.diff(positions)
+        if len(positions) == 1 or (
+            distances[0] > 0 and (distances == distances[0]).all()
+        ):
+            frame_stride = distances[0] if len(positions) > 1 else 0
+            return np.ndarray(
+                (len(positions),) + tuple(shape), dtype, self._buffer,
+                offset=positions[0], strides=(frame_stride,) + tuple(strides)
+            )
+        else:
+            return np.stack([
+                np.ndarray(
+                    shape, dtype, self._buffer,
+                    offset=position, strides=strides
+                )
+                for position in positions
+            ])
@@ -6,8 +6,15 @@ __name__ = "biotite.structure.io.trr"
 __author__ = "Patrick Kunzmann"
 __all__ = ["TRRFile"]
 
+import struct
 import numpy as np
-from ..trajfile import TrajectoryFile
+from ..trajfile import TrajectoryFile, FrameReader
+from ....file import InvalidFileError
+
+
+_MAGIC = 1993
+# Number of integers in the header that follow the version string
+_N_HEADER_INTS = 13
 
 
 class TRRFile(TrajectoryFile):
@@ -20,6 +27,10 @@ class TRRFile(TrajectoryFile):
         import mdtraj.formats as traj
         return traj.TRRTrajectoryFile
     
+    @classmethod
+    def reader_type(cls):
+        return _TRRReader
+
     @classmethod
     def process_read_values(cls, read_values):
         # nm to Angstrom
@@ -44,3 +55,132 @@ class TRRFile(TrajectoryFile):
             "box"  : box,
             "time" : time,
         }
+
+
+
+class _TRRReader(FrameReader):
+    """
+    Native reader for TRR files.
+
+    Frames without box or coordinates are filled with *NaN* values.
+    """
+
+    def _index(self):
+        buffer = self._buffer
+        offsets = []
+        time_positions = []
+        box_positions = []
+        coord_positions = []
+        self._n_atoms = None
+        self._dtype = None
+        position = 0
+        while position < len(buffer):
+            if position + 12 > len(buffer):
+                raise InvalidFileError("The TRR file is truncated")
+            magic, _, string_length = struct.unpack_from(
+                ">iii", buffer, position
+            )
+            if magic != _MAGIC:
+                raise InvalidFileError(
+                    f"Expected magic number {_MAGIC} at byte {position}, "
+                    f"but got {magic}"
+                )
+            # Skip the version string, that is padded to 4 bytes
+            header_position = position + 12 + -(-string_length // 4) * 4
+            if header_position + _N_HEADER_INTS * 4 > len(buffer):
+                raise InvalidFileError("The TRR file is truncated")
+            (
+                _, _, box_size, vir_size, pres_size, _, _,
+                x_size, v_size, f_size, n_atoms, _, _
+            ) = struct.unpack_from(
+                f">{_N_HEADER_INTS}i", buffer, header_position
+            )
+
+            if self._n_atoms is None:
+                self._n_atoms = n_atoms
+            elif n_atoms != self._n_atoms:
+                raise InvalidFileError(
+                    "The number of atoms differs between frames"
+                )
+            # The floating point precision is only implicitly given
+            # by the size of the data blocks
+            if box_size != 0:
+                real_size = box_size // 9
+            elif x_size != 0:
+                real_size = x_size // (n_atoms * 3)
+            elif v_size != 0:
+                real_size = v_size // (n_atoms * 3)
+            elif f_size != 0:
+                real_size = f_size // (n_atoms * 3)
+            else:
+                real_size = None
+            if real_size is not None:
+                if real_size not in (4, 8):
+                    raise InvalidFileError(
+                        f"Invalid floating point size of {real_size} bytes"
+                    )
+                if self._dtype is None:
+                    self._dtype = np.dtype(f">f{real_size}")
+                elif self._dtype.itemsize != real_size:
+                    raise InvalidFileError(
+                        "The floating point precision differs between frames"
+                    )
+            else:
+                real_size = self._dtype.itemsize \
+                            if self._dtype is not None else 4
+
+            # Time and lambda value follow the integers
+            time_position = header_position + _N_HEADER_INTS * 4
+            data_position = time_position + 2 * real_size
+            offsets.append(position)
+            time_positions.append(time_position)
+            box_positions.append(data_position if box_size != 0 else -1)
+            coord_positions.append(
+                data_position + box_size + vir_size + pres_size
+                if x_size != 0 else -1
+            )
+            position = data_position + box_size + vir_size + pres_size \
+                       + x_size + v_size + f_size
+        if position > len(buffer):
+            raise InvalidFileError("The TRR file is truncated")
+
+        if self._dtype is None:
+            self._dtype = np.dtype(">f4")
+        self._time_positions = np.array(time_positions, dtype=np.int64)
+        self._box_positions = np.array(box_positions, dtype=np.int64)
+        self._coord_positions = np.array(coord_positions, dtype=np.int64)
+        return np.array(offsets, dtype=np.int64)
+
+    def read(self, frames, atom_i=None):
+        time = self._view(self._time_positions[frames], self._dtype, ()) \
+               .astype(np.float32)
+        box = self._read_optional(self._box_positions[frames], (3, 3))
+        coord = self._read_optional(
+            self._coord_positions[frames], (self._n_atoms, 3), atom_i
+        )
+        if box is not None and np.isnan(box).all():
+            box = None
+        return coord, box, time
+
+    def _read_optional(self, positions, shape, atom_i=None):
+        """
+        Read data, that is not necessarily present in each frame,
+        and convert it from nm to Å.
+        """
+        present = positions >= 0
+        if present.all():
+            data = self._view(positions, self._dtype, shape)
+            if atom_i is not None:
+                data = data[:, atom_i]
+        else:
+            data = np.full(
+                (len(positions),) + shape, np.nan, dtype=np.float32
+            )
+            if atom_i is not None:
+                data = data[:, atom_i]
+            present_data = self._view(positions[present], self._dtype, shape)
+            if atom_i is not None:
+                present_data = present_data[:, atom_i]
+            data[present] = present_data
+        # nm to Angstrom
+        return (data * 10).astype(np.float32, copy=False)
@@ -0,0 +1,321 @@
+# This source code is part of the Biotite package and is distributed
+# under the 3-Clause BSD License. Please see 'LICENSE.rst' for further
+# information.
+
+"""
+Decompression of the coordinates in *Gromacs* XTC files.
+
+The algorithm follows the ``xdr3dfcoord()`` function of the *xdrfile*
+library.
+"""
+
+__name__ = "biotite.structure.io.xtc"
+__author__ = "Patrick Kunzmann"
+__all__ = ["decompress_coord"]
+
+cimport cython
+cimport numpy as np
+
+import numpy as np
+from ....file import InvalidFileError
+
+ctypedef np.int64_t int64
+ctypedef np.uint8_t uint8
+ctypedef np.float32_t float32
+
+
+cdef int _FIRST_INDEX = 9
+cdef int _N_MAGIC_INTS = 73
+cdef int[73] _MAGIC_INTS
+_MAGIC_INTS[:] = [
+    0, 0, 0, 0, 0, 0, 0, 0, 0,
+    8, 10, 12, 16, 20, 25, 32, 40, 50, 64,
+    80, 101, 128, 161, 203, 256, 322, 406, 512, 645,
+    812, 1024, 1290, 1625, 2048, 2580, 3250, 4096, 5060, 6501,
+    8192, 10321, 13003, 16384, 20642, 26007, 32768, 41285, 52015, 65536,
+    82570, 104031, 131072, 165140, 208063, 262144, 330280, 416127, 524287,
+    660561, 832255, 1048576, 1321122, 1664510, 2097152, 2642245, 3329021,
+    4194304, 5284491, 6658042, 8388607, 10568983, 13316085, 16777216
+]
+
+
+cdef struct _BitReader:
+    const uint8* data
+    int64 length
+    int64 count
+    unsigned int last_bits
+    unsigned int last_byte
+    bint overflow
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def decompress_coord(const uint8[:] buffer, int64 position,
+                     float32[:,:] coord):
+    """
+    Decompress the coordinates of a single XTC frame.
+
+    Parameters
+    ----------
+    buffer : ndarray, dtype=np.uint8
+        The content of the XTC file.
+    position : int
+        The position of the compressed coordinate block, i.e. the
+        position of the precision value behind the atom count.
+    coord : ndarray, dtype=np.float32, shape=(n,3)
+        The decompressed coordinates in *nm* are written into this
+        array.
+        The number of atoms is determined from its length.
+    """
+    cdef int d, k
+    cdef int64 n_atoms = coord.shape[0]
+    cdef int min_int[3]
+    cdef int max_int[3]
+    cdef unsigned int size_int[3]
+    cdef int bit_size_int[3]
+    cdef unsigned int size_small[3]
+    cdef int this_coord[3]
+    cdef int prev_coord[3]
+    cdef int bit_size, small_index, smaller, small_num
+    cdef int flag, run, is_smaller, tmp
+    cdef int64 atom_i
+    cdef float precision, inv_precision
+    cdef int64 byte_count
+    cdef _BitReader reader
+
+    if position + 36 > buffer.shape[0]:
+        raise InvalidFileError("The XTC file is truncated")
+    precision = _read_float(buffer, position)
+    for d in range(3):
+        min_int[d] = _read_int(buffer, position + 4 + 4*d)
+        max_int[d] = _read_int(buffer, position + 16 + 4*d)
+    small_index = _read_int(buffer, position + 28)
+    byte_count = <unsigned int> _read_int(buffer, position + 32)
+    if position + 36 + byte_count > buffer.shape[0]:
+        raise InvalidFileError("The XTC file is truncated")
+    if small_index < _FIRST_INDEX or small_index >= _N_MAGIC_INTS:
+        raise InvalidFileError("Invalid compression parameters")
+
+    for d in range(3):
+        size_int[d] = max_int[d] - min_int[d] + 1
+    # For large ranges each coordinate is stored separately
+    if (size_int[0] | size_int[1] | size_int[2]) > 0xffffff:
+        for d in range(3):
+            bit_size_int[d] = _size_of_int(size_int[d])
+        bit_size = 0
+    else:
+        bit_size = _size_of_ints(size_int)
+
+    smaller = _MAGIC_INTS[max(_FIRST_INDEX, small_index - 1)] // 2
+    small_num = _MAGIC_INTS[small_index] // 2
+    for d in range(3):
+        size_small[d] = _MAGIC_INTS[small_index]
+
+    reader.data = &buffer[position + 36] if byte_count > 0 else NULL
+    reader.length = byte_count
+    reader.count = 0
+    reader.last_bits = 0
+    reader.last_byte = 0
+    reader.overflow = False
+
+    inv_precision = 1.0 / precision
+    atom_i = 0
+    run = 0
+    while atom_i < n_atoms:
+        if bit_size == 0:
+            for d in range(3):
+                this_coord[d] = _receive_bits(&reader, bit_size_int[d])
+        else:
+            _receive_ints(&reader, bit_size, size_int, this_coord)
+        for d in range(3):
+            this_coord[d] += min_int[d]
+            prev_coord[d] = this_coord[d]
+
+        flag = _receive_bits(&reader, 1)
+        is_smaller = 0
+        if flag == 1:
+            run = _receive_bits(&reader, 5)
+            is_smaller = run % 3
+            run -= is_smaller
+            is_smaller -= 1
+        if atom_i + 1 + run // 3 > n_atoms:
+            raise InvalidFileError("Compressed data contains too many atoms")
+
+        if run > 0:
+            # Atoms in the run are stored as small differences to the
+            # previous atom
+            for k in range(0, run, 3):
+                _receive_ints(&reader, small_index, size_small, this_coord)
+                for d in range(3):
+                    this_coord[d] += prev_coord[d] - small_num
+                if k == 0:
+                    # The first two atoms are swapped
+                    # for better compression of water molecules
+                    for d in range(3):
+                        tmp = this_coord[d]
+                        this_coord[d] = prev_coord[d]
+                        prev_coord[d] = tmp
+                    for d in range(3):
+                        coord[atom_i, d] = prev_coord[d] * inv_precision
+                    atom_i += 1
+                else:
+                    for d in range(3):
+                        prev_coord[d] = this_coord[d]
+                for d in range(3):
+                    coord[atom_i, d] = this_coord[d] * inv_precision
+                atom_i += 1
+        else:
+            for d in range(3):
+                coord[atom_i, d] = this_coord[d] * inv_precision
+            atom_i += 1
+
+        small_index += is_smaller
+        if small_index < _FIRST_INDEX or small_index >= _N_MAGIC_INTS:
+            raise InvalidFileError("Invalid compression parameters")
+        if is_smaller < 0:
+            small_num = smaller
+            if small_index > _FIRST_INDEX:
+                smaller = _MAGIC_INTS[small_index - 1] // 2
+            else:
+                smaller = 0
+        elif is_smaller > 0:
+            smaller = small_num
+            small_num = _MAGIC_INTS[small_index] // 2
+        for d in range(3):
+            size_small[d] = _MAGIC_INTS[small_index]
+
+        if reader.overflow:
+            raise InvalidFileError("Compressed data is truncated")
+
+
+cdef inline int _read_int(const uint8[:] buffer, int64 position):
+    """
+    Read a big-endian 32-bit integer.
+    """
+    return <int> (
+        (<unsigned int> buffer[position    ] << 24) |
+        (<unsigned int> buffer[position + 1] << 16) |
+        (<unsigned int> buffer[position + 2] <<  8) |
+        (<unsigned int> buffer[position + 3]      )
+    )
+
+
+cdef inline float _read_float(const uint8[:] buffer, int64 position):
+    """
+    Read a big-endian 32-bit floating point number.
+    """
+    cdef int bits = _read_int(buffer, position)
+    return (<float*> &bits)[0]
+
+
+cdef inline unsigned int _next_byte(_BitReader* reader):
+    if reader.count >= reader.length:
+        reader.overflow = True
+        return 0
+    reader.count += 1
+    return reader.data[reader.count - 1]
+
+
+cdef int _receive_bits(_BitReader* reader, int n_bits):
+    """
+    Read the given number of bits from the compressed data.
+    """
+    cdef unsigned int one = 1
+    cdef unsigned int mask
+    cdef unsigned int num = 0
+    if n_bits >= 32:
+        mask = 0xffffffff
+    else:
+        mask = (one << n_bits) - 1
+    while n_bits >= 8:
+        reader.last_byte = (reader.last_byte << 8) | _next_byte(reader)
+        num |= (reader.last_byte >> reader.last_bits) << (n_bits - 8)
+        n_bits -= 8
+    if n_bits > 0:
+        if reader.last_bits < <unsigned int> n_bits:
+            reader.last_bits += 8
+            reader.last_byte = (reader.last_byte << 8) | _next_byte(reader)
+        reader.last_bits -= n_bits
+        num |= (reader.last_byte >> reader.last_bits) & ((one << n_bits) - 1)
+    return <int> (num & mask)
+
+
+@cython.cdivision(True)
+cdef void _receive_ints(_BitReader* reader, int n_bits,
+                        unsigned int* sizes, int* nums):
+    """
+    Read three integers, that were combined into a single number with
+    the given number of bits.
+    """
+    cdef unsigned int bytes_[32]
+    cdef int i, j
+    cdef int n_bytes = 0
+    cdef unsigned int num, p
+    bytes_[1] = 0
+    bytes_[2] = 0
+    bytes_[3] = 0
+    while n_bits > 8:
+        bytes_[n_bytes] = _receive_bits(reader, 8)
+        n_bytes += 1
+        n_bits -= 8
+    if n_bits > 0:
+        bytes_[n_bytes] = _receive_bits(reader, n_bits)
+        n_bytes += 1
+    for i in range(2, 0, -1):
+        num = 0
+        for j in range(n_bytes - 1, -1, -1):
+            num = (num << 8) | bytes_[j]
+            p = num // sizes[i]
+            bytes_[j] = p
+            num = num - p * sizes[i]
+        nums[i] = num
+    nums[0] = <int> (
+        bytes_[0] | (bytes_[1] << 8) | (bytes_[2] << 16) | (bytes_[3] << 24)
+    )
+
+
+cdef int _size_of_int(unsigned int size):
+    """
+    Get the number of bits required to store an integer up to the given
+    size.
+    """
+    cdef unsigned int num = 1
+    cdef int n_bits = 0
+    while size >= num and n_bits < 32:
+        n_bits += 1
+        num <<= 1
+    return n_bits
+
+
+cdef int _size_of_ints(unsigned int* sizes):
+    """
+    Get the number of bits required to store three integers up to the
+    given sizes combined into a single number.
+    """
+    cdef unsigned int bytes_[32]
+    cdef unsigned int n_bytes = 1
+    cdef unsigned int byte_count
+    cdef unsigned int tmp, num
+    cdef int i
+    cdef int n_bits = 0
+    bytes_[0] = 1
+    for i in range(3):
+        tmp = 0
+        byte_count = 0
+        while byte_count < n_bytes:
+            tmp = bytes_[byte_count] * sizes[i] + tmp
+            bytes_[byte_count] = tmp & 0xff
+            tmp >>= 8
+            byte_count += 1
+        while tmp != 0:
+            bytes_[byte_count] = tmp & 0xff
+            byte_count += 1
+            tmp >>= 8
+        n_bytes = byte_count
+    num = 1
+    n_bytes -= 1
+    while bytes_[n_bytes] >= num:
+        n_bits += 1
+        num *= 2
+    return n_bits + n_bytes * 8
@@ -6,8 +6,18 @@ __name__ = "biotite.structure.io.xtc"
 __author__ = "Patrick Kunzmann"
 __all__ = ["XTCFile"]
 
+import struct
 import numpy as np
-from ..trajfile import TrajectoryFile
+from ..trajfile import TrajectoryFile, FrameReader
+from .decompress import decompress_coord
+from ....file import InvalidFileError
+
+
+_MAGIC = 1995
+# Magic number, atom count, step, time, box and repeated atom count
+_HEADER_SIZE = 56
+# Up to this number of atoms the coordinates are not compressed
+_MAX_UNCOMPRESSED_ATOMS = 9
 
 
 class XTCFile(TrajectoryFile):
@@ -20,6 +30,10 @@ class XTCFile(TrajectoryFile):
         import mdtraj.formats as traj
         return traj.XTCTrajectoryFile
 
+    @classmethod
+    def reader_type(cls):
+        return _XTCReader
+
     @classmethod
     def process_read_values(cls, read_values):
         # nm to Angstrom
@@ -44,3 +58,80 @@ class XTCFile(TrajectoryFile):
             "box"  : box,
             "time" : time,
         }
+
+
+
+class _XTCReader(FrameReader):
+    """
+    Native reader for XTC files.
+    """
+
+    def _index(self):
+        buffer = self._buffer
+        offsets = []
+        self._n_atoms = None
+        position = 0
+        while position < len(buffer):
+            if position + _HEADER_SIZE > len(buffer):
+                raise InvalidFileError("The XTC file is truncated")
+            magic, n_atoms = struct.unpack_from(">ii", buffer, position)
+            if magic != _MAGIC:
+                raise InvalidFileError(
+                    f"Expected magic number {_MAGIC} at byte {position}, "
+                    f"but got {magic}"
+                )
+            if self._n_atoms is None:
+                self._n_atoms = n_atoms
+            elif n_atoms != self._n_atoms:
+                raise InvalidFileError(
+                    "The number of atoms differs between frames"
+                )
+            offsets.append(position)
+            position += _HEADER_SIZE
+            if n_atoms <= _MAX_UNCOMPRESSED_ATOMS:
+                position += 3 * n_atoms * 4
+            else:
+                if position + 36 > len(buffer):
+                    raise InvalidFileError("The XTC file is truncated")
+                # Skip precision and the integer ranges
+                # to get the size of the compressed data
+                byte_count, = struct.unpack_from(
+                    ">I", buffer, position + 32
+                )
+                # The data is padded to a multiple of 4 bytes
+                position += 36 + -(-byte_count // 4) * 4
+        if position > len(buffer):
+            raise InvalidFileError("The XTC file is truncated")
+        return np.array(offsets, dtype=np.int64)
+
+    def read(self, frames, atom_i=None):
+        positions = self._offsets[frames]
+        time = self._view(positions + 12, ">f4", ()).astype(np.float32)
+        # nm to Angstrom
+        box = self._view(positions + 16, ">f4", (3, 3)) * 10
+        if self._n_atoms <= _MAX_UNCOMPRESSED_ATOMS:
+            coord = self._view(
+                positions + _HEADER_SIZE, ">f4", (self._n_atoms, 3)
+            )
+            if atom_i is not None:
+                coord = coord[:, atom_i]
+            coord = coord * 10
+        else:
+            frame_coord = np.empty((self._n_atoms, 3), dtype=np.float32)
+            n_selected = self._n_atoms if atom_i is None \
+                         else len(frame_coord[atom_i])
+            coord = np.empty(
+                (len(positions), n_selected, 3), dtype=np.float32
+            )
+            for i, position in enumerate(positions):
+                if atom_i is None:
+                    decompress_coord(
+                        self._buffer, position + _HEADER_SIZE, coord[i]
+                    )
+                else:
+                    decompress_coord(
+                        self._buffer, position + _HEADER_SIZE, frame_coord
+                    )
+                    coord[i] = frame_coord[atom_i]
+            coord *= 10
+        return coord, box, time
@@ -44,6 +44,11 @@ def get_molecule_indices(array):
     get_molecule_masks
     molecule_iter
 
+    Notes
+    -----
+    For an :class:`AtomArray` or :class:`AtomArrayStack` the molecule
+    indices are cached, until its annotation arrays or bonds change.
+
     Example
     -------
     Get an :class:`AtomArray` for ATP and show that it is a single
@@ -113,17 +118,24 @@ def get_molecule_indices(array):
     HET         0  ATP H2     H         0.166   -2.014    8.490
     """
     if isinstance(array, BondList):
-        bonds = array
+        return _compute_molecule_indices(array)
     elif isinstance(array, (AtomArray, AtomArrayStack)):
         if array.bonds is None:
             raise ValueError("An associated BondList is required")
-        bonds = array.bonds
+        molecule_indices = array._get_cached(
+            "molecule_indices",
+            lambda atoms: _compute_molecule_indices(atoms.bonds)
+        )
+        # The cached arrays must not be exposed to modifications
+        return [indices.copy() for indices in molecule_indices]
     else:
         raise TypeError(
             f"Expected a 'BondList', 'AtomArray' or 'AtomArrayStack', "
             f"not '{type(array).__name__}'"
         )
-    
+
+
+def _compute_molecule_indices(bonds):
     molecule_indices = []
     visited_mask = np.zeros(bonds.get_atom_count(), dtype=bool)
     while not visited_mask.all():
@@ -184,46 +184,68 @@ def rdf(center, atoms, selection=None, interval=(0, 10), bins=100, box=None,
             "Center, box, and atoms must have the same model count"
         )
 
-    # Calculate distance histogram
     edges = _calculate_edges(interval, bins)
+    hist = _rdf_histogram(center, atom_coord, box, edges, periodic)
+    return _normalize_rdf(
+        hist, edges, atoms.array_length(), box_volume(box).mean(),
+        len(atoms), center.shape[1]
+    )
+
+
+def _rdf_histogram(center, atom_coord, box, edges, periodic):
+    """
+    Calculate the histogram of distances from the centers to the
+    atoms, summed over all models.
+    """
     # Make histogram of quared distances to save computation time
     # of sqrt calculation
     sq_edges = edges**2
     threshold_dist = edges[-1]
     cell_size = threshold_dist
-    disp = []
-    for i in range(atoms.stack_depth()):
-        # Use cell list to efficiently preselect atoms that are in range
-        # of the desired bin range
-        cell_list = CellList(atom_coord[i], cell_size, periodic, box[i])
+    hist = np.zeros(len(edges) - 1, dtype=int)
+    # Use cell list to efficiently preselect atoms that are in range
+    # of the desired bin range
+    # The same cell list is reused for all models
+    cell_list = CellList(atom_coord[0], cell_size, periodic, box[0])
+    for i in range(atom_coord.shape[0]):
+        if i > 0:
+            cell_list.update(atom_coord[i], box[i])
         # 'cell_radius=1' is used in 'get_atoms_in_cells()'
         # This is enough to find all atoms that are in the given
         # interval (and more), since the size of each cell is as large
         # as the last edge of the bins
-        near_atom_mask = cell_list.get_atoms_in_cells(center[i], as_mask=True)
+        offsets, near_atom_i = cell_list.get_atoms_in_cells(
+            center[i], as_sparse=True
+        )
+        center_i = np.repeat(np.arange(center.shape[1]), np.diff(offsets))
+        if periodic:
+            # An atom may be found multiple times for the same center
+            # via different periodic copies
+            center_i, near_atom_i = _unique_pairs(
+                center_i, near_atom_i, atom_coord.shape[1]
+            )
         # Calculate distances of each center to preselected atoms
-        # for each center
-        for j in range(center.shape[1]):
-            dist_box = box[i] if periodic else None
-            # Calculate squared distances
-            disp.append(displacement(
-                center[i,j], atom_coord[i, near_atom_mask[j]], box=dist_box
-            ))
-    # Make one array from multiple arrays with different length
-    disp = np.concatenate(disp)
-    sq_distances = vector_dot(disp, disp)
-    hist, _ = np.histogram(sq_distances, bins=sq_edges)
+        dist_box = box[i] if periodic else None
+        disp = displacement(
+            center[i, center_i], atom_coord[i, near_atom_i], box=dist_box
+        )
+        sq_distances = vector_dot(disp, disp)
+        hist += np.histogram(sq_distances, bins=sq_edges)[0]
+    return hist
+
 
+def _normalize_rdf(hist, edges, n_atoms, volume, n_frames, n_centers):
+    """
+    Convert the distance histogram into the RDF.
+    """
     # Normalize with average particle density (N/V) in each bin
     bin_volume =   (4 / 3 * np.pi * np.power(edges[1: ], 3)) \
                  - (4 / 3 * np.pi * np.power(edges[:-1], 3))
-    n_frames = len(atoms)
-    volume = box_volume(box).mean()
-    density = atoms.array_length() / volume
+    density = n_atoms / volume
     g_r = hist / (bin_volume * density * n_frames)
 
     # Normalize with number of centers
-    g_r /= center.shape[1]
+    g_r /= n_centers
 
     bin_centers = (edges[:-1] + edges[1:]) * 0.5
 
@@ -238,3 +260,11 @@ def _calculate_edges(interval, bins):
     else:
         # 'bins' contains edges
         return np.array(bins, dtype=float)
+
+
+def _unique_pairs(first, second, n_second):
+    """
+    Remove duplicate index pairs.
+    """
+    unique_keys = np.unique(first.astype(np.int64) * n_second + second)
+    return unique_keys // n_second, unique_keys % n_second
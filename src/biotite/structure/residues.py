@@ -16,6 +16,7 @@ __all__ = ["get_residue_starts", "apply_residue_wise", "spread_residue_wise",
 
 import numpy as np
 from .atoms import AtomArray, AtomArrayStack
+from .segments import apply_segment_wise, spread_segment_wise
 
 
 def get_residue_starts(array, add_exclusive_stop=False):
@@ -45,6 +46,12 @@ def get_residue_starts(array, add_exclusive_stop=False):
     This method is internally used by all other residue-related
     functions.
 
+    The residue starts are cached in the atom array (stack), until its
+    annotation arrays are changed.
+    If an annotation array is modified in place, it must be set again
+    via :meth:`AtomArray.set_annotation()`, to update the cached
+    residue starts.
+
     Examples
     --------
 
@@ -55,6 +62,24 @@ def get_residue_starts(array, add_exclusive_stop=False):
     [  0  16  35  56  75  92 116 135 157 169 176 183 197 208 219 226 250 264
      278 292 304]
     """
+    if isinstance(array, (AtomArray, AtomArrayStack)):
+        residue_starts = array._get_cached(
+            "residue_starts", _compute_residue_starts
+        )
+    else:
+        residue_starts = _compute_residue_starts(array)
+    
+    # The cached array must not be exposed to modifications
+    if add_exclusive_stop:
+        return residue_starts.copy()
+    else:
+        return residue_starts[:-1].copy()
+
+
+def _compute_residue_starts(array):
+    """
+    Compute the residue starts including the exclusive stop.
+    """
     # These mask are 'true' at indices where the value changes
     chain_id_changes = (array.chain_id[1:] != array.chain_id[:-1])
     res_id_changes   = (array.res_id[1:]   != array.res_id[:-1]  )
@@ -75,10 +100,7 @@ def get_residue_starts(array, add_exclusive_stop=False):
     residue_starts = np.where(residue_change_mask)[0] +1
     
     # The first residue is not included yet -> Insert '[0]'
-    if add_exclusive_stop:
-        return np.concatenate(([0], residue_starts, [array.array_length()]))
-    else:
-        return np.concatenate(([0], residue_starts))
+    return np.concatenate(([0], residue_starts, [array.array_length()]))
 
 
 def apply_residue_wise(array, data, function, axis=None):
@@ -115,6 +137,17 @@ def apply_residue_wise(array, data, function, axis=None):
         Residue-wise evaluation of `data` by `function`. The size of the
         first dimension of this array is equal to the amount of
         residues.
+    
+    See also
+    --------
+    spread_residue_wise, apply_segment_wise
+
+    Notes
+    -----
+    Common *NumPy* reductions along the first axis, like
+    :func:`numpy.sum()` or :func:`numpy.mean()`, are computed for all
+    residues at once, instead of calling `function` for each residue.
+    See :func:`apply_segment_wise()` for the supported functions.
         
     Examples
     --------
@@ -163,31 +196,7 @@ def apply_residue_wise(array, data, function, axis=None):
      [ 1.194 10.416  1.130]]
     """
     starts = get_residue_starts(array, add_exclusive_stop=True)
-    # The result array
-    processed_data = None
-    for i in range(len(starts)-1):
-        interval = data[starts[i]:starts[i+1]]
-        if axis == None:
-            value = function(interval)
-        else:
-            value = function(interval, axis=axis)
-        value = function(interval, axis=axis)
-        # Identify the shape of the resulting array by evaluation
-        # of the function return value for the first interval
-        if processed_data is None:
-            if isinstance(value, np.ndarray):
-                # Maximum length of the processed data
-                # is length of interval of size 1 -> length of all IDs
-                # (equal to atom array length)
-                processed_data = np.zeros((len(starts)-1,) + value.shape,
-                                          dtype=value.dtype)
-            else:
-                # Scalar value -> one dimensional result array
-                processed_data = np.zeros(len(starts)-1,
-                                          dtype=type(value))
-        # Write values into result arrays
-        processed_data[i] = value
-    return processed_data
+    return apply_segment_wise(starts, data, function, axis)
 
 
 def spread_residue_wise(array, input_data):
@@ -214,6 +223,10 @@ def spread_residue_wise(array, input_data):
     output_data : ndarray
         Residue-wise spread `input_data`. Length is the same as
         `array_length()` of `array`.
+    
+    See also
+    --------
+    apply_residue_wise, spread_segment_wise
         
     Examples
     --------
@@ -248,12 +261,8 @@ def spread_residue_wise(array, input_data):
          'c' 'c' 'c' 'c' 'c' 'c' 'c' 'c' 'c' 'c' 'c' 'c' 'c' 'c' 'c' 'c' 'c' 'c'
          'c' 'c' 'c' 'c' 'c' 'c' 'c' 'c' 'c' 'c' 'c' 'c' 'c' 'c' 'c' 'c']
     """
-    starts = get_residue_starts(array)
-    output_data = np.zeros(array.array_length(), dtype=input_data.dtype)
-    for i in range(len(starts)-1):
-        output_data[starts[i]:starts[i+1]] = input_data[i]
-    output_data[starts[-1]:] = input_data[-1]
-    return output_data
+    starts = get_residue_starts(array, add_exclusive_stop=True)
+    return spread_segment_wise(starts, input_data)
 
 
 def get_residue_masks(array, indices):
@@ -13,26 +13,28 @@ __all__ = ["sasa"]
 
 cimport cython
 cimport numpy as np
-from libc.stdlib cimport malloc, free
 
+from functools import partial
 import numpy as np
+from ..parallel import check_n_jobs, map_tasks
 from .celllist import CellList
+from .residues import get_residue_starts
+from .chains import get_chain_starts
 from .filter import filter_solvent, filter_monoatomic_ions
 from .info.radii import vdw_radius_protor, vdw_radius_single
 
-ctypedef np.uint8_t np_bool
 ctypedef np.int64_t int64
 ctypedef np.float32_t float32
 
 
-@cython.boundscheck(False)
-@cython.wraparound(False)
 def sasa(array, float probe_radius=1.4, np.ndarray atom_filter=None,
          bint ignore_ions=True, int point_number=1000,
-         point_distr="Fibonacci", vdw_radii="ProtOr"):
+         point_distr="Fibonacci", vdw_radii="ProtOr", level="atom",
+         n_jobs=1):
     """
     sasa(array, probe_radius=1.4, atom_filter=None, ignore_ions=True,
-         point_number=1000, point_distr="Fibonacci", vdw_radii="ProtOr")
+         point_number=1000, point_distr="Fibonacci", vdw_radii="ProtOr",
+         level="atom", n_jobs=1)
 
     Calculate the Solvent Accessible Surface Area (SASA) of a protein.
     
@@ -41,11 +43,17 @@ def sasa(array, float probe_radius=1.4, np.ndarray atom_filter=None,
     Every atom is occupied by a evenly distributed point mesh. The
     points that can be reached by the "rolling probe", are surface
     accessible.
+
+    The sphere points and atom radii are determined only once and are
+    shared by all models of an :class:`AtomArrayStack`.
+    The calculation is distributed over multiple threads:
+    For an :class:`AtomArrayStack` each thread handles different
+    models, otherwise each thread handles different atoms.
     
     Parameters
     ----------
-    array : AtomArray
-        The protein model to calculate the SASA for.
+    array : AtomArray or AtomArrayStack
+        The protein model(s) to calculate the SASA for.
     probe_radius : float, optional
         The VdW-radius of the solvent molecules (default: 1.4).
     atom_filter : ndarray, dtype=bool, optional
@@ -84,14 +92,30 @@ def sasa(array, float probe_radius=1.4, np.ndarray atom_filter=None,
               in the model (e.g. NMR elucidated structures). [3]_
               
         By default *ProtOr* is used.
+    level : {'atom', 'residue', 'chain'}, optional
+        Whether the atom-wise SASA or the SASA summed over each
+        residue or chain is returned.
+        Atoms, where the SASA has not been calculated, are ignored in
+        the sum.
+        (Default: 'atom')
+    n_jobs : int, optional
+        The number of threads.
+        If ``None``, the number of available CPU cores is used.
+        By default, the SASA is calculated in the calling thread.
               
     
     Returns
     -------
-    sasa : ndarray, dtype=bool, shape=(n,)
+    sasa : ndarray, dtype=float32, shape=(n,) or shape=(m,n)
         Atom-wise SASA. `NaN` for atoms where SASA has not been 
         calculated
         (solvent atoms, hydrogen atoms (ProtOr), atoms not in `filter`).
+        If `array` is an :class:`AtomArrayStack`, the SASA is
+        calculated for each model.
+        If `level` is ``'residue'`` or ``'chain'``, the last dimension
+        is the number of residues or chains instead.
+        `NaN` for residues or chains, that do not contain any atom the
+        SASA has been calculated for.
         
     References
     ----------
@@ -110,18 +134,19 @@ def sasa(array, float probe_radius=1.4, np.ndarray atom_filter=None,
        J Phys Chem, 86, 441-451 (1964).
     
     """
-    cdef int i=0, j=0, k=0, adj_atom_i=0, rel_atom_i=0
-    
+    if level not in ("atom", "residue", "chain"):
+        raise ValueError(f"'{level}' is not a valid level")
+
     cdef np.ndarray sasa_filter
     cdef np.ndarray occl_filter
     if atom_filter is not None:
         # Filter for all atoms to calculate SASA for
         sasa_filter = np.array(atom_filter, dtype=bool)
     else:
-        sasa_filter = np.ones(len(array), dtype=bool)
+        sasa_filter = np.ones(array.array_length(), dtype=bool)
     # Filter for all atoms that are considered for occlusion calculation
     # sasa_filter is subfilter of occlusion_filter
-    occl_filter = np.ones(len(array), dtype=bool)
+    occl_filter = np.ones(array.array_length(), dtype=bool)
     # Remove water residues, since it is the solvent
     filter = ~filter_solvent(array)
     sasa_filter = sasa_filter & filter
@@ -152,13 +177,13 @@ def sasa(array, float probe_radius=1.4, np.ndarray atom_filter=None,
         filter = (array.element != "H")
         sasa_filter = sasa_filter & filter
         occl_filter = occl_filter & filter
-        radii = np.full(len(array), np.nan, dtype=np.float32)
+        radii = np.full(array.array_length(), np.nan, dtype=np.float32)
         for i in np.arange(len(radii))[occl_filter]:
             rad = vdw_radius_protor(array.res_name[i], array.atom_name[i])
             # 1.8 is default radius
             radii[i] = rad if rad is not None else 1.8
     elif vdw_radii == "Single":
-        radii = np.full(len(array), np.nan, dtype=np.float32)
+        radii = np.full(array.array_length(), np.nan, dtype=np.float32)
         for i in np.arange(len(radii))[occl_filter]:
             rad = vdw_radius_single(array.element[i])
             # 1.5 is default radius
@@ -167,44 +192,151 @@ def sasa(array, float probe_radius=1.4, np.ndarray atom_filter=None,
         raise KeyError(f"'{vdw_radii}' is not a valid radii set")
     # Increase atom radii by probe size ("rolling probe")
     radii += probe_radius
-    
-    # Memoryview for filter
-    # Problem with creating boolean memoryviews
-    # -> Type uint8 is used
-    cdef np_bool[:] sasa_filter_view = np.frombuffer(sasa_filter,
-                                                     dtype=np.uint8)
-    
-    cdef np.ndarray occl_r = radii[occl_filter]
-    # Atom array containing occluding atoms
-    occl_array = array[occl_filter]
-    
-    # Memoryviews for coordinates of entire (main) array
-    # and for coordinates of occluding atom array
-    cdef float32[:,:] main_coord = array.coord.astype(np.float32,
-                                                      copy=False)
-    cdef float32[:,:] occl_coord = occl_array.coord.astype(np.float32,
-                                                           copy=False)
-    # Memoryviews for sphere points
-    cdef float32[:,:] sphere_coord = sphere_points
+
+    coord = array.coord.astype(np.float32, copy=False)
+    is_stack = (coord.ndim == 3)
+    if not is_stack:
+        coord = coord[np.newaxis, ...]
+    sasa_i = np.where(sasa_filter)[0].astype(np.int64)
+    occl_r = radii[occl_filter]
     # Check if any of these arrays are empty to prevent segfault
-    if     main_coord.shape[0]   == 0 \
-        or occl_coord.shape[0]   == 0 \
-        or sphere_coord.shape[0] == 0:
+    if     coord.shape[1]        == 0 \
+        or len(occl_r)           == 0 \
+        or sphere_points.shape[0] == 0:
             raise ValueError("Coordinates are empty")
-    # Memoryviews for radii of SASA and occluding atoms
-    # their squares and their sum of sqaures
-    cdef float32[:] atom_radii = radii
-    cdef float32[:] atom_radii_sq = radii * radii
-    cdef float32[:] occl_radii = occl_r
-    cdef float32[:] occl_radii_sq = occl_r * occl_r
-    # Memoryview for atomwise SASA
-    cdef float32[:] sasa = np.full(len(array), np.nan, dtype=np.float32)
-    
-    # Area of a sphere point on a unit sphere
-    cdef float32 area_per_point = 4.0 * np.pi / point_number
-    
-    # Define further statically typed variables
-    # that are needed for SASA calculation
+    # Cell size is as large as the maximum distance,
+    # where two atom can intersect.
+    # Therefore intersecting atoms are always in the same or adjacent cell.
+    cell_size = np.max(occl_r) * 2
+    # These values are independent of the model
+    # and hence are shared by all models
+    model_sasa = partial(
+        _model_sasa,
+        occl_filter=occl_filter, sasa_i=sasa_i, cell_size=cell_size,
+        atom_radii=radii[sasa_i], occl_radii=occl_r,
+        sphere_coord=sphere_points,
+        area_per_point=4.0 * np.pi / point_number
+    )
+
+    n_jobs = check_n_jobs(n_jobs)
+    sasa = np.full(coord.shape[:2], np.nan, dtype=np.float32)
+    if coord.shape[0] > 1:
+        # Parallelize over models
+        results = map_tasks(
+            lambda model_coord: model_sasa(model_coord),
+            coord, n_jobs
+        )
+        for model_i, model_result in enumerate(results):
+            sasa[model_i, sasa_i] = model_result
+    else:
+        # Parallelize over atoms of the single model
+        offsets, neighbors = _find_neighbors(
+            coord[0], occl_filter, sasa_i, cell_size
+        )
+        chunk_bounds = np.linspace(
+            0, len(sasa_i), min(len(sasa_i), n_jobs * 4) + 1
+        ).astype(int)
+        results = map_tasks(
+            lambda bounds: model_sasa(
+                coord[0], offsets=offsets, neighbors=neighbors,
+                start=bounds[0], stop=bounds[1]
+            ),
+            zip(chunk_bounds[:-1], chunk_bounds[1:]), n_jobs
+        )
+        if len(results) > 0:
+            sasa[0, sasa_i] = np.concatenate(results)
+
+    if level == "residue":
+        sasa = _sum_segments(sasa, sasa_filter, get_residue_starts(array))
+    elif level == "chain":
+        sasa = _sum_segments(sasa, sasa_filter, get_chain_starts(array))
+
+    if is_stack:
+        return sasa
+    else:
+        return sasa[0]
+
+
+def _model_sasa(float32[:,:] coord, np.ndarray occl_filter,
+                np.ndarray sasa_i, float cell_size,
+                float32[:] atom_radii, float32[:] occl_radii,
+                float32[:,:] sphere_coord, float32 area_per_point,
+                offsets=None, neighbors=None, start=0, stop=None):
+    """
+    Calculate the SASA of the atoms ``sasa_i[start:stop]`` of a single
+    model.
+
+    If the adjacent occluding atoms are not given, they are calculated
+    here.
+    """
+    if offsets is None:
+        offsets, neighbors = _find_neighbors(
+            np.asarray(coord), occl_filter, sasa_i, cell_size
+        )
+    if stop is None:
+        stop = len(sasa_i)
+    cdef float32[:,:] occl_coord = np.asarray(coord)[occl_filter]
+    cdef int64[:] sasa_i_v = sasa_i
+    cdef int64[:] offsets_v = offsets
+    cdef int[:] neighbors_v = neighbors
+    cdef int start_i = start
+    cdef int stop_i = stop
+    # Later on, this array stores coordinates for actual
+    # occluding atoms for a certain atom to calculate the
+    # SASA for
+    # The first three indices of the second axis
+    # are x, y and z, the last one is the squared radius
+    # This list is as long as the maximal length of a list of
+    # adjacent atoms
+    cdef int max_adj_list_length = 0
+    if stop_i > start_i:
+        max_adj_list_length = np.max(np.diff(offsets[start_i : stop_i+1]))
+    cdef float32[:,:] relevant_occl_coord = np.zeros(
+        (max_adj_list_length, 4), dtype=np.float32
+    )
+    cdef float32[:] sasa = np.zeros(stop_i - start_i, dtype=np.float32)
+
+    with nogil:
+        _calculate_sasa(
+            coord, occl_coord, sasa_i_v, offsets_v, neighbors_v,
+            atom_radii, occl_radii, sphere_coord, area_per_point,
+            relevant_occl_coord, start_i, stop_i, sasa
+        )
+    return np.asarray(sasa)
+
+
+def _find_neighbors(np.ndarray coord, np.ndarray occl_filter,
+                    np.ndarray sasa_i, float cell_size):
+    """
+    Find the potentially occluding atoms for each atom the SASA is
+    calculated for.
+    """
+    cell_list = CellList(coord[occl_filter], cell_size)
+    # Adjacent atoms in compressed sparse row format
+    # -> memory scales linearly with the number of adjacent atoms
+    return cell_list.get_atoms_in_cells(coord[sasa_i], as_sparse=True)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+cdef void _calculate_sasa(float32[:,:] main_coord,
+                          float32[:,:] occl_coord,
+                          int64[:] sasa_i,
+                          int64[:] offsets,
+                          int[:] neighbors,
+                          float32[:] atom_radii,
+                          float32[:] occl_radii,
+                          float32[:,:] sphere_coord,
+                          float32 area_per_point,
+                          float32[:,:] relevant_occl_coord,
+                          int start, int stop,
+                          float32[:] sasa) nogil:
+    """
+    The Shrake-Rupley algorithm for the atoms ``sasa_i[start:stop]``.
+    """
+    cdef int i=0, j=0, k=0, atom_i=0, adj_atom_i=0, rel_atom_i=0
+    cdef int64 n
     cdef int n_accesible = 0
     cdef float32 radius = 0
     cdef float32 radius_sq = 0
@@ -220,61 +352,30 @@ def sasa(array, float probe_radius=1.4, np.ndarray atom_filter=None,
     cdef float32 occl_x = 0
     cdef float32 occl_y = 0
     cdef float32 occl_z = 0
-    cdef float32[:,:] relevant_occl_coord = None
-    
-    # Cell size is as large as the maximum distance, 
-    # where two atom can intersect.
-    # Therefore intersecting atoms are always in the same or adjacent cell.
-    cell_list = CellList(occl_array, np.max(radii[occl_filter])*2)
-    cdef np.ndarray cell_indices
-    cdef int[:,:] cell_indices_view
-    cdef int length
-    cdef int max_adj_list_length = 0
-    cdef int array_length = array.array_length()
 
-    cell_indices = cell_list.get_atoms_in_cells(array.coord)
-    cell_indices_view = cell_indices
-    max_adj_list_length = cell_indices.shape[0]
-        
-    # Later on, this array stores coordinates for actual
-    # occluding atoms for a certain atom to calculate the
-    # SASA for
-    # The first three indices of the second axis
-    # are x, y and z, the last one is the squared radius
-    # This list is as long as the maximal length of a list of
-    # adjacent atoms
-    relevant_occl_coord = np.zeros((max_adj_list_length, 4),
-                                   dtype=np.float32)
-    
-    # Actual SASA calculation
-    for i in range(array_length):
+    for i in range(start, stop):
         # First level: The atoms to calculate SASA for
-        if not sasa_filter_view[i]:
-            # SASA is not calculated for this atom
-            continue
-        n_accesible = point_number
-        atom_x = main_coord[i,0]
-        atom_y = main_coord[i,1]
-        atom_z = main_coord[i,2]
+        atom_i = sasa_i[i]
+        n_accesible = sphere_coord.shape[0]
+        atom_x = main_coord[atom_i,0]
+        atom_y = main_coord[atom_i,1]
+        atom_z = main_coord[atom_i,2]
         radius = atom_radii[i]
-        radius_sq = atom_radii_sq[i]
+        radius_sq = radius * radius
         # Find occluding atoms from list of adjacent atoms
         rel_atom_i = 0
-        for j in range(max_adj_list_length):
+        for n in range(offsets[i], offsets[i+1]):
             # Remove all atoms, where the distance to the relevant atom
             # is larger than the sum of the radii,
             # since those atoms do not touch
             # If distance is 0, it is the same atom,
             # and the atom is removed from the list as well
-            adj_atom_i = cell_indices_view[i,j]
-            if adj_atom_i == -1:
-                # -1 means end of list
-                break
+            adj_atom_i = neighbors[n]
             occl_x = occl_coord[adj_atom_i,0]
             occl_y = occl_coord[adj_atom_i,1]
             occl_z = occl_coord[adj_atom_i,2]
             adj_radius = occl_radii[adj_atom_i]
-            adj_radius_sq = occl_radii_sq[adj_atom_i]
+            adj_radius_sq = adj_radius * adj_radius
             dist_sq = distance_sq(atom_x, atom_y, atom_z,
                                       occl_x, occl_y, occl_z)
             if dist_sq != 0 \
@@ -304,12 +405,27 @@ def sasa(array, float probe_radius=1.4, np.ndarray atom_filter=None,
                     # -> Continue with next point
                     n_accesible -= 1
                     break
-        sasa[i] = area_per_point * n_accesible * radius_sq
-    return np.asarray(sasa)
+        sasa[i - start] = area_per_point * n_accesible * radius_sq
+
+
+def _sum_segments(np.ndarray sasa, np.ndarray sasa_filter,
+                  np.ndarray starts):
+    """
+    Sum the atom-wise SASA over each segment (e.g. residue) beginning
+    at the given `starts`.
+    Segments without any atom, that SASA was calculated for, get
+    `NaN`.
+    """
+    if len(starts) == 0:
+        return np.zeros((sasa.shape[0], 0), dtype=np.float32)
+    segment_sasa = np.add.reduceat(np.nan_to_num(sasa), starts, axis=-1)
+    is_empty = np.add.reduceat(sasa_filter.astype(int), starts) == 0
+    segment_sasa[:, is_empty] = np.nan
+    return segment_sasa
 
 
 cdef inline float32 distance_sq(float32 x1, float32 y1, float32 z1,
-                        float32 x2, float32 y2, float32 z2):
+                        float32 x2, float32 y2, float32 z2) nogil:
     cdef float32 dx = x2 - x1
     cdef float32 dy = y2 - y1
     cdef float32 dz = z2 - z1
@@ -0,0 +1,233 @@
+# This source code is part of the Biotite package and is distributed
+# under the 3-Clause BSD License. Please see 'LICENSE.rst' for further
+# information.
+
+"""
+This module provides utility for handling data on the level of
+contiguous segments of atoms, e.g. residues or chains.
+"""
+
+__name__ = "biotite.structure"
+__author__ = "Patrick Kunzmann"
+__all__ = ["apply_segment_wise", "spread_segment_wise"]
+
+import numpy as np
+
+
+# Reductions, that can be computed for all segments at once
+_SUM = 0
+_NANSUM = 1
+_MEAN = 2
+_NANMEAN = 3
+_MIN = 4
+_MAX = 5
+_NANMIN = 6
+_NANMAX = 7
+_COUNT_NONZERO = 8
+_REDUCTIONS = {
+    np.sum: _SUM,
+    np.nansum: _NANSUM,
+    np.mean: _MEAN,
+    np.average: _MEAN,
+    np.nanmean: _NANMEAN,
+    np.min: _MIN,
+    np.amin: _MIN,
+    np.max: _MAX,
+    np.amax: _MAX,
+    np.nanmin: _NANMIN,
+    np.nanmax: _NANMAX,
+    np.count_nonzero: _COUNT_NONZERO,
+}
+
+
+def apply_segment_wise(starts, data, function, axis=None):
+    """
+    Apply a function to intervals of data, where each interval
+    corresponds to one segment.
+
+    This is the generalized version of :func:`apply_residue_wise()`
+    and :func:`apply_chain_wise()` for arbitrary segments.
+
+    Parameters
+    ----------
+    starts : ndarray, dtype=int
+        The sorted start indices of the segments.
+        Includes the exclusive stop of the last segment as last
+        element.
+    data : ndarray
+        The data, whose intervals are the parameter for `function`.
+    function : function
+        The `function` must have either the form *f(data)* or
+        *f(data, axis)* in case `axis` is given. Every `function` call
+        must return a value with the same shape and data type.
+    axis : int, optional
+        This value is given to the `axis` parameter of `function`.
+
+    Returns
+    -------
+    processed_data : ndarray
+        Segment-wise evaluation of `data` by `function`.
+        The size of the first dimension of this array is equal to the
+        amount of segments.
+
+    See also
+    --------
+    spread_segment_wise
+
+    Notes
+    -----
+    Common reductions along the first axis, i.e. :func:`numpy.sum()`,
+    :func:`numpy.mean()`, :func:`numpy.average()`,
+    :func:`numpy.min()`, :func:`numpy.max()`, their *NaN* ignoring
+    variants, :func:`numpy.count_nonzero()` and :func:`centroid()`,
+    are computed for all segments at once.
+    Any other function is called separately for each segment.
+    """
+    if len(starts) < 2:
+        return np.zeros(0, dtype=np.asarray(data).dtype)
+
+    # The function is evaluated on the first segment in any case
+    # to determine the shape and data type of the output
+    value = _apply(function, data[starts[0] : starts[1]], axis)
+    if isinstance(value, np.ndarray):
+        shape = value.shape
+        dtype = value.dtype
+    else:
+        # Scalar value -> one dimensional result array
+        shape = ()
+        dtype = type(value)
+
+    reduced = _reduce_segments(starts, data, function, axis)
+    if reduced is not None and reduced.shape[1:] == shape:
+        return reduced.astype(dtype, copy=False)
+
+    processed_data = np.zeros((len(starts)-1,) + shape, dtype=dtype)
+    processed_data[0] = value
+    for i in range(1, len(starts)-1):
+        interval = data[starts[i] : starts[i+1]]
+        processed_data[i] = _apply(function, interval, axis)
+    return processed_data
+
+
+def spread_segment_wise(starts, input_data):
+    """
+    Expand segment-wise data to atom-wise data.
+
+    Each value in the segment-wise input is assigned to all atoms of
+    this segment.
+
+    This is the generalized version of :func:`spread_residue_wise()`
+    and :func:`spread_chain_wise()` for arbitrary segments.
+
+    Parameters
+    ----------
+    starts : ndarray, dtype=int
+        The sorted start indices of the segments.
+        Includes the exclusive stop of the last segment as last
+        element.
+    input_data : ndarray
+        The data to be spread.
+        The length of axis=0 must be equal to the amount of segments.
+
+    Returns
+    -------
+    output_data : ndarray
+        Segment-wise spread `input_data`.
+        The length is the exclusive stop of the last segment.
+
+    See also
+    --------
+    apply_segment_wise
+    """
+    if len(input_data) != len(starts) - 1:
+        raise IndexError(
+            f"{len(input_data)} values were given, "
+            f"but there are {len(starts) - 1} segments"
+        )
+    return np.repeat(input_data, np.diff(starts), axis=0)
+
+
+def _apply(function, interval, axis):
+    if axis is None:
+        return function(interval)
+    else:
+        return function(interval, axis=axis)
+
+
+def _reduce_segments(starts, data, function, axis):
+    """
+    Compute the segment-wise reduction given by `function` for all
+    segments at once via :func:`numpy.ufunc.reduceat()`.
+
+    Returns ``None``, if this is not possible for the given input.
+    """
+    # Imported here to avoid a circular import
+    from .geometry import centroid
+
+    if function is centroid:
+        reduction = _MEAN
+    else:
+        try:
+            reduction = _REDUCTIONS.get(function)
+        except TypeError:
+            # Unhashable callable
+            return None
+    if reduction is None or not isinstance(data, np.ndarray):
+        return None
+    if data.ndim == 0 or data.dtype.kind not in "biuf":
+        return None
+    # The reduction must be performed only along the first axis
+    if function is centroid:
+        if axis is not None or data.ndim != 2:
+            return None
+    elif not (
+        axis == 0 or axis == -data.ndim or (axis is None and data.ndim == 1)
+    ):
+        return None
+    lengths = np.diff(starts)
+    if (lengths <= 0).any():
+        # 'reduceat()' does not handle empty segments as required
+        return None
+
+    # 'reduceat()' would reduce the last segment until the end of data
+    data = data[starts[0] : starts[-1]]
+    indices = starts[:-1] - starts[0]
+    # Expand the lengths to the shape of the reduced values
+    lengths = lengths.reshape((-1,) + (1,) * (data.ndim - 1))
+    is_float = np.issubdtype(data.dtype, np.floating)
+    # Like 'np.sum()' small integer types are summed up with the
+    # default integer type to prevent overflows
+    sum_dtype = np.sum(np.zeros(0, dtype=data.dtype)).dtype
+
+    if reduction == _SUM:
+        return np.add.reduceat(data, indices, axis=0, dtype=sum_dtype)
+    elif reduction == _NANSUM:
+        if is_float:
+            data = np.where(np.isnan(data), 0, data)
+        return np.add.reduceat(data, indices, axis=0, dtype=sum_dtype)
+    elif reduction == _MEAN:
+        mean_dtype = data.dtype if is_float else np.float64
+        sums = np.add.reduceat(data, indices, axis=0, dtype=mean_dtype)
+        return sums / lengths.astype(mean_dtype)
+    elif reduction == _NANMEAN:
+        if not is_float:
+            sums = np.add.reduceat(data, indices, axis=0, dtype=np.float64)
+            return sums / lengths
+        nan_mask = np.isnan(data)
+        sums = np.add.reduceat(np.where(nan_mask, 0, data), indices, axis=0)
+        counts = np.add.reduceat(~nan_mask, indices, axis=0, dtype=np.int64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return sums / counts.astype(sums.dtype)
+    elif reduction == _MIN:
+        return np.minimum.reduceat(data, indices, axis=0)
+    elif reduction == _MAX:
+        return np.maximum.reduceat(data, indices, axis=0)
+    elif reduction == _NANMIN:
+        # 'fmin()' ignores NaN values
+        return np.fmin.reduceat(data, indices, axis=0)
+    elif reduction == _NANMAX:
+        return np.fmax.reduceat(data, indices, axis=0)
+    elif reduction == _COUNT_NONZERO:
+        return np.add.reduceat(data != 0, indices, axis=0, dtype=np.int64)
+    else:
+        raise ValueError(f"Unknown reduction {reduction}")
@@ -0,0 +1,555 @@
+# This source code is part of the Biotite package and is distributed
+# under the 3-Clause BSD License. Please see 'LICENSE.rst' for further
+# information.
+
+"""
+This module provides analyses that process a trajectory frame by frame,
+so that the complete trajectory never needs to be kept in memory.
+"""
+
+__name__ = "biotite.structure"
+__author__ = "Patrick Kunzmann"
+__all__ = ["StreamAnalysis", "AverageAnalysis", "RMSDAnalysis",
+           "RMSFAnalysis", "RDFAnalysis", "DensityAnalysis",
+           "HBondAnalysis", "analyze_stream"]
+
+import abc
+import os
+import numpy as np
+from .atoms import AtomArrayStack, stack, from_template
+from .box import box_volume
+from .compare import rmsd, _sq_euclidian
+from .hbond import _find_hbonds
+from .rdf import _calculate_edges, _rdf_histogram, _normalize_rdf
+
+
+class StreamAnalysis(metaclass=abc.ABCMeta):
+    """
+    Base class for an analysis that consumes a trajectory in chunks of
+    consecutive frames.
+
+    Each analysis only keeps an accumulated state, whose size does not
+    depend on the number of frames (except for inherently frame-wise
+    results like the RMSD).
+    Hence, trajectories of arbitrary length can be analyzed in a single
+    pass, usually via :func:`analyze_stream()`.
+    """
+
+    @abc.abstractmethod
+    def add(self, frames):
+        """
+        Update the analysis with the next chunk of frames.
+
+        Parameters
+        ----------
+        frames : AtomArrayStack
+            The frames that directly follow the previously added
+            frames.
+        """
+        pass
+
+    @abc.abstractmethod
+    def result(self):
+        """
+        Get the result of the analysis for all frames added so far.
+        """
+        pass
+
+
+class AverageAnalysis(StreamAnalysis):
+    """
+    Calculate an average structure, analogous to :func:`average()`.
+
+    The result is an :class:`AtomArray` with the average coordinates
+    of all frames.
+    """
+
+    def __init__(self):
+        self._template = None
+        self._coord_sum = None
+        self._n_frames = 0
+
+    def add(self, frames):
+        if self._template is None:
+            self._template = frames[0].copy()
+            self._coord_sum = np.zeros(frames.coord.shape[1:], dtype=float)
+        self._coord_sum += np.sum(frames.coord, axis=0, dtype=float)
+        self._n_frames += frames.stack_depth()
+
+    def result(self):
+        _check_frames_added(self._n_frames)
+        average = self._template.copy()
+        average.coord = (self._coord_sum / self._n_frames).astype(np.float32)
+        return average
+
+
+class RMSDAnalysis(StreamAnalysis):
+    """
+    Calculate the RMSD of each frame to a reference structure,
+    analogous to :func:`rmsd()`.
+
+    The result is an :class:`ndarray` containing the RMSD for each
+    frame.
+
+    Parameters
+    ----------
+    reference : AtomArray or ndarray, dtype=float, shape=(n,3)
+        The reference structure.
+    """
+
+    def __init__(self, reference):
+        self._reference = reference
+        self._rmsd = []
+
+    def add(self, frames):
+        self._rmsd.append(rmsd(self._reference, frames))
+
+    def result(self):
+        _check_frames_added(len(self._rmsd))
+        return np.concatenate(self._rmsd)
+
+
+class RMSFAnalysis(StreamAnalysis):
+    """
+    Calculate the RMSF of the frames, analogous to :func:`rmsf()`.
+
+    The result is an :class:`ndarray` containing the RMSF for each atom.
+
+    Parameters
+    ----------
+    reference : AtomArray or ndarray, dtype=float, shape=(n,3), optional
+        The reference structure.
+        By default, the average structure of all frames is used as
+        reference.
+        As the average is not known until all frames have been added,
+        the variance of the coordinates is calculated in a numerically
+        stable online manner instead [1]_.
+
+    References
+    ----------
+
+    .. [1] TF Chan, GH Golub and RJ LeVeque,
+       "Updating formulae and a pairwise algorithm for computing sample
+       variances."
+       COMPSTAT 1982, 30-41 (1982).
+    """
+
+    def __init__(self, reference=None):
+        self._reference = reference
+        self._n_frames = 0
+        # Either the sum of squared deviations from the reference
+        # or the running mean and squared deviations from the mean
+        self._sq_dev = None
+        self._mean = None
+
+    def add(self, frames):
+        frame_coord = frames.coord.astype(float)
+        n_new = frame_coord.shape[0]
+        if self._reference is not None:
+            sq_dev = np.sum(
+                _sq_euclidian(self._reference, frame_coord), axis=0
+            )
+            if self._sq_dev is None:
+                self._sq_dev = sq_dev
+            else:
+                self._sq_dev += sq_dev
+        else:
+            new_mean = np.mean(frame_coord, axis=0)
+            new_sq_dev = np.sum((frame_coord - new_mean)**2, axis=0)
+            if self._mean is None:
+                self._mean = new_mean
+                self._sq_dev = new_sq_dev
+            else:
+                # Combine the statistics of both sets of frames
+                n_total = self._n_frames + n_new
+                delta = new_mean - self._mean
+                self._sq_dev += new_sq_dev \
+                    + delta**2 * self._n_frames * n_new / n_total
+                self._mean += delta * n_new / n_total
+        self._n_frames += n_new
+
+    def result(self):
+        _check_frames_added(self._n_frames)
+        sq_dev = self._sq_dev
+        if self._reference is None:
+            # Sum over x, y and z
+            sq_dev = np.sum(sq_dev, axis=-1)
+        return np.sqrt(sq_dev / self._n_frames)
+
+
+class RDFAnalysis(StreamAnalysis):
+    """
+    Calculate the radial distribution function of the frames, analogous
+    to :func:`rdf()`.
+
+    The distance histogram is accumulated over the frames.
+    The result is a tuple of the bin centers and the RDF values.
+
+    Parameters
+    ----------
+    center : ndarray, dtype=bool, shape=(n,) or ndarray, dtype=float, shape=(3,) or shape=(p,3)
+        If a boolean mask is given, the selected atoms of each frame are
+        used as origins.
+        Otherwise, the given fixed coordinates are used as origins.
+    selection : ndarray, dtype=bool, shape=(n,), optional
+        Boolean mask to limit the RDF calculation to specific atoms.
+    interval : tuple, optional
+        The range in which the RDF is calculated.
+    bins : int or sequence of scalars, optional
+        The number of bins or the bin edges.
+    periodic : bool, optional
+        Defines if periodic boundary conditions are taken into account.
+
+    Notes
+    -----
+    Each frame must have a box.
+    """
+
+    def __init__(self, center, selection=None, interval=(0, 10), bins=100,
+                 periodic=False):
+        center = np.asarray(center)
+        if center.dtype == bool:
+            self._center_mask = center
+            self._center_coord = None
+        else:
+            self._center_mask = None
+            self._center_coord = center.reshape(-1, 3)
+        self._selection = selection
+        self._edges = _calculate_edges(interval, bins)
+        self._periodic = periodic
+        self._hist = np.zeros(len(self._edges) - 1, dtype=int)
+        self._volume_sum = 0
+        self._n_frames = 0
+        self._n_atoms = None
+        self._n_centers = None
+
+    def add(self, frames):
+        if frames.box is None:
+            raise ValueError("The frames must have a box")
+        atom_coord = frames.coord
+        if self._selection is not None:
+            atom_coord = atom_coord[:, self._selection]
+        if self._center_mask is not None:
+            center = frames.coord[:, self._center_mask]
+        else:
+            center = np.repeat(
+                self._center_coord[np.newaxis, ...], len(atom_coord), axis=0
+            )
+        self._hist += _rdf_histogram(
+            center, atom_coord, frames.box, self._edges, self._periodic
+        )
+        self._volume_sum += np.sum(box_volume(frames.box))
+        self._n_frames += frames.stack_depth()
+        self._n_atoms = atom_coord.shape[1]
+        self._n_centers = center.shape[1]
+
+    def result(self):
+        _check_frames_added(self._n_frames)
+        return _normalize_rdf(
+            self._hist, self._edges, self._n_atoms,
+            self._volume_sum / self._n_frames, self._n_frames,
+            self._n_centers
+        )
+
+
+class DensityAnalysis(StreamAnalysis):
+    """
+    Calculate the density of the selected atoms, analogous to
+    :func:`density()`.
+
+    The histogram is accumulated over the frames.
+    The result is a tuple of the histogram and the bin edges.
+
+    Parameters
+    ----------
+    bins : sequence of ndarray, dtype=float
+        The bin edges for each dimension.
+        In contrast to :func:`density()`, the edges must be given,
+        since the range of coordinates is not known in advance.
+    selection : ndarray, dtype=bool, shape=(n,), optional
+        Boolean mask to limit the density calculation to specific atoms.
+    density : bool, optional
+        If true, normalize the histogram, so that the integral over the
+        whole grid is 1.
+    weights : ndarray, dtype=float, shape=(n,), optional
+        Weight of each selected atom.
+    """
+
+    def __init__(self, bins, selection=None, density=False, weights=None):
+        self._edges = [np.asarray(edges, dtype=float) for edges in bins]
+        if len(self._edges) != 3:
+            raise ValueError("Bin edges for three dimensions are required")
+        self._selection = selection
+        self._density = density
+        self._weights = weights
+        self._hist = np.zeros([len(edges) - 1 for edges in self._edges])
+        self._n_frames = 0
+
+    def add(self, frames):
+        frame_coord = frames.coord
+        if self._selection is not None:
+            frame_coord = frame_coord[:, self._selection]
+        if self._weights is not None:
+            weights = np.tile(self._weights, frame_coord.shape[0])
+        else:
+            weights = None
+        hist, _ = np.histogramdd(
+            frame_coord.reshape(-1, 3), bins=self._edges, weights=weights
+        )
+        self._hist += hist
+        self._n_frames += frames.stack_depth()
+
+    def result(self):
+        _check_frames_added(self._n_frames)
+        hist = self._hist
+        if self._density:
+            widths = [np.diff(edges) for edges in self._edges]
+            bin_volume = widths[0][:, np.newaxis, np.newaxis] \
+                       * widths[1][np.newaxis, :, np.newaxis] \
+                       * widths[2][np.newaxis, np.newaxis, :]
+            hist = hist / np.sum(hist) / bin_volume
+        return hist, self._edges
+
+
+class HBondAnalysis(StreamAnalysis):
+    """
+    Find hydrogen bonds in the frames, analogous to :func:`hbond()`.
+
+    The hydrogen atoms are assigned to their donors based on the
+    first frame of the trajectory, as :func:`hbond()` does for the
+    first model.
+    The found hydrogen bonds are recorded sparsely as pairs of frame
+    index and triplet index.
+    The result is a tuple of the D-H..A triplets and these pairs.
+
+    Parameters
+    ----------
+    file_name : str, optional
+        The file, the hydrogen bonds of each chunk of frames are
+        appended to.
+        The file contains consecutive pairs of the frame index and the
+        triplet index as *int64* values.
+        The pairs returned by :meth:`result()` are memory-mapped from
+        this file.
+        By default, the pairs are kept in memory.
+    **kwargs
+        Additional parameters for :func:`hbond()`.
+
+    Notes
+    -----
+    Unless a `file_name` is given, the memory consumption grows with the
+    number of found hydrogen bonds.
+    :meth:`get_frequency()` only requires the count of each triplet and
+    hence constant memory with respect to the number of frames.
+
+    Examples
+    --------
+
+    The pairs can be converted into the mask returned by
+    :func:`hbond()`:
+
+    >>> triplets, hbond_pairs = analyze_stream(
+    ...     atom_array_stack, [HBondAnalysis()]
+    ... )[0]
+    >>> mask = np.zeros(
+    ...     (atom_array_stack.stack_depth(), len(triplets)), dtype=bool
+    ... )
+    >>> mask[hbond_pairs[:, 0], hbond_pairs[:, 1]] = True
+    >>> print(np.count_nonzero(mask, axis=1))
+    [14 15 15 13 11 13  9 14  9 15 13 13 15 11 11 13 11 14 14 13 14 13 15 17
+     14 12 15 12 12 13 13 13 12 12 11 15 10 11]
+    """
+
+    def __init__(self, file_name=None, **kwargs):
+        self._file_name = file_name
+        if file_name is not None:
+            # Clear the file
+            open(file_name, "wb").close()
+        self._pairs = []
+        self._kwargs = kwargs
+        self._reference = None
+        self._triplets = np.zeros((0, 3), dtype=int)
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._n_frames = 0
+
+    def add(self, frames):
+        if self._reference is None:
+            self._reference = frames[0].copy()
+        triplets, mask = _find_hbonds(
+            frames, self._reference, **self._kwargs
+        )
+        indices = self._register_triplets(triplets)
+        np.add.at(self._counts, indices, np.count_nonzero(mask, axis=0))
+        frame_i, triplet_i = np.nonzero(mask)
+        pairs = np.stack(
+            [frame_i + self._n_frames, indices[triplet_i]], axis=-1
+        ).astype(np.int64)
+        if self._file_name is not None:
+            with open(self._file_name, "ab") as file:
+                file.write(pairs.tobytes())
+        else:
+            self._pairs.append(pairs)
+        self._n_frames += frames.stack_depth()
+
+    def result(self):
+        """
+        Get the D-H..A triplets and the hydrogen bonds of all frames
+        added so far.
+
+        Returns
+        -------
+        triplets : ndarray, dtype=int, shape=(n,3)
+            The triplets in the order of the triplet indices.
+        pairs : ndarray, dtype=np.int64, shape=(m,2)
+            The frame index and triplet index of each hydrogen bond
+            found in any frame.
+        """
+        _check_frames_added(self._n_frames)
+        if self._file_name is not None:
+            if os.path.getsize(self._file_name) == 0:
+                # An empty file cannot be memory-mapped
+                pairs = np.zeros((0, 2), dtype=np.int64)
+            else:
+                pairs = np.memmap(
+                    self._file_name, dtype=np.int64, mode="r"
+                ).reshape(-1, 2)
+        else:
+            pairs = np.concatenate(self._pairs)
+        return self.get_triplets(), pairs
+
+    def get_triplets(self):
+        """
+        Get the D-H..A triplets found so far.
+
+        Returns
+        -------
+        triplets : ndarray, dtype=int, shape=(n,3)
+            The triplets in the order of the triplet indices.
+        """
+        return self._triplets.copy()
+
+    def get_frequency(self):
+        """
+        Get the frequency of each hydrogen bond, analogous to
+        :func:`hbond_frequency()`, without loading the frame-wise
+        hydrogen bonds.
+
+        Returns
+        -------
+        freq : ndarray, dtype=float, shape=(n,)
+            The frequency of each triplet in the order of the triplet
+            indices.
+        """
+        _check_frames_added(self._n_frames)
+        return self._counts / self._n_frames
+
+    def _register_triplets(self, triplets):
+        """
+        Get the triplet index of each of the given triplets.
+        Triplets that were not found before get new indices in the
+        order of their appearance.
+        """
+        n_known = len(self._triplets)
+        combined = np.concatenate([self._triplets, triplets])
+        _, first_indices, inverse = np.unique(
+            combined, axis=0, return_index=True, return_inverse=True
+        )
+        # For each given triplet, the position of its first occurence
+        # in 'combined'
+        # For known triplets, this is already the triplet index
+        first_occurence = first_indices[inverse.reshape(-1)[n_known:]]
+        is_new = first_occurence >= n_known
+        new_positions = np.unique(first_occurence[is_new])
+        indices = np.where(
+            is_new,
+            n_known + np.searchsorted(new_positions, first_occurence),
+            first_occurence
+        )
+        self._triplets = np.concatenate(
+            [self._triplets, combined[new_positions]]
+        )
+        self._counts = np.concatenate(
+            [self._counts, np.zeros(len(new_positions), dtype=np.int64)]
+        )
+        return indices
+
+
+def analyze_stream(frames, analyses, template=None, chunk_size=100):
+    """
+    Run the given analyses in a single pass over a stream of frames.
+
+    The frames are grouped into chunks, which are passed to each
+    analysis.
+    Hence, only a single chunk of frames needs to be kept in memory.
+
+    Parameters
+    ----------
+    frames : iterable object of AtomArray or iterable object of tuple
+        The frames, e.g. obtained from
+        :meth:`TrajectoryFile.read_iter_structure()`.
+        If `template` is given, the frames are instead expected as
+        ``(coord, box, time)`` tuples, as obtained from
+        :meth:`TrajectoryFile.read_iter()`.
+    analyses : iterable object of StreamAnalysis
+        The analyses to be run.
+    template : AtomArray, optional
+        The template, the coordinates in `frames` belong to.
+        Using a template avoids the creation of an :class:`AtomArray`
+        for each frame.
+    chunk_size : int, optional
+        The number of frames that are passed to the analyses at once.
+
+    Returns
+    -------
+    results : list
+        The result of each analysis.
+
+    Examples
+    --------
+
+    Calculate the average structure and the RMSF to the average
+    structure:
+
+    >>> ca = atom_array_stack[:, atom_array_stack.atom_name == "CA"]
+    >>> ca, _ = superimpose(ca[0], ca)
+    >>> average_structure, ca_rmsf = analyze_stream(
+    ...     ca, [AverageAnalysis(), RMSFAnalysis()], chunk_size=10
+    ... )
+    >>> print(np.allclose(average_structure.coord, average(ca).coord))
+    True
+    >>> print(np.allclose(ca_rmsf, rmsf(average(ca), ca)))
+    True
+    """
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be at least 1")
+    analyses = list(analyses)
+    chunk = []
+    for frame in frames:
+        chunk.append(frame)
+        if len(chunk) == chunk_size:
+            _add_chunk(chunk, analyses, template)
+            chunk = []
+    if len(chunk) > 0:
+        _add_chunk(chunk, analyses, template)
+    return [analysis.result() for analysis in analyses]
+
+
+def _add_chunk(chunk, analyses, template):
+    if template is None:
+        frames = stack(chunk)
+    else:
+        if isinstance(template, AtomArrayStack):
+            template = template[0]
+        frame_coord = np.stack([frame_coord for frame_coord, _, _ in chunk])
+        if chunk[0][1] is not None:
+            box = np.stack([box for _, box, _ in chunk])
+        else:
+            box = None
+        frames = from_template(template, frame_coord, box)
+    for analysis in analyses:
+        analysis.add(frames)
+
+
+def _check_frames_added(n_frames):
+    if n_frames == 0:
+        raise ValueError("No frames have been added yet")
@@ -150,13 +150,16 @@ def superimpose(fixed, mobile, atom_mask=None):
     elif isinstance(mobile, AtomArrayStack):
         superimposed = mobile.copy()
         superimposed.coord -= mob_centroid[..., np.newaxis, :]
-        # Perform Kabsch algorithm for every model
-        transformations = [None] * len(superimposed.coord)
-        for i in range(len(superimposed.coord)):
-            rotation = _superimpose(fix_filtered, mob_filtered[i])
-            superimposed.coord[i] = np.dot(rotation, superimposed.coord[i].T).T
-            transformations[i] = (-mob_centroid[i], rotation, fix_centroid)
+        # Perform Kabsch algorithm for all models at once
+        rotations = _superimpose(fix_filtered, mob_filtered)
+        superimposed.coord = np.matmul(
+            superimposed.coord, np.swapaxes(rotations, -1, -2)
+        )
         superimposed.coord += fix_centroid
+        transformations = [
+            (-mob_centroid[i], rotations[i], fix_centroid)
+            for i in range(len(rotations))
+        ]
         return superimposed, transformations
    
     else:
@@ -167,17 +170,20 @@ def superimpose(fixed, mobile, atom_mask=None):
 def _superimpose(fix_centered, mob_centered):
     """
     Perform the Kabsch algorithm using only the coordinates.
+
+    If `mob_centered` contains multiple models, the rotation matrices
+    for all models are calculated at once using a stacked SVD.
     """
     # Calculating rotation matrix
     y = mob_centered
     x = fix_centered
-    # Calculate covariance matrix
-    cov = np.dot(x.T, y)
+    # Calculate covariance matrix (for each model)
+    cov = np.matmul(x.T, y)
     v, s, w = np.linalg.svd(cov)
     # Remove possibility of reflected atom coordinates
-    if np.linalg.det(v) * np.linalg.det(w) < 0:
-        v[:,-1] *= -1
-    rotation = np.dot(v,w)
+    reflected = np.linalg.det(v) * np.linalg.det(w) < 0
+    v[..., :, -1] *= np.where(reflected, -1, 1)[..., np.newaxis]
+    rotation = np.matmul(v, w)
     return rotation
 
 
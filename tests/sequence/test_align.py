@@ -260,6 +260,408 @@ def test_scoring(sequences, gap_penalty, term, seq_indices):
         print(alignment)
         raise
 
+@pytest.mark.parametrize(
+    "local, term, gap_penalty, seq_indices", itertools.product(
+        [True, False], [True, False], [-10, (-10,-1)],
+        [(i,j) for i in range(4) for j in range(i+1)]
+    )
+)
+def test_align_optimal_score_only(sequences, local, term, gap_penalty,
+                                  seq_indices):
+    """
+    The score from the linear memory `score_only` mode must be equal to
+    the score of the alignments from the full alignment table.
+    """
+    matrix = align.SubstitutionMatrix.std_protein_matrix()
+    index1, index2 = seq_indices
+    seq1 = sequences[index1]
+    seq2 = sequences[index2]
+    ref_score = align.align_optimal(
+        seq1, seq2, matrix,
+        gap_penalty=gap_penalty, terminal_penalty=term, local=local,
+        max_number=1
+    )[0].score
+    test_score = align.align_optimal(
+        seq1, seq2, matrix,
+        gap_penalty=gap_penalty, terminal_penalty=term, local=local,
+        score_only=True
+    )
+    assert test_score == ref_score
+
+@pytest.mark.parametrize(
+    "local_term, gap_penalty, seq_indices", itertools.product(
+        # 'terminal_penalty' has no effect for local alignments
+        [(True, True), (False, True), (False, False)], [-10, (-10,-1)],
+        [(i,j) for i in range(4) for j in range(i+1)]
+    )
+)
+def test_align_optimal_linear_memory(sequences, local_term, gap_penalty,
+                                     seq_indices):
+    """
+    The alignment from the linear memory mode must be optimal, i.e. it
+    must have the same score as the alignments from the full alignment
+    table.
+    """
+    local, term = local_term
+    matrix = align.SubstitutionMatrix.std_protein_matrix()
+    index1, index2 = seq_indices
+    seq1 = sequences[index1]
+    seq2 = sequences[index2]
+    ref_score = align.align_optimal(
+        seq1, seq2, matrix,
+        gap_penalty=gap_penalty, terminal_penalty=term, local=local,
+        max_number=1
+    )[0].score
+    alignments = align.align_optimal(
+        seq1, seq2, matrix,
+        gap_penalty=gap_penalty, terminal_penalty=term, local=local,
+        linear_memory=True
+    )
+    assert len(alignments) == 1
+    alignment = alignments[0]
+    assert alignment.score == ref_score
+    assert align.score(alignment, matrix, gap_penalty, term) == ref_score
+    if not local:
+        # All symbols of both sequences are part of a global alignment
+        for i, sequence in enumerate((seq1, seq2)):
+            assert (alignment.trace[:, i] != -1).tolist().count(True) \
+                == len(sequence)
+
+@pytest.mark.parametrize(
+    "score_only, gap_penalty, backend", itertools.product(
+        [False, True], [-10, (-10,-1)], ["thread", "process"]
+    )
+)
+def test_align_many(sequences, score_only, gap_penalty, backend):
+    """
+    `align_many()` must give the same results as individual
+    `align_optimal()` calls.
+    """
+    matrix = align.SubstitutionMatrix.std_protein_matrix()
+    query = sequences[0]
+    targets = sequences[1:5]
+    ref_alignments = [
+        align.align_optimal(
+            query, target, matrix, gap_penalty=gap_penalty, max_number=1
+        )[0]
+        for target in targets
+    ]
+    test_result = align.align_many(
+        query, targets, matrix, gap_penalty=gap_penalty,
+        score_only=score_only, n_jobs=2, backend=backend
+    )
+    if score_only:
+        assert test_result.tolist() \
+            == [ali.score for ali in ref_alignments]
+    else:
+        assert test_result == ref_alignments
+
+@pytest.mark.parametrize(
+    "return_alignments, n_jobs, backend", itertools.product(
+        [False, True], [1, 3], ["thread", "process"]
+    )
+)
+def test_pairwise_scores(return_alignments, n_jobs, backend):
+    """
+    The scores of `pairwise_scores()` must be equal to the scores of
+    individual `align_optimal()` calls.
+    """
+    np.random.seed(0)
+    sequences = []
+    for _ in range(6):
+        sequence = seq.NucleotideSequence()
+        sequence.code = np.random.randint(0, 4, np.random.randint(1, 50))
+        sequences.append(sequence)
+    matrix = align.SubstitutionMatrix.std_nucleotide_matrix()
+
+    ref_scores = np.zeros((len(sequences), len(sequences)), dtype=int)
+    for i in range(len(sequences)):
+        for j in range(len(sequences)):
+            ref_scores[i,j] = align.align_optimal(
+                sequences[i], sequences[j], matrix, max_number=1
+            )[0].score
+
+    if return_alignments:
+        test_scores, alignments = align.pairwise_scores(
+            sequences, matrix, return_alignments=True,
+            n_jobs=n_jobs, backend=backend
+        )
+        for i in range(len(sequences)):
+            for j in range(len(sequences)):
+                alignment = alignments[i,j]
+                assert alignment.sequences == [sequences[i], sequences[j]]
+                assert align.score(alignment, matrix) == ref_scores[i,j]
+    else:
+        test_scores = align.pairwise_scores(
+            sequences, matrix, n_jobs=n_jobs, backend=backend
+        )
+    assert test_scores.tolist() == ref_scores.tolist()
+
+
+@pytest.mark.parametrize(
+    "gap_penalty, seed", itertools.product(
+        [-10, -4, (-10,-1), (-11,-1)], range(10)
+    )
+)
+def test_scan_local(gap_penalty, seed):
+    """
+    The scores of `scan_local()` must be equal to the scores of
+    local `align_optimal()` calls.
+    The returned alignments must have the same score and must end at
+    the reported end positions.
+    """
+    np.random.seed(seed)
+    query = seq.ProteinSequence()
+    query.code = np.random.randint(0, 20, np.random.randint(1, 100))
+    targets = []
+    for _ in range(5):
+        target = seq.ProteinSequence()
+        target.code = np.random.randint(0, 20, np.random.randint(1, 150))
+        targets.append(target)
+    # Add a homologous target to obtain a high scoring hit
+    target = seq.ProteinSequence()
+    target.code = np.concatenate([
+        np.random.randint(0, 20, 10),
+        query.code,
+        np.random.randint(0, 20, 5)
+    ])
+    targets.append(target)
+    matrix = align.SubstitutionMatrix.std_protein_matrix()
+
+    ref_scores = [
+        align.align_optimal(
+            query, target, matrix, gap_penalty, local=True, score_only=True
+        )
+        for target in targets
+    ]
+
+    test_scores, ends, alignments = align.scan_local(
+        query, targets, matrix, gap_penalty, n_alignments=3
+    )
+    assert test_scores.tolist() == ref_scores
+    assert len(alignments) == len(targets)
+    assert sum(alignment is not None for alignment in alignments) == 3
+    for score, end, alignment in zip(test_scores, ends, alignments):
+        if alignment is None:
+            continue
+        assert alignment.score == score
+        assert align.score(alignment, matrix, gap_penalty) == score
+        assert alignment.trace[-1].tolist() == end.tolist()
+
+
+@pytest.mark.parametrize("length", [100, 3000])
+def test_scan_local_large_score(length):
+    """
+    Scores exceeding the range of 8 bit and 16 bit integers must be
+    calculated correctly.
+    """
+    np.random.seed(0)
+    query = seq.ProteinSequence()
+    query.code = np.random.randint(0, 20, length)
+    matrix = align.SubstitutionMatrix.std_protein_matrix()
+    ref_score = align.align_optimal(
+        query, query, matrix, local=True, score_only=True
+    )
+    test_scores, ends = align.scan_local(query, [query], matrix)
+    assert test_scores.tolist() == [ref_score]
+    assert ends.tolist() == [[length-1, length-1]]
+
+
+@pytest.mark.parametrize(
+    "local, gap_penalty, seed", itertools.product(
+        [False, True], [-7, (-7,-1)], range(10)
+    )
+)
+def test_align_banded_full_band(local, gap_penalty, seed):
+    """
+    If the band covers the entire alignment table, `align_banded()`
+    must give the same alignments as `align_optimal()`.
+    """
+    np.random.seed(seed)
+    seq1 = seq.NucleotideSequence()
+    seq1.code = np.random.randint(0, 4, np.random.randint(1, 50))
+    seq2 = seq.NucleotideSequence()
+    seq2.code = np.random.randint(0, 4, np.random.randint(1, 50))
+    matrix = align.SubstitutionMatrix.std_nucleotide_matrix()
+
+    ref_alignments = align.align_optimal(
+        seq1, seq2, matrix, gap_penalty=gap_penalty, local=local,
+        max_number=10000
+    )
+    test_alignments = align.align_banded(
+        seq1, seq2, matrix, band=(-len(seq1), len(seq2)),
+        gap_penalty=gap_penalty, local=local, max_number=10000
+    )
+    assert test_alignments[0].score == ref_alignments[0].score
+    if len(ref_alignments) < 10000:
+        # Only test if the maximum number of alignments has not been
+        # reached, otherwise the returned alignments may differ
+        assert set(str(ali) for ali in test_alignments) \
+            == set(str(ali) for ali in ref_alignments)
+
+
+@pytest.mark.parametrize(
+    "local, gap_penalty, band_width", itertools.product(
+        [False, True], [-10, (-10,-1)], [2, 10, 50]
+    )
+)
+def test_align_banded_narrow_band(sequences, local, gap_penalty, band_width):
+    """
+    Test whether the alignment of `align_banded()` stays within the
+    band and whether its score is consistent.
+    """
+    matrix = align.SubstitutionMatrix.std_protein_matrix()
+    seq1, seq2 = sequences[:2]
+    diagonal = len(seq2) - len(seq1)
+    band = (min(0, diagonal) - band_width, max(0, diagonal) + band_width)
+    ref_score = align.align_optimal(
+        seq1, seq2, matrix, gap_penalty=gap_penalty, local=local,
+        max_number=1
+    )[0].score
+    alignments = align.align_banded(
+        seq1, seq2, matrix, band, gap_penalty=gap_penalty, local=local,
+        max_number=10
+    )
+    for alignment in alignments:
+        assert alignment.score <= ref_score
+        assert align.score(alignment, matrix, gap_penalty) == alignment.score
+        trace = alignment.trace
+        trace = trace[(trace != -1).all(axis=-1)]
+        diagonals = trace[:, 1] - trace[:, 0]
+        assert (diagonals >= band[0]).all() and (diagonals <= band[1]).all()
+
+
+def test_align_banded_invalid_band():
+    seq1 = seq.NucleotideSequence("ACGTACGT")
+    seq2 = seq.NucleotideSequence("ACGTACGTAAAA")
+    matrix = align.SubstitutionMatrix.std_nucleotide_matrix()
+    # The band does not contain the end of the alignment table
+    with pytest.raises(ValueError):
+        align.align_banded(seq1, seq2, matrix, band=(-2, 2))
+
+
+@pytest.mark.parametrize(
+    "direction, seed", itertools.product(
+        ["both", "upstream", "downstream"], range(20)
+    )
+)
+def test_align_local_ungapped(direction, seed):
+    """
+    Compare `align_local_ungapped()` to a brute force *X-Drop*
+    implementation.
+    """
+    np.random.seed(seed)
+    matrix = align.SubstitutionMatrix.std_protein_matrix()
+    score_matrix = matrix.score_matrix()
+    seq1 = seq.ProteinSequence()
+    seq1.code = np.random.randint(0, 20, 100)
+    seq2 = seq.ProteinSequence()
+    seq2.code = np.random.randint(0, 20, 120)
+    seed_pos = (np.random.randint(len(seq1)), np.random.randint(len(seq2)))
+    threshold = 10
+
+    def extend(positions1, positions2):
+        score = 0
+        max_score = 0
+        length = 0
+        for n, (i, j) in enumerate(zip(positions1, positions2)):
+            score += score_matrix[seq1.code[i], seq2.code[j]]
+            if score > max_score:
+                max_score = score
+                length = n + 1
+            elif max_score - score > threshold:
+                break
+        return max_score, length
+
+    ref_score = score_matrix[seq1.code[seed_pos[0]], seq2.code[seed_pos[1]]]
+    start = np.array(seed_pos)
+    stop = np.array(seed_pos) + 1
+    if direction in ("both", "downstream"):
+        score, length = extend(
+            range(seed_pos[0]+1, len(seq1)), range(seed_pos[1]+1, len(seq2))
+        )
+        ref_score += score
+        stop += length
+    if direction in ("both", "upstream"):
+        score, length = extend(
+            range(seed_pos[0]-1, -1, -1), range(seed_pos[1]-1, -1, -1)
+        )
+        ref_score += score
+        start -= length
+
+    alignment = align.align_local_ungapped(
+        seq1, seq2, matrix, seed_pos, threshold, direction
+    )
+    assert alignment.score == ref_score
+    assert align.score(alignment, matrix) == ref_score
+    assert alignment.trace[0].tolist() == start.tolist()
+    assert alignment.trace[-1].tolist() == (stop - 1).tolist()
+    assert align.align_local_ungapped(
+        seq1, seq2, matrix, seed_pos, threshold, direction, score_only=True
+    ) == ref_score
+
+
+@pytest.mark.parametrize(
+    "gap_penalty, direction, seed", itertools.product(
+        [-5, (-8,-2)], ["both", "upstream", "downstream"], range(10)
+    )
+)
+def test_align_local_gapped(gap_penalty, direction, seed):
+    """
+    Test whether the *X-Drop* extension of `align_local_gapped()`
+    with an infinite threshold finds the optimal alignment starting at
+    the seed.
+    The reference is a local alignment of homologous sequences,
+    whose start and end is given as seed to `align_local_gapped()`.
+    """
+    np.random.seed(seed)
+    matrix = align.SubstitutionMatrix.std_protein_matrix()
+    # Create two homologous sequences with random flanks
+    core = np.random.randint(0, 20, 50)
+    mutated = core.copy()
+    mutation_pos = np.random.choice(len(core), 10, replace=False)
+    mutated[mutation_pos] = np.random.randint(0, 20, 10)
+    mutated = np.delete(mutated, np.random.choice(len(core), 3))
+    seq1 = seq.ProteinSequence()
+    seq1.code = np.concatenate([
+        np.random.randint(0, 20, 20), core, np.random.randint(0, 20, 20)
+    ])
+    seq2 = seq.ProteinSequence()
+    seq2.code = np.concatenate([
+        np.random.randint(0, 20, 30), mutated, np.random.randint(0, 20, 10)
+    ])
+
+    ref_alignment = align.align_optimal(
+        seq1, seq2, matrix, gap_penalty=gap_penalty, local=True,
+        max_number=1
+    )[0]
+    if direction == "upstream":
+        seed_pos = ref_alignment.trace[-1]
+    elif direction == "downstream":
+        seed_pos = ref_alignment.trace[0]
+    else:
+        trace = ref_alignment.trace
+        seed_pos = trace[(trace != -1).all(axis=-1)][len(trace) // 2]
+    # An infinite threshold gives the optimal alignment
+    test_alignment = align.align_local_gapped(
+        seq1, seq2, matrix, seed_pos, threshold=10000,
+        gap_penalty=gap_penalty, direction=direction
+    )
+    assert test_alignment.score == ref_alignment.score
+    assert align.score(test_alignment, matrix, gap_penalty) \
+        == test_alignment.score
+    assert align.align_local_gapped(
+        seq1, seq2, matrix, seed_pos, threshold=10000,
+        gap_penalty=gap_penalty, direction=direction, score_only=True
+    ) == ref_alignment.score
+    # A small threshold cannot give a better score
+    test_score = align.align_local_gapped(
+        seq1, seq2, matrix, seed_pos, threshold=5,
+        gap_penalty=gap_penalty, direction=direction, score_only=True
+    )
+    assert test_score <= ref_alignment.score
+
+
 @pytest.mark.skipif(
     is_not_installed("muscle"),
     reason="MUSCLE is not installed"
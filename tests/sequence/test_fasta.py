@@ -3,8 +3,13 @@
 # information.
 
 import glob
+import itertools
+import struct
+import zlib
+from tempfile import NamedTemporaryFile
 import biotite.sequence as seq
 import biotite.sequence.io.fasta as fasta
+from biotite.file import InvalidFileError
 import numpy as np
 import os
 import os.path
@@ -111,4 +116,124 @@ def test_read_iter(file_name):
     
     test_dict = dict(fasta.FastaFile.read_iter(file_name))
 
-    assert test_dict == ref_dict
\ No newline at end of file
+    assert test_dict == ref_dict
+
+
+def _write_bgzip(path, content, block_size):
+    """
+    Write *bgzip* compressed content, with each block containing
+    `block_size` uncompressed bytes.
+    """
+    with open(path, "wb") as file:
+        # The final empty block is the EOF marker
+        for i in itertools.chain(range(0, len(content), block_size), [None]):
+            data = b"" if i is None else content[i : i + block_size]
+            compressor = zlib.compressobj(wbits=-15)
+            compressed = compressor.compress(data) + compressor.flush()
+            # Header (18 bytes) + compressed data + footer (8 bytes)
+            block_size_field = 18 + len(compressed) + 8 - 1
+            file.write(
+                b"\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00BC\x02\x00"
+                + struct.pack("<H", block_size_field)
+                + compressed
+                + struct.pack("<II", zlib.crc32(data), len(data))
+            )
+
+
+@pytest.mark.parametrize(
+    "file_name, compress, write_index",
+    list(itertools.product(
+        glob.glob(os.path.join(data_dir("sequence"), "*.fasta")),
+        [False, True],
+        [False, True]
+    ))
+)
+def test_indexed_fasta(file_name, compress, write_index):
+    """
+    Test whether sequence regions obtained from
+    :class:`IndexedFastaFile` are equal to the corresponding slices of
+    the sequences from :class:`FastaFile`, both for uncompressed and
+    *bgzip* compressed files and both with an index read from file and
+    built in memory.
+    """
+    ref_dict = {
+        header.split()[0]: seq_str for header, seq_str
+        in fasta.FastaFile.read(file_name).items()
+    }
+
+    with open(file_name, "rb") as file:
+        content = file.read()
+    temp = NamedTemporaryFile("wb", suffix=".fasta", delete=False)
+    temp.close()
+    if compress:
+        # Use small blocks to obtain regions spanning multiple blocks
+        _write_bgzip(temp.name, content, block_size=100)
+    else:
+        with open(temp.name, "wb") as file:
+            file.write(content)
+    if write_index:
+        fasta.create_fasta_index(temp.name)
+
+    np.random.seed(0)
+    with fasta.IndexedFastaFile(temp.name) as indexed_file:
+        assert list(indexed_file.keys()) == list(ref_dict.keys())
+        for name, ref_seq_str in ref_dict.items():
+            assert indexed_file.get_length(name) == len(ref_seq_str)
+            assert indexed_file.get_seq_string(name) == ref_seq_str
+            for _ in range(10):
+                start, stop = np.sort(
+                    np.random.randint(len(ref_seq_str) + 1, size=2)
+                )
+                assert indexed_file.get_seq_string(name, start, stop) \
+                    == ref_seq_str[start:stop]
+
+    for path in (temp.name, temp.name + ".fai", temp.name + ".gzi"):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def test_fasta_index_format():
+    """
+    Test whether the created index follows the *faidx* format.
+    """
+    content = (
+        ">seq1 first sequence\n"
+        "ACGTA\n"
+        "CGTAC\n"
+        "GT\n"
+        ">seq2\r\n"
+        "AAA\r\n"
+    )
+    temp = NamedTemporaryFile("wb", suffix=".fasta", delete=False)
+    temp.write(content.encode())
+    temp.close()
+    fasta.create_fasta_index(temp.name)
+    with open(temp.name + ".fai") as file:
+        index = file.read()
+    assert index == (
+        "seq1\t12\t21\t5\t6\n"
+        "seq2\t3\t43\t3\t5\n"
+    )
+    with fasta.IndexedFastaFile(temp.name) as indexed_file:
+        assert indexed_file.get_sequence("seq1", 3, 11) \
+            == seq.NucleotideSequence("TACGTACG")
+        assert indexed_file.get_seq_string("seq2", 1) == "AA"
+    os.remove(temp.name)
+    os.remove(temp.name + ".fai")
+
+
+def test_fasta_index_invalid():
+    """
+    Lines of different length within a sequence cannot be indexed.
+    """
+    content = (
+        ">seq1\n"
+        "ACG\n"
+        "ACGTA\n"
+    )
+    temp = NamedTemporaryFile("wb", suffix=".fasta", delete=False)
+    temp.write(content.encode())
+    temp.close()
+    with pytest.raises(InvalidFileError):
+        fasta.create_fasta_index(temp.name)
+    os.remove(temp.name)
@@ -3,9 +3,14 @@
 # information.
 
 import glob
-from tempfile import TemporaryFile
+import gzip
+import io
+import itertools
+from tempfile import TemporaryFile, NamedTemporaryFile
 import biotite.sequence as seq
 import biotite.sequence.io.fastq as fastq
+import biotite.sequence.io.fastq.file as fastq_file_module
+from biotite.file import InvalidFileError
 import numpy as np
 import os
 import os.path
@@ -84,3 +89,78 @@ def test_read_iter(file_name):
             assert test_id == ref_id
             assert test_seq == ref_seq
             assert (test_sc == ref_sc).all()
+
+
+@pytest.mark.parametrize(
+    "file_name, batch_size, block_size, four_lines, compress",
+    itertools.product(
+        glob.glob(os.path.join(data_dir("sequence"), "*.fastq")),
+        [1, 7, 10000],
+        [10, 10000],
+        [False, True],
+        [False, True]
+    )
+)
+def test_read_batches(monkeypatch, file_name, batch_size, block_size,
+                      four_lines, compress):
+    """
+    Test whether the sequences and scores from
+    :meth:`FastqFile.read_batches()` are equal to the ones from
+    :meth:`FastqFile.read_iter()`, also for blocks that end within an
+    entry.
+    """
+    # Enforce reading the file in multiple blocks
+    monkeypatch.setattr(fastq_file_module, "_BLOCK_SIZE", block_size)
+    ref_entries = list(fastq.FastqFile.read_iter(file_name, offset="Sanger"))
+
+    if four_lines:
+        # Rewrite file with each entry consisting of exactly four lines
+        fastq_file = fastq.FastqFile(offset="Sanger")
+        for identifier, (seq_str, scores) in ref_entries:
+            fastq_file[identifier] = seq_str, scores
+        content = str(fastq_file) + "\n"
+    else:
+        with open(file_name) as file:
+            content = file.read()
+    temp = NamedTemporaryFile("wb", suffix=".fastq", delete=False)
+    if compress:
+        with gzip.open(temp, "wb") as file:
+            file.write(content.encode())
+    else:
+        temp.write(content.encode())
+    temp.close()
+
+    alphabet = seq.NucleotideSequence.alphabet_amb
+    test_entries = []
+    for identifiers, codes, scores, offsets in fastq.FastqFile.read_batches(
+        temp.name, offset="Sanger", batch_size=batch_size
+    ):
+        assert len(identifiers) <= batch_size
+        assert len(offsets) == len(identifiers) + 1
+        for i, identifier in enumerate(identifiers):
+            seq_str = "".join(
+                alphabet.decode_multiple(codes[offsets[i] : offsets[i+1]])
+            )
+            test_entries.append(
+                (identifier, (seq_str, scores[offsets[i] : offsets[i+1]]))
+            )
+    os.remove(temp.name)
+
+    assert len(test_entries) == len(ref_entries)
+    for (test_id, (test_seq, test_sc)), (ref_id, (ref_seq, ref_sc)) \
+        in zip(test_entries, ref_entries):
+            assert test_id == ref_id
+            assert test_seq == ref_seq
+            assert test_sc.tolist() == ref_sc.tolist()
+
+
+def test_read_batches_incomplete():
+    """
+    An incomplete last entry must raise an exception.
+    """
+    content = "@seq1\nACGT\n+\n!!!!\n@seq2\nACGT\n+\n!!\n"
+    with pytest.raises(InvalidFileError):
+        for _ in fastq.FastqFile.read_batches(
+            io.StringIO(content), offset="Sanger"
+        ):
+            pass
@@ -0,0 +1,148 @@
+# This source code is part of the Biotite package and is distributed
+# under the 3-Clause BSD License. Please see 'LICENSE.rst' for further
+# information.
+
+import pickle
+import itertools
+import numpy as np
+import pytest
+import biotite.sequence as seq
+import biotite.sequence.align as align
+
+
+@pytest.fixture
+def reference_sequences():
+    np.random.seed(0)
+    sequences = []
+    for length in (1000, 50, 1, 0, 500):
+        sequence = seq.NucleotideSequence()
+        sequence.code = np.random.randint(0, 4, length)
+        sequences.append(sequence)
+    return sequences
+
+
+@pytest.mark.parametrize("k", [1, 3, 8])
+def test_match(reference_sequences, k):
+    """
+    Test whether :func:`KmerTable.match()` finds the same matches as a
+    brute force comparison of all *k-mers*.
+    """
+    np.random.seed(1)
+    query = seq.NucleotideSequence()
+    query.code = np.random.randint(0, 4, 200)
+    table = align.KmerTable.from_sequences(k, reference_sequences)
+
+    ref_matches = []
+    for i in range(len(query) - k + 1):
+        for ref_id, reference in enumerate(reference_sequences):
+            for j in range(len(reference) - k + 1):
+                if np.array_equal(query.code[i:i+k], reference.code[j:j+k]):
+                    ref_matches.append((i, ref_id, j))
+    ref_matches = np.array(ref_matches, dtype=np.int64).reshape(-1, 3)
+
+    test_matches = table.match(query)
+    assert test_matches.tolist() == ref_matches.tolist()
+
+
+def test_kmer_codes():
+    """
+    Test *k-mer code* calculation for a sequence against the codes of
+    each individual *k-mer*.
+    """
+    k = 4
+    sequence = seq.NucleotideSequence("ACGTTGCAAC")
+    table = align.KmerTable(sequence.alphabet, k)
+    codes = table.kmer_codes(sequence)
+    assert len(codes) == len(sequence) - k + 1
+    for i, code in enumerate(codes):
+        assert code == table.kmer_code(sequence[i : i+k])
+    # All possible k-mers have unique codes in the range [0, n^k)
+    all_codes = [
+        table.kmer_code(kmer)
+        for kmer in itertools.product(sequence.alphabet, repeat=k)
+    ]
+    assert sorted(all_codes) == list(range(len(sequence.alphabet) ** k))
+
+
+def test_lookup(reference_sequences):
+    """
+    Test whether the positions of a *k-mer* in the table point to that
+    *k-mer* and whether its count is correct.
+    """
+    k = 5
+    table = align.KmerTable.from_sequences(k, reference_sequences)
+    for kmer in table.get_kmers():
+        positions = table[kmer]
+        assert kmer in table
+        assert len(positions) == table.count([kmer])[0]
+        for ref_id, pos in positions:
+            reference = reference_sequences[ref_id]
+            assert table.kmer_code(reference[pos : pos+k]) == kmer
+    assert table.count().sum() \
+        == sum(max(len(s) - k + 1, 0) for s in reference_sequences)
+    # A k-mer that cannot appear in the table
+    absent = len(table.alphabet) ** k
+    assert absent not in table
+    assert len(table[absent]) == 0
+
+
+def test_ref_ids(reference_sequences):
+    """
+    Test custom reference IDs.
+    """
+    ref_ids = np.arange(len(reference_sequences)) * 10
+    table = align.KmerTable.from_sequences(
+        3, reference_sequences, ref_ids=ref_ids
+    )
+    matches = table.match(reference_sequences[1])
+    assert set(matches[:, 1]).issubset(ref_ids)
+    # The query sequence itself is among the references
+    assert 10 in matches[:, 1]
+
+
+def test_large_ref_ids():
+    """
+    Test that reference IDs beyond the 32-bit range are not truncated.
+    """
+    ref_id = 2**40 + 1
+    table = align.KmerTable.from_sequences(
+        3, [seq.NucleotideSequence("ACGTAC")], ref_ids=[ref_id]
+    )
+    matches = table.match(seq.NucleotideSequence("ACG"))
+    assert matches.tolist() == [[0, ref_id, 0]]
+
+
+def test_unhashable():
+    table = align.KmerTable.from_sequences(
+        3, [seq.NucleotideSequence("ACGTAC")]
+    )
+    with pytest.raises(TypeError):
+        hash(table)
+
+
+def test_pickle(reference_sequences):
+    """
+    Test whether a pickled and unpickled table equals the original one.
+    """
+    table = align.KmerTable.from_sequences(6, reference_sequences)
+    unpickled = pickle.loads(pickle.dumps(table))
+    assert unpickled == table
+    assert np.array_equal(
+        unpickled.match(reference_sequences[0]),
+        table.match(reference_sequences[0])
+    )
+
+
+def test_invalid_alphabet():
+    table = align.KmerTable.from_sequences(
+        3, [seq.NucleotideSequence("ACGTAC")]
+    )
+    with pytest.raises(seq.AlphabetError):
+        table.match(seq.ProteinSequence("MLKRA"))
+
+
+def test_invalid_k():
+    with pytest.raises(ValueError):
+        align.KmerTable(seq.ProteinSequence.alphabet, 0)
+    with pytest.raises(ValueError):
+        align.KmerTable(seq.ProteinSequence.alphabet, 20)
@@ -21,4 +21,21 @@ def test_find_symbol():
     dna = seq.NucleotideSequence(string)
     assert list(seq.find_symbol(dna, symbol)) == [1,6,7,10]
     assert seq.find_symbol_first(dna, symbol) == 1
-    assert seq.find_symbol_last(dna, symbol) == 10
\ No newline at end of file
+    assert seq.find_symbol_last(dna, symbol) == 10
+
+@pytest.mark.parametrize("seed", range(10))
+def test_find_subsequence_random(seed):
+    """
+    Compare :func:`find_subsequence()` with a brute force search on
+    random sequences.
+    """
+    np.random.seed(seed)
+    main_seq = seq.NucleotideSequence()
+    main_seq.code = np.random.randint(0, 4, 1000)
+    sub_seq = seq.NucleotideSequence()
+    sub_seq.code = np.random.randint(0, 4, np.random.randint(1, 5))
+    ref_matches = [
+        i for i in range(len(main_seq) - len(sub_seq) + 1)
+        if np.array_equal(main_seq.code[i : i+len(sub_seq)], sub_seq.code)
+    ]
+    assert list(seq.find_subsequence(main_seq, sub_seq)) == ref_matches
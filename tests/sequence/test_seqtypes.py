@@ -3,6 +3,7 @@
 # information.
 
 import biotite.sequence as seq
+import biotite.sequence.align as align
 import numpy as np
 import pytest
 
@@ -22,6 +23,90 @@ def test_reverse_complement():
     string = "AATGCGTTA"
     dna = seq.NucleotideSequence(string)
     assert "TAACGCATT" == str(dna.reverse().complement())
+    assert "TAACGCATT" == str(dna.reverse_complement())
+    dna = seq.NucleotideSequence("ANNGCBRTAN")
+    assert dna.reverse_complement() == dna.reverse().complement()
+
+
+@pytest.mark.parametrize("length", [0, 1, 2, 3, 4, 5, 7, 8, 9, 100, 1001])
+def test_packed_nucleotide_sequence(length):
+    """
+    Each operation on a :class:`PackedNucleotideSequence` should give
+    the same result as on the corresponding unpacked
+    :class:`NucleotideSequence`.
+    """
+    np.random.seed(length)
+    ref_dna = seq.NucleotideSequence(ambiguous=False)
+    ref_dna.code = np.random.randint(4, size=length)
+    dna = ref_dna.pack()
+    
+    assert len(dna.packed_code) == (length + 3) // 4
+    assert len(dna) == length
+    assert dna.code.tolist() == ref_dna.code.tolist()
+    assert str(dna) == str(ref_dna)
+    assert list(dna) == list(ref_dna)
+    assert dna == ref_dna
+    assert ref_dna == dna
+    assert dna.unpack() == ref_dna
+    assert seq.PackedNucleotideSequence(str(ref_dna)) == dna
+    
+    for test_seq, ref_seq in [
+        (dna.reverse(),            ref_dna.reverse()),
+        (dna.complement(),         ref_dna.complement()),
+        (dna.reverse_complement(), ref_dna.reverse().complement()),
+        (dna[3 : length-2],        ref_dna[3 : length-2]),
+        (dna[-5:],                 ref_dna[-5:]),
+        (dna[::3],                 ref_dna[::3]),
+    ]:
+        assert isinstance(test_seq, seq.PackedNucleotideSequence)
+        assert test_seq.code.tolist() == ref_seq.code.tolist()
+        # Packed sequences are compared via their packed code
+        # -> This checks, that the unused bits of the last byte are zero
+        assert test_seq == seq.PackedNucleotideSequence(str(ref_seq))
+    for i in range(-length, length):
+        assert dna[i] == ref_dna[i]
+
+    if length >= 3:
+        original_string = str(dna)
+        test_dna = dna.copy()
+        test_dna[1:3] = "GG"
+        test_dna[0] = "T"
+        ref_dna[1:3] = "GG"
+        ref_dna[0] = "T"
+        assert test_dna == ref_dna
+        # The copied sequence is not modified
+        assert str(dna) == original_string
+
+
+@pytest.mark.parametrize("k", [1, 2, 5, 16, 31])
+def test_packed_kmer_codes(k):
+    """
+    The *k-mer codes* computed on the packed sequence should be equal
+    to the ones computed by a :class:`KmerTable`.
+    """
+    np.random.seed(k)
+    dna = seq.NucleotideSequence(ambiguous=False)
+    dna.code = np.random.randint(4, size=1000)
+    table = align.KmerTable(seq.NucleotideSequence.unambiguous_alphabet(), k)
+    
+    assert dna.pack().kmer_codes(k).tolist() == table.kmer_codes(dna).tolist()
+
+
+def test_packed_ambiguous():
+    """
+    Ambiguous symbols cannot be packed.
+    """
+    with pytest.raises(seq.AlphabetError):
+        seq.PackedNucleotideSequence("ACGN")
+    with pytest.raises(seq.AlphabetError):
+        seq.NucleotideSequence("ACGN").pack()
+    dna = seq.PackedNucleotideSequence("ACGT")
+    with pytest.raises(seq.AlphabetError):
+        dna[0] = "N"
+    # An ambiguous sequence without ambiguous symbols can be packed
+    assert str(seq.NucleotideSequence("ACGT", ambiguous=True).pack()) \
+        == "ACGT"
+
 
 def test_stop_removal():
     string = "LYG*GR*"
@@ -88,3 +173,19 @@ def test_get_molecular_weight(monoisotopic, expected_mol_weight_protein):
         monoisotopic=monoisotopic)
     assert mol_weight_protein == \
            pytest.approx(expected_mol_weight_protein, abs=1e-2)
+
+
+def test_packed_code_read_only():
+    """
+    The unpacked code of a :class:`PackedNucleotideSequence` is only a
+    temporary array, hence writing into it should raise an exception
+    instead of being silently lost.
+    """
+    dna = seq.PackedNucleotideSequence("ACGT")
+    with pytest.raises(ValueError):
+        dna.code[0] = 3
+    assert str(dna) == "ACGT"
+    # Modifying the unpacked sequence is still possible
+    unpacked_dna = dna.unpack()
+    unpacked_dna[0] = "T"
+    assert str(unpacked_dna) == "TCGT"
@@ -147,6 +147,73 @@ def test_bonds(array):
                                                       [7, 9, 0]]
 
 
+def _set_res_id(array):
+    array.res_id = np.array([1, 2, 1, 1, 2])
+
+def _set_annotation(array):
+    array.set_annotation("chain_id", np.array(["A", "A", "A", "B", "B"]))
+
+def _modify_in_place(array):
+    # In-place modifications must be followed by 'set_annotation()'
+    res_name = array.res_name
+    res_name[0] = "GLY"
+    array.set_annotation("res_name", res_name)
+
+def _set_atom(array):
+    atom = array[4]
+    atom.chain_id = "C"
+    array[4] = atom
+
+def _del_atom(array):
+    del array[1]
+
+def _delete_annotation(array):
+    array.del_annotation("ins_code")
+    array.add_annotation("ins_code", dtype="U1")
+    ins_code = array.ins_code.copy()
+    ins_code[3] = "A"
+    array.ins_code = ins_code
+
+def _set_bonds(array):
+    array.bonds = struc.BondList(5, np.array([(0, 1), (1, 2)]))
+
+def _remove_bond(array):
+    array.bonds.remove_bond(2, 4)
+
+@pytest.mark.parametrize(
+    "modify", [
+        _set_res_id, _set_annotation, _modify_in_place, _set_atom, _del_atom, _delete_annotation, _set_bonds, _remove_bond
+    ]
+)
+def test_cached_segments(array, modify):
+    """
+    Check that cached residue starts, chain starts and molecule indices
+    are updated, when the atom array is modified in any way.
+    The reference is computed from a copy, which has an empty cache.
+    """
+    array.bonds = struc.BondList(5, np.array([(0, 1), (2, 3), (2, 4)]))
+
+    def segments(array):
+        return (
+            struc.get_residue_starts(array).tolist(),
+            struc.get_chain_starts(array, add_exclusive_stop=True).tolist(),
+            [i.tolist() for i in struc.get_molecule_indices(array)]
+        )
+
+    # Fill the cache
+    initial_segments = segments(array)
+    # Modifications of the returned arrays must not alter the cache
+    struc.get_residue_starts(array)[:] = -1
+    struc.get_molecule_indices(array)[0][:] = -1
+    assert segments(array) == initial_segments
+
+    modify(array)
+    test_segments = segments(array)
+    ref_segments = segments(array.copy())
+    assert test_segments == ref_segments
+    assert test_segments != initial_segments
+
+
 def test_box(array, stack, array_box, stack_box):
     # Test attribute access
     with pytest.raises(ValueError):
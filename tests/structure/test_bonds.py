@@ -433,6 +433,60 @@ def test_connect_via_residue_names(single_model):
     assert test_bonds == ref_bonds
 
 
+def test_connect_via_residue_names_inter_residue():
+    """
+    Test the bonds between adjacent residues for a chain that mixes
+    peptide, nucleotide and non-polymer residues.
+    Only residues with compatible link types should be connected, where
+    the link type of each residue must be taken from the residue itself.
+    """
+    residues = [
+        # (residue ID, residue name, atom names)
+        (1, "ALA", ["N", "CA", "C", "O"]),
+        (2, "GLY", ["N", "CA", "C", "O"]),
+        # Non-polymer with an atom named like the peptide connector
+        # -> must not be connected to the preceding peptide
+        (3, "NH3", ["N"]),
+        (4, "DA",  ["P", "O5'", "C5'", "O3'"]),
+        (5, "DC",  ["P", "O5'", "C5'", "O3'"]),
+        # Nucleotide followed by a peptide -> not connected
+        (6, "ALA", ["N", "CA", "C", "O"]),
+        # Gap in residue IDs -> not connected
+        (8, "GLY", ["N", "CA", "C", "O"]),
+    ]
+    atoms = struc.array([
+        struc.Atom(
+            [0, 0, 0], chain_id="A", res_id=res_id, res_name=res_name,
+            atom_name=atom_name, element=atom_name[0]
+        )
+        for res_id, res_name, atom_names in residues
+        for atom_name in atom_names
+    ])
+
+    bonds = struc.connect_via_residue_names(atoms).as_array()
+    # Only consider bonds between different residues
+    bonds = bonds[atoms.res_id[bonds[:, 0]] != atoms.res_id[bonds[:, 1]]]
+    test_bonds = set(
+        tuple(
+            (atoms.res_id[i], atoms.atom_name[i]) for i in sorted(bond[:2])
+        ) + (bond[2],)
+        for bond in bonds
+    )
+    assert test_bonds == set([
+        ((1, "C"), (2, "N"), struc.BondType.SINGLE),
+        ((4, "O3'"), (5, "P"), struc.BondType.SINGLE),
+    ])
+
+
+def test_connect_via_residue_names_empty():
+    """
+    An empty structure should give an empty :class:`BondList`.
+    """
+    bonds = struc.connect_via_residue_names(struc.AtomArray(0))
+    assert bonds.get_atom_count() == 0
+    assert len(bonds.as_array()) == 0
+
+
 def test_connect_via_distances():
     """
     Test whether the created bond list is equal to the bonds deposited
@@ -0,0 +1,82 @@
+# This source code is part of the Biotite package and is distributed
+# under the 3-Clause BSD License. Please see 'LICENSE.rst' for further
+# information.
+
+import glob
+import os
+from os.path import join
+from tempfile import TemporaryDirectory
+import numpy as np
+import pytest
+import biotite.structure as struc
+import biotite.structure.io as strucio
+import biotite.structure.io.cache as cache
+import biotite.structure.io.npz as npz
+from ..util import data_dir
+
+
+@pytest.mark.parametrize(
+    "path", glob.glob(join(data_dir("structure"), "*.npz"))
+)
+def test_array_conversion(path):
+    """
+    Test whether writing and reading a structure gives the same
+    structure, including bonds and box.
+    """
+    ref_array = npz.NpzFile.read(path).get_structure()
+    with TemporaryDirectory() as temp_dir:
+        cache_path = join(temp_dir, "test.cache")
+        cache_file = cache.CacheFile()
+        cache_file.set_structure(ref_array)
+        cache_file.write(cache_path)
+
+        cache_file = cache.CacheFile.read(cache_path)
+        test_array = cache_file.get_structure()
+        assert test_array == ref_array
+        assert test_array.bonds == ref_array.bonds
+        if ref_array.box is None:
+            assert test_array.box is None
+        else:
+            assert np.array_equal(test_array.box, ref_array.box)
+        # Memory-mapped arrays are read-only
+        assert not test_array.coord.flags.writeable
+
+        if isinstance(ref_array, struc.AtomArrayStack):
+            test_model = cache_file.get_structure(model=-1)
+            assert test_model == ref_array[-1]
+            assert np.array_equal(
+                cache_file.get_coord(model=2), ref_array.coord[1]
+            )
+        # Release the memory-mapped file
+        del cache_file, test_array
+
+
+def test_cached_loading():
+    """
+    Test whether :func:`load_structure()` uses the cache, if the source
+    file and the parser options are unchanged, and whether it reparses
+    the file otherwise.
+    """
+    path = join(data_dir("structure"), "1l2y.mmtf")
+    with TemporaryDirectory() as temp_dir:
+        cache_dir = join(temp_dir, "cache")
+        ref_array = strucio.load_structure(path)
+        test_array = strucio.load_structure(path, cache_dir=cache_dir)
+        assert test_array == ref_array
+        # The structure is always returned from the cache,
+        # even if it was newly cached
+        assert not test_array.coord.flags.writeable
+        # The structure is cached in the directory
+        assert len(os.listdir(cache_dir)) == 1
+        test_array = strucio.load_structure(path, cache_dir=cache_dir)
+        assert test_array == ref_array
+        assert not test_array.coord.flags.writeable
+
+        # Different parser options lead to a different cache entry
+        ref_array = strucio.load_structure(path, model=1)
+        test_array = strucio.load_structure(
+            path, cache_dir=cache_dir, model=1
+        )
+        assert test_array == ref_array
+        assert len(os.listdir(cache_dir)) == 2
+        del test_array
@@ -134,4 +134,150 @@ def test_selection():
     cell_list = struc.CellList(array, cell_size=10, selection=selection)
     test_near_atoms = array[cell_list.get_atoms(array.coord[0], 20.0)]
 
-    assert test_near_atoms == ref_near_atoms
\ No newline at end of file
+    assert test_near_atoms == ref_near_atoms
+
+@pytest.mark.parametrize(
+    "cell_size, radius, periodic",
+    itertools.product(
+        [1, 5],
+        [2, 5, np.array([2.0, 5.0])],
+        [False, True],
+    )
+)
+def test_sparse_output(cell_size, radius, periodic):
+    """
+    Check whether the compressed sparse row output of
+    :meth:`get_atoms()` and :meth:`get_atoms_in_cells()` contains the
+    same indices as the padded index array.
+    """
+    array = strucio.load_structure(join(data_dir("structure"), "3o5r.mmtf"))
+    if periodic:
+        array.box = np.diag(
+            np.max(array.coord, axis=-2) - np.min(array.coord, axis=-2)
+        )
+    cell_list = struc.CellList(array, cell_size=cell_size, periodic=periodic)
+    np.random.seed(0)
+    if isinstance(radius, np.ndarray):
+        coord = array.coord[np.random.choice(array.array_length(), 2)]
+    else:
+        coord = array.coord[np.random.choice(array.array_length(), 10)]
+
+    ref_indices = cell_list.get_atoms(coord, radius)
+    offsets, indices, distances = cell_list.get_atoms(
+        coord, radius, as_sparse=True, return_distances=True
+    )
+    assert offsets.shape == (len(coord) + 1,)
+    assert offsets[-1] == len(indices) == len(distances)
+    for i, ref_row in enumerate(ref_indices):
+        ref_row = ref_row[ref_row != -1]
+        row = indices[offsets[i] : offsets[i+1]]
+        assert row.tolist() == ref_row.tolist()
+        ref_distances = struc.distance(
+            coord[i], array.coord[row], box=array.box if periodic else None
+        )
+        assert distances[offsets[i] : offsets[i+1]] \
+            == pytest.approx(ref_distances, abs=1e-4)
+
+    ref_indices = cell_list.get_atoms_in_cells(coord)
+    offsets, indices = cell_list.get_atoms_in_cells(coord, as_sparse=True)
+    for i, ref_row in enumerate(ref_indices):
+        ref_row = ref_row[ref_row != -1]
+        assert indices[offsets[i] : offsets[i+1]].tolist() == ref_row.tolist()
+
+
+@pytest.mark.parametrize(
+    "cell_size, threshold, periodic, use_selection",
+    itertools.product(
+        [0.5, 2, 5],
+        [2, 5],
+        [False, True],
+        [False, True],
+    )
+)
+def test_atom_pairs(cell_size, threshold, periodic, use_selection):
+    """
+    Check whether :meth:`get_atom_pairs()` finds the same pairs as the
+    adjacency matrix.
+    """
+    array = strucio.load_structure(join(data_dir("structure"), "3o5r.mmtf"))
+    if periodic:
+        array.box = np.diag(
+            np.max(array.coord, axis=-2) - np.min(array.coord, axis=-2)
+        )
+    if use_selection:
+        np.random.seed(0)
+        selection = np.random.choice((False, True), array.array_length())
+    else:
+        selection = None
+    cell_list = struc.CellList(
+        array, cell_size=cell_size, periodic=periodic, selection=selection
+    )
+
+    pairs, distances = cell_list.get_atom_pairs(
+        threshold, return_distances=True
+    )
+    matrix = cell_list.create_adjacency_matrix(threshold)
+    ref_pairs = np.stack(np.where(np.triu(matrix, k=1)), axis=-1)
+    assert pairs.tolist() == ref_pairs.tolist()
+    ref_distances = struc.index_distance(array, pairs, periodic)
+    assert distances == pytest.approx(ref_distances, abs=1e-4)
+
+
+def test_invalid_output_format():
+    array = struc.AtomArray(length=5)
+    array.coord = np.array([[0,0,i] for i in range(5)])
+    cell_list = struc.CellList(array, cell_size=1)
+    with pytest.raises(ValueError):
+        cell_list.get_atoms(array.coord, 1, as_mask=True, as_sparse=True)
+    with pytest.raises(ValueError):
+        cell_list.get_atoms(array.coord, 1, return_distances=True)
+
+
+@pytest.mark.parametrize(
+    "periodic, use_selection, displacement",
+    itertools.product(
+        [False, True],
+        [False, True],
+        # The latter moves atoms outside the initial cells
+        [1.0, 20.0],
+    )
+)
+def test_update(periodic, use_selection, displacement):
+    """
+    Check whether an updated cell list gives the same results as a cell
+    list created from the new coordinates.
+    """
+    array = strucio.load_structure(join(data_dir("structure"), "3o5r.mmtf"))
+    if periodic:
+        array.box = np.diag(
+            np.max(array.coord, axis=-2) - np.min(array.coord, axis=-2)
+        )
+    np.random.seed(0)
+    if use_selection:
+        selection = np.random.choice((False, True), array.array_length())
+    else:
+        selection = None
+    new_coord = array.coord + np.random.uniform(
+        -displacement, displacement, size=array.coord.shape
+    ).astype(np.float32)
+
+    cell_list = struc.CellList(
+        array, cell_size=5, periodic=periodic, selection=selection
+    )
+    cell_list.update(new_coord)
+    test_pairs = cell_list.get_atom_pairs(5)
+    test_indices = cell_list.get_atoms(new_coord[:10], 5)
+
+    array.coord = new_coord
+    ref_cell_list = struc.CellList(
+        array, cell_size=5, periodic=periodic, selection=selection
+    )
+    ref_pairs = ref_cell_list.get_atom_pairs(5)
+    ref_indices = ref_cell_list.get_atoms(new_coord[:10], 5)
+
+    assert test_pairs.tolist() == ref_pairs.tolist()
+    for test_row, ref_row in zip(test_indices, ref_indices):
+        assert set(test_row[test_row != -1]) == set(ref_row[ref_row != -1])
+
+    with pytest.raises(IndexError):
+        cell_list.update(new_coord[:-1])
@@ -31,4 +31,20 @@ def test_chain_iter(array):
     for chain in struc.get_chains(array):
         n += 1
         assert isinstance(array, struc.AtomArray)
-    assert n == 6
\ No newline at end of file
+    assert n == 6
+
+
+def test_apply_chain_wise(array):
+    data = struc.apply_chain_wise(array, np.ones(len(array)), np.sum)
+    assert data.tolist() == [
+        len(chain) for chain in struc.chain_iter(array)
+    ]
+
+def test_spread_chain_wise(array):
+    input_data = np.arange(struc.get_chain_count(array))
+    output_data = struc.spread_chain_wise(array, input_data)
+    ref_data = np.concatenate([
+        np.full(len(chain), i) for i, chain
+        in enumerate(struc.chain_iter(array))
+    ])
+    assert output_data.tolist() == ref_data.tolist()
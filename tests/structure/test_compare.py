@@ -2,9 +2,14 @@
 # under the 3-Clause BSD License. Please see 'LICENSE.rst' for further
 # information.
 
+import importlib
+import itertools
+from os.path import join
 import biotite.structure as struc
+import biotite.structure.io as strucio
 import numpy as np
 import pytest
+from ..util import data_dir
 
 
 @pytest.fixture
@@ -29,4 +34,39 @@ def test_rmsf(stack, as_coord):
     if as_coord:
         stack = stack.coord
     assert struc.rmsf(struc.average(stack), stack).tolist() \
-           == pytest.approx([21.21320344] * 5)
\ No newline at end of file
+           == pytest.approx([21.21320344] * 5)
+
+
+@pytest.mark.parametrize(
+    "superimpose, condensed, tile_size, n_jobs",
+    itertools.product([False, True], [False, True], [256, 7], [1, 2])
+)
+def test_pairwise_rmsd(monkeypatch, superimpose, condensed, tile_size,
+                       n_jobs):
+    """
+    Compare :func:`pairwise_rmsd()` with :func:`rmsd()` applied to
+    each model as reference, with and without prior superimposition.
+    """
+    # Test also the borders between tiles
+    monkeypatch.setattr(
+        importlib.import_module("biotite.structure.compare"),
+        "_TILE_SIZE", tile_size
+    )
+    stack = strucio.load_structure(join(data_dir("structure"), "1l2y.mmtf"))
+
+    ref_rmsd = np.zeros((len(stack), len(stack)))
+    for i, reference in enumerate(stack):
+        if superimpose:
+            subject, _ = struc.superimpose(reference, stack)
+        else:
+            subject = stack
+        ref_rmsd[i] = struc.rmsd(reference, subject)
+
+    test_rmsd = struc.pairwise_rmsd(
+        stack, superimpose, condensed, n_jobs=n_jobs
+    )
+    if condensed:
+        ref_rmsd = ref_rmsd[np.triu_indices(len(stack), k=1)]
+    else:
+        assert (test_rmsd == test_rmsd.T).all()
+    assert test_rmsd == pytest.approx(ref_rmsd, abs=1e-4)
@@ -98,6 +98,48 @@ def test_filter_altloc(all_atloc_structure, filter_func):
     assert test_atom_set == ref_atom_set
 
 
+@pytest.mark.parametrize("seed", range(10))
+def test_filter_altloc_consistency(all_atloc_structure, seed):
+    """
+    Compare the altloc filters with a straightforward implementation
+    iterating over all residues, using random altloc IDs and
+    occupancies.
+    """
+    atoms = all_atloc_structure
+    rng = np.random.default_rng(seed)
+    altloc_ids = rng.choice(
+        np.array([".", "?", " ", "", "A", "B", "C", "1"]), len(atoms)
+    )
+    # Discrete values to provoke equal occupancy sums
+    occupancies = rng.integers(0, 4, len(atoms)) / 4
+
+    ref_first_filter = np.isin(altloc_ids, [".", "?", " ", ""])
+    ref_occupancy_filter = ref_first_filter.copy()
+    starts = struc.get_residue_starts(atoms, add_exclusive_stop=True)
+    for start, stop in zip(starts[:-1], starts[1:]):
+        res_altloc_ids = altloc_ids[start:stop]
+        letter_ids = []
+        for altloc_id in res_altloc_ids:
+            if altloc_id.isalpha() and altloc_id not in letter_ids:
+                letter_ids.append(altloc_id)
+        if len(letter_ids) == 0:
+            continue
+        ref_first_filter[start:stop] |= (res_altloc_ids == letter_ids[0])
+        occupancy_sums = [
+            np.sum(occupancies[start:stop][res_altloc_ids == altloc_id])
+            for altloc_id in letter_ids
+        ]
+        highest_id = letter_ids[np.argmax(occupancy_sums)]
+        ref_occupancy_filter[start:stop] |= (res_altloc_ids == highest_id)
+
+    test_first_filter = struc.filter_first_altloc(atoms, altloc_ids)
+    test_occupancy_filter = struc.filter_highest_occupancy_altloc(
+        atoms, altloc_ids, occupancies
+    )
+    assert test_first_filter.tolist() == ref_first_filter.tolist()
+    assert test_occupancy_filter.tolist() == ref_occupancy_filter.tolist()
+
+
 def test_filter_highest_occupancy_altloc(all_atloc_structure):
     """
     When filtering altlocs with the highest occupancy, the average
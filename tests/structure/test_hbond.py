@@ -3,6 +3,7 @@
 # information.
 
 from tempfile import NamedTemporaryFile
+import importlib
 from os.path import join
 import numpy as np
 import pytest
@@ -157,4 +158,40 @@ def test_hbond_periodicity(translation_vector):
     array.coord = struc.move_inside_box(array.coord, array.box)
     hbonds = struc.hbond(array, periodic=True)
     hbonds = set([tuple(triplet) for triplet in hbonds])
-    assert ref_hbonds == hbonds
\ No newline at end of file
+    assert ref_hbonds == hbonds
+
+def test_hbond_with_bonds():
+    """
+    Using the :class:`BondList` of the structure for finding the
+    hydrogen atoms bonded to donors should give the same result as the
+    distance-based approach.
+    """
+    stack = load_structure(join(data_dir("structure"), "1l2y.mmtf"))
+    ref_triplets, ref_mask = struc.hbond(stack)
+
+    stack.bonds = struc.connect_via_distances(stack[0])
+    test_triplets, test_mask = struc.hbond(stack)
+
+    ref_order = np.lexsort(ref_triplets.T)
+    test_order = np.lexsort(test_triplets.T)
+    assert test_triplets[test_order].tolist() \
+        == ref_triplets[ref_order].tolist()
+    assert test_mask[:, test_order].tolist() \
+        == ref_mask[:, ref_order].tolist()
+
+
+def test_hbond_chunks(monkeypatch):
+    """
+    The evaluation of the models in chunks should not affect the
+    result.
+    """
+    stack = load_structure(join(data_dir("structure"), "1l2y.mmtf"))
+    ref_triplets, ref_mask = struc.hbond(stack)
+
+    # The module is shadowed by the function with the same name
+    hbond_module = importlib.import_module("biotite.structure.hbond")
+    monkeypatch.setattr(hbond_module, "_MAX_CHUNK_SIZE", 100)
+    test_triplets, test_mask = struc.hbond(stack)
+
+    assert test_triplets.tolist() == ref_triplets.tolist()
+    assert test_mask.tolist() == ref_mask.tolist()
@@ -104,6 +104,134 @@ def test_link_type():
     assert strucinfo.link_type("ALA").upper() == "L-PEPTIDE LINKING"
 
 
+@pytest.mark.parametrize("memory_mapped", [False, True])
+def test_component_store(tmp_path, memory_mapped):
+    """
+    Create a component store from small *MessagePack* datasets and
+    check whether the datasets can be restored from it.
+    """
+    msgpack = pytest.importorskip("msgpack")
+    from biotite.structure.info.ccd import ComponentStore
+
+    datasets = {
+        "residues": {
+            "ABC": {
+                "res_name": ("ABC",) * 3,
+                "atom_name": ("C1", "O1", "HO1"),
+                "element": ("C", "O", "H"),
+                "charge": (0, -1, 0),
+                "hetero": (True, True, True),
+                "coord_x": (0.0, 1.0, 2.0),
+                "coord_y": (0.5, 1.5, 2.5),
+                "coord_z": (-1.0, -2.0, -3.0),
+                "bond_i": (0, 1),
+                "bond_j": (1, 2),
+                "bond_type": (2, 1),
+            }
+        },
+        "intra_bonds": {
+            "ABC": {("C1", "O1"): 2, ("O1", "HO1"): 1},
+            # Bond with atoms that do not appear in the residue structure
+            "DEF": {("N", "CA"): 1},
+        },
+        "residue_masses": {"ABC": 42.0, "GHI": 1.5},
+        "link_types": {"ABC": "NON-POLYMER", "GHI": "L-PEPTIDE LINKING"},
+        "residue_names": {"ABC": "ALPHABET", "DEF": "Ünicode"},
+    }
+    for name, dataset in datasets.items():
+        with open(tmp_path / f"{name}.msgpack", "wb") as file:
+            msgpack.pack(dataset, file)
+
+    store = ComponentStore.from_msgpack(str(tmp_path))
+    if memory_mapped:
+        store.write(str(tmp_path / "components.bcs"))
+        store = ComponentStore.read(str(tmp_path / "components.bcs"))
+
+    assert store.res_names() == ["ABC", "DEF", "GHI"]
+    assert store.index("XYZ") == -1
+    assert store.index("ABCDEF") == -1
+    abc, def_, ghi = [store.index(name) for name in ("ABC", "DEF", "GHI")]
+
+    structure = store.structure(abc)
+    assert structure["atom_name"].tolist() == ["C1", "O1", "HO1"]
+    assert structure["element"].tolist() == ["C", "O", "H"]
+    assert structure["charge"].tolist() == [0, -1, 0]
+    assert structure["hetero"].tolist() == [True, True, True]
+    assert structure["coord"].tolist() == [
+        [0.0, 0.5, -1.0], [1.0, 1.5, -2.0], [2.0, 2.5, -3.0]
+    ]
+    assert structure["bonds"].tolist() == [[0, 1, 2], [1, 2, 1]]
+    assert store.structure(def_) is None
+
+    for index, res_name in [(abc, "ABC"), (def_, "DEF")]:
+        atom_names1, atom_names2, bond_orders = store.bonds(index)
+        assert {
+            (atom_name1, atom_name2): bond_order
+            for atom_name1, atom_name2, bond_order
+            in zip(atom_names1, atom_names2, bond_orders)
+        } == datasets["intra_bonds"][res_name]
+    assert store.bonds(ghi) is None
+
+    for index, res_name in [(abc, "ABC"), (def_, "DEF"), (ghi, "GHI")]:
+        assert store.mass(index) \
+            == datasets["residue_masses"].get(res_name)
+        assert store.link_type(index) \
+            == datasets["link_types"].get(res_name)
+        assert store.full_name(index) \
+            == datasets["residue_names"].get(res_name)
+
+
+def test_component_store_missing_dataset(tmp_path):
+    """
+    Check whether the data from a missing dataset raises an exception
+    on access, while the remaining data is still accessible, and
+    whether a store is never written from incomplete data.
+    """
+    msgpack = pytest.importorskip("msgpack")
+    from biotite.structure.info.ccd import ComponentStore
+
+    datasets = {
+        "intra_bonds": {"ABC": {("C1", "O1"): 2}},
+        "residue_masses": {"ABC": 42.0},
+        "link_types": {"ABC": "NON-POLYMER"},
+        "residue_names": {"ABC": "ALPHABET"},
+    }
+    for name, dataset in datasets.items():
+        with open(tmp_path / f"{name}.msgpack", "wb") as file:
+            msgpack.pack(dataset, file)
+
+    store = ComponentStore.from_msgpack(str(tmp_path))
+    abc = store.index("ABC")
+    with pytest.raises(FileNotFoundError, match="residues.msgpack"):
+        store.structure(abc)
+    with pytest.raises(FileNotFoundError, match="residues.msgpack"):
+        store.write(str(tmp_path / "components.bcs"))
+    assert not (tmp_path / "components.bcs").exists()
+    assert store.mass(abc) == 42.0
+
+
+def test_component_store_outdated(tmp_path):
+    """
+    Check whether a store is detected as outdated, after a dataset
+    was changed.
+    """
+    msgpack = pytest.importorskip("msgpack")
+    from biotite.structure.info.ccd import ComponentStore, DATASET_FILE_NAMES
+
+    for file_name in DATASET_FILE_NAMES:
+        with open(tmp_path / file_name, "wb") as file:
+            msgpack.pack({}, file)
+    ComponentStore.from_msgpack(str(tmp_path)).write(
+        str(tmp_path / "components.bcs")
+    )
+    store = ComponentStore.read(str(tmp_path / "components.bcs"))
+    assert store.is_up_to_date(str(tmp_path))
+
+    with open(tmp_path / "link_types.msgpack", "wb") as file:
+        msgpack.pack({"ABC": "NON-POLYMER"}, file)
+    assert not store.is_up_to_date(str(tmp_path))
+
+
 @pytest.mark.parametrize(
     "multi_model, seed", itertools.product([False, True], range(10))
 )
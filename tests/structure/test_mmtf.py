@@ -46,6 +46,47 @@ def test_codecs(path):
                 assert (array1 == array2).all()
 
 
+@pytest.mark.parametrize(
+    "path", glob.glob(join(data_dir("structure"), "*.mmtf"))
+)
+def test_get_array(path):
+    """
+    Decoding only a range of an encoded array should give the same
+    result as slicing the entirely decoded array.
+    """
+    mmtf_file = mmtf.MMTFFile.read(path)
+    for key in mmtf_file:
+        if mmtf_file.get_codec(key) is None:
+            continue
+        ref_array = mmtf_file[key]
+        length = len(ref_array)
+        for start, stop in [
+            (None, None), (0, length // 3), (length // 3, 2 * length // 3),
+            (length - 1, None), (-5, -2), (3, 1)
+        ]:
+            test_array = mmtf_file.get_array(key, start, stop)
+            assert test_array.dtype == ref_array.dtype
+            assert test_array.tolist() == ref_array[start:stop].tolist()
+
+
+def test_model_selection():
+    """
+    Each model obtained via the `model` parameter should be equal to
+    the corresponding model in the stack.
+    """
+    path = join(data_dir("structure"), "1l2y.mmtf")
+    mmtf_file = mmtf.MMTFFile.read(path)
+    stack = mmtf.get_structure(mmtf_file, include_bonds=True)
+    for model in [1, 2, stack.stack_depth(), -1]:
+        array = mmtf.get_structure(mmtf_file, model=model, include_bonds=True)
+        ref_array = stack[model - 1 if model > 0 else model]
+        for category in ref_array.get_annotation_categories():
+            assert array.get_annotation(category).tolist() == \
+                   ref_array.get_annotation(category).tolist()
+        assert array.coord.tolist() == ref_array.coord.tolist()
+        assert array.bonds == ref_array.bonds
+
+
 @pytest.mark.parametrize(
     "path, model",
     itertools.product(
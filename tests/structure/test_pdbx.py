@@ -2,6 +2,7 @@
 # under the 3-Clause BSD License. Please see 'LICENSE.rst' for further
 # information.
 
+import io
 import itertools
 import glob
 from os.path import join
@@ -49,6 +50,61 @@ def test_parsing(category, key, exp_value):
         assert value == exp_value
 
 
+def test_tokenization():
+    """
+    Test parsing of quoted values, multi-line text fields and comments,
+    in *looped* and *non-looped* categories.
+    """
+    lines = [
+        "data_test",
+        "#",
+        "_single.quoted     'it's quoted'",
+        "_single.next_line",
+        '"value in next line"',
+        "_single.text_field",
+        ";first line",
+        "_not_a_category.key second line",
+        ";",
+        "#",
+        "loop_",
+        "_looped.id",
+        "_looped.name",
+        "1 'a b'",
+        '2 "c\'d" 3',
+        ";multi",
+        "line",
+        ";",
+        "# comment",
+        "4 e#f",
+        "#",
+    ]
+    pdbx_file = pdbx.PDBxFile.read(io.StringIO("\n".join(lines)))
+    assert list(pdbx_file.keys()) == [("test", "single"), ("test", "looped")]
+    assert pdbx_file["single"] == {
+        "quoted"     : "it's quoted",
+        "next_line"  : "value in next line",
+        "text_field" : "first line_not_a_category.key second line",
+    }
+    looped = pdbx_file["looped"]
+    assert looped["id"].tolist() == ["1", "2", "3", "4"]
+    assert looped["name"].tolist() == ["a b", "c'd", "multiline", "e#f"]
+
+
+def test_category_dtype():
+    """
+    *Looped* and *non-looped* categories should both give object arrays,
+    so that assigning longer strings does not truncate them.
+    """
+    pdbx_file = pdbx.PDBxFile.read(join(data_dir("structure"), "1l2y.cif"))
+    looped = pdbx_file.get_category("atom_site")
+    non_looped = pdbx_file.get_category("struct", expect_looped=True)
+    for category_dict in (looped, non_looped):
+        for array in category_dict.values():
+            assert array.dtype == object
+    looped["label_atom_id"][0] = "LONG_NAME"
+    assert looped["label_atom_id"][0] == "LONG_NAME"
+
+
 @pytest.mark.parametrize(
     "string, use_array",
     itertools.product(
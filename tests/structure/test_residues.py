@@ -2,6 +2,7 @@
 # under the 3-Clause BSD License. Please see 'LICENSE.rst' for further
 # information.
 
+import itertools
 import biotite.structure as struc
 import biotite.structure.io as strucio
 import numpy as np
@@ -20,6 +21,60 @@ def test_apply_residue_wise(array):
     assert data.tolist() == [len(array[array.res_id == i])
                              for i in range(1, 21)]
 
+
+@pytest.mark.parametrize(
+    "function, axis, dtype_and_nan",
+    itertools.product(
+        [np.sum, np.nansum, np.mean, np.average, np.nanmean,
+         np.min, np.max, np.nanmin, np.nanmax, np.count_nonzero],
+        [None, 0],
+        # Only floating point types can contain NaN values
+        [(np.float32, False), (np.float32, True), (np.int32, False),
+         (bool, False)]
+    )
+)
+def test_apply_residue_wise_reductions(array, function, axis, dtype_and_nan):
+    """
+    Compare the reductions that are computed for all residues at once
+    with calling the function for each residue.
+    """
+    dtype, insert_nan = dtype_and_nan
+    np.random.seed(0)
+    data = (np.random.rand(array.array_length(), 3) * 10).astype(dtype)
+    if insert_nan:
+        data[np.random.choice(len(data), 50, replace=False)] = np.nan
+    if axis is None:
+        # Without axis the reduction over the first axis
+        # is only equivalent for one-dimensional data
+        data = data[:, 0]
+
+    test_data = struc.apply_residue_wise(array, data, function, axis)
+    # Wrapping the function prevents the reduction for all residues
+    # at once
+    ref_data = struc.apply_residue_wise(
+        array, data, lambda *args, **kwargs: function(*args, **kwargs), axis
+    )
+    assert test_data.dtype == ref_data.dtype
+    assert test_data.shape == ref_data.shape
+    assert test_data.astype(float) == pytest.approx(
+        ref_data.astype(float), rel=1e-6, nan_ok=True
+    )
+
+
+def test_apply_residue_wise_centroid(array):
+    """
+    Check :func:`centroid()` as function for the reduction over all
+    residues at once.
+    """
+    test_centroids = struc.apply_residue_wise(
+        array, array.coord, struc.centroid
+    )
+    ref_centroids = np.stack(
+        [struc.centroid(residue) for residue in struc.residue_iter(array)]
+    )
+    assert test_centroids == pytest.approx(ref_centroids, abs=1e-5)
+
+
 def test_spread_residue_wise(array):
     input_data = np.arange(1,21)
     output_data = struc.spread_residue_wise(array, input_data)
@@ -63,4 +118,6 @@ def test_residue_iter(array):
     ref_centroid = struc.apply_residue_wise(
         array, array.coord, np.average, axis=0
     )
-    assert centroid == ref_centroid.tolist()
\ No newline at end of file
+    # The residue-wise mean is computed for all residues at once,
+    # which sums up the values in a different order than 'np.mean()'
+    assert np.array(centroid) == pytest.approx(ref_centroid, abs=1e-5)
\ No newline at end of file
@@ -73,4 +73,46 @@ def test_coarse_grained(pdb_id):
     # have less than 40% SASA difference
     assert np.count_nonzero(
         np.isclose(sasa, sasa_exp, rtol=4e-1, atol=1)
-    ) / len(sasa) > 0.98
\ No newline at end of file
+    ) / len(sasa) > 0.98
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_stack(n_jobs):
+    """
+    The SASA of an :class:`AtomArrayStack` should be equal to the SASA
+    of each individual model.
+    """
+    file = mmtf.MMTFFile.read(join(data_dir("structure"), "1l2y.mmtf"))
+    stack = mmtf.get_structure(file)[:3]
+    ref_sasa = np.stack(
+        [struc.sasa(model, vdw_radii="Single", n_jobs=1) for model in stack]
+    )
+
+    test_sasa = struc.sasa(stack, vdw_radii="Single", n_jobs=n_jobs)
+    assert test_sasa.shape == (3, stack.array_length())
+    assert np.array_equal(test_sasa, ref_sasa, equal_nan=True)
+
+    # Parallelization over atoms should give the same result
+    test_sasa = struc.sasa(stack[0], vdw_radii="Single", n_jobs=n_jobs)
+    assert np.array_equal(test_sasa, ref_sasa[0], equal_nan=True)
+
+
+def test_level():
+    """
+    Compare the SASA summed on residue and chain level with the sum of
+    the atom-wise SASA.
+    """
+    file = mmtf.MMTFFile.read(join(data_dir("structure"), "1l2y.mmtf"))
+    stack = mmtf.get_structure(file)[:2]
+    atom_sasa = struc.sasa(stack, vdw_radii="Single")
+
+    ref_sasa = np.stack([
+        struc.apply_residue_wise(model, sasa, np.nansum)
+        for model, sasa in zip(stack, atom_sasa)
+    ])
+    test_sasa = struc.sasa(stack, vdw_radii="Single", level="residue")
+    assert test_sasa == pytest.approx(ref_sasa, rel=1e-5)
+
+    # The structure has a single chain
+    ref_sasa = np.nansum(atom_sasa, axis=-1)[:, np.newaxis]
+    test_sasa = struc.sasa(stack, vdw_radii="Single", level="chain")
+    assert test_sasa == pytest.approx(ref_sasa, rel=1e-5)
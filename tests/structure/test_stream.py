@@ -0,0 +1,135 @@
+# This source code is part of the Biotite package and is distributed
+# under the 3-Clause BSD License. Please see 'LICENSE.rst' for further
+# information.
+
+import itertools
+from os.path import join
+import numpy as np
+import pytest
+import biotite.structure as struc
+import biotite.structure.io as strucio
+from ..util import data_dir
+
+
+@pytest.fixture
+def stack():
+    stack = strucio.load_structure(join(data_dir("structure"), "1l2y.mmtf"))
+    stack, _ = struc.superimpose(stack[0], stack)
+    return stack
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 100])
+def test_compare(stack, chunk_size):
+    """
+    Compare the streamed average, RMSD and RMSF with the respective
+    functions applied to the entire stack.
+    """
+    average, rmsd, rmsf, rmsf_to_ref = struc.analyze_stream(
+        stack,
+        [
+            struc.AverageAnalysis(),
+            struc.RMSDAnalysis(stack[0]),
+            struc.RMSFAnalysis(),
+            struc.RMSFAnalysis(stack[0]),
+        ],
+        chunk_size=chunk_size
+    )
+    ref_average = struc.average(stack)
+    assert average.atom_name.tolist() == ref_average.atom_name.tolist()
+    assert average.coord == pytest.approx(ref_average.coord, abs=1e-4)
+    assert rmsd == pytest.approx(struc.rmsd(stack[0], stack), abs=1e-5)
+    assert rmsf == pytest.approx(struc.rmsf(ref_average, stack), abs=1e-4)
+    assert rmsf_to_ref == pytest.approx(struc.rmsf(stack[0], stack), abs=1e-5)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7])
+def test_template(stack, chunk_size):
+    """
+    Providing the frames as coordinates with a template should give the
+    same result as providing the frames as :class:`AtomArray` objects.
+    """
+    frames = [(model.coord, None, None) for model in stack]
+    average, = struc.analyze_stream(
+        frames, [struc.AverageAnalysis()],
+        template=stack[0], chunk_size=chunk_size
+    )
+    ref_average = struc.average(stack)
+    assert average.coord == pytest.approx(ref_average.coord, abs=1e-4)
+
+
+@pytest.mark.parametrize("use_mask", [False, True])
+def test_rdf(use_mask):
+    """
+    Compare the streamed RDF with :func:`rdf()`.
+    """
+    stack = strucio.load_structure(join(data_dir("structure"), "waterbox.gro"))
+    # Shorten the test
+    stack = stack[:5]
+    oxygen_mask = stack.atom_name == "OW"
+    if use_mask:
+        center = oxygen_mask
+        ref_center = stack[:, oxygen_mask]
+    else:
+        center = np.array([[5.0, 5.0, 5.0], [10.0, 10.0, 10.0]])
+        ref_center = np.repeat(center[np.newaxis], len(stack), axis=0)
+
+    (bins, g_r), = struc.analyze_stream(
+        stack,
+        [struc.RDFAnalysis(
+            center, oxygen_mask, interval=(0.2, 10), bins=49, periodic=True
+        )],
+        chunk_size=2
+    )
+    ref_bins, ref_g_r = struc.rdf(
+        ref_center, stack[:, oxygen_mask],
+        interval=(0.2, 10), bins=49, periodic=True
+    )
+    assert bins.tolist() == ref_bins.tolist()
+    assert g_r == pytest.approx(ref_g_r)
+
+
+@pytest.mark.parametrize("density", [False, True])
+def test_density(stack, density):
+    """
+    Compare the streamed density with :func:`density()`.
+    """
+    ref_hist, edges = struc.density(stack, density=density)
+    (hist, test_edges), = struc.analyze_stream(
+        stack, [struc.DensityAnalysis(edges, density=density)], chunk_size=7
+    )
+    assert hist == pytest.approx(ref_hist)
+
+
+@pytest.mark.parametrize(
+    "to_file, use_bonds", itertools.product([False, True], [False, True])
+)
+def test_hbond(stack, tmp_path, to_file, use_bonds):
+    """
+    Compare the streamed hydrogen bonds with :func:`hbond()`.
+    Without a :class:`BondList` the hydrogen atoms must be assigned to
+    the donors based on the first frame of the trajectory, as
+    :func:`hbond()` does, instead of the first frame of each chunk.
+    """
+    if not use_bonds:
+        stack.bonds = None
+    ref_triplets, ref_mask = struc.hbond(stack)
+
+    file_name = str(tmp_path / "hbonds.bin") if to_file else None
+    analysis = struc.HBondAnalysis(file_name)
+    (triplets, pairs), = struc.analyze_stream(
+        stack, [analysis], chunk_size=7
+    )
+    mask = np.zeros((stack.stack_depth(), len(triplets)), dtype=bool)
+    mask[pairs[:, 0], pairs[:, 1]] = True
+
+    ref_bonds = {
+        tuple(triplet): ref_mask[:, i].tolist()
+        for i, triplet in enumerate(ref_triplets)
+    }
+    test_bonds = {
+        tuple(triplet): mask[:, i].tolist()
+        for i, triplet in enumerate(triplets)
+    }
+    assert test_bonds == ref_bonds
+    assert analysis.get_frequency().tolist() \
+        == struc.hbond_frequency(mask).tolist()
@@ -103,4 +103,27 @@ def test_masked_superimposition(seed):
     fitted = struc.superimpose_apply(mobile, transformation)
     
     struc.distance(fixed[mask], fitted[mask])[0] \
-        == pytest.approx(0, abs=5e-4)
\ No newline at end of file
+        == pytest.approx(0, abs=5e-4)
+
+
+def test_superimposition_stack_consistency():
+    """
+    Superimposing all models of a stack at once should give the same
+    result as superimposing each model individually.
+    """
+    path = join(data_dir("structure"), "1l2y.mmtf")
+    stack = strucio.load_structure(path)
+    fixed = stack[0]
+    mobile = struc.rotate(struc.translate(stack, (1,2,3)), (1,2,3))
+    # Include a reflected model
+    mobile.coord[1, :, 0] *= -1
+
+    fitted, transformations = struc.superimpose(fixed, mobile)
+
+    for i in range(mobile.stack_depth()):
+        ref_fitted, ref_transformation = struc.superimpose(fixed, mobile[i])
+        assert fitted.coord[i] == pytest.approx(ref_fitted.coord, abs=1e-4)
+        for test_trans, ref_trans in zip(
+            transformations[i], ref_transformation
+        ):
+            assert test_trans == pytest.approx(ref_trans, abs=1e-5)
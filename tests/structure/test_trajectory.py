@@ -16,6 +16,7 @@ import biotite.structure.io.tng as tng
 import biotite.structure.io.dcd as dcd
 import biotite.structure.io.netcdf as netcdf
 import biotite.structure.io.pdbx as pdbx
+from biotite.file import InvalidFileError
 from ..util import data_dir, cannot_import
 
 
@@ -240,4 +241,104 @@ def test_read_iter_structure(format, start, stop, step):
         )]
     )
     
-    assert test_traj == ref_traj
\ No newline at end of file
+    assert test_traj == ref_traj
+
+
+@pytest.mark.parametrize(
+    "format, start, stop, step, use_atom_i",
+    itertools.product(
+        ["trr", "xtc", "dcd"],
+        [None, 2],
+        [None, 17],
+        [None, 2],
+        [False, True]
+    )
+)
+def test_native_reader(format, start, stop, step, use_atom_i):
+    """
+    Check whether the formats with a native reader can be read without
+    *MDTraj* and compare the read frames with the reference MMTF file.
+    """
+    ref_traj = strucio.load_structure(join(data_dir("structure"), "1l2y.mmtf"))
+    ref_traj = ref_traj[slice(start, stop, step)]
+    if use_atom_i:
+        atom_i = np.array([10, 2, 5, 100])
+        ref_traj = ref_traj[:, atom_i]
+    else:
+        atom_i = None
+
+    if format == "trr":
+        traj_file_cls = trr.TRRFile
+    if format == "xtc":
+        traj_file_cls = xtc.XTCFile
+    if format == "dcd":
+        traj_file_cls = dcd.DCDFile
+    file_name = join(data_dir("structure"), f"1l2y.{format}")
+    traj_file = traj_file_cls.read(file_name, start, stop, step, atom_i)
+    assert traj_file.get_coord() \
+        == pytest.approx(ref_traj.coord, abs=1e-2)
+    # The files contain a unit box
+    assert traj_file.get_box() == pytest.approx(
+        np.repeat(np.identity(3)[np.newaxis], ref_traj.stack_depth(), axis=0)
+    )
+    if format != "dcd":
+        start = start if start is not None else 0
+        stop = stop if stop is not None else 38
+        step = step if step is not None else 1
+        assert (traj_file.get_time() - 1).astype(int).tolist() \
+            == list(range(start, stop, step))
+
+    test_coord = np.stack([
+        coord for coord, _, _
+        in traj_file_cls.read_iter(file_name, start, stop, step, atom_i)
+    ])
+    assert test_coord.tolist() == traj_file.get_coord().tolist()
+
+
+def test_dcd_memory_mapping(tmp_path):
+    """
+    Check that the coordinates of a DCD file are mapped from the file
+    and that modifying them does not alter the file.
+    """
+    file_name = str(tmp_path / "test.dcd")
+    with open(join(data_dir("structure"), "1l2y.dcd"), "rb") as file:
+        content = file.read()
+    with open(file_name, "wb") as file:
+        file.write(content)
+
+    coord = dcd.DCDFile.read(file_name).get_coord()
+    assert not coord.flags.owndata
+    coord[:] = 0
+    with open(file_name, "rb") as file:
+        assert file.read() == content
+
+
+@pytest.mark.parametrize(
+    "format, in_last_frame",
+    itertools.product(["trr", "xtc", "dcd"], [False, True])
+)
+def test_truncated_file(tmp_path, format, in_last_frame):
+    """
+    Reading a truncated file with a native reader should raise an
+    :class:`InvalidFileError`.
+    """
+    file_name = str(tmp_path / f"test.{format}")
+    with open(join(data_dir("structure"), f"1l2y.{format}"), "rb") as file:
+        content = file.read()
+    with open(file_name, "wb") as file:
+        if in_last_frame:
+            # Truncate the file within the last frame
+            file.write(content[:-10])
+        else:
+            # Truncate the file within the header of the DCD file
+            # or the first frame of the other formats, respectively
+            file.write(content[:200])
+
+    if format == "trr":
+        traj_file_cls = trr.TRRFile
+    if format == "xtc":
+        traj_file_cls = xtc.XTCFile
+    if format == "dcd":
+        traj_file_cls = dcd.DCDFile
+    with pytest.raises(InvalidFileError):
+        traj_file_cls.read(file_name)
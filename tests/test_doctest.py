@@ -50,6 +50,7 @@ RCSB_URL = "https://www.rcsb.org/"
                                                  "biotite"]                  ),
     pytest.param("biotite.structure.io.pdbx",   ["biotite.structure"]        ),
     pytest.param("biotite.structure.io.npz",    ["biotite.structure"]        ),
+    pytest.param("biotite.structure.io.cache",  ["biotite.structure"]        ),
     pytest.param("biotite.structure.io.mmtf",   ["biotite.structure"]        ),
     pytest.param("biotite.structure.info",      ["biotite.structure"]        ),
     pytest.param("biotite.database.entrez",     [],                           
@@ -87,6 +88,8 @@ def test_doctest(package_name, context_package_names):
     globs = {}
     mod_names = []
     #The package itself is also used as context
+    # This also loads the lazily loaded attributes of the package into
+    # its dictionary, which is inspected by the 'DocTestFinder'
     for name in context_package_names + [package_name]:
         context_package = import_module(name)
         globs.update(
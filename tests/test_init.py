@@ -4,10 +4,178 @@
 
 __author__ = "Daniel Bauer"
 
+import ast
+import importlib
+import pkgutil
+import re
+import subprocess
+import sys
+from os.path import join
+from types import ModuleType
 import biotite
 import pytest
 
 
 def test_version_number():
     version = biotite.__version__
-    assert hasattr(biotite, "__version__")
\ No newline at end of file
+    assert hasattr(biotite, "__version__")
+
+
+# Modules, whose attributes are not exposed by the package
+INTERNAL_MODULES = {
+    "biotite":                ["lazy", "parallel"],
+    "biotite.sequence":       ["codec"],
+    "biotite.structure":      ["util"],
+    "biotite.structure.info": ["ccd"],
+}
+
+
+@pytest.mark.parametrize("package_name", INTERNAL_MODULES.keys())
+def test_lazy_attributes(package_name):
+    """
+    The lazily loaded attributes of a package should be the same as
+    the ones obtained by star-importing all of its modules.
+    """
+    package = importlib.import_module(package_name)
+    module_names = [
+        module_info.name
+        for module_info in pkgutil.iter_modules(package.__path__)
+        if not module_info.ispkg
+        and module_info.name not in INTERNAL_MODULES[package_name]
+    ]
+    # Importing the modules first ensures that the modules do not
+    # shadow attributes with the same name (e.g. 'sasa()')
+    modules = [
+        importlib.import_module(f"{package_name}.{module_name}")
+        for module_name in dict.fromkeys(package._lazy_attributes.values())
+    ]
+    assert sorted(dict.fromkeys(package._lazy_attributes.values())) \
+        == sorted(module_names)
+
+    ref_attributes = {}
+    for module in modules:
+        for name in module.__all__:
+            ref_attributes[name] = getattr(module, name)
+    assert sorted(package.__all__) == sorted(ref_attributes.keys())
+    for name, ref_value in ref_attributes.items():
+        assert getattr(package, name) is ref_value
+    assert set(ref_attributes.keys()).issubset(dir(package))
+
+
+@pytest.mark.parametrize("package_name", INTERNAL_MODULES.keys())
+def test_no_leaked_names(package_name):
+    """
+    The names imported in the ``__init__.py`` of a package for lazy
+    loading should not appear as public attributes of the package.
+    """
+    package = importlib.import_module(package_name)
+    public_names = [
+        name for name, value in vars(package).items()
+        if not name.startswith("_") and not isinstance(value, ModuleType)
+    ]
+    assert set(public_names).issubset(package.__all__)
+
+
+@pytest.mark.parametrize("package_name", INTERNAL_MODULES.keys())
+def test_lazy_attribute_table(package_name):
+    """
+    Generate the table of lazily loaded attributes from the
+    ``__all__`` of the modules in the source files of a package and
+    compare it to the table in its ``__init__.py``.
+
+    In contrast to :func:`test_lazy_attributes()`, this test does not
+    depend on whether optional dependencies are installed.
+    If the test fails, the generated table is shown, which can be
+    copied into ``__init__.py``.
+    """
+    package = importlib.import_module(package_name)
+    generated_table = {}
+    for module_info in pkgutil.iter_modules(package.__path__):
+        module_name = module_info.name
+        if (
+            module_info.ispkg
+            or module_name in INTERNAL_MODULES[package_name]
+        ):
+            continue
+        generated_table[module_name] = _parse_all(
+            package.__path__[0], module_name
+        )
+
+    table = {}
+    for name, module_name in package._lazy_attributes.items():
+        table.setdefault(module_name, []).append(name)
+    assert table == generated_table, (
+        "The table of lazily loaded attributes is outdated, expected\n"
+        + "\n".join(
+            f"    {module_name!r}: {names!r},"
+            for module_name, names in sorted(generated_table.items())
+        )
+    )
+
+
+def _parse_all(package_dir, module_name):
+    """
+    Get the names in ``__all__`` of a Python or Cython module from its
+    source, including names that are added conditionally.
+    """
+    for extension in (".py", ".pyx"):
+        try:
+            with open(join(package_dir, module_name + extension)) as file:
+                source = file.read()
+            break
+        except FileNotFoundError:
+            pass
+    else:
+        raise FileNotFoundError(f"No source file for module '{module_name}'")
+    # Cython source code cannot be parsed by 'ast'
+    # -> Only parse the '__all__' expressions
+    names = ast.literal_eval(
+        re.search(r"^__all__\s*=\s*(\[.*?\])", source, re.M | re.S).group(1)
+    )
+    for match in re.finditer(r"__all__\.append\((.*?)\)", source):
+        names.append(ast.literal_eval(match.group(1)))
+    return names
+
+
+def test_lazy_import():
+    """
+    Importing the packages should not import any of their modules,
+    as they are only imported on first access of their attributes.
+    This guards the import time of *Biotite* against regressions.
+    """
+    code = (
+        "import sys\n"
+        "import biotite.sequence\n"
+        "import biotite.structure\n"
+        "import biotite.structure.info\n"
+        "print('\\n'.join(sys.modules))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True, text=True, check=True
+    ).stdout
+    imported = set(output.split())
+    assert set(
+        name for name in imported if name.startswith("biotite")
+    ) == set([
+        "biotite", "biotite.lazy", "biotite.sequence",
+        "biotite.structure", "biotite.structure.info"
+    ])
+    # Not even NumPy is required for the package import
+    assert "numpy" not in imported
+
+    # Accessing an attribute imports only the required modules
+    code = (
+        "import sys\n"
+        "import biotite.structure as struc\n"
+        "struc.AtomArray\n"
+        "print('\\n'.join(sys.modules))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True, text=True, check=True
+    ).stdout
+    imported = set(output.split())
+    assert "biotite.structure.atoms" in imported
+    assert "biotite.structure.basepairs" not in imported
+    assert "biotite.structure.info" not in imported